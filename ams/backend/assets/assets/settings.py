@@ -179,6 +179,22 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Product/Asset response cache (assets_ms/services/response_cache.py):
+# seconds an entry is fresh, then how long it may still be served stale
+# while one worker refreshes it. Single flight and generation invalidation
+# across workers need the shared Redis cache (ASSETS_CACHE_REDIS_URL); the
+# default local-memory cache only coordinates threads of one process.
+ASSETS_CACHE_REDIS_URL = os.getenv("ASSETS_CACHE_REDIS_URL", "")
+if ASSETS_CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': ASSETS_CACHE_REDIS_URL,
+        }
+    }
+RESPONSE_CACHE_TTL = int(os.getenv("ASSETS_RESPONSE_CACHE_TTL", 300))
+RESPONSE_CACHE_STALE_TTL = int(os.getenv("ASSETS_RESPONSE_CACHE_STALE_TTL", 600))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -1,97 +1,127 @@
 from io import BytesIO
+import csv
 import datetime
-from django.http import HttpResponse
+import tempfile
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from ..services.depreciation_report import generate_depreciation_report
-from ..services.asset_report import generate_asset_report
+from ..services.depreciation_report import generate_depreciation_report, iter_depreciation_report
+from ..services.asset_report import generate_asset_report, iter_asset_report
 from ..services.activity_report import generate_activity_report, get_activity_summary
 
 # No ticket resolution here — report will only include status fields per request
 
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def streaming_csv_response(filename, header, rows):
+    """Stream `rows` (lists of cell values) as a CSV download, one line at a time."""
+    def lines():
+        writer = csv.writer(_Echo())
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def streaming_xlsx_response(filename, sheet_title, header, rows):
+    """Write `rows` to a write-only workbook (rows are flushed to disk, not kept
+    in memory) and stream the finished file back."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(sheet_title)
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+
+    tmp = tempfile.TemporaryFile()
+    wb.save(tmp)
+    tmp.seek(0)
+    return FileResponse(tmp, as_attachment=True, filename=filename, content_type=XLSX_CONTENT_TYPE)
+
+
+def _openpyxl_missing_response(install_instructions):
+    try:
+        import openpyxl  # type: ignore  # noqa: F401
+    except ImportError:
+        return Response({
+            'detail': 'openpyxl is not installed in the running Python environment.',
+            'install_instructions': install_instructions,
+        }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return None
+
 
 class DepreciationReportAPIView(APIView):
-    """Return depreciation report as XLSX (default) or JSON.
+    """Return depreciation report as XLSX (default), CSV or JSON.
 
     Query params:
       - depreciation_id: int to filter by a specific depreciation record
-      - format=xlsx (default) to download an XLSX file
-      - format=json to return JSON results
+      - export_format (or format)=xlsx (default) to download an XLSX file
+      - export_format=csv to download a streamed CSV file
+      - export_format=json to return JSON results
     """
 
+    FIELDNAMES = [
+        'assetId', 'product', 'statusName', 'depreciationName', 'duration',
+        'currency', 'minimumValue', 'purchaseCost', 'currentValue', 'depreciated',
+        'monthlyDepreciation', 'monthsLeft'
+    ]
+
     def get(self, request):
         dep = request.query_params.get('depreciation_id')
-        fmt = request.query_params.get('format', '').lower()
+        fmt = (request.query_params.get('export_format') or request.query_params.get('format', '')).lower()
 
         try:
             dep_id = int(dep) if dep is not None else None
         except ValueError:
             return Response({"detail": "Invalid depreciation_id"}, status=status.HTTP_400_BAD_REQUEST)
 
-        rows = generate_depreciation_report(depreciation_id=dep_id)
-
         # Explicit JSON request returns JSON (backwards compatible)
         if fmt == 'json':
-            return Response({'results': rows})
-
-        # CSV not supported for this report; prefer XLSX
-        if fmt == 'csv':
-            return Response({'detail': 'CSV export is not supported. Use format=xlsx or omit format to download an XLSX file.'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({'results': generate_depreciation_report(depreciation_id=dep_id)})
 
-        # Default: produce XLSX. Lazy import openpyxl and provide install guidance if missing.
-        try:
-            import openpyxl  # type: ignore
-            from openpyxl.workbook import Workbook  # type: ignore
-        except Exception:
-            return Response({
-                'detail': 'openpyxl is not installed in the running Python environment.',
-                'install_instructions': (
-                    'Add openpyxl to backend/assets/requirements.txt and rebuild the assets image,\n'
-                    'for example: docker-compose -f docker-compose.dev.yml build --no-cache assets && '
-                    'docker-compose -f docker-compose.dev.yml up -d assets'
-                )
-            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        rows = (self._cells(r) for r in iter_depreciation_report(depreciation_id=dep_id))
+        filename = f"depreciation_report_{datetime.date.today().isoformat()}"
 
-        fieldnames = [
-            'assetId', 'product', 'statusName', 'depreciationName', 'duration',
-            'currency', 'minimumValue', 'purchaseCost', 'currentValue', 'depreciated',
-            'monthlyDepreciation', 'monthsLeft'
-        ]
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'DepreciationReport'
-
-        # Header
-        ws.append(fieldnames)
-
-        for r in rows:
-            row = []
-            for f in fieldnames:
-                v = r.get(f, '')
-                if isinstance(v, float):
-                    # monthlyDepreciation keep more precision
-                    if f == 'monthlyDepreciation':
-                        row.append(round(v, 6))
-                    else:
-                        row.append(round(v, 2))
-                else:
-                    row.append(v)
-            ws.append(row)
-
-        bio = BytesIO()
-        wb.save(bio)
-        bio.seek(0)
+        if fmt == 'csv':
+            return streaming_csv_response(f"{filename}.csv", self.FIELDNAMES, rows)
 
-        filename = f"depreciation_report_{datetime.date.today().isoformat()}.xlsx"
-        response = HttpResponse(bio.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
+        # Default: produce XLSX. Provide install guidance if openpyxl is missing.
+        missing = _openpyxl_missing_response(
+            'Add openpyxl to backend/assets/requirements.txt and rebuild the assets image,\n'
+            'for example: docker-compose -f docker-compose.dev.yml build --no-cache assets && '
+            'docker-compose -f docker-compose.dev.yml up -d assets'
+        )
+        if missing:
+            return missing
+        return streaming_xlsx_response(f"{filename}.xlsx", 'DepreciationReport', self.FIELDNAMES, rows)
+
+    def _cells(self, r):
+        row = []
+        for f in self.FIELDNAMES:
+            v = r.get(f, '')
+            if isinstance(v, float):
+                # monthlyDepreciation keep more precision
+                row.append(round(v, 6) if f == 'monthlyDepreciation' else round(v, 2))
+            else:
+                row.append(v)
+        return row
 
 
 class AssetReportAPIView(APIView):
-    """Return asset report as XLSX (default) or JSON.
+    """Return asset report as XLSX (default), CSV or JSON.
 
     Query params:
       - status_id: int to filter by a specific status
@@ -101,8 +131,9 @@ class AssetReportAPIView(APIView):
       - product_id: int to filter by a specific product
       - manufacturer_id: int to filter by a specific manufacturer
       - columns: comma-separated list of column IDs to include
-      - format=xlsx (default) to download an XLSX file
-      - format=json to return JSON results
+      - export_format=xlsx (default) to download an XLSX file
+      - export_format=csv to download a streamed CSV file
+      - export_format=json to return JSON results
     """
 
     # Map frontend column IDs to backend field names
@@ -162,7 +193,7 @@ class AssetReportAPIView(APIView):
         except ValueError:
             return Response({"detail": "Invalid filter parameter. IDs must be integers."}, status=status.HTTP_400_BAD_REQUEST)
 
-        rows = generate_asset_report(
+        filters = dict(
             status_id=status_id,
             category_id=category_id,
             supplier_id=supplier_id,
@@ -195,52 +226,29 @@ class AssetReportAPIView(APIView):
         if fmt == 'json':
             # Filter rows to only include selected columns
             filtered_rows = []
-            for row in rows:
+            for row in generate_asset_report(**filters):
                 filtered_row = {k: row.get(k, '') for k in fieldnames}
                 filtered_rows.append(filtered_row)
             return Response({'results': filtered_rows, 'count': len(filtered_rows)})
 
-        # CSV not supported
-        if fmt == 'csv':
-            return Response({'detail': 'CSV export is not supported. Use export_format=xlsx or omit export_format to download an XLSX file.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Default: XLSX export
-        try:
-            from openpyxl.workbook import Workbook
-        except ImportError:
-            return Response({
-                'detail': 'openpyxl is not installed in the running Python environment.',
-                'install_instructions': (
-                    'Add openpyxl to backend/assets/requirements.txt and rebuild the assets image.'
-                )
-            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
-
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'AssetReport'
+        def cells(r):
+            return [round(v, 2) if isinstance(v, float) else v for v in (r.get(f, '') for f in fieldnames)]
 
+        rows = (cells(r) for r in iter_asset_report(**filters))
         # Header row with human-readable names
         header_names = self._get_header_names(fieldnames)
-        ws.append(header_names)
-
-        for r in rows:
-            row = []
-            for f in fieldnames:
-                v = r.get(f, '')
-                if isinstance(v, float):
-                    row.append(round(v, 2))
-                else:
-                    row.append(v)
-            ws.append(row)
+        filename = f"asset_report_{datetime.date.today().isoformat()}"
 
-        bio = BytesIO()
-        wb.save(bio)
-        bio.seek(0)
+        if fmt == 'csv':
+            return streaming_csv_response(f"{filename}.csv", header_names, rows)
 
-        filename = f"asset_report_{datetime.date.today().isoformat()}.xlsx"
-        response = HttpResponse(bio.read(), content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
+        # Default: XLSX export
+        missing = _openpyxl_missing_response(
+            'Add openpyxl to backend/assets/requirements.txt and rebuild the assets image.'
+        )
+        if missing:
+            return missing
+        return streaming_xlsx_response(f"{filename}.xlsx", 'AssetReport', header_names, rows)
 
     def _get_header_names(self, fieldnames):
         """Convert field names to human-readable header names."""
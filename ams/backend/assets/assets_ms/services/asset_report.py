@@ -1,37 +1,32 @@
-from typing import List, Dict, Optional
+from typing import Dict, Iterator, List, Optional
 from ..models import Asset, AssetCheckout
-from .contexts import (
-    get_statuses_list,
-    get_categories_list,
-    get_suppliers_list,
-    get_manufacturers_list,
-    get_depreciations_list,
-)
-from .integration_help_desk import *
-
-
-def _build_lookup_dict(data) -> Dict[int, Dict]:
-    """Convert a list response into a dict keyed by id for fast lookups."""
-    if isinstance(data, dict) and 'results' in data:
-        items = data['results']
-    elif isinstance(data, list):
-        items = data
-    else:
-        return {}
-    return {item.get('id'): item for item in items if item.get('id')}
+from .report_context import report_context_for
 
+CHUNK_SIZE = 2000
 
-def generate_asset_report(
+# Resource -> asset field holding its id
+CONTEXT_FIELDS = {
+    'statuses': 'status',
+    'categories': 'product__category',
+    'suppliers': 'supplier',
+    'manufacturers': 'product__manufacturer',
+    'locations': 'location',
+    'depreciations': 'product__depreciation',
+}
+
+
+def iter_asset_report(
     status_id: Optional[int] = None,
     category_id: Optional[int] = None,
     supplier_id: Optional[int] = None,
     location_id: Optional[int] = None,
     product_id: Optional[int] = None,
     manufacturer_id: Optional[int] = None,
-) -> List[Dict]:
-    """Return a list of assets with their full details for reporting.
+) -> Iterator[Dict]:
+    """Yield the rows of generate_asset_report() while reading assets in chunks.
 
-    Uses batch fetching for context data to avoid per-asset HTTP calls.
+    Only the context types referenced by the filtered assets are fetched,
+    with one list call each.
     """
     qs = Asset.objects.select_related('product').filter(
         is_deleted=False,
@@ -52,13 +47,13 @@ def generate_asset_report(
     if manufacturer_id is not None:
         qs = qs.filter(product__manufacturer=manufacturer_id)
 
-    # Batch fetch all context data upfront (single HTTP call each)
-    statuses_lookup = _build_lookup_dict(get_statuses_list(limit=500))
-    categories_lookup = _build_lookup_dict(get_categories_list(limit=500))
-    suppliers_lookup = _build_lookup_dict(get_suppliers_list(limit=500))
-    manufacturers_lookup = _build_lookup_dict(get_manufacturers_list(limit=500))
-    locations_lookup = _build_lookup_dict(get_locations_list(limit=500))
-    depreciations_lookup = _build_lookup_dict(get_depreciations_list(limit=500))
+    context = report_context_for(qs, CONTEXT_FIELDS)
+    statuses_lookup = context.maps['statuses']
+    categories_lookup = context.maps['categories']
+    suppliers_lookup = context.maps['suppliers']
+    manufacturers_lookup = context.maps['manufacturers']
+    locations_lookup = context.maps['locations']
+    depreciations_lookup = context.maps['depreciations']
 
     # Get active checkouts for all assets (checkouts without a corresponding checkin)
     active_checkouts = {}
@@ -72,9 +67,7 @@ def generate_asset_report(
                 'checkout_date': checkout.checkout_date.isoformat() if checkout.checkout_date else '',
             }
 
-    results = []
-
-    for asset in qs.order_by('asset_id'):
+    for asset in qs.order_by('asset_id').iterator(chunk_size=CHUNK_SIZE):
         product = getattr(asset, 'product', None)
 
         # Status lookup from cache
@@ -135,7 +128,7 @@ def generate_asset_report(
         # Image URL
         image_url = asset.image.url if asset.image else ''
 
-        results.append({
+        yield {
             'id': asset.id,
             'assetId': asset.asset_id or str(asset.id),
             'name': asset.name or '',
@@ -159,9 +152,26 @@ def generate_asset_report(
             'image': image_url,
             'createdAt': created_at_str,
             'updatedAt': updated_at_str,
-        })
+        }
+
 
-    return results
+def generate_asset_report(
+    status_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    supplier_id: Optional[int] = None,
+    location_id: Optional[int] = None,
+    product_id: Optional[int] = None,
+    manufacturer_id: Optional[int] = None,
+) -> List[Dict]:
+    """Return a list of assets with their full details for reporting."""
+    return list(iter_asset_report(
+        status_id=status_id,
+        category_id=category_id,
+        supplier_id=supplier_id,
+        location_id=location_id,
+        product_id=product_id,
+        manufacturer_id=manufacturer_id,
+    ))
 
 
 def print_sample_report(limit: int = 10) -> None:
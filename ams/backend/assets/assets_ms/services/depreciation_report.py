@@ -1,8 +1,8 @@
 from datetime import date
 from django.utils.timezone import now
-from typing import List, Dict, Optional
-from ..models import Asset, AssetCheckout
-from .contexts import get_depreciation_by_id, get_status_by_id
+from typing import Dict, Iterator, List, Optional, Tuple
+from ..models import Asset
+from .report_context import report_context_for
 
 #Will Add authentication imports here later
 #Fix the information about tickets later
@@ -23,61 +23,86 @@ def _months_between(start_date, end_date) -> int:
     return max(months, 0)
 
 
-def generate_depreciation_report(today: Optional[date] = None, depreciation_id: Optional[int] = None) -> List[Dict]:
-    """Return a list of assets that have a depreciation configured and computed metrics.
+# Asset columns read by the report; no model instances are built
+REPORT_COLUMNS = (
+    'id', 'asset_id', 'product__name', 'status', 'product__depreciation',
+    'purchase_cost', 'product__default_purchase_cost', 'purchase_date',
+)
+CHUNK_SIZE = 2000
 
-    Each list item contains keys used by the frontend report mockup, for example:
-    - assetId, product, statusType, statusName, deployedTo, depreciationName,
-      duration, currency, minimumValue, purchaseCost, currentValue,
-      depreciated, monthlyDepreciation, monthsLeft
 
-    Parameters:
-    - today: optional date to use as "now" for calculations (defaults to today)
-    - depreciation_id: if provided, filter assets to that depreciation id
-    """
-    today = today or date.today()
+def _depreciation_terms(dep) -> Tuple[str, int, float, str]:
+    """(name, duration in months, minimum value, currency) of a depreciation record, with defaults."""
+    dep_name = None
+    duration = None
+    minimum_value = 0
+    currency = None
+    if isinstance(dep, dict):
+        dep_name = dep.get('name') or dep.get('display_name') or dep.get('title')
+        # common keys used in contexts / frontend
+        duration = dep.get('duration') or dep.get('months') or dep.get('duration_months')
+        minimum_value = dep.get('minimum_value') or dep.get('minimumValue') or dep.get('minimum') or 0
+        currency = dep.get('currency') or dep.get('symbol')
+
+    duration = int(duration) if duration else 36
+    minimum_value = float(minimum_value) if minimum_value is not None else 0.0
+    return dep_name or '', duration, minimum_value, currency or "₱"
+
 
-    qs = Asset.objects.select_related('product').filter(
+def _status_labels(status_info) -> Tuple[str, str]:
+    if not isinstance(status_info, dict):
+        return '', ''
+    status_type = status_info.get('code') or status_info.get('slug') or ''
+    status_name = status_info.get('name') or status_info.get('display_name') or ''
+    return status_type, status_name
+
+
+def depreciation_queryset(depreciation_id: Optional[int] = None):
+    qs = Asset.objects.filter(
         is_deleted=False,
         product__is_deleted=False,
     ).exclude(product__depreciation__isnull=True)
 
     if depreciation_id is not None:
         qs = qs.filter(product__depreciation=depreciation_id)
+    return qs
+
+
+def iter_depreciation_report(today: Optional[date] = None, depreciation_id: Optional[int] = None) -> Iterator[Dict]:
+    """Yield the rows of generate_depreciation_report() while reading assets in chunks.
 
-    results = []
-
-    for asset in qs.order_by('asset_id'):
-        product = getattr(asset, 'product', None)
-        dep = None
-        if product and getattr(product, 'depreciation', None):
-            dep = get_depreciation_by_id(product.depreciation)
-
-        # Fallbacks for depreciation fields
-        dep_name = None
-        duration = None
-        minimum_value = 0
-        currency = None
-        if isinstance(dep, dict):
-            dep_name = dep.get('name') or dep.get('display_name') or dep.get('title')
-            # common keys used in contexts / frontend
-            duration = dep.get('duration') or dep.get('months') or dep.get('duration_months')
-            minimum_value = dep.get('minimum_value') or dep.get('minimumValue') or dep.get('minimum') or 0
-            currency = dep.get('currency') or dep.get('symbol')
+    Depreciations and statuses are prefetched once for the whole report and
+    each depreciation's terms are parsed once, so the per-row work is plain
+    arithmetic.
+    """
+    today = today or date.today()
+    qs = depreciation_queryset(depreciation_id)
+
+    context = report_context_for(qs, {
+        'depreciations': 'product__depreciation',
+        'statuses': 'status',
+    })
+    terms_by_dep = {
+        dep_id: _depreciation_terms(dep) for dep_id, dep in context.maps['depreciations'].items()
+    }
+    default_terms = _depreciation_terms(None)
+    status_by_id = {
+        status_id: _status_labels(info) for status_id, info in context.maps['statuses'].items()
+    }
+
+    rows = qs.order_by('asset_id').values_list(*REPORT_COLUMNS).iterator(chunk_size=CHUNK_SIZE)
+    for pk, asset_id, product_name, status_id, dep_id, cost, default_cost, purchase_date in rows:
+        dep_name, duration, minimum_value, currency = terms_by_dep.get(dep_id, default_terms)
 
         try:
-            purchase_cost = float(asset.purchase_cost if asset.purchase_cost is not None else (product.default_purchase_cost if product and getattr(product, 'default_purchase_cost', None) is not None else 0))
+            purchase_cost = float(cost if cost is not None else (default_cost if default_cost is not None else 0))
         except Exception:
             purchase_cost = 0.0
 
-        duration = int(duration) if duration else 36
-        minimum_value = float(minimum_value) if minimum_value is not None else 0.0
-        currency = currency or "₱"
-
         # Calculate depreciable amount (never negative). If there is no meaningful
         # purchase cost (0) or purchase cost <= minimum value, the monthly
         # depreciation must be zero to avoid negative depreciation values.
-        months_elapsed = _months_between(asset.purchase_date, today) if getattr(asset, 'purchase_date', None) else 0
+        months_elapsed = _months_between(purchase_date, today)
         depreciable_amount = max(0.0, purchase_cost - minimum_value)
 
         if depreciable_amount <= 0 or duration <= 0:
@@ -89,21 +114,15 @@ def generate_depreciation_report(today: Optional[date] = None, depreciation_id:
         current_value = max(minimum_value, purchase_cost - depreciated)
         months_left = max(duration - months_elapsed, 0)
 
-        # Status lookups (contexts)
-        status_info = get_status_by_id(asset.status) if getattr(asset, 'status', None) else None
-        status_type = ''
-        status_name = ''
-        if isinstance(status_info, dict):
-            status_type = status_info.get('code') or status_info.get('slug') or ''
-            status_name = status_info.get('name') or status_info.get('display_name') or ''
-
-        results.append({
-            'id': asset.id,
-            'assetId': asset.asset_id or asset.id,
-            'product': product.name if product else '',
+        status_type, status_name = status_by_id.get(status_id, ('', ''))
+
+        yield {
+            'id': pk,
+            'assetId': asset_id or pk,
+            'product': product_name or '',
             'statusType': status_type,
             'statusName': status_name,
-            'depreciationName': dep_name or '',
+            'depreciationName': dep_name,
             'duration': duration,
             'currency': currency,
             'minimumValue': minimum_value,
@@ -112,9 +131,22 @@ def generate_depreciation_report(today: Optional[date] = None, depreciation_id:
             'depreciated': float(depreciated),
             'monthlyDepreciation': float(monthly_dep),
             'monthsLeft': months_left,
-        })
+        }
+
 
-    return results
+def generate_depreciation_report(today: Optional[date] = None, depreciation_id: Optional[int] = None) -> List[Dict]:
+    """Return a list of assets that have a depreciation configured and computed metrics.
+
+    Each list item contains keys used by the frontend report mockup, for example:
+    - assetId, product, statusType, statusName, deployedTo, depreciationName,
+      duration, currency, minimumValue, purchaseCost, currentValue,
+      depreciated, monthlyDepreciation, monthsLeft
+
+    Parameters:
+    - today: optional date to use as "now" for calculations (defaults to today)
+    - depreciation_id: if provided, filter assets to that depreciation id
+    """
+    return list(iter_depreciation_report(today=today, depreciation_id=depreciation_id))
 
 
 def print_sample_report(limit: int = 10) -> None:
@@ -0,0 +1,17 @@
+from rest_framework.pagination import PageNumberPagination
+
+
+class OptionalPageNumberPagination(PageNumberPagination):
+    """
+    Paginate only when the client asks for it (?page= or ?page_size=), so
+    existing callers of the list endpoints keep getting a plain list.
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.page_query_param not in request.query_params and \
+                self.page_size_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
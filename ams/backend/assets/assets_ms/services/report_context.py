@@ -0,0 +1,120 @@
+"""
+Prefetched Contexts lookups for report generation.
+
+Reports used to resolve statuses, depreciations, etc. one asset at a time
+(a cache lookup, or a Contexts HTTP call on a miss, per row). Instead the
+distinct foreign ids of the report are collected with one DISTINCT query,
+and each resource type that is actually referenced is resolved with a
+single list call, so report time depends on the number of assets only.
+Ids the list response does not include (beyond LIST_LIMIT on paginated
+deployments) are fetched one by one through the cached by-id helpers.
+"""
+from typing import Dict, Iterable, Optional
+
+from .contexts import (
+    get_categories_list,
+    get_category_by_id,
+    get_depreciation_by_id,
+    get_depreciations_list,
+    get_manufacturer_by_id,
+    get_manufacturers_list,
+    get_status_by_id,
+    get_statuses_list,
+    get_supplier_by_id,
+    get_suppliers_list,
+)
+from .integration_help_desk import get_location_by_id, get_locations_list
+
+# Contexts list endpoints are not paginated; the limit only guards against
+# deployments that are.
+LIST_LIMIT = 500
+
+LIST_FETCHERS = {
+    'statuses': get_statuses_list,
+    'categories': get_categories_list,
+    'suppliers': get_suppliers_list,
+    'manufacturers': get_manufacturers_list,
+    'locations': get_locations_list,
+    'depreciations': get_depreciations_list,
+}
+
+ITEM_FETCHERS = {
+    'statuses': get_status_by_id,
+    'categories': get_category_by_id,
+    'suppliers': get_supplier_by_id,
+    'manufacturers': get_manufacturer_by_id,
+    'locations': get_location_by_id,
+    'depreciations': get_depreciation_by_id,
+}
+
+
+def build_lookup_dict(data) -> Dict[int, Dict]:
+    """Convert a list response into a dict keyed by id for fast lookups."""
+    if isinstance(data, dict) and 'results' in data:
+        items = data['results']
+    elif isinstance(data, list):
+        items = data
+    else:
+        return {}
+    return {item.get('id'): item for item in items if isinstance(item, dict) and item.get('id')}
+
+
+class ReportContext:
+    """Context maps of one report, keyed by resource name then id."""
+
+    def __init__(self, maps: Dict[str, Dict[int, Dict]]):
+        self.maps = maps
+
+    def get(self, resource: str, pk) -> Optional[Dict]:
+        if not pk:
+            return None
+        return self.maps.get(resource, {}).get(pk)
+
+    def name(self, resource: str, pk, key: str = 'name') -> str:
+        item = self.get(resource, pk)
+        return (item.get(key) or '') if item else ''
+
+
+def distinct_ids(queryset, fields: Dict[str, str]) -> Dict[str, set]:
+    """
+    Distinct non-null ids per resource in one query.
+
+    Args:
+        fields: {resource: queryset field holding its id},
+            e.g. {'statuses': 'status', 'depreciations': 'product__depreciation'}
+    """
+    resources = list(fields)
+    ids = {resource: set() for resource in resources}
+    for values in queryset.order_by().values_list(*fields.values()).distinct():
+        for resource, pk in zip(resources, values):
+            if pk:
+                ids[resource].add(pk)
+    return ids
+
+
+def prefetch_report_context(ids: Dict[str, Iterable[int]]) -> ReportContext:
+    """
+    Resolve each referenced resource type with a single list call, then
+    fetch ids missing from the list by id. When the list call fails the
+    service is unreachable, so the by-id calls are skipped as well.
+    """
+    maps = {}
+    for resource, pks in ids.items():
+        pks = set(pks)
+        if not pks:
+            maps[resource] = {}
+            continue
+        data = LIST_FETCHERS[resource](limit=LIST_LIMIT)
+        lookup = build_lookup_dict(data)
+        maps[resource] = {pk: lookup[pk] for pk in pks if pk in lookup}
+        if isinstance(data, dict) and data.get('warning'):
+            continue
+        for pk in sorted(pks - maps[resource].keys()):
+            item = ITEM_FETCHERS[resource](pk)
+            if isinstance(item, dict) and item.get('id') and not item.get('warning'):
+                maps[resource][pk] = item
+    return ReportContext(maps)
+
+
+def report_context_for(queryset, fields: Dict[str, str]) -> ReportContext:
+    return prefetch_report_context(distinct_ids(queryset, fields))
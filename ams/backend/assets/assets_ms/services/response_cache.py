@@ -0,0 +1,168 @@
+"""
+Response cache for the Product and Asset viewsets.
+
+- Single flight: on a miss only the caller that wins a short cache.add()
+  lock recomputes; everyone else waits briefly for its result instead of
+  hitting the database and the Contexts service at the same time.
+- Stale-while-revalidate: entries outlive their freshness window by
+  RESPONSE_CACHE_STALE_TTL. Once stale, one caller refreshes and the rest
+  keep serving the old value, so a TTL expiry never turns into a cold miss.
+- Generation invalidation: keys embed a per-namespace generation number
+  ("products:v42:list:..."). invalidate("products") bumps it and every
+  list/page/detail key of the namespace is abandoned at once, however many
+  filter or page variants were cached.
+
+Across processes all three need the shared Redis cache configured by
+ASSETS_CACHE_REDIS_URL; with the default local-memory cache each worker
+keeps its own entries, locks and generations.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+FRESH_TTL = getattr(settings, "RESPONSE_CACHE_TTL", 300)
+STALE_TTL = getattr(settings, "RESPONSE_CACHE_STALE_TTL", 600)
+EMPTY_TTL = 60              # maps built while the Contexts service is down
+LOCK_TTL = 30               # upper bound for one recomputation
+LOCK_WAIT = 5               # how long a follower waits for the leader on a cold miss
+POLL_INTERVAL = 0.05
+
+
+def _generation_key(namespace):
+    return f"{namespace}:generation"
+
+
+def _new_generation():
+    # Time-based so a generation key lost to eviction never restarts at a
+    # number whose entries may still be cached
+    return int(time.time() * 1000)
+
+
+def get_generation(namespace):
+    key = _generation_key(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _new_generation(), None)
+        generation = cache.get(key) or _new_generation()
+    return generation
+
+
+def invalidate(namespace):
+    """Abandon every cached entry of the namespace."""
+    key = _generation_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_generation(), None)
+
+
+def versioned_key(namespace, *parts):
+    return ":".join([namespace, f"v{get_generation(namespace)}", *map(str, parts)])
+
+
+def query_key(query_params, exclude=()):
+    """Stable key fragment for a request's filters and page."""
+    items = sorted(
+        (k, ",".join(sorted(query_params.getlist(k))))
+        for k in query_params.keys() if k not in exclude
+    )
+    return "&".join(f"{k}={v}" for k, v in items) or "all"
+
+
+def _store(key, compute, ttl):
+    value = compute()
+    fresh_for = ttl(value) if callable(ttl) else ttl
+    cache.set(key, (value, time.time() + fresh_for), fresh_for + STALE_TTL)
+    return value
+
+
+def get_or_set(key, compute, ttl=FRESH_TTL):
+    """
+    Return the cached value for `key`, computing it with `compute()` at most
+    once across workers.
+
+    Args:
+        ttl: Seconds the value stays fresh, or a callable taking the value
+            and returning them (e.g. shorter for empty results)
+    """
+    lock_key = f"{key}:lock"
+    entry = cache.get(key)
+    if not (isinstance(entry, tuple) and len(entry) == 2):
+        entry = None  # missing, or written by an older format
+
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() < fresh_until:
+            return value
+        # Stale: one caller refreshes, the others keep serving the old value
+        if cache.add(lock_key, 1, LOCK_TTL):
+            try:
+                return _store(key, compute, ttl)
+            finally:
+                cache.delete(lock_key)
+        return value
+
+    if cache.add(lock_key, 1, LOCK_TTL):
+        try:
+            return _store(key, compute, ttl)
+        finally:
+            cache.delete(lock_key)
+
+    # Cold miss while another worker computes: wait for its result
+    deadline = time.time() + LOCK_WAIT
+    while time.time() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if isinstance(entry, tuple) and len(entry) == 2:
+            return entry[0]
+
+    logger.warning("Timed out waiting for cache key %s; computing it here", key)
+    return compute()
+
+
+def cached_map(key, fetch, key_field="id"):
+    """
+    {item[key_field]: item} for a list returned by `fetch()`, cached with
+    single flight. Error payloads (non-lists) give an empty map that is only
+    kept for EMPTY_TTL.
+    """
+    def build():
+        items = fetch()
+        if not isinstance(items, list):
+            return {}
+        return {item[key_field]: item for item in items if item.get(key_field) is not None}
+
+    return get_or_set(key, build, ttl=lambda m: FRESH_TTL if m else EMPTY_TTL)
+
+
+class CachedResponseMixin:
+    """
+    cached_response()/cached_list_response() for viewsets; keys live under
+    `cache_namespace` and are dropped together by invalidate(namespace).
+    """
+    cache_namespace = None
+
+    def cached_response(self, cache_key, queryset, serializer_class, many=True, context=None):
+        def build():
+            return serializer_class(queryset, many=many, context=context or {}).data
+
+        return Response(get_or_set(versioned_key(self.cache_namespace, cache_key), build))
+
+    def cached_list_response(self, request, serializer_class, context_builder):
+        """List response, paginated when ?page=/?page_size= is given, cached per filter/page combination."""
+        def build():
+            queryset = self.get_queryset()
+            context = {**context_builder(), "request": request}
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                return self.get_paginated_response(
+                    serializer_class(page, many=True, context=context).data).data
+            return serializer_class(queryset, many=True, context=context).data
+
+        cache_key = versioned_key(self.cache_namespace, "list", query_key(request.query_params))
+        return Response(get_or_set(cache_key, build))
@@ -1,8 +1,17 @@
-from django.test import SimpleTestCase
-from rest_framework.test import APIRequestFactory
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
 from assets_ms.views import check_bulk_usage
 from rest_framework import status
-from unittest.mock import patch, Mock
+from assets_ms.authentication import AuthenticatedUser
+from assets_ms.models import Asset, Component, Product, Repair
+
+AMS_USER = AuthenticatedUser({'user_id': 1, 'roles': [{'system': 'ams', 'role': 'Admin'}]})
+
+
+def post(factory, data):
+    req = factory.post('/usage/check_bulk/', data, format='json')
+    force_authenticate(req, user=AMS_USER)
+    return check_bulk_usage(req)
 
 
 class CheckBulkUsageTests(SimpleTestCase):
@@ -10,46 +19,75 @@ class CheckBulkUsageTests(SimpleTestCase):
         self.factory = APIRequestFactory()
 
     def test_missing_type_returns_400(self):
-        req = self.factory.post('/usage/check_bulk/', {}, format='json')
-        resp = check_bulk_usage(req)
+        resp = post(self.factory, {})
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_ids_not_list_returns_400(self):
-        req = self.factory.post('/usage/check_bulk/', {'type': 'category', 'ids': 'notalist'}, format='json')
-        resp = check_bulk_usage(req)
+        resp = post(self.factory, {'type': 'category', 'ids': 'notalist'})
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_too_many_ids_returns_413(self):
         big = list(range(0, 1000))
-        req = self.factory.post('/usage/check_bulk/', {'type': 'category', 'ids': big}, format='json')
-        resp = check_bulk_usage(req)
+        resp = post(self.factory, {'type': 'category', 'ids': big})
         self.assertEqual(resp.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
 
-    @patch('assets_ms.api.usage.Repair')
-    @patch('assets_ms.api.usage.Asset')
-    def test_status_counts_returned(self, mock_asset, mock_repair):
-        """When requesting status ids, the endpoint should return asset_count per status id."""
-        # Prepare mock queryset behavior
-        mock_qs = Mock()
-        # Asset.objects.filter(...).filter(...) chain -> return the same mock_qs
-        mock_asset.objects.filter.return_value = mock_qs
-        mock_qs.filter.return_value = mock_qs
-        # values() should yield rows with status and asset identifiers
-        mock_qs.values.return_value = [
-            {'status': 5, 'asset_id': 'AS-001', 'id': 1},
-            {'status': 6, 'asset_id': 'AS-002', 'id': 2},
-        ]
+    def test_unknown_type_returns_400(self):
+        resp = post(self.factory, {'type': 'widget', 'ids': [1]})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
 
-        # Repairs for status -> return empty list/qs
-        mock_repair.objects.filter.return_value = []
 
-        req = self.factory.post('/usage/check_bulk/', {'type': 'status', 'ids': [5]}, format='json')
-        resp = check_bulk_usage(req)
+class CheckBulkUsageQueryTests(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.product = Product.objects.create(name='Laptop', category=1, manufacturer=7, depreciation=3)
+        self.assets = [
+            Asset.objects.create(asset_id=f'AS-00{i}', product=self.product, status=5, supplier=9)
+            for i in range(1, 4)
+        ]
+        Asset.objects.create(asset_id='AS-004', product=self.product, status=6)
+        Asset.objects.create(asset_id='AS-005', product=self.product, status=5, is_deleted=True)
+
+    def _check(self, item_type, ids, sample_limit=5):
+        resp = post(self.factory, {
+            'type': item_type, 'ids': ids, 'options': {'sample_limit': sample_limit}
+        })
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        results = resp.data.get('results')
-        # Find the entry for status id 5
-        entry = next((r for r in results if r.get('id') == 5), None)
-        self.assertIsNotNone(entry)
-        self.assertTrue(entry.get('in_use'))
-        self.assertEqual(entry.get('asset_count'), 1)
-        self.assertIn('AS-001', entry.get('asset_ids'))
+        return {r['id']: r for r in resp.data['results']}
+
+    def test_status_counts_returned(self):
+        """When requesting status ids, the endpoint should return asset_count per status id."""
+        Repair.objects.create(asset=self.assets[0], supplier_id=9, type='repair', name='Fan', cost=10, status_id=6)
+        results = self._check('status', [5, 6, 8])
+
+        self.assertTrue(results[5]['in_use'])
+        self.assertEqual(results[5]['asset_count'], 3)
+        self.assertIn('AS-001', results[5]['asset_ids'])
+        self.assertEqual(results[6]['asset_count'], 1)
+        self.assertEqual(results[6]['repair_count'], 1)
+        self.assertFalse(results[8]['in_use'])
+
+    def test_samples_are_capped_but_counts_are_not(self):
+        results = self._check('supplier', [9], sample_limit=2)
+        self.assertEqual(results[9]['asset_count'], 3)
+        self.assertEqual(results[9]['asset_ids'], ['AS-001', 'AS-002'])
+
+    def test_product_scoped_contexts_are_grouped_through_product(self):
+        Product.objects.create(name='Unused', category=2, manufacturer=8)
+        Component.objects.create(name='RAM', category=1, manufacturer=8)
+        results = self._check('manufacturer', [7, 8, 99])
+
+        self.assertEqual(results[7]['asset_count'], 4)
+        self.assertEqual(results[8]['asset_count'], 0)
+        self.assertEqual(results[8]['product_count'], 1)
+        self.assertEqual(results[8]['component_count'], 1)
+        self.assertTrue(results[8]['in_use'])
+        self.assertFalse(results[99]['in_use'])
+
+    def test_one_query_per_referencing_table(self):
+        ids = list(range(1, 201))
+        # assets, components, repairs
+        with self.assertNumQueries(3):
+            self._check('supplier', ids)
+        # assets, products
+        with self.assertNumQueries(2):
+            self._check('depreciation', ids)
@@ -0,0 +1,119 @@
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import openpyxl
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from assets_ms.api.reports import AssetReportAPIView, DepreciationReportAPIView
+from assets_ms.authentication import AuthenticatedUser
+from assets_ms.models import Asset, Product
+from assets_ms.services import report_context
+from assets_ms.services.depreciation_report import generate_depreciation_report
+
+AMS_USER = AuthenticatedUser({'user_id': 1, 'roles': [{'system': 'ams', 'role': 'Admin'}]})
+
+
+class ReportTestCase(TestCase):
+    def setUp(self):
+        self.fetchers = {
+            'statuses': Mock(return_value=[{'id': 5, 'name': 'Ready', 'code': 'deployable'}]),
+            'depreciations': Mock(return_value=[
+                {'id': 3, 'name': 'Laptops', 'duration': 10, 'minimum_value': '100.00'},
+                {'id': 4, 'name': 'Unused', 'duration': 12, 'minimum_value': '0'},
+            ]),
+            'categories': Mock(return_value=[{'id': 1, 'name': 'Computers'}]),
+            'suppliers': Mock(return_value=[]),
+            'manufacturers': Mock(return_value=[]),
+            'locations': Mock(return_value=[]),
+        }
+        self.item_fetchers = {resource: Mock(return_value=None) for resource in self.fetchers}
+        for fetchers, mocks in ((report_context.LIST_FETCHERS, self.fetchers),
+                                (report_context.ITEM_FETCHERS, self.item_fetchers)):
+            patcher = patch.dict(fetchers, mocks)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        laptop = Product.objects.create(name='Laptop', category=1, depreciation=3, default_purchase_cost=Decimal('500'))
+        for i in range(30):
+            Asset.objects.create(asset_id=f'AS-{i:03}', product=laptop, status=5,
+                                 purchase_cost=Decimal('1100') if i else None, purchase_date=date(2025, 1, 15))
+        Product.objects.create(name='Chair', category=1)
+
+
+class ReportContextTests(ReportTestCase):
+    def test_each_context_type_is_fetched_once(self):
+        rows = generate_depreciation_report(today=date(2025, 4, 20))
+
+        self.assertEqual(len(rows), 30)
+        self.fetchers['depreciations'].assert_called_once()
+        self.fetchers['statuses'].assert_called_once()
+        self.fetchers['categories'].assert_not_called()
+
+        row = next(r for r in rows if r['assetId'] == 'AS-001')
+        self.assertEqual(row['statusName'], 'Ready')
+        self.assertEqual(row['statusType'], 'deployable')
+        self.assertEqual(row['depreciationName'], 'Laptops')
+        self.assertEqual(row['monthlyDepreciation'], 100.0)
+        self.assertEqual(row['depreciated'], 300.0)
+        self.assertEqual(row['currentValue'], 800.0)
+        self.assertEqual(row['monthsLeft'], 7)
+        # Falls back to the product's default purchase cost
+        self.assertEqual(rows[0]['purchaseCost'], 500.0)
+
+    def test_report_queries_do_not_grow_with_assets(self):
+        with self.assertNumQueries(2):
+            generate_depreciation_report(today=date(2025, 4, 20))
+
+    def test_unknown_depreciation_uses_defaults(self):
+        self.fetchers['depreciations'].return_value = {'warning': 'Contexts service unreachable.'}
+        row = generate_depreciation_report(today=date(2025, 4, 20))[1]
+        self.assertEqual((row['depreciationName'], row['duration'], row['currency']), ('', 36, '₱'))
+        # An unreachable service is not retried id by id
+        self.item_fetchers['depreciations'].assert_not_called()
+
+    def test_ids_beyond_the_list_page_are_fetched_by_id(self):
+        self.fetchers['statuses'].return_value = [{'id': n, 'name': f'Status {n}'} for n in range(1, 5)]
+        self.item_fetchers['statuses'].return_value = {'id': 5, 'name': 'Ready', 'code': 'deployable'}
+
+        rows = generate_depreciation_report(today=date(2025, 4, 20))
+
+        self.item_fetchers['statuses'].assert_called_once_with(5)
+        self.item_fetchers['depreciations'].assert_not_called()
+        self.assertEqual({row['statusName'] for row in rows}, {'Ready'})
+
+    def test_deleted_ids_stay_blank(self):
+        self.fetchers['statuses'].return_value = []
+        self.item_fetchers['statuses'].return_value = {'warning': 'Statuse 5 not found or deleted.'}
+
+        row = generate_depreciation_report(today=date(2025, 4, 20))[0]
+
+        self.assertEqual(row['statusName'], '')
+
+
+class ReportExportTests(ReportTestCase):
+    def _get(self, view, path):
+        request = APIRequestFactory().get(path)
+        force_authenticate(request, user=AMS_USER)
+        return view.as_view()(request)
+
+    def test_depreciation_csv_is_streamed(self):
+        response = self._get(DepreciationReportAPIView, '/reports/depreciation/?export_format=csv')
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+        self.assertEqual(rows[0], DepreciationReportAPIView.FIELDNAMES)
+        self.assertEqual(len(rows), 31)
+
+    def test_asset_xlsx_keeps_selected_columns(self):
+        response = self._get(AssetReportAPIView, '/reports/assets/?columns=asset_id,category_data,purchase_cost')
+
+        ws = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        rows = list(ws.iter_rows(values_only=True))
+        self.assertEqual(rows[0], ('Asset ID', 'Category', 'Purchase Cost'))
+        self.assertEqual(rows[2], ('AS-001', 'Computers', 1100))
+        self.fetchers['suppliers'].assert_not_called()
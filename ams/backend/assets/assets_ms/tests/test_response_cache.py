@@ -0,0 +1,88 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import SimpleTestCase, override_settings
+
+from assets_ms.services import response_cache
+from assets_ms.services.response_cache import (
+    cached_map,
+    get_or_set,
+    invalidate,
+    query_key,
+    versioned_key,
+)
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "response-cache-tests"}}
+
+
+@override_settings(CACHES=LOCMEM)
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cold_miss_is_computed_once_across_threads(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return ["payload"]
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_or_set("k", compute))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["payload"]] * 8)
+
+    def test_stale_value_served_while_another_worker_refreshes(self):
+        get_or_set("k", lambda: "old", ttl=0)
+        compute = Mock(return_value="new")
+
+        # Another worker holds the refresh lock: serve stale, don't recompute
+        cache.add("k:lock", 1, 30)
+        self.assertEqual(get_or_set("k", compute), "old")
+        compute.assert_not_called()
+
+        # Lock free: this caller refreshes
+        cache.delete("k:lock")
+        self.assertEqual(get_or_set("k", compute), "new")
+        self.assertEqual(get_or_set("k", compute), "new")
+        compute.assert_called_once()
+
+    def test_invalidate_abandons_every_key_of_the_namespace(self):
+        list_key, page_key = versioned_key("products", "list", "all"), versioned_key("products", "list", "page=2")
+        get_or_set(list_key, lambda: "v1-list")
+        get_or_set(page_key, lambda: "v1-page")
+        other = versioned_key("assets", "list", "all")
+
+        invalidate("products")
+
+        self.assertNotEqual(versioned_key("products", "list", "all"), list_key)
+        self.assertEqual(get_or_set(versioned_key("products", "list", "all"), lambda: "v2"), "v2")
+        self.assertEqual(versioned_key("assets", "list", "all"), other)
+
+    def test_generation_survives_eviction_without_reuse(self):
+        key = versioned_key("products", "list")
+        cache.delete("products:generation")
+        time.sleep(0.002)
+        self.assertNotEqual(versioned_key("products", "list"), key)
+
+    def test_query_key_ignores_param_order(self):
+        self.assertEqual(query_key(QueryDict("page=2&show_deleted=true")),
+                         query_key(QueryDict("show_deleted=true&page=2")))
+        self.assertEqual(query_key(QueryDict("")), "all")
+
+    def test_cached_map_keeps_error_payload_briefly(self):
+        fetch = Mock(return_value={"warning": "Contexts service unreachable."})
+        with patch.object(response_cache, "EMPTY_TTL", 0):
+            self.assertEqual(cached_map("statuses:map", fetch), {})
+            fetch.return_value = [{"id": 1, "name": "Ready"}, {"id": None}]
+            self.assertEqual(cached_map("statuses:map", fetch), {1: {"id": 1, "name": "Ready"}})
+        self.assertEqual(fetch.call_count, 2)
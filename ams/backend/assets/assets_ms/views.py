@@ -18,6 +18,14 @@ import logging
 from assets_ms.services.contexts import *
 from assets_ms.services.integration_help_desk import *
 from assets_ms.services.integration_ticket_tracking import *
+from assets_ms.services.pagination import OptionalPageNumberPagination
+from assets_ms.services.response_cache import (
+    CachedResponseMixin,
+    cached_map,
+    get_or_set,
+    invalidate,
+    versioned_key,
+)
 
 from assets_ms.services.activity_logger import (
     log_asset_activity,
@@ -36,8 +44,10 @@ logger = logging.getLogger(__name__)
 
 # If will add more views later or functionality, please create file on api folder or services folder
 # Only viewsets here
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = OptionalPageNumberPagination
+    cache_namespace = "products"
 
     def get_queryset(self):
         return Product.objects.filter(is_deleted=False).order_by('name')
@@ -64,112 +74,46 @@ class ProductViewSet(viewsets.ModelViewSet):
     
     # Build context maps for serializers
     def _build_context_maps(self):
-        # categories
-        category_map = cache.get("categories:map")
-        if not category_map:
-            categories = get_category_names()
-            category_map = {c['id']: c for c in categories}
-            cache.set("categories:map", category_map, 300)
-
-        # manufacturers
-        manufacturer_map = cache.get("manufacturers:map")
-        if not manufacturer_map:
-            manufacturers = get_manufacturer_names()
-            manufacturer_map = {m['id']: m for m in manufacturers}
-            cache.set("manufacturers:map", manufacturer_map, 300)
-
-        # suppliers
-        supplier_map = cache.get("suppliers:map")
-        if not supplier_map:
-            suppliers = get_supplier_names()
-            supplier_map = {s['id']: s for s in suppliers}
-            cache.set("suppliers:map", supplier_map, 300)
-
-        # depreciations
-        depreciation_map = cache.get("depreciations:map")
-        if not depreciation_map:
-            depreciations = get_depreciation_names()
-            depreciation_map = {d['id']: d for d in depreciations}
-            cache.set("depreciations:map", depreciation_map, 300)
-
         return {
-            "category_map": category_map,
-            "manufacturer_map": manufacturer_map,
-            "supplier_map": supplier_map,
-            "depreciation_map": depreciation_map,
+            "category_map": cached_map("categories:map", get_category_names),
+            "manufacturer_map": cached_map("manufacturers:map", get_manufacturer_names),
+            "supplier_map": cached_map("suppliers:map", get_supplier_names),
+            "depreciation_map": cached_map("depreciations:map", get_depreciation_names),
         }
     
     def _build_asset_context_maps(self):
         """Build context maps needed for nested AssetListSerializer in ProductInstanceSerializer."""
-        # statuses
-        status_map = cache.get("statuses:map")
-        if not status_map:
-            statuses = get_status_names()
-            status_map = {s['id']: s for s in statuses}
-            cache.set("statuses:map", status_map, 300)
-
         # products (for product_details - though in product view we already know the product)
-        product_map = cache.get("products:map")
-        if not product_map:
-            products = Product.objects.filter(is_deleted=False)
-            product_map = {p.id: p.name for p in products}
-            cache.set("products:map", product_map, 300)
-
-        # tickets
-        ticket_map = cache.get("tickets:map")
-        if not ticket_map:
-            tickets = get_tickets_list()
-            ticket_map = {t["asset"]: t for t in tickets}
-            cache.set("tickets:map", ticket_map, 300)
-
+        product_map = get_or_set(
+            versioned_key("products", "map:names"),
+            lambda: dict(Product.objects.filter(is_deleted=False).values_list("id", "name")),
+        )
         return {
-            "status_map": status_map,
+            "status_map": cached_map("statuses:map", get_status_names),
             "product_map": product_map,
-            "ticket_map": ticket_map,
+            "ticket_map": cached_map("tickets:map", get_tickets_list, key_field="asset"),
         }
 
-    # Helper function for cached responses
-    def cached_response(self, cache_key, queryset, serializer_class, many=True, context=None):
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached)
-
-        context = context or {}
-        serializer = serializer_class(queryset, many=many, context=context)
-        cache.set(cache_key, serializer.data, 300)
-        return Response(serializer.data)
-    
-    
     def list(self, request, *args, **kwargs):
-        quesryset = self.get_queryset()
-
-        context_maps = self._build_context_maps()
-        return self.cached_response(
-            "products:list",
-            quesryset,
-            self.get_serializer_class(),
-            many=True,
-            context={**context_maps, 'request': request}
-        )
+        return self.cached_list_response(
+            request, self.get_serializer_class(), self._build_context_maps)
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        context_maps = self._build_context_maps()
-        asset_context_maps = self._build_asset_context_maps()
-        cache_key = f"products:detail:{instance.id}"
         return self.cached_response(
-            cache_key,
+            f"detail:{instance.id}",
             instance,
             self.get_serializer_class(),
             many=False,
-            context={**context_maps, **asset_context_maps, 'request': request}
+            context={**self._build_context_maps(), **self._build_asset_context_maps(), 'request': request}
         )
 
-    def invalidate_product_cache(self, product_id):
-        cache.delete("products:list")
-        cache.delete("products:names")
-        cache.delete("products:asset-registration")
-        cache.delete(f"products:detail:{product_id}")
+    def invalidate_product_cache(self, product_id=None):
+        # Bumping the generation drops every list page, name list, detail and
+        # the product map at once
+        invalidate("products")
+        # Asset lists embed product names
+        invalidate("assets")
 
     def perform_destroy(self, instance):
         # Check for referencing assets that are not deleted
@@ -222,7 +166,7 @@ class ProductViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
 
         # Build a cache key specific for this set of IDs
-        cache_key = "products:names"
+        cache_key = "names"
         if ids_param:
             cache_key += f":{','.join(map(str, ids))}"
 
@@ -330,16 +274,13 @@ class ProductViewSet(viewsets.ModelViewSet):
                     instance.save()
 
                 updated.append(product.id)
-                cache.delete(f"products:detail:{product.id}")
             else:
                 failed.append({
                     "id": product.id,
                     "errors": serializer.errors
                 })
         
-        cache.delete("products:list")
-        cache.delete("products:names")
-        cache.delete("products:asset-registration")
+        self.invalidate_product_cache()
 
         return Response({
             "updated": updated,
@@ -367,7 +308,7 @@ class ProductViewSet(viewsets.ModelViewSet):
             except ValidationError as e:
                 failed.append({"id": product.id, "error": str(e.detail)})
         
-        cache.delete("products:list")
+        self.invalidate_product_cache()
 
         if failed:
             return Response({
@@ -381,14 +322,16 @@ class ProductViewSet(viewsets.ModelViewSet):
     def asset_registration(self, request):
         queryset = self.get_queryset()
         return self.cached_response(
-            "products:asset-registration",
+            "asset-registration",
             queryset,
             self.get_serializer_class(),
             many=True,
         )
 
-class AssetViewSet(viewsets.ModelViewSet):
+class AssetViewSet(CachedResponseMixin, viewsets.ModelViewSet):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    pagination_class = OptionalPageNumberPagination
+    cache_namespace = "assets"
 
     def get_queryset(self):
         queryset = Asset.objects.filter(is_deleted=False).order_by('name')
@@ -407,89 +350,37 @@ class AssetViewSet(viewsets.ModelViewSet):
         return AssetSerializer
     
     def _build_asset_context_maps(self):
-        # statuses
-        status_map = cache.get("statuses:map")
-        if not status_map:
-            statuses = get_status_names()
-            status_map = {s['id']: s for s in statuses}
-            cache.set("statuses:map", status_map, 300)
-
         # products
-        product_map = cache.get("products:map")
-        if not product_map:
-            products = Product.objects.filter(is_deleted=False)
-            # products
-            product_map = cache.get("products:map")
-            if not product_map:
-                products = Product.objects.filter(is_deleted=False)
-                serialized = ProductNameSerializer(products, many=True).data
-                product_map = {p['id']: p for p in serialized}
-                cache.set("products:map", product_map, 300)
-
-        # locations
-        location_map = cache.get("locations:map")
-        if not location_map:
-            locations = get_locations_list()
-            location_map = {l['id']: l for l in locations}
-            cache.set("locations:map", location_map, 300)
-
-        # tickets (unresolved)
-        ticket_map = cache.get("tickets:map")
-        if not ticket_map:
-            tickets = get_tickets_list()
-            if isinstance(tickets, list):
-                ticket_map = {t["asset"]: t for t in tickets if t.get("asset")}
-            else:
-                ticket_map = {}
-            cache.set("tickets:map", ticket_map, 300)
-
+        product_map = get_or_set(
+            versioned_key("products", "map:details"),
+            lambda: {p['id']: p for p in ProductNameSerializer(
+                Product.objects.filter(is_deleted=False), many=True).data},
+        )
         return {
-            "status_map": status_map,
+            "status_map": cached_map("statuses:map", get_status_names),
             "product_map": product_map,
-            "location_map": location_map,
-            "ticket_map": ticket_map,
+            "location_map": cached_map("locations:map", get_locations_list),
+            # tickets (unresolved)
+            "ticket_map": cached_map("tickets:map", get_tickets_list, key_field="asset"),
         }
     
-    # Helper function for cached responses
-    def cached_response(self, cache_key, queryset, serializer_class, many=True, context=None):
-        cached = cache.get(cache_key)
-        if cached:
-            return Response(cached)
-
-        context = context or {}
-        serializer = serializer_class(queryset, many=many, context=context)
-        cache.set(cache_key, serializer.data, 300)
-        return Response(serializer.data)
-    
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        
-        context_maps = self._build_asset_context_maps()
-        return self.cached_response(
-            "assets:list",
-            queryset,
-            self.get_serializer_class(),
-            many=True,
-            context={**context_maps, 'request': request}
-        )
+        return self.cached_list_response(
+            request, self.get_serializer_class(), self._build_asset_context_maps)
     
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-
-        context_maps = self._build_asset_context_maps()
-        cache_key = f"assets:detail:{instance.id}"
         return self.cached_response(
-            cache_key,
+            f"detail:{instance.id}",
             instance,
             self.get_serializer_class(),
             many=False,
-            context={**context_maps, 'request': request}
+            context={**self._build_asset_context_maps(), 'request': request}
         )
     
-    def invalidate_asset_cache(self, asset_id):
-        cache.delete("assets:list")
-        cache.delete(f"assets:detail:{asset_id}")
-        cache.delete("assets:names")
+    def invalidate_asset_cache(self, asset_id=None):
+        # Drops every list page, name list and detail of the namespace
+        invalidate("assets")
 
     def perform_destroy(self, instance):
         errors = []
@@ -571,7 +462,7 @@ class AssetViewSet(viewsets.ModelViewSet):
             asset = Asset.objects.get(pk=pk, is_deleted=True)
             asset.is_deleted = False
             asset.save()
-            cache.delete(f"assets:detail:{asset.id}")
+            self.invalidate_asset_cache(asset.id)
             serializer = self.get_serializer(asset)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Asset.DoesNotExist:
@@ -698,7 +589,7 @@ class AssetViewSet(viewsets.ModelViewSet):
             return Response(serializer.data)
 
         # Build a cache key specific for this set of IDs
-        cache_key = "assets:names"
+        cache_key = "names"
         if ids_param:
             cache_key += f":{','.join(map(str, ids))}"
 
@@ -804,15 +695,13 @@ class AssetViewSet(viewsets.ModelViewSet):
                     instance.save()
 
                 updated.append(asset.id)
-                cache.delete(f"assets:detail:{asset.id}")
             else:
                 failed.append({
                     "id": asset.id,
                     "errors": serializer.errors
                 })
 
-        cache.delete("assets:list")
-        cache.delete("assets:names")
+        self.invalidate_asset_cache()
 
         return Response({
             "updated": updated,
@@ -839,7 +728,7 @@ class AssetViewSet(viewsets.ModelViewSet):
             except ValidationError as e:
                 failed.append({"id": asset.id, "error": str(e.detail)})
         
-        cache.delete("assets:list")
+        self.invalidate_asset_cache()
 
         if failed:
             return Response({
@@ -915,8 +804,8 @@ class AssetCheckoutViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Invalidate cache
-        cache.delete(f"assets:detail:{asset.id}")
+        # Invalidate cache (list rows show the new status too)
+        invalidate("assets")
 
         return Response(
             {"success": "Checkout, attachments, and status update completed successfully."},
@@ -1014,8 +903,8 @@ class AssetCheckinViewSet(viewsets.ModelViewSet):
         except Exception as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Invalidate cache
-        cache.delete(f"assets:detail:{asset.id}")
+        # Invalidate cache (list rows show the new status too)
+        invalidate("assets")
 
         # Resolve ticket (optional, outside transaction)
         ticket_id = request.data.get("ticket_id")
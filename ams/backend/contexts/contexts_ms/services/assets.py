@@ -62,7 +62,7 @@ def count_components_by_category(category_id, timeout=5):
         return None
 
 
-def bulk_check_usage(item_type, ids, sample_limit=0, timeout=8):
+def bulk_check_usage(item_type, ids, sample_limit=0, timeout=8, headers=None):
     """Call the assets service bulk usage endpoint for multiple ids.
 
     Returns a dict mapping id -> usage dict as returned by assets service.
@@ -76,7 +76,7 @@ def bulk_check_usage(item_type, ids, sample_limit=0, timeout=8):
             'ids': ids,
             'options': {'sample_limit': sample_limit}
         }
-        r = client_post('usage/check_bulk/', json=payload, timeout=timeout)
+        r = client_post('usage/check_bulk/', json=payload, timeout=timeout, headers=headers)
         r.raise_for_status()
         j = r.json() or {}
         results = j.get('results') if isinstance(j, dict) else None
@@ -1,7 +1,7 @@
 from rest_framework.response import Response
 from rest_framework import status
 from django.db import transaction
-from .usage_check import is_item_in_use
+from .usage_check import bulk_item_usage, forward_auth_headers
 
 # Import models from parent package
 from ..models import Category, Supplier, Depreciation, Manufacturer, Status, Location
@@ -95,7 +95,7 @@ def _build_cant_delete_message(instance, usage):
 
     # Repairs
     if repair_ids:
-        part = render_usage('Repair', repair_ids, len(repair_ids))
+        part = render_usage('Repair', repair_ids, usage.get('repair_count', len(repair_ids)))
         if part:
             pieces.append(part)
 
@@ -137,28 +137,27 @@ def _bulk_delete_handler(request, item_type, hard_delete=False):
     deleted = []
     skipped = {}
 
-    for i in range(0, len(ids), CHUNK_SIZE):
-        chunk = ids[i:i+CHUNK_SIZE]
-        instances = {obj.pk: obj for obj in Model.objects.filter(pk__in=chunk)}
+    instances = Model.objects.in_bulk(ids)
+    found = [pk for pk in ids if pk in instances]
+    usage_by_id = bulk_item_usage(item_type, found, headers=forward_auth_headers(request))
 
-        for pk in chunk:
-            inst = instances.get(pk)
-            if not inst:
-                skipped[pk] = "Not found"
-                continue
+    for pk in ids:
+        inst = instances.get(pk)
+        if not inst:
+            skipped[pk] = "Not found"
+            continue
 
-            try:
-                usage = is_item_in_use(item_type, pk)
-            except Exception:
-                skipped[pk] = "Could not verify usage (service error)"
-                continue
+        usage = usage_by_id.get(pk)
+        if usage is None:
+            skipped[pk] = "Could not verify usage (service error)"
+            continue
 
-            if usage.get('in_use'):
-                msg = _build_cant_delete_message(inst, usage)
-                skipped[pk] = msg
-                continue
+        if usage.get('in_use'):
+            msg = _build_cant_delete_message(inst, usage)
+            skipped[pk] = msg
+            continue
 
-            deleted.append(pk)
+        deleted.append(pk)
 
     if deleted:
         if hard_delete:
@@ -1,6 +1,13 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from .assets import bulk_check_usage
 from .http_client import get as client_get
 
+# Matches MAX_BATCH of the assets service's usage/check_bulk/ endpoint
+BULK_USAGE_CHUNK_SIZE = 200
+BULK_USAGE_MAX_WORKERS = 4
+
 
 def _extract_ids_from_response(resp_json):
     """Normalize possible list response shapes into a list of ids."""
@@ -269,3 +276,39 @@ def is_item_in_use(item_type, item_id):
         # If the assets-service is unreachable, assume item is in use
         # to prevent accidental deletion.
         return {'in_use': True, 'asset_ids': [], 'component_ids': [], 'repair_ids': []}
+
+
+def forward_auth_headers(request):
+    """Authorization header carrying the caller's JWT, for calls made on their behalf."""
+    token = request.COOKIES.get('access_token')
+    if token:
+        return {'Authorization': f'Bearer {token}'}
+    auth_header = request.headers.get('Authorization')
+    return {'Authorization': auth_header} if auth_header else {}
+
+
+def bulk_item_usage(item_type, item_ids, sample_limit=5, headers=None):
+    """
+    Usage of many items through the assets service's usage/check_bulk/ endpoint.
+
+    Ids are sent in chunks of BULK_USAGE_CHUNK_SIZE, dispatched concurrently
+    over the pooled http_client session, so a full bulk delete costs a few
+    round trips instead of several requests per item.
+
+    Returns:
+        {item_id: usage} with the same keys as is_item_in_use(). Ids whose
+        chunk failed are missing; callers must treat them as unverified.
+    """
+    item_ids = list(item_ids)
+    chunks = [item_ids[i:i + BULK_USAGE_CHUNK_SIZE] for i in range(0, len(item_ids), BULK_USAGE_CHUNK_SIZE)]
+    if not chunks:
+        return {}
+
+    def check(chunk):
+        return bulk_check_usage(item_type, chunk, sample_limit=sample_limit, headers=headers)
+
+    usage = {}
+    with ThreadPoolExecutor(max_workers=min(BULK_USAGE_MAX_WORKERS, len(chunks))) as pool:
+        for result in pool.map(check, chunks):
+            usage.update(result)
+    return usage
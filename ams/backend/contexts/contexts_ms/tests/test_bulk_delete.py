@@ -0,0 +1,59 @@
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from rest_framework.request import Request
+from rest_framework.parsers import JSONParser
+
+from ..models import Supplier
+from ..services.bulk_delete import _bulk_delete_handler
+
+
+def usage_response(ids, in_use_ids=()):
+    resp = Mock(status_code=200)
+    resp.json.return_value = {'results': [
+        {'id': i, 'in_use': i in in_use_ids, 'asset_count': 2 if i in in_use_ids else 0,
+         'asset_ids': ['AST-1', 'AST-2'] if i in in_use_ids else [], 'component_ids': [], 'repair_ids': []}
+        for i in ids
+    ]}
+    return resp
+
+
+class BulkDeleteUsageTests(TestCase):
+    def setUp(self):
+        self.suppliers = [Supplier.objects.create(name=f'Supplier {i}') for i in range(450)]
+        self.ids = [s.pk for s in self.suppliers]
+
+    def _delete(self, ids):
+        raw = APIRequestFactory().post('/suppliers/bulk_delete/', {'ids': ids}, format='json',
+                                       HTTP_AUTHORIZATION='Bearer abc')
+        return _bulk_delete_handler(Request(raw, parsers=[JSONParser()]), 'supplier')
+
+    @patch('contexts_ms.services.assets.client_post')
+    def test_usage_is_checked_once_per_chunk(self, client_post):
+        in_use = {self.ids[0], self.ids[300]}
+        client_post.side_effect = lambda path, json, **kw: usage_response(json['ids'], in_use)
+
+        resp = self._delete(self.ids + [999999])
+
+        self.assertEqual(client_post.call_count, 3)
+        self.assertEqual(sorted(len(c.kwargs['json']['ids']) for c in client_post.call_args_list), [50, 200, 200])
+        self.assertEqual(client_post.call_args.kwargs['headers'], {'Authorization': 'Bearer abc'})
+        self.assertEqual(len(resp.data['deleted']), 448)
+        self.assertEqual(resp.data['skipped'][999999], 'Not found')
+        self.assertIn('Asset(s): AST-1, AST-2', resp.data['skipped'][self.ids[0]])
+        self.assertEqual(Supplier.objects.filter(is_deleted=True).count(), 448)
+
+    @patch('contexts_ms.services.assets.client_post')
+    def test_failed_chunk_is_not_deleted(self, client_post):
+        def respond(path, json, **kw):
+            if self.ids[0] in json['ids']:
+                raise ConnectionError('assets service down')
+            return usage_response(json['ids'])
+        client_post.side_effect = respond
+
+        resp = self._delete(self.ids)
+
+        self.assertEqual(len(resp.data['deleted']), 250)
+        self.assertEqual(resp.data['skipped'][self.ids[0]], 'Could not verify usage (service error)')
+        self.assertFalse(Supplier.objects.get(pk=self.ids[0]).is_deleted)
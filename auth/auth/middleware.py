@@ -4,11 +4,8 @@ Extracts JWT tokens from cookies and adds the authenticated user/employee to the
 """
 
 import logging
-import jwt
-from django.conf import settings
-from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
 from users.models import User
+from users.token_cache import EMPLOYEE, get_snapshot, verify_token
 from hdts.models import Employees
 
 logger = logging.getLogger(__name__)
@@ -34,37 +31,11 @@ class JWTAuthenticationMiddleware:
                 access_token = auth_header[7:]  # Remove 'Bearer ' prefix
         
         if access_token:
-            # First, try to decode as a custom employee token
-            employee_payload = self._decode_custom_token(access_token)
-            if employee_payload:
-                employee_id = employee_payload.get('employee_id')
-                if employee_id:
-                    try:
-                        request.employee = Employees.objects.get(id=employee_id)
-                        logger.debug(f"JWT Employee authenticated: {request.employee.email}")
-                    except Employees.DoesNotExist:
-                        logger.warning(f"JWT token references non-existent employee: {employee_id}")
-                return self.get_response(request)
-            
-            # If not a custom employee token, try DRF simplejwt format
             try:
-                token = AccessToken(access_token)
-                token.verify()
-                
-                user_id = token.get('user_id')
-                
-                # Try to get User
-                if user_id:
-                    try:
-                        request.user = User.objects.get(id=user_id)
-                        logger.debug(f"JWT User authenticated: {request.user.email}")
-                    except User.DoesNotExist:
-                        logger.warning(f"JWT token references non-existent user: {user_id}")
-                        
-            except (TokenError, InvalidToken) as e:
-                logger.debug(f"Invalid JWT token: {str(e)}")
-                # Clear invalid token from cookies if present
-                request.COOKIES.pop('access_token', None)
+                self._authenticate_token(request, access_token)
+            except Exception as e:
+                # e.g. the cache is unreachable; the request stays anonymous
+                logger.warning(f"Unexpected error during JWT authentication: {e}")
         else:
             # No JWT token present
             # Allow session authentication for superadmin routes (they use Django sessions)
@@ -77,24 +48,24 @@ class JWTAuthenticationMiddleware:
         
         response = self.get_response(request)
         return response
-    
-    def _decode_custom_token(self, token_str):
-        """
-        Decode custom employee JWT token without verification to check if it's a custom token.
-        Returns payload if valid custom token, None otherwise.
-        """
-        try:
-            algorithm = getattr(settings, 'SIMPLE_JWT', {}).get('ALGORITHM', 'HS256')
-            # Use the same signing key as jwt_helpers.py for consistency
-            secret = getattr(settings, 'SIMPLE_JWT', {}).get('SIGNING_KEY', settings.SECRET_KEY)
-            
-            payload = jwt.decode(token_str, secret, algorithms=[algorithm])
-            
-            # Check if this is a custom employee token (has employee_id)
-            if 'employee_id' in payload:
-                return payload
-            
-            return None
-        except Exception as e:
-            logger.debug(f"Custom token decode failed: {str(e)}")
-            return None
+
+    def _authenticate_token(self, request, access_token):
+        """Set request.user or request.employee from a JWT access token."""
+        # One decode, dispatched on the token's claims; cached until expiry
+        verified = verify_token(access_token)
+        if verified is None:
+            # Clear invalid token from cookies if present
+            request.COOKIES.pop('access_token', None)
+        else:
+            model = Employees if verified.kind == EMPLOYEE else User
+            try:
+                subject = get_snapshot(verified.kind, verified.subject_id, verified.expires_at)
+            except model.DoesNotExist:
+                logger.warning(f"JWT token references non-existent {verified.kind}: {verified.subject_id}")
+            else:
+                if verified.kind == EMPLOYEE:
+                    request.employee = subject
+                    logger.debug(f"JWT Employee authenticated: {request.employee.email}")
+                else:
+                    request.user = subject
+                    logger.debug(f"JWT User authenticated: {request.user.email}")
@@ -1,6 +1,7 @@
 """
 API views for employee authentication and profile management.
 """
+import hmac
 import logging
 from rest_framework import generics, status
 from rest_framework.response import Response
@@ -8,6 +9,7 @@ from rest_framework.permissions import AllowAny, BasePermission
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.views import APIView
+from django.conf import settings
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
@@ -68,6 +70,17 @@ class IsEmployeeAuthenticated(BasePermission):
         return False
 
 
+class HasInternalServiceKey(BasePermission):
+    """
+    Allows service-to-service requests carrying INTERNAL_SERVICE_API_KEY in
+    the X-API-Key header. Denies everything when no key is configured.
+    """
+    def has_permission(self, request, view):
+        expected = getattr(settings, 'INTERNAL_SERVICE_API_KEY', '')
+        provided = request.META.get('HTTP_X_API_KEY', '')
+        return bool(expected and provided) and hmac.compare_digest(provided, expected)
+
+
 # ==================== API Views ====================
 
 @method_decorator(csrf_exempt, name='dispatch')
@@ -741,3 +754,35 @@ class EmployeeByIdView(generics.RetrieveAPIView):
                 {'error': 'Employee not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
+
+
+class EmployeeBulkByIdView(APIView):
+    """
+    Internal API endpoint to look up many employees in one request.
+    GET ?ids=1,2,3 returns {'results': [...], 'missing': [...]}.
+    Used by the helpdesk profile resolver instead of one call per employee.
+    Requires the internal service key (X-API-Key), as it returns many profiles at once.
+    """
+    authentication_classes = []
+    permission_classes = [HasInternalServiceKey]
+    serializer_class = EmployeeProfileSerializer
+    max_ids = 200
+
+    def get(self, request):
+        raw = request.query_params.get('ids', '')
+        try:
+            ids = list(dict.fromkeys(int(part) for part in raw.split(',') if part.strip()))
+        except ValueError:
+            return Response({'error': 'ids must be a comma-separated list of integers'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.max_ids:
+            return Response({'error': f'At most {self.max_ids} ids per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        employees = Employees.objects.filter(id__in=ids)
+        results = self.serializer_class(employees, many=True, context={'request': request}).data
+        found = {item['id'] for item in results}
+        return Response({
+            'results': results,
+            'missing': [employee_id for employee_id in ids if employee_id not in found],
+        }, status=status.HTTP_200_OK)
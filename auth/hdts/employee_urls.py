@@ -19,6 +19,7 @@ from .employee_api_views import (
     EmployeeResetPasswordView as EmployeeResetPasswordAPIView,
     MeView,
     EmployeeByIdView,
+    EmployeeBulkByIdView,
 )
 
 
@@ -60,6 +61,7 @@ urlpatterns = [
     path('', employees_root, name='employees-root'),
     
     # ========== INTERNAL SERVICE-TO-SERVICE ENDPOINTS ==========
+    path('internal/bulk/', EmployeeBulkByIdView.as_view(), name='employee-bulk-by-id'),
     path('internal/<int:employee_id>/', EmployeeByIdView.as_view(), name='employee-by-id'),
     
     # ========== API ENDPOINTS (json responses) ==========
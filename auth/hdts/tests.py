@@ -1,3 +1,55 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .employee_api_views import EmployeeBulkByIdView
+from .models import Employees
+
+
+@override_settings(INTERNAL_SERVICE_API_KEY='internal-key')
+class EmployeeBulkByIdViewTests(TestCase):
+    """Tests for the internal bulk employee lookup used by the helpdesk"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('hdts:employee-bulk-by-id')
+        self.ana = Employees.objects.create(email='ana@example.com', first_name='Ana', company_id='MA0001')
+        self.ben = Employees.objects.create(email='ben@example.com', first_name='Ben', company_id='MA0002')
+
+    def _get(self, ids, key='internal-key'):
+        headers = {'HTTP_X_API_KEY': key} if key is not None else {}
+        return self.client.get(self.url, {'ids': ids}, **headers)
+
+    def test_requires_service_key(self):
+        """Test that requests without the right X-API-Key cannot list employees"""
+        ids = f'{self.ana.id},{self.ben.id}'
+        self.assertEqual(self._get(ids, key=None).status_code, 403)
+        self.assertEqual(self._get(ids, key='wrong').status_code, 403)
+
+    @override_settings(INTERNAL_SERVICE_API_KEY='')
+    def test_denied_when_no_key_is_configured(self):
+        """Test that an unset key fails closed, even for an empty header"""
+        self.assertEqual(self._get(str(self.ana.id), key='').status_code, 403)
+
+    def test_returns_results_and_missing_ids(self):
+        """Test that known ids are returned once and unknown ids listed as missing"""
+        response = self._get(f'{self.ana.id},{self.ben.id},{self.ana.id},999999')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(item['email'] for item in response.data['results']),
+                         ['ana@example.com', 'ben@example.com'])
+        self.assertEqual(response.data['missing'], [999999])
+
+    def test_rejects_more_than_max_ids(self):
+        """Test that a request over max_ids is refused without querying"""
+        ids = ','.join(str(i) for i in range(1, EmployeeBulkByIdView.max_ids + 2))
+        with self.assertNumQueries(0):
+            response = self._get(ids)
+        self.assertEqual(response.status_code, 400)
+
+        ids = ','.join(str(i) for i in range(1, EmployeeBulkByIdView.max_ids + 1))
+        self.assertEqual(self._get(ids).status_code, 200)
+
+    def test_rejects_non_integer_ids(self):
+        """Test that malformed ids return 400"""
+        self.assertEqual(self._get('1,abc').status_code, 400)
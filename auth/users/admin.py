@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import User, IPAddressRateLimit, DeviceFingerprint, RateLimitConfig
+from .rate_limiting import reset_ip_rate_limit, reset_device_rate_limit
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -24,12 +25,14 @@ class IPAddressRateLimitAdmin(admin.ModelAdmin):
 	def reset_attempts(self, request, queryset):
 		for obj in queryset:
 			obj.reset_attempts()
+			reset_ip_rate_limit(obj.ip_address, obj.user_email)
 		self.message_user(request, f"Reset attempts for {queryset.count()} IP(s).")
 	reset_attempts.short_description = "Reset failed attempts"
 
 	def unblock_ip(self, request, queryset):
 		for obj in queryset:
 			obj.reset_attempts()
+			reset_ip_rate_limit(obj.ip_address, obj.user_email)
 		self.message_user(request, f"Unblocked {queryset.count()} IP(s).")
 	unblock_ip.short_description = "Unblock selected IPs"
 
@@ -45,12 +48,14 @@ class DeviceFingerprintAdmin(admin.ModelAdmin):
 	def reset_attempts(self, request, queryset):
 		for obj in queryset:
 			obj.reset_attempts()
+			reset_device_rate_limit(obj.fingerprint_hash, obj.user_email)
 		self.message_user(request, f"Reset attempts for {queryset.count()} device(s).")
 	reset_attempts.short_description = "Reset failed attempts"
 
 	def unblock_device(self, request, queryset):
 		for obj in queryset:
 			obj.reset_attempts()
+			reset_device_rate_limit(obj.fingerprint_hash, obj.user_email)
 		self.message_user(request, f"Unblocked {queryset.count()} device(s).")
 	unblock_device.short_description = "Unblock selected devices"
 
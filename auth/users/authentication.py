@@ -2,6 +2,8 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.conf import settings
 
+from .token_cache import USER, get_snapshot, verify_token
+
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -11,6 +13,8 @@ class CookieJWTAuthentication(JWTAuthentication):
 
     - Uses configurable user_id_field and user_id_claim from settings.SIMPLE_JWT.
     - Gracefully handles invalid/missing cookie tokens.
+    - Tokens and users come from users.token_cache, shared with
+      JWTAuthenticationMiddleware, so a request decodes and loads them once.
     """
 
     def __init__(self, *args, **kwargs):
@@ -37,6 +41,16 @@ class CookieJWTAuthentication(JWTAuthentication):
             # Invalid or expired cookie token → fallback to header
             return super().authenticate(request)
 
+    def get_validated_token(self, raw_token):
+        """
+        Returns the verified claims of a staff access token.
+        Employee tokens are rejected here; they are handled by the middleware.
+        """
+        verified = verify_token(raw_token)
+        if verified is None or verified.kind != USER:
+            raise InvalidToken("Given token not valid for any token type")
+        return verified.payload
+
     def get_user(self, validated_token):
         """
         Returns the user based on the validated token.
@@ -45,7 +59,7 @@ class CookieJWTAuthentication(JWTAuthentication):
         try:
             user_id = validated_token[self.user_id_claim]
             user_id = int(user_id) if not isinstance(user_id, int) else user_id
-            user = self.user_model.objects.get(**{self.user_id_field: user_id})
+            user = get_snapshot(USER, user_id, validated_token['exp'])
             return user
 
         except (self.user_model.DoesNotExist, ValueError, KeyError) as e:
@@ -11,8 +11,7 @@ Handles:
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.conf import settings
-from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .token_cache import verify_token
 import logging
 
 logger = logging.getLogger(__name__)
@@ -108,32 +107,31 @@ class AuthenticationRoutingMiddleware:
         if not token_str:
             return
 
+        # Already verified (and cached) by JWTAuthenticationMiddleware
         try:
-            access_token = AccessToken(token_str)
-            access_token.verify()
-
-            user_id = access_token.payload.get('user_id')
-            user_type = access_token.payload.get('user_type')  # 'staff' or 'employee'
+            verified = verify_token(token_str)
+        except Exception as e:
+            logger.warning(f'Unexpected error during JWT authentication: {e}')
+            return
+        if verified is None:
+            logger.debug('Invalid or expired JWT token')
+            return
 
-            if not user_id:
-                logger.warning('JWT token missing user_id claim')
-                return
+        user_id = verified.payload.get('user_id')
+        user_type = verified.payload.get('user_type')  # 'staff' or 'employee'
 
-            # Default to 'staff' if user_type not specified (backward compatibility)
-            if not user_type:
-                user_type = 'staff'
+        if not user_id:
+            logger.warning('JWT token missing user_id claim')
+            return
 
-            request.user_id = user_id
-            request.user_type = user_type.lower()
+        # Default to 'staff' if user_type not specified (backward compatibility)
+        if not user_type:
+            user_type = 'staff'
 
-            logger.debug(f'Authenticated {request.user_type} user {user_id}')
+        request.user_id = user_id
+        request.user_type = user_type.lower()
 
-        except (InvalidToken, TokenError) as e:
-            logger.debug(f'Invalid or expired JWT token: {e}')
-            return
-        except Exception as e:
-            logger.warning(f'Unexpected error during JWT authentication: {e}')
-            return
+        logger.debug(f'Authenticated {request.user_type} user {user_id}')
 
     def _is_public_path(self, path):
         """Check if path is publicly accessible without authentication."""
@@ -0,0 +1,216 @@
+"""
+Breached password lookups for check_password_pwned.
+
+With PWNED_PASSWORDS_INDEX_PATH set, passwords are checked against a local
+index built by `manage.py build_breached_password_index` from the
+HaveIBeenPwned SHA-1 corpus, with no network access. The index file is
+memory-mapped and holds:
+
+    header   MAGIC, record count (uint64)
+    fanout   65537 uint64 record offsets, one per leading 2 bytes of the hash
+    records  sorted (first KEY_BYTES bytes of the SHA-1, breach count uint32)
+
+so a lookup is a binary search over one fanout bucket, O(log n), touching a
+handful of pages. Hashes are truncated to KEY_BYTES; at the size of the full
+corpus the chance of a false match is around 1e-10 per lookup.
+
+Without an index the HaveIBeenPwned range API is used (k-anonymity, only the
+first 5 hex characters of the hash are sent) unless PWNED_PASSWORDS_API_ENABLED
+is off. Range responses are kept in an LRU so repeated checks of the same
+prefix do not go back to the network.
+"""
+
+import bisect
+import hashlib
+import logging
+import mmap
+import os
+import struct
+from functools import lru_cache
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'PWNDIDX1'
+KEY_BYTES = 8
+HEADER = struct.Struct('>8sQ')
+FANOUT = struct.Struct('>65537Q')
+RECORD = struct.Struct(f'>{KEY_BYTES}sI')
+API_URL = 'https://api.pwnedpasswords.com/range/{prefix}'
+
+
+class InvalidIndexError(ValueError):
+    pass
+
+
+class _RecordKeys:
+    """Sequence view of the record keys of one fanout bucket, for bisect."""
+
+    def __init__(self, buffer, offset, start, end):
+        self.buffer = buffer
+        self.offset = offset
+        self.start = start
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, i):
+        position = self.offset + (self.start + i) * RECORD.size
+        return self.buffer[position:position + KEY_BYTES]
+
+
+class BreachedPasswordIndex:
+    """Read-only, memory-mapped breached password index."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.buffer) < HEADER.size + FANOUT.size:
+            raise InvalidIndexError(f"{path} is too small to be a breached password index")
+        magic, self.size = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            raise InvalidIndexError(f"{path} is not a breached password index")
+        self.fanout = FANOUT.unpack_from(self.buffer, HEADER.size)
+        self.records_offset = HEADER.size + FANOUT.size
+
+    def __len__(self):
+        return self.size
+
+    def count(self, sha1_hex):
+        """Breach count of a SHA-1 hex digest, 0 if it is not in the index."""
+        key = bytes.fromhex(sha1_hex)[:KEY_BYTES]
+        bucket = int.from_bytes(key[:2], 'big')
+        keys = _RecordKeys(self.buffer, self.records_offset, self.fanout[bucket], self.fanout[bucket + 1])
+        i = bisect.bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            _, count = RECORD.unpack_from(self.buffer, self.records_offset + (keys.start + i) * RECORD.size)
+            return count
+        return 0
+
+    def close(self):
+        self.buffer.close()
+
+
+def write_index(records, path):
+    """
+    Write an index from (sha1_hex, count) pairs sorted by hash.
+
+    The file is written next to `path` and moved into place, so running
+    processes never see a partial index.
+
+    Returns:
+        number of records written (hashes that truncate to the same key are merged)
+
+    Raises:
+        InvalidIndexError: if the records are not sorted
+    """
+    tmp_path = f"{path}.tmp"
+    fanout = [0] * 65537
+    written = 0
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.seek(HEADER.size + FANOUT.size)
+            previous_key, pending = None, 0
+            for sha1_hex, count in records:
+                key = bytes.fromhex(sha1_hex)[:KEY_BYTES]
+                if previous_key is not None and key < previous_key:
+                    raise InvalidIndexError(f"Corpus is not sorted by hash (at {sha1_hex})")
+                if key == previous_key:
+                    pending += count
+                    continue
+                if previous_key is not None:
+                    f.write(RECORD.pack(previous_key, min(pending, 0xFFFFFFFF)))
+                    written += 1
+                    fanout[int.from_bytes(previous_key[:2], 'big') + 1] = written
+                previous_key, pending = key, count
+            if previous_key is not None:
+                f.write(RECORD.pack(previous_key, min(pending, 0xFFFFFFFF)))
+                written += 1
+                fanout[int.from_bytes(previous_key[:2], 'big') + 1] = written
+
+            # Buckets without records end where the previous bucket ended
+            for bucket in range(1, 65537):
+                fanout[bucket] = max(fanout[bucket], fanout[bucket - 1])
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, written))
+            f.write(FANOUT.pack(*fanout))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return written
+
+
+_index = None
+
+
+def get_breached_password_index():
+    """
+    The configured index, reopened when the file is rebuilt.
+    Returns None when no index is configured or it cannot be read.
+    """
+    global _index
+    path = getattr(settings, 'PWNED_PASSWORDS_INDEX_PATH', '')
+    if not path:
+        return None
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        logger.error(f"Breached password index not found at {path}")
+        return None
+
+    cached = _index
+    if cached is None or cached[0] != (path, mtime):
+        try:
+            cached = ((path, mtime), BreachedPasswordIndex(path))
+        except (OSError, InvalidIndexError) as e:
+            logger.error(f"Could not open breached password index: {e}")
+            return None
+        _index = cached
+    return cached[1]
+
+
+@lru_cache(maxsize=getattr(settings, 'PWNED_PASSWORDS_CACHE_SIZE', 256))
+def _fetch_range(prefix):
+    """
+    {hash suffix: count} for a 5 character hash prefix.
+    Raises on failure so that errors are not cached.
+    """
+    response = requests.get(API_URL.format(prefix=prefix), timeout=5)
+    response.raise_for_status()
+    suffixes = {}
+    for line in response.text.splitlines():
+        suffix, _, count = line.partition(':')
+        suffixes[suffix] = int(count)
+    return suffixes
+
+
+def check_password_pwned(password):
+    """
+    Check if password has been compromised.
+
+    Returns:
+        (is_pwned, breach_count). Errors fail open with (False, 0) so an
+        unavailable API does not block password creation.
+    """
+    sha1_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+
+    index = get_breached_password_index()
+    if index is not None:
+        count = index.count(sha1_hash)
+        return count > 0, count
+
+    if not getattr(settings, 'PWNED_PASSWORDS_API_ENABLED', True):
+        return False, 0
+
+    try:
+        count = _fetch_range(sha1_hash[:5]).get(sha1_hash[5:], 0)
+    except Exception as e:
+        logger.warning(f"Pwned passwords API lookup failed: {e}")
+        return False, 0
+    return count > 0, count
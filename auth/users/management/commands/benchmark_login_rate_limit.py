@@ -0,0 +1,63 @@
+"""
+Management command to measure login rate limiter throughput.
+
+Simulates a credential-stuffing burst: every attempt runs the same rate limit
+calls as the login view (check, then record the failure) from many threads
+and documentation-range IPs (198.51.100.0/24), and reports attempts per
+second and the database queries issued per attempt.
+
+Usage:
+    python manage.py benchmark_login_rate_limit
+    python manage.py benchmark_login_rate_limit --attempts 20000 --threads 16
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from users.rate_limiting import check_login_rate_limits, get_rate_limit_store, record_failed_login_attempt
+
+
+class Command(BaseCommand):
+    help = 'Benchmark login rate limit checks under concurrent failed logins'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=5000, help='Total login attempts')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent workers')
+        parser.add_argument('--ips', type=int, default=50, help='Distinct client IPs in the burst')
+
+    def handle(self, *args, **options):
+        attempts, threads, ips = options['attempts'], options['threads'], options['ips']
+        factory = RequestFactory()
+        requests = [
+            factory.post('/login/', REMOTE_ADDR=f'198.51.100.{i % 250}', HTTP_USER_AGENT=f'bench-{i}')
+            for i in range(ips)
+        ]
+
+        def attempt(i):
+            request = requests[i % ips]
+            email = f'bench{i % 10}@example.com'
+            if check_login_rate_limits(request, user_email=email)['login_allowed']:
+                record_failed_login_attempt(request, user_email=email)
+
+        # Warm the config cache, then measure queries for a sample of attempts
+        attempt(0)
+        with CaptureQueriesContext(connection) as queries:
+            for i in range(100):
+                attempt(i)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(attempt, range(attempts)))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(f"Cache backend: {caches['default'].__class__.__name__}")
+        self.stdout.write(f"Store: {get_rate_limit_store().__class__.__name__}")
+        self.stdout.write(f"{attempts} attempts on {threads} threads in {elapsed:.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"{attempts / elapsed:.0f} attempts/s"))
+        self.stdout.write(f"DB queries per attempt: {len(queries.captured_queries) / 100:.2f}")
@@ -0,0 +1,86 @@
+"""
+Management command to build the offline breached password index.
+
+The corpus is the HaveIBeenPwned SHA-1 download ("HASH:COUNT" lines sorted by
+hash, e.g. from the PwnedPasswordsDownloader tool), or a plain list of
+passwords with --plaintext. Point PWNED_PASSWORDS_INDEX_PATH at the output;
+running workers pick up a rebuilt index on their next lookup.
+
+Usage:
+    python manage.py build_breached_password_index pwnedpasswords.txt --output /data/pwned.idx
+    python manage.py build_breached_password_index pwnedpasswords.txt --min-count 10
+    python manage.py build_breached_password_index common-passwords.txt --plaintext
+"""
+
+import hashlib
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from users.breached_passwords import InvalidIndexError, write_index
+
+HASH_LINE = re.compile(r'^([0-9A-Fa-f]{40})(?::(\d+))?$')
+
+
+class Command(BaseCommand):
+    help = 'Build the offline breached password index from a downloaded corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('corpus', help='Corpus file path')
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Index file path (defaults to PWNED_PASSWORDS_INDEX_PATH)',
+        )
+        parser.add_argument(
+            '--plaintext',
+            action='store_true',
+            help='Corpus is one password per line instead of SHA-1 hashes',
+        )
+        parser.add_argument(
+            '--min-count',
+            type=int,
+            default=1,
+            help='Skip hashes seen in fewer breaches, for a smaller index',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.PWNED_PASSWORDS_INDEX_PATH
+        if not output:
+            raise CommandError('Pass --output or set PWNED_PASSWORDS_INDEX_PATH')
+
+        if options['plaintext']:
+            records = self.read_plaintext(options['corpus'])
+        else:
+            records = self.read_hashes(options['corpus'])
+        records = ((sha1, count) for sha1, count in records if count >= options['min_count'])
+
+        try:
+            written = write_index(records, output)
+        except InvalidIndexError as e:
+            raise CommandError(f"{e}. Sort the corpus by hash first, e.g. with `sort`.")
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} hashes to {output}"))
+
+    def read_hashes(self, path):
+        with open(path, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                match = HASH_LINE.match(line)
+                if not match:
+                    raise CommandError(f"Line {line_number} is not HASH:COUNT: {line[:60]}")
+                yield match.group(1).upper(), int(match.group(2) or 1)
+
+    def read_plaintext(self, path):
+        """Plaintext lists are small enough to hash and sort in memory."""
+        counts = {}
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                password = line.rstrip('\r\n')
+                if password:
+                    sha1 = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
+                    counts[sha1] = counts.get(sha1, 0) + 1
+        return sorted(counts.items())
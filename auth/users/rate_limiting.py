@@ -1,16 +1,36 @@
 """
 Rate limiting and device fingerprinting utilities for login protection.
 Implements IP-based and device-based rate limiting to prevent brute force attacks.
+
+With a cache shared by all workers (CACHE_REDIS_URL), failed attempts are
+counted in the cache (CacheRateLimitStore) and the database is only written
+when a block is placed, for auditing. Without one, counters and blocks stay on
+the IPAddressRateLimit / DeviceFingerprint rows (DatabaseRateLimitStore), so
+every worker sees the same counts and blocks.
 """
 
 import hashlib
 import logging
-from django.utils import timezone
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Case, F, Q, Value, When
 from django.http import HttpRequest
 from .models import IPAddressRateLimit, DeviceFingerprint, RateLimitConfig
 
 logger = logging.getLogger(__name__)
 
+UNKNOWN_EMAIL = "unknown@system.local"
+CACHE_PREFIX = 'login_rate_limit'
+WINDOW_BUCKETS = 12
+CONFIG_CACHE_SECONDS = 60
+
+_cached_config = (None, 0.0)
+
 
 def get_client_ip(request: HttpRequest) -> str:
     """
@@ -52,30 +72,194 @@ def generate_device_fingerprint(request: HttpRequest) -> str:
     return fingerprint_hash
 
 
-def get_or_create_ip_rate_limit(ip_address: str, user_email: str = None) -> IPAddressRateLimit:
-    """Get or create IP rate limit tracker for a specific IP and user email combination"""
-    # If no email provided, use a default placeholder for backward compatibility
-    if not user_email:
-        user_email = "unknown@system.local"
-    
-    rate_limit, created = IPAddressRateLimit.objects.get_or_create(
-        ip_address=ip_address,
-        user_email=user_email
-    )
-    return rate_limit
+def get_rate_limit_config() -> RateLimitConfig:
+    """
+    RateLimitConfig, kept in memory for CONFIG_CACHE_SECONDS.
+    Saving the config clears it in the saving process (see signals.py).
+    """
+    global _cached_config
+    config, expires_at = _cached_config
+    if config is None or time.monotonic() >= expires_at:
+        config = RateLimitConfig.get_config()
+        _cached_config = (config, time.monotonic() + CONFIG_CACHE_SECONDS)
+    return config
 
 
-def get_or_create_device_fingerprint(fingerprint_hash: str, user_email: str = None) -> DeviceFingerprint:
-    """Get or create device fingerprint tracker for a specific device and user email combination"""
-    # If no email provided, use a default placeholder for backward compatibility
-    if not user_email:
-        user_email = "unknown@system.local"
-    
-    fingerprint, created = DeviceFingerprint.objects.get_or_create(
-        fingerprint_hash=fingerprint_hash,
-        user_email=user_email
-    )
-    return fingerprint
+def clear_rate_limit_config_cache():
+    global _cached_config
+    _cached_config = (None, 0.0)
+
+
+SCOPES = {
+    'ip': (IPAddressRateLimit, 'ip_address'),
+    'device': (DeviceFingerprint, 'fingerprint_hash'),
+}
+
+
+def _to_datetime(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=dt_timezone.utc) if timestamp else None
+
+
+def _lookup(scope: str, identifier: str, user_email: str = None):
+    model, field = SCOPES[scope]
+    return model, {field: identifier, 'user_email': user_email or UNKNOWN_EMAIL}
+
+
+def _window_seconds(config: RateLimitConfig) -> int:
+    return int(config.attempt_reset_hours * 3600)
+
+
+class CacheRateLimitStore:
+    """
+    Counters and blocks in a cache shared by all workers (Redis).
+
+    Each subject has a sliding window of attempt_reset_hours split into
+    WINDOW_BUCKETS buckets; a failure is one atomic cache.incr. Blocks are
+    placed with cache.add so exactly one concurrent request creates a block,
+    and only that request writes the block row for auditing.
+    """
+
+    @staticmethod
+    def _subject_key(scope: str, identifier: str, user_email: str = None) -> str:
+        digest = hashlib.sha256(f"{identifier}|{user_email or UNKNOWN_EMAIL}".encode()).hexdigest()[:32]
+        return f"{CACHE_PREFIX}:{scope}:{digest}"
+
+    @staticmethod
+    def _bucket_seconds(config: RateLimitConfig) -> int:
+        return max(1, _window_seconds(config) // WINDOW_BUCKETS)
+
+    def _window_keys(self, subject: str, config: RateLimitConfig, now: float) -> list:
+        """Keys of the buckets inside the sliding window, oldest first."""
+        current = int(now // self._bucket_seconds(config))
+        return [f"{subject}:{bucket}" for bucket in range(current - WINDOW_BUCKETS + 1, current + 1)]
+
+    def read(self, scope, identifier, user_email, config, now):
+        """
+        Returns:
+            (attempts in the window, blocked_until timestamp or None), in one cache read
+        """
+        subject = self._subject_key(scope, identifier, user_email)
+        keys = self._window_keys(subject, config, now)
+        block_key = f"{subject}:block"
+        values = cache.get_many(keys + [block_key])
+        blocked_until = values.pop(block_key, None)
+        if blocked_until and blocked_until <= now:
+            blocked_until = None
+        return sum(values.values()), blocked_until
+
+    def increment(self, scope, identifier, user_email, config, now) -> int:
+        """Atomically count one attempt; returns the attempts in the window."""
+        keys = self._window_keys(self._subject_key(scope, identifier, user_email), config, now)
+        current = keys[-1]
+        timeout = self._bucket_seconds(config) * (WINDOW_BUCKETS + 1)
+        cache.add(current, 0, timeout)
+        try:
+            count = cache.incr(current)
+        except ValueError:
+            # Evicted between add and incr
+            cache.add(current, 1, timeout)
+            count = 1
+        return count + sum(cache.get_many(keys[:-1]).values())
+
+    def block(self, scope, identifier, user_email, config, attempts, duration_minutes, now):
+        """
+        Block the subject unless it already is; returns the blocked_until timestamp.
+        The attempt window restarts, so the subject starts over once the block expires.
+        """
+        subject = self._subject_key(scope, identifier, user_email)
+        blocked_until = now + duration_minutes * 60
+        if not cache.add(f"{subject}:block", blocked_until, duration_minutes * 60):
+            return cache.get(f"{subject}:block", blocked_until)
+
+        cache.delete_many(self._window_keys(subject, config, now))
+        model, lookup = _lookup(scope, identifier, user_email)
+        defaults = {'failed_attempts': attempts, 'blocked_until': _to_datetime(blocked_until)}
+        if model is DeviceFingerprint:
+            defaults['requires_captcha'] = True
+        model.objects.update_or_create(**lookup, defaults=defaults)
+        return blocked_until
+
+    def clear(self, scope, identifier, user_email, config, now):
+        subject = self._subject_key(scope, identifier, user_email)
+        cache.delete_many(self._window_keys(subject, config, now) + [f"{subject}:block"])
+
+
+class DatabaseRateLimitStore:
+    """
+    Counters and blocks on the IPAddressRateLimit / DeviceFingerprint rows.
+
+    Used when the cache is local to each process, where cache counters would
+    let every worker count (and block) separately. Updates are single UPDATE
+    statements with F() expressions so concurrent failures are not lost, and
+    the window restarts when the last attempt is older than attempt_reset_hours
+    or a block has expired.
+    """
+
+    def read(self, scope, identifier, user_email, config, now):
+        model, lookup = _lookup(scope, identifier, user_email)
+        row = model.objects.filter(**lookup).values_list('failed_attempts', 'last_attempt', 'blocked_until').first()
+        if row is None:
+            return 0, None
+        attempts, last_attempt, blocked_until = row
+        blocked_until = blocked_until.timestamp() if blocked_until else None
+        if blocked_until and blocked_until <= now:
+            # Block expired; the next failure starts a new window
+            return 0, None
+        if last_attempt and last_attempt.timestamp() < now - _window_seconds(config):
+            attempts = 0
+        return attempts, blocked_until
+
+    def increment(self, scope, identifier, user_email, config, now) -> int:
+        model, lookup = _lookup(scope, identifier, user_email)
+        now_dt = _to_datetime(now)
+        restart = Q(last_attempt__lt=_to_datetime(now - _window_seconds(config))) | Q(blocked_until__lte=now_dt)
+        row, _ = model.objects.get_or_create(**lookup)
+        # Both CASEs read the row as it was before this UPDATE
+        model.objects.filter(pk=row.pk).update(
+            failed_attempts=Case(When(restart, then=Value(1)), default=F('failed_attempts') + 1),
+            blocked_until=Case(When(blocked_until__lte=now_dt, then=Value(None)), default=F('blocked_until')),
+            last_attempt=now_dt,
+        )
+        return model.objects.filter(pk=row.pk).values_list('failed_attempts', flat=True).get()
+
+    def block(self, scope, identifier, user_email, config, attempts, duration_minutes, now):
+        model, lookup = _lookup(scope, identifier, user_email)
+        blocked_until = _to_datetime(now + duration_minutes * 60)
+        changes = {'blocked_until': blocked_until}
+        if model is DeviceFingerprint:
+            changes['requires_captcha'] = True
+        not_blocked = Q(blocked_until__isnull=True) | Q(blocked_until__lte=_to_datetime(now))
+        if model.objects.filter(not_blocked, **lookup).update(**changes):
+            return blocked_until.timestamp()
+        current = model.objects.filter(**lookup).values_list('blocked_until', flat=True).first()
+        return current.timestamp() if current else blocked_until.timestamp()
+
+    def clear(self, scope, identifier, user_email, config, now):
+        model, lookup = _lookup(scope, identifier, user_email)
+        changes = {'failed_attempts': 0, 'blocked_until': None}
+        if model is DeviceFingerprint:
+            changes['requires_captcha'] = False
+        model.objects.filter(**lookup).update(**changes)
+
+
+_cache_store = CacheRateLimitStore()
+_database_store = DatabaseRateLimitStore()
+
+
+def cache_is_shared() -> bool:
+    """False for caches that are private to each process (or do not store anything)."""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def get_rate_limit_store():
+    """
+    The store for counters and blocks: LOGIN_RATE_LIMIT_STORE ('cache' or
+    'database'), or by default the cache when it is shared between workers.
+    """
+    store = getattr(settings, 'LOGIN_RATE_LIMIT_STORE', 'auto')
+    if store == 'auto':
+        store = 'cache' if cache_is_shared() else 'database'
+    return _cache_store if store == 'cache' else _database_store
 
 
 def check_ip_rate_limit(request: HttpRequest, user_email: str = None) -> dict:
@@ -90,38 +274,37 @@ def check_ip_rate_limit(request: HttpRequest, user_email: str = None) -> dict:
             'attempts': int
         }
     """
-    config = RateLimitConfig.get_config()
+    config = get_rate_limit_config()
     ip_address = get_client_ip(request)
-    rate_limit = get_or_create_ip_rate_limit(ip_address, user_email)
+    now = time.time()
+    attempts, blocked_until = get_rate_limit_store().read('ip', ip_address, user_email, config, now)
     
     # Check if IP is blocked
-    if rate_limit.is_blocked():
+    if blocked_until:
         return {
             'allowed': False,
             'reason': 'IP_BLOCKED',
-            'blocked_until': rate_limit.blocked_until,
-            'attempts': rate_limit.failed_attempts
+            'blocked_until': _to_datetime(blocked_until),
+            'attempts': attempts
         }
     
-    # If block has expired but attempts are still high, reset them
-    if rate_limit.blocked_until and timezone.now() >= rate_limit.blocked_until:
-        rate_limit.reset_attempts()
-    
     # Check if IP has exceeded threshold
-    if rate_limit.failed_attempts >= config.ip_attempt_threshold:
-        rate_limit.block_until(config.ip_block_duration_minutes)
+    if attempts >= config.ip_attempt_threshold:
+        blocked_until = get_rate_limit_store().block(
+            'ip', ip_address, user_email, config, attempts, config.ip_block_duration_minutes, now
+        )
         return {
             'allowed': False,
             'reason': 'IP_THRESHOLD_EXCEEDED',
-            'blocked_until': rate_limit.blocked_until,
-            'attempts': rate_limit.failed_attempts
+            'blocked_until': _to_datetime(blocked_until),
+            'attempts': attempts
         }
     
     return {
         'allowed': True,
         'reason': None,
         'blocked_until': None,
-        'attempts': rate_limit.failed_attempts
+        'attempts': attempts
     }
 
 
@@ -137,41 +320,40 @@ def check_device_rate_limit(request: HttpRequest, user_email: str = None) -> dic
             'attempts': int
         }
     """
-    config = RateLimitConfig.get_config()
+    config = get_rate_limit_config()
     fingerprint_hash = generate_device_fingerprint(request)
-    device = get_or_create_device_fingerprint(fingerprint_hash, user_email)
+    now = time.time()
+    attempts, blocked_until = get_rate_limit_store().read('device', fingerprint_hash, user_email, config, now)
     
     # Check if device is blocked
-    if device.is_blocked():
+    if blocked_until:
         return {
             'allowed': False,
             'requires_captcha': True,
-            'blocked_until': device.blocked_until,
-            'attempts': device.failed_attempts
+            'blocked_until': _to_datetime(blocked_until),
+            'attempts': attempts
         }
     
-    # If block has expired but attempts are still high, reset them
-    if device.blocked_until and timezone.now() >= device.blocked_until:
-        device.reset_attempts()
-    
     # Check if device has exceeded block threshold
-    if device.failed_attempts >= config.device_captcha_threshold:
-        device.block_until(config.device_block_duration_minutes)
+    if attempts >= config.device_captcha_threshold:
+        blocked_until = get_rate_limit_store().block(
+            'device', fingerprint_hash, user_email, config, attempts, config.device_block_duration_minutes, now
+        )
         return {
             'allowed': False,
             'requires_captcha': True,
-            'blocked_until': device.blocked_until,
-            'attempts': device.failed_attempts
+            'blocked_until': _to_datetime(blocked_until),
+            'attempts': attempts
         }
     
     # Check if device requires captcha (but not blocked)
-    requires_captcha = device.failed_attempts >= config.device_attempt_threshold
+    requires_captcha = attempts >= config.device_attempt_threshold
     
     return {
         'allowed': True,
         'requires_captcha': requires_captcha,
         'blocked_until': None,
-        'attempts': device.failed_attempts
+        'attempts': attempts
     }
 
 
@@ -230,20 +412,28 @@ def record_failed_login_attempt(request: HttpRequest, user_email: str = None, sk
     if skip_for_otp_error:
         return
     
+    config = get_rate_limit_config()
     ip_address = get_client_ip(request)
     fingerprint_hash = generate_device_fingerprint(request)
+    now = time.time()
+    
+    store = get_rate_limit_store()
     
     # Increment IP attempt counter for this user
-    ip_rate_limit = get_or_create_ip_rate_limit(ip_address, user_email)
-    ip_rate_limit.increment_failed_attempts()
+    ip_attempts = store.increment('ip', ip_address, user_email, config, now)
+    if ip_attempts >= config.ip_attempt_threshold:
+        store.block('ip', ip_address, user_email, config, ip_attempts, config.ip_block_duration_minutes, now)
     
     # Increment device attempt counter for this user
-    device = get_or_create_device_fingerprint(fingerprint_hash, user_email)
-    device.increment_failed_attempts()
+    device_attempts = store.increment('device', fingerprint_hash, user_email, config, now)
+    if device_attempts >= config.device_captcha_threshold:
+        store.block(
+            'device', fingerprint_hash, user_email, config, device_attempts, config.device_block_duration_minutes, now
+        )
     
     logger.warning(
         f"Failed login attempt - IP: {ip_address}, Email: {user_email}, Device: {fingerprint_hash[:16]}..., "
-        f"IP Attempts: {ip_rate_limit.failed_attempts}, Device Attempts: {device.failed_attempts}"
+        f"IP Attempts: {ip_attempts}, Device Attempts: {device_attempts}"
     )
 
 
@@ -251,17 +441,27 @@ def record_successful_login(request: HttpRequest, user_email: str = None):
     """
     Record a successful login and reset rate limits for the device/IP and user combination.
     """
+    config = get_rate_limit_config()
     ip_address = get_client_ip(request)
     fingerprint_hash = generate_device_fingerprint(request)
+    now = time.time()
     
-    # Reset IP attempt counter for this user
-    ip_rate_limit = get_or_create_ip_rate_limit(ip_address, user_email)
-    ip_rate_limit.reset_attempts()
-    
-    # Reset device attempt counter for this user
-    device = get_or_create_device_fingerprint(fingerprint_hash, user_email)
-    device.reset_attempts()
+    reset_ip_rate_limit(ip_address, user_email, config, now)
+    reset_device_rate_limit(fingerprint_hash, user_email, config, now)
     
     logger.info(
         f"Successful login - IP: {ip_address}, Email: {user_email}, Device: {fingerprint_hash[:16]}..."
     )
+
+
+def reset_ip_rate_limit(ip_address: str, user_email: str = None, config: RateLimitConfig = None, now: float = None):
+    """Clear the attempt window and any block of an IP and user combination"""
+    get_rate_limit_store().clear('ip', ip_address, user_email, config or get_rate_limit_config(), now or time.time())
+
+
+def reset_device_rate_limit(fingerprint_hash: str, user_email: str = None, config: RateLimitConfig = None,
+                            now: float = None):
+    """Clear the attempt window and any block of a device and user combination"""
+    get_rate_limit_store().clear(
+        'device', fingerprint_hash, user_email, config or get_rate_limit_config(), now or time.time()
+    )
@@ -4,6 +4,7 @@ from django.contrib.auth import authenticate
 from django.core.mail import send_mail
 from django.conf import settings
 from .models import User, UserOTP, PasswordResetToken
+from .breached_passwords import check_password_pwned
 from emails.services import get_email_service
 from system_roles.models import UserSystemRole
 import hashlib
@@ -32,38 +33,6 @@ def validate_phone_number(phone_number):
     return True, None
 
 
-def check_password_pwned(password):
-    """
-    Check if password has been compromised using HaveIBeenPwned API.
-    Returns True if password is compromised, False otherwise.
-    """
-    try:
-        # Create SHA-1 hash of the password
-        sha1_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
-        
-        # Use k-anonymity - only send first 5 characters of hash
-        prefix = sha1_hash[:5]
-        suffix = sha1_hash[5:]
-        
-        # Query HaveIBeenPwned API
-        url = f"https://api.pwnedpasswords.com/range/{prefix}"
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 200:
-            # Check if our hash suffix appears in the results
-            for line in response.text.splitlines():
-                hash_suffix, count = line.split(':')
-                if hash_suffix == suffix:
-                    return True, int(count)  # Password is compromised
-            return False, 0  # Password not found in breach database
-        else:
-            # If API is unavailable, don't block password creation
-            return False, 0
-            
-    except Exception:
-        # If there's any error (network, timeout, etc.), don't block password creation
-        return False, 0
-import hashlib
 import requests
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
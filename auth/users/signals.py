@@ -66,3 +66,25 @@ def sync_user_email_on_delete(sender, instance, **kwargs):
         logger.info(f"Triggered email cache delete for user {instance.pk}")
     except Exception as e:
         logger.error(f"Failed to trigger email cache delete for user {instance.pk}: {str(e)}")
+
+
+@receiver(post_save, sender='users.RateLimitConfig')
+def clear_rate_limit_config_cache(sender, instance, **kwargs):
+    """Drop the in-memory rate limit config so new thresholds apply immediately."""
+    from .rate_limiting import clear_rate_limit_config_cache
+    clear_rate_limit_config_cache()
+
+
+@receiver(post_save, sender='users.User')
+@receiver(post_delete, sender='users.User')
+def invalidate_user_snapshot(sender, instance, **kwargs):
+    """Drop the cached JWT user snapshot so the next request reloads it."""
+    from .token_cache import USER, invalidate_snapshot
+    invalidate_snapshot(USER, instance.pk)
+
+
+@receiver(post_save, sender='hdts.Employees')
+@receiver(post_delete, sender='hdts.Employees')
+def invalidate_employee_snapshot(sender, instance, **kwargs):
+    from .token_cache import EMPLOYEE, invalidate_snapshot
+    invalidate_snapshot(EMPLOYEE, instance.pk)
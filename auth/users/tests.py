@@ -0,0 +1,340 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import skipIf
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TransactionTestCase, override_settings
+
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from auth.middleware import JWTAuthenticationMiddleware
+from hdts.models import Employees
+from hdts.utils.jwt_helpers import generate_employee_tokens
+
+from . import breached_passwords, rate_limiting, token_cache
+from .authentication import CookieJWTAuthentication
+from .authentication_middleware import AuthenticationRoutingMiddleware
+from .breached_passwords import BreachedPasswordIndex, check_password_pwned
+from .models import DeviceFingerprint, IPAddressRateLimit, RateLimitConfig, User
+from .rate_limiting import check_login_rate_limits, record_failed_login_attempt, record_successful_login
+
+EMAIL = 'user@example.com'
+
+
+@override_settings(LOGIN_RATE_LIMIT_STORE='cache', CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'login-rate-limit-tests',
+}})
+class LoginRateLimitTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        rate_limiting.clear_rate_limit_config_cache()
+        self.request = RequestFactory().post('/login/', REMOTE_ADDR='10.0.0.1', HTTP_USER_AGENT='test-agent')
+
+    def configure(self, **thresholds):
+        RateLimitConfig.objects.update_or_create(pk=1, defaults=thresholds)
+
+    def fail(self, times=1):
+        for _ in range(times):
+            record_failed_login_attempt(self.request, user_email=EMAIL)
+
+    def test_concurrent_failures_are_all_counted(self):
+        self.configure(ip_attempt_threshold=1000, device_attempt_threshold=1000, device_captcha_threshold=1000)
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            list(pool.map(lambda _: self.fail(5), range(20)))
+
+        self.assertEqual(rate_limiting.check_ip_rate_limit(self.request, EMAIL)['attempts'], 100)
+        self.assertEqual(rate_limiting.check_device_rate_limit(self.request, EMAIL)['attempts'], 100)
+        self.assertFalse(IPAddressRateLimit.objects.exists())
+        self.assertFalse(DeviceFingerprint.objects.exists())
+
+    def test_concurrent_burst_blocks_once(self):
+        self.configure(ip_attempt_threshold=10, device_attempt_threshold=1000, device_captcha_threshold=1000)
+        with patch.object(IPAddressRateLimit.objects, 'update_or_create',
+                          wraps=IPAddressRateLimit.objects.update_or_create) as persist:
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                list(pool.map(lambda _: self.fail(), range(40)))
+
+        persist.assert_called_once()
+        result = check_login_rate_limits(self.request, EMAIL)
+        self.assertEqual((result['login_allowed'], result['blocked_reason']), (False, 'IP_BLOCKED'))
+        block = IPAddressRateLimit.objects.get()
+        self.assertEqual((block.ip_address, block.user_email), ('10.0.0.1', EMAIL))
+        self.assertEqual(block.blocked_until, result['blocked_until'])
+
+    def test_captcha_block_and_reset(self):
+        self.configure(ip_attempt_threshold=100, device_attempt_threshold=2, device_captcha_threshold=4)
+        self.fail(2)
+        self.assertTrue(check_login_rate_limits(self.request, EMAIL)['captcha_required'])
+        # Other accounts from the same device are tracked separately
+        self.assertFalse(check_login_rate_limits(self.request, 'other@example.com')['captcha_required'])
+
+        self.fail(2)
+        self.assertEqual(check_login_rate_limits(self.request, EMAIL)['blocked_reason'], 'DEVICE_BLOCKED')
+        self.assertTrue(DeviceFingerprint.objects.get().requires_captcha)
+
+        record_successful_login(self.request, EMAIL)
+        result = check_login_rate_limits(self.request, EMAIL)
+        self.assertEqual((result['login_allowed'], result['captcha_required']), (True, False))
+
+    def test_attempts_leave_the_sliding_window(self):
+        self.configure(attempt_reset_hours=24)
+        with patch.object(rate_limiting.time, 'time', return_value=1_000_000.0):
+            self.fail(3)
+        with patch.object(rate_limiting.time, 'time', return_value=1_000_000.0 + 12 * 3600):
+            self.fail(1)
+            self.assertEqual(rate_limiting.check_ip_rate_limit(self.request, EMAIL)['attempts'], 4)
+        with patch.object(rate_limiting.time, 'time', return_value=1_000_000.0 + 25 * 3600):
+            self.assertEqual(rate_limiting.check_ip_rate_limit(self.request, EMAIL)['attempts'], 1)
+
+    def test_checks_do_not_query_the_database(self):
+        self.configure(ip_attempt_threshold=100)
+        check_login_rate_limits(self.request, EMAIL)
+        with self.assertNumQueries(0):
+            check_login_rate_limits(self.request, EMAIL)
+            self.fail(3)
+            record_successful_login(self.request, EMAIL)
+
+    def test_saving_config_applies_immediately(self):
+        self.configure(ip_attempt_threshold=100)
+        self.fail(3)
+        self.assertTrue(check_login_rate_limits(self.request, EMAIL)['login_allowed'])
+
+        config = RateLimitConfig.get_config()
+        config.ip_attempt_threshold = 3
+        config.save()
+        self.assertEqual(check_login_rate_limits(self.request, EMAIL)['blocked_reason'], 'IP_THRESHOLD_EXCEEDED')
+
+
+
+@override_settings(LOGIN_RATE_LIMIT_STORE='auto', CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'login-rate-limit-worker-1',
+}})
+class DatabaseRateLimitStoreTests(TransactionTestCase):
+    """A per-process cache is not shared by gunicorn workers, so the rows are used."""
+
+    def setUp(self):
+        rate_limiting.clear_rate_limit_config_cache()
+        RateLimitConfig.objects.update_or_create(pk=1, defaults={
+            'ip_attempt_threshold': 5, 'device_attempt_threshold': 100, 'device_captcha_threshold': 100,
+        })
+        self.request = RequestFactory().post('/login/', REMOTE_ADDR='10.0.0.2', HTTP_USER_AGENT='test-agent')
+
+    def fail(self, times=1):
+        for _ in range(times):
+            record_failed_login_attempt(self.request, user_email=EMAIL)
+
+    def test_local_memory_cache_uses_database(self):
+        self.assertIsInstance(rate_limiting.get_rate_limit_store(), rate_limiting.DatabaseRateLimitStore)
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+                                                   'LOCATION': 'redis://localhost:6379'}}):
+            self.assertIsInstance(rate_limiting.get_rate_limit_store(), rate_limiting.CacheRateLimitStore)
+
+    def test_block_is_seen_by_other_workers(self):
+        self.fail(5)
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'login-rate-limit-worker-2',
+        }}):
+            result = check_login_rate_limits(self.request, EMAIL)
+        self.assertEqual((result['login_allowed'], result['blocked_reason']), (False, 'IP_BLOCKED'))
+        self.assertEqual(IPAddressRateLimit.objects.get().blocked_until, result['blocked_until'])
+
+    @skipIf(connection.vendor == 'sqlite', 'SQLite test databases lock tables on concurrent writes')
+    def test_concurrent_failures_are_all_counted(self):
+        RateLimitConfig.objects.filter(pk=1).update(ip_attempt_threshold=1000)
+        self.fail()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: self.fail(), range(20)))
+        self.assertEqual(rate_limiting.check_ip_rate_limit(self.request, EMAIL)['attempts'], 21)
+
+    def test_window_restarts_after_block_and_reset(self):
+        with patch.object(rate_limiting.time, 'time', return_value=1_000_000.0):
+            self.fail(5)
+            self.assertFalse(check_login_rate_limits(self.request, EMAIL)['login_allowed'])
+        with patch.object(rate_limiting.time, 'time', return_value=1_000_000.0 + 31 * 60):
+            self.assertTrue(check_login_rate_limits(self.request, EMAIL)['login_allowed'])
+            self.fail()
+            self.assertEqual(rate_limiting.check_ip_rate_limit(self.request, EMAIL)['attempts'], 1)
+            record_successful_login(self.request, EMAIL)
+            self.assertEqual(rate_limiting.check_ip_rate_limit(self.request, EMAIL)['attempts'], 0)
+
+
+def sha1(password):
+    return hashlib.sha1(password.encode()).hexdigest().upper()
+
+
+class BreachedPasswordTests(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+        self.index_path = os.path.join(self.tmpdir, 'pwned.idx')
+        breached_passwords._index = None
+        breached_passwords._fetch_range.cache_clear()
+        patcher = patch.object(breached_passwords.requests, 'get')
+        self.api = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_corpus(self, lines):
+        path = os.path.join(self.tmpdir, 'corpus.txt')
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines))
+        return path
+
+    def build(self, lines, *args):
+        call_command('build_breached_password_index', self.write_corpus(lines),
+                     '--output', self.index_path, *args, stdout=io.StringIO())
+
+    def test_index_lookups(self):
+        hashes = sorted(sha1(f'password{i}') for i in range(3000))
+        self.build([f'{h}:{i + 1}' for i, h in enumerate(hashes)])
+        index = BreachedPasswordIndex(self.index_path)
+        self.addCleanup(index.close)
+
+        self.assertEqual(len(index), 3000)
+        for i, h in enumerate(hashes):
+            self.assertEqual(index.count(h), i + 1)
+        self.assertEqual(index.count(sha1('not breached')), 0)
+        self.assertEqual(index.count('0' * 40), 0)
+        self.assertEqual(index.count('F' * 40), 0)
+
+    def test_unsorted_corpus_is_rejected(self):
+        with self.assertRaises(CommandError):
+            self.build([f'{h}:1' for h in sorted([sha1('a'), sha1('b')], reverse=True)])
+        self.assertFalse(os.path.exists(self.index_path))
+
+    def test_check_uses_index_without_network(self):
+        self.build(['hunter2', 'hunter2', 'letmein'], '--plaintext')
+        with override_settings(PWNED_PASSWORDS_INDEX_PATH=self.index_path):
+            self.assertEqual(check_password_pwned('hunter2'), (True, 2))
+            self.assertEqual(check_password_pwned('correct horse battery staple'), (False, 0))
+        self.api.assert_not_called()
+
+    @override_settings(PWNED_PASSWORDS_INDEX_PATH='')
+    def test_api_ranges_are_cached_and_failures_are_not(self):
+        digest = sha1('hunter2')
+        self.api.side_effect = [OSError('unreachable'), Mock(text=f'{digest[5:]}:17\r\nABC:1')]
+
+        self.assertEqual(check_password_pwned('hunter2'), (False, 0))
+        self.assertEqual(check_password_pwned('hunter2'), (True, 17))
+        self.assertEqual(check_password_pwned('hunter2'), (True, 17))
+        self.assertEqual(self.api.call_count, 2)
+
+    @override_settings(PWNED_PASSWORDS_INDEX_PATH='', PWNED_PASSWORDS_API_ENABLED=False)
+    def test_api_can_be_disabled(self):
+        self.assertEqual(check_password_pwned('hunter2'), (False, 0))
+        self.api.assert_not_called()
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'jwt-token-cache-tests',
+}})
+class JWTHydrationCacheTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = patch('users.tasks.sync_user_email_to_notification_service.delay')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user(email='staff@example.com', password='x', first_name='Staff')
+        self.token = str(AccessToken.for_user(self.user))
+
+    def authenticate(self, token):
+        request = RequestFactory().get('/api/v1/users/profile/')
+        request.COOKIES['access_token'] = token
+        JWTAuthenticationMiddleware(lambda r: None)(request)
+        return request
+
+    def test_token_is_decoded_and_user_loaded_once(self):
+        with patch.object(token_cache, 'cache_is_shared', return_value=True), \
+                patch.object(token_cache.token_backend, 'decode', wraps=token_cache.token_backend.decode) as decode:
+            with self.assertNumQueries(1):
+                self.assertEqual(self.authenticate(self.token).user.pk, self.user.pk)
+            with self.assertNumQueries(0):
+                request = self.authenticate(self.token)
+                drf_request = APIRequestFactory().get('/api/me/')
+                drf_request.COOKIES['access_token'] = self.token
+                user, claims = CookieJWTAuthentication().authenticate(drf_request)
+        decode.assert_called_once()
+        self.assertEqual((request.user.email, user.pk, claims['user_id']), ('staff@example.com', self.user.pk, str(self.user.pk)))
+
+    def test_user_save_invalidates_snapshot(self):
+        self.authenticate(self.token)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        self.assertEqual(self.authenticate(self.token).user.first_name, 'Renamed')
+
+    def test_snapshot_leaves_out_password_hash(self):
+        self.authenticate(self.token)
+        cached = cache.get(token_cache._snapshot_key(token_cache.USER, self.user.pk))
+        self.assertNotIn('password', cached)
+
+        user = self.authenticate(self.token).user
+        self.assertIn('password', user.get_deferred_fields())
+        with self.assertNumQueries(1):
+            self.assertTrue(user.check_password('x'))
+
+    def test_per_process_cache_rechecks_account_status(self):
+        """Another worker's deactivation is not signalled here, so hits re-read is_active"""
+        self.assertTrue(self.authenticate(self.token).user.is_active)
+        # A queryset update sends no signal, like a save in another worker
+        User.objects.filter(pk=self.user.pk).update(is_active=False, first_name='Stale')
+
+        with self.assertNumQueries(1):
+            user = self.authenticate(self.token).user
+        self.assertFalse(user.is_active)
+        self.assertEqual(user.first_name, 'Staff')
+
+        User.objects.filter(pk=self.user.pk).delete()
+        self.assertFalse(hasattr(self.authenticate(self.token), 'user'))
+
+    def test_malformed_user_id_claim_is_rejected(self):
+        token = AccessToken.for_user(self.user)
+        token['user_id'] = 'not-a-number'
+        request = self.authenticate(str(token))
+        self.assertFalse(hasattr(request, 'user'))
+
+    def test_cache_errors_leave_request_anonymous(self):
+        with patch.object(token_cache.cache, 'get', side_effect=ConnectionError('cache down')):
+            request = self.authenticate(self.token)
+            self.assertFalse(hasattr(request, 'user'))
+
+            routed = RequestFactory().get('/api/v1/users/profile/')
+            routed.COOKIES['access_token'] = self.token
+            AuthenticationRoutingMiddleware(lambda r: None).authenticate_from_jwt(routed)
+            self.assertFalse(hasattr(routed, 'user_id'))
+
+    def test_employee_token_dispatch(self):
+        employee = Employees.objects.create(email='employee@example.com', username='employee')
+        token = generate_employee_tokens(employee)['access_token']
+
+        request = self.authenticate(token)
+        self.assertEqual(request.employee.pk, employee.pk)
+        self.assertFalse(hasattr(request, 'user'))
+
+        # The employee id also appears as user_id; it must not authenticate a User
+        drf_request = APIRequestFactory().get('/api/me/')
+        drf_request.COOKIES['access_token'] = token
+        self.assertIsNone(CookieJWTAuthentication().authenticate(drf_request))
+
+    def test_employee_refresh_token_is_rejected(self):
+        employee = Employees.objects.create(email='employee@example.com', username='employee')
+        token = generate_employee_tokens(employee)['refresh_token']
+
+        request = self.authenticate(token)
+        self.assertFalse(hasattr(request, 'employee'))
+        self.assertFalse(hasattr(request, 'user'))
+
+    def test_invalid_token_is_not_cached(self):
+        request = self.authenticate(self.token[:-2] + 'xx')
+        self.assertNotIn('access_token', request.COOKIES)
+        self.assertFalse(hasattr(request, 'user'))
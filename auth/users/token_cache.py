@@ -0,0 +1,180 @@
+"""
+Verified-token and user snapshot cache for JWT authentication.
+
+JWTAuthenticationMiddleware and CookieJWTAuthentication both authenticate
+every request from the access token. Instead of decoding the token (twice:
+once as an employee token, once as a simplejwt AccessToken) and loading the
+User/Employees row and the user's system roles on every hit:
+
+- verify_token() decodes the token once, dispatching on its claims
+  (employee_id for HDTS employee tokens, token_type/user_id for staff), and
+  caches the result under a digest of the token until the token expires.
+  A token and its jti are one-to-one, so the digest serves as the jti key
+  without parsing the token first.
+- get_snapshot() caches the fields of the authenticated User or Employees
+  row listed in SNAPSHOT_FIELDS (never the password hash), for at most
+  SNAPSHOT_SECONDS and never past the token's expiry. Other fields load from
+  the database on first access. User and Employees saves and deletes drop
+  the snapshot (see users/signals.py).
+
+Set CACHE_REDIS_URL so all workers share the cache and its invalidations.
+With the default local-memory cache another worker's invalidation never
+reaches this process, so each hit re-reads LIVE_FIELDS (is_active, status,
+is_locked) by primary key, one indexed query: a deactivated, locked or
+deleted account is seen as such on the next request, not SNAPSHOT_SECONDS
+later.
+"""
+
+import hashlib
+import logging
+import time
+from dataclasses import dataclass
+
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.state import token_backend
+
+from .rate_limiting import cache_is_shared
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PREFIX = 'jwt_auth:token'
+SNAPSHOT_PREFIX = 'jwt_auth:snapshot'
+SNAPSHOT_SECONDS = 60
+
+USER = 'user'
+EMPLOYEE = 'employee'
+
+# What request.user / request.employee are read for on most requests
+SNAPSHOT_FIELDS = {
+    USER: ('id', 'email', 'username', 'first_name', 'middle_name', 'suffix', 'last_name',
+           'company_id', 'department', 'status', 'profile_picture',
+           'is_active', 'is_staff', 'is_superuser', 'is_locked', 'otp_enabled'),
+    EMPLOYEE: ('id', 'user_id', 'email', 'username', 'first_name', 'middle_name', 'suffix',
+               'last_name', 'company_id', 'department', 'status', 'profile_picture',
+               'is_locked', 'otp_enabled'),
+}
+# Re-read on every hit when the cache is private to each worker
+LIVE_FIELDS = {
+    USER: ('is_active', 'status', 'is_locked'),
+    EMPLOYEE: ('status', 'is_locked'),
+}
+
+
+@dataclass(frozen=True)
+class VerifiedToken:
+    kind: str  # USER or EMPLOYEE
+    subject_id: int
+    expires_at: int
+    payload: dict
+
+
+def _ttl(expires_at, limit=None):
+    ttl = int(expires_at - time.time())
+    return min(ttl, limit) if limit else ttl
+
+
+def _token_key(raw_token):
+    if isinstance(raw_token, bytes):
+        raw_token = raw_token.decode()
+    return f"{TOKEN_PREFIX}:{hashlib.sha256(raw_token.encode()).hexdigest()}"
+
+
+def _verify(raw_token):
+    try:
+        payload = token_backend.decode(raw_token, verify=True)
+    except TokenBackendError as e:
+        logger.debug(f"Invalid JWT token: {str(e)}")
+        return None
+
+    expires_at = payload.get('exp')
+    if not expires_at:
+        return None
+
+    # Refresh tokens (staff and employee) never authenticate a request
+    if payload.get(api_settings.TOKEN_TYPE_CLAIM) != 'access':
+        return None
+
+    # Custom HDTS employee tokens carry employee_id (and a user_id that is
+    # the employee's id, so they must be told apart before the staff check)
+    if payload.get('employee_id'):
+        try:
+            employee_id = int(payload['employee_id'])
+        except (TypeError, ValueError):
+            logger.debug("JWT token has a malformed employee_id claim")
+            return None
+        return VerifiedToken(EMPLOYEE, employee_id, expires_at, payload)
+
+    try:
+        user_id = int(payload.get(api_settings.USER_ID_CLAIM))
+    except (TypeError, ValueError):
+        logger.debug("JWT token has no usable user id claim")
+        return None
+    return VerifiedToken(USER, user_id, expires_at, payload)
+
+
+def verify_token(raw_token):
+    """
+    Verified claims of an access token, or None if it is invalid or expired.
+    """
+    key = _token_key(raw_token)
+    verified = cache.get(key)
+    if verified is not None and _ttl(verified.expires_at) > 0:
+        return verified
+
+    verified = _verify(raw_token)
+    if verified is not None and _ttl(verified.expires_at) > 0:
+        cache.set(key, verified, _ttl(verified.expires_at))
+        return verified
+    return None
+
+
+def _snapshot_key(kind, subject_id):
+    return f"{SNAPSHOT_PREFIX}:{kind}:{subject_id}"
+
+
+def _model(kind):
+    if kind == EMPLOYEE:
+        from hdts.models import Employees
+        return Employees
+    from .models import User
+    return User
+
+
+def _build(kind, values):
+    """An instance with the snapshot fields set and the rest deferred."""
+    model = _model(kind)
+    names = [f.attname for f in model._meta.concrete_fields if f.attname in values]
+    return model.from_db(DEFAULT_DB_ALIAS, names, [values[name] for name in names])
+
+
+def get_snapshot(kind, subject_id, expires_at):
+    """
+    The User or Employees row a token refers to.
+
+    Each call returns a fresh instance, so changes made by a request never
+    leak into the cache; saving it invalidates the snapshot as usual.
+
+    Raises:
+        DoesNotExist: if the user/employee no longer exists
+    """
+    model = _model(kind)
+    key = _snapshot_key(kind, subject_id)
+    values = cache.get(key)
+    if values is None:
+        values = model.objects.values(*SNAPSHOT_FIELDS[kind]).get(id=subject_id)
+        ttl = _ttl(expires_at, SNAPSHOT_SECONDS)
+        if ttl > 0:
+            cache.set(key, values, ttl)
+    elif not cache_is_shared():
+        values = {**values, **model.objects.values(*LIVE_FIELDS[kind]).get(id=subject_id)}
+    return _build(kind, values)
+
+
+def invalidate_snapshot(kind, subject_id):
+    """Drop a snapshot once the current transaction (if any) commits."""
+    key = _snapshot_key(kind, subject_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
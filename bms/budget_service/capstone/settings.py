@@ -177,6 +177,11 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Exports (core.exports): rows fetched per server-side cursor round trip, and
+# lifetime in seconds of download links printed by `manage.py export_ledger`
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', 2000))
+EXPORT_LINK_MAX_AGE = int(os.getenv('EXPORT_LINK_MAX_AGE', 60 * 60 * 24))
+
 # Debug toolbar settings
 INTERNAL_IPS = [
     '127.0.0.1',
@@ -0,0 +1,114 @@
+"""
+Budget variance engine shared by BudgetVarianceReportView and
+export_budget_variance_excel.
+
+The whole report costs three queries however deep or wide the category tree
+is: one fetch of every ExpenseCategory, one GROUP BY category over active
+BudgetAllocations and one over APPROVED Expenses. The tree is assembled in
+memory and totals are rolled up bottom-up.
+
+Roll-up rules (unchanged from the per-node implementation):
+- top-level nodes are active level-1 categories; children are all their
+  subcategories;
+- a leaf reports its own budget/actual;
+- a parent reports the sum of its children (its own direct allocations and
+  expenses are not added).
+"""
+from decimal import Decimal
+
+from django.db.models import Sum
+
+from .models import BudgetAllocation, Expense, ExpenseCategory
+
+ZERO = Decimal('0')
+
+
+def _sums_by_category(queryset):
+    return dict(
+        queryset.order_by().values('category_id')
+        .annotate(total=Sum('amount'))
+        .values_list('category_id', 'total')
+    )
+
+
+def build_variance_tree(fiscal_year, department_id=None, month=None):
+    """
+    Build the budget variance report for a fiscal year.
+
+    Args:
+        fiscal_year: FiscalYear instance or id
+        department_id: Only count this department's allocations and expenses
+        month: Only count expenses dated in this month (1-12); budgets are
+            always whole-year
+
+    Returns:
+        list of top-level nodes, each a dict with id, name, code, level,
+        classification, budget, actual, available (Decimals) and children
+    """
+    budget_qs = BudgetAllocation.objects.filter(fiscal_year=fiscal_year, is_active=True)
+    actual_qs = Expense.objects.filter(budget_allocation__fiscal_year=fiscal_year, status='APPROVED')
+    if department_id:
+        budget_qs = budget_qs.filter(department_id=department_id)
+        actual_qs = actual_qs.filter(department_id=department_id)
+    if month:
+        actual_qs = actual_qs.filter(date__month=month)
+
+    budgets = _sums_by_category(budget_qs)
+    actuals = _sums_by_category(actual_qs)
+
+    nodes = {}
+    children_of = {}
+    roots = []
+    for row in ExpenseCategory.objects.order_by('id').values(
+            'id', 'name', 'code', 'level', 'classification', 'parent_category_id', 'is_active'):
+        nodes[row['id']] = {
+            'id': row['id'],
+            'name': row['name'],
+            'code': row['code'],
+            'level': row['level'],
+            'classification': row['classification'],
+            'children': [],
+        }
+        children_of.setdefault(row['parent_category_id'], []).append(row['id'])
+        if row['level'] == 1 and row['is_active']:
+            roots.append(row['id'])
+
+    # Iterative post-order walk; `seen` guards against cycles in bad data
+    seen = set()
+    for root_id in roots:
+        stack = [(root_id, False)]
+        while stack:
+            node_id, expanded = stack.pop()
+            node = nodes[node_id]
+            if not expanded:
+                if node_id in seen:
+                    continue
+                seen.add(node_id)
+                stack.append((node_id, True))
+                for child_id in reversed(children_of.get(node_id, [])):
+                    if child_id not in seen:
+                        stack.append((child_id, False))
+                continue
+
+            node['children'] = [nodes[c] for c in children_of.get(node_id, []) if 'budget' in nodes[c]]
+            if node['children']:
+                node['budget'] = sum((c['budget'] for c in node['children']), ZERO)
+                node['actual'] = sum((c['actual'] for c in node['children']), ZERO)
+            else:
+                node['budget'] = budgets.get(node_id) or ZERO
+                node['actual'] = actuals.get(node_id) or ZERO
+            node['available'] = node['budget'] - node['actual']
+
+    return [nodes[root_id] for root_id in roots if 'budget' in nodes[root_id]]
+
+
+def flatten_variance_tree(tree):
+    """
+    Yields:
+        (depth, node) in display order (parents before their children)
+    """
+    stack = [(0, node) for node in reversed(tree)]
+    while stack:
+        depth, node = stack.pop()
+        yield depth, node
+        stack.extend((depth + 1, child) for child in reversed(node['children']))
@@ -0,0 +1,192 @@
+"""
+Export engine for ledger, proposal and report downloads.
+
+- CSV is streamed row by row (StreamingHttpResponse) straight from a
+  server-side cursor, so memory stays flat however many lines are exported.
+- XLSX is written with openpyxl's write_only mode, which flushes rows to a
+  temporary file instead of keeping every cell in memory; the finished file
+  is then streamed back in chunks.
+- Ledger rows are read with values_list() over the joined columns, so no
+  model instances (or per-row journal_entry/account lookups) are created.
+
+Very large ledgers are exported out of band by `manage.py export_ledger`,
+which writes into MEDIA_ROOT/exports and prints a signed download link
+served by LedgerExportDownloadView.
+"""
+import csv
+import os
+import tempfile
+
+import openpyxl
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, StreamingHttpResponse
+
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CURRENCY_FORMAT = '#,##0.00'
+
+LEDGER_HEADER = ['Reference ID', 'Date', 'Category',
+                 'Description', 'Account', 'Amount (PHP)']
+LEDGER_COLUMNS = (
+    'journal_entry__entry_id',
+    'journal_entry__date',
+    'journal_entry__category',
+    'description',
+    'account__name',
+    'amount',
+)
+
+EXPORT_SIGNING_SALT = 'core.exports.download'
+
+
+def export_chunk_size():
+    return getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+
+
+def ledger_rows(queryset, chunk_size=None):
+    """
+    Yields:
+        [entry_id, date, category, description, account, amount] per line
+    """
+    rows = queryset.values_list(*LEDGER_COLUMNS).iterator(
+        chunk_size=chunk_size or export_chunk_size())
+    for entry_id, entry_date, category, description, account, amount in rows:
+        yield [
+            entry_id,
+            entry_date,
+            category,
+            (description or '').replace('\n', ' ').strip(),
+            account,
+            amount,
+        ]
+
+
+def _csv_ledger_row(row):
+    return row[:1] + [row[1].strftime('%Y-%m-%d')] + row[2:5] + ["{:,.2f}".format(row[5])]
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def streaming_csv_response(filename, header, rows):
+    response = StreamingHttpResponse(
+        iter_csv(header, rows), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def bold_row(ws, values):
+    """Row of bold WriteOnlyCells (write-only sheets cannot be styled after append)."""
+    cells = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = Font(bold=True)
+        cells.append(cell)
+    return cells
+
+
+def currency_cell(ws, value, bold=False):
+    cell = WriteOnlyCell(ws, value=value)
+    cell.number_format = CURRENCY_FORMAT
+    if bold:
+        cell.font = Font(bold=True)
+    return cell
+
+
+def new_write_only_workbook(title):
+    wb = openpyxl.Workbook(write_only=True)
+    return wb, wb.create_sheet(title)
+
+
+def _xlsx_file_response(write, filename):
+    tmp = tempfile.TemporaryFile()
+    write(tmp)
+    tmp.seek(0)
+    # FileResponse streams the file in chunks and closes it when done
+    return FileResponse(tmp, as_attachment=True, filename=filename,
+                        content_type=XLSX_CONTENT_TYPE)
+
+
+def xlsx_response(wb, filename):
+    """Save a (write-only) workbook to a temp file and stream it back."""
+    return _xlsx_file_response(wb.save, filename)
+
+
+def write_ledger_csv(queryset, fileobj, chunk_size=None):
+    writer = csv.writer(fileobj)
+    writer.writerow(LEDGER_HEADER)
+    count = 0
+    for row in ledger_rows(queryset, chunk_size):
+        writer.writerow(_csv_ledger_row(row))
+        count += 1
+    return count
+
+
+def write_ledger_xlsx(queryset, fileobj, chunk_size=None):
+    wb, ws = new_write_only_workbook("Ledger")
+    for column, width in zip('ABCDEF', (18, 12, 16, 50, 30, 16)):
+        ws.column_dimensions[column].width = width
+    ws.append(bold_row(ws, LEDGER_HEADER))
+    count = 0
+    for row in ledger_rows(queryset, chunk_size):
+        ws.append(row[:5] + [currency_cell(ws, row[5])])
+        count += 1
+    wb.save(fileobj)
+    return count
+
+
+def streaming_ledger_csv_response(queryset, filename="ledger_export.csv"):
+    return streaming_csv_response(
+        filename, LEDGER_HEADER, (_csv_ledger_row(row) for row in ledger_rows(queryset)))
+
+
+def ledger_xlsx_response(queryset, filename="ledger_export.xlsx"):
+    return _xlsx_file_response(lambda tmp: write_ledger_xlsx(queryset, tmp), filename)
+
+
+# --- Out-of-band exports (manage.py export_ledger) ---
+
+def export_dir():
+    return os.path.join(settings.MEDIA_ROOT, 'exports')
+
+
+def export_download_token(filename, department_id=None):
+    """
+    Signed download token for an export file. `department_id` is the
+    department the export was filtered to (None for a company-wide export).
+    """
+    return signing.dumps(
+        {'file': filename, 'department': str(department_id) if department_id else None},
+        salt=EXPORT_SIGNING_SALT,
+    )
+
+
+def resolve_export_token(token):
+    """
+    Returns:
+        (absolute path of the export file, department id or None), or None
+        if the token is invalid, expired or the file is gone
+    """
+    max_age = getattr(settings, 'EXPORT_LINK_MAX_AGE', 60 * 60 * 24)
+    try:
+        payload = signing.loads(token, salt=EXPORT_SIGNING_SALT, max_age=max_age)
+    except signing.BadSignature:
+        return None
+    if not isinstance(payload, dict) or not payload.get('file'):
+        return None
+    path = os.path.join(export_dir(), os.path.basename(payload['file']))
+    return (path, payload.get('department')) if os.path.isfile(path) else None
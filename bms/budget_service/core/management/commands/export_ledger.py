@@ -0,0 +1,55 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from core.exports import export_dir, export_download_token, write_ledger_csv, write_ledger_xlsx
+from core.models import JournalEntryLine
+from core.views_budget import filter_ledger_lines
+
+
+class Command(BaseCommand):
+    help = ('Exports the ledger to MEDIA_ROOT/exports in constant memory and prints a '
+            'signed download link. Meant for ledgers too large for the ledger/export/ endpoint.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--export-format', choices=['csv', 'xlsx'], default='csv')
+        parser.add_argument('--search')
+        parser.add_argument('--category', help='CAPEX, OPEX or a category name')
+        parser.add_argument('--transaction-type')
+        parser.add_argument('--department', help='Department ID')
+        parser.add_argument('--chunk-size', type=int, help='Rows per server-side cursor fetch')
+
+    def handle(self, *args, **options):
+        queryset = filter_ledger_lines(
+            JournalEntryLine.objects.filter(expense_category__isnull=False),
+            {
+                'search': options['search'],
+                'category': options['category'],
+                'transaction_type': options['transaction_type'],
+                'department': options['department'],
+            }
+        ).order_by('-journal_entry__date', 'journal_entry__entry_id')
+
+        export_format = options['export_format']
+        filename = f"ledger_export_{timezone.now().strftime('%Y%m%d%H%M%S')}.{export_format}"
+        os.makedirs(export_dir(), exist_ok=True)
+        path = os.path.join(export_dir(), filename)
+
+        self.stdout.write(f"Writing {path}...")
+        try:
+            if export_format == 'csv':
+                with open(path, 'w', newline='', encoding='utf-8') as f:
+                    count = write_ledger_csv(queryset, f, options['chunk_size'])
+            else:
+                with open(path, 'wb') as f:
+                    count = write_ledger_xlsx(queryset, f, options['chunk_size'])
+        except Exception as e:
+            if os.path.exists(path):
+                os.remove(path)
+            raise CommandError(f"Export failed: {e}")
+
+        link = reverse('ledger-export-download', args=[export_download_token(filename, options['department'])])
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} ledger lines."))
+        self.stdout.write(f"Download link: {link}")
@@ -1,20 +1,59 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db import transaction
-from django.db.models import Sum, Count
 from decimal import Decimal
+from itertools import accumulate
 import calendar
-from collections import defaultdict
-from core.models import FiscalYear, Expense, Forecast, ForecastDataPoint
+from core.models import Department, FiscalYear, Expense, Forecast, ForecastDataPoint
+from core.monthly_series import ZERO, monthly_totals
+
+# Used for months with no history at all
+DEFAULT_MONTHLY_AVERAGE = Decimal('25000.00')
+
+
+def seasonal_averages(history):
+    """
+    Average spend per calendar month across all previous years.
+
+    Args:
+        history: {(year, month): total} from monthly_totals()
+
+    Returns:
+        list of 12 averages (January first)
+    """
+    sums = [ZERO] * 12
+    years = [0] * 12
+    for (_, month), total in history.items():
+        sums[month - 1] += total
+        years[month - 1] += 1
+    return [s / n if n else DEFAULT_MONTHLY_AVERAGE for s, n in zip(sums, years)]
+
+
+def cumulative_forecast(averages, actuals, current_month):
+    """
+    Actual spend for months before current_month, seasonal averages from it
+    on, accumulated into 12 cumulative values.
+    """
+    actual_by_month = [ZERO] * 12
+    for (_, month), total in actuals.items():
+        actual_by_month[month - 1] += total
+    cutoff = current_month - 1
+    monthly = actual_by_month[:cutoff] + averages[cutoff:]
+    return [round(value, 2) for value in accumulate(monthly)]
+
 
 class Command(BaseCommand):
     help = 'Generates a full-year Seasonal Baseline Forecast anchored on YTD spend.'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--per-department', action='store_true',
+            help='Also generate one forecast per active department')
+
     def handle(self, *args, **options):
         self.stdout.write("Starting Seasonal Baseline Forecast generation...")
         today = timezone.now().date()
         current_month = today.month
-        current_year = today.year
 
         active_fiscal_year = FiscalYear.objects.filter(
             start_date__lte=today, end_date__gte=today, is_active=True).first()
@@ -23,57 +62,65 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING("No active fiscal year found."))
             return
 
+        # Two grouped queries per scope, however many months or departments
+        historical_expenses = Expense.objects.filter(
+            status='APPROVED',
+            date__lt=active_fiscal_year.start_date
+        )
+        current_expenses = Expense.objects.filter(
+            status='APPROVED',
+            budget_allocation__fiscal_year=active_fiscal_year,
+            date__month__lt=current_month
+        )
+
+        # Forecast series keyed by department id (None = organization-wide)
+        series = {
+            None: cumulative_forecast(
+                seasonal_averages(monthly_totals(historical_expenses)),
+                monthly_totals(current_expenses),
+                current_month
+            )
+        }
+        if options['per_department']:
+            history = monthly_totals(historical_expenses, group_by='department_id')
+            actuals = monthly_totals(current_expenses, group_by='department_id')
+            for department_id in Department.objects.filter(is_active=True).values_list('id', flat=True):
+                series[department_id] = cumulative_forecast(
+                    seasonal_averages(history.get(department_id, {})),
+                    actuals.get(department_id, {}),
+                    current_month
+                )
+
         try:
             with transaction.atomic():
-                # 1. Calculate Historical Monthly Averages (Seasonal Model)
-                historical_expenses = Expense.objects.filter(
-                    status='APPROVED',
-                    date__lt=active_fiscal_year.start_date 
-                )
+                # Replace only the forecasts being regenerated
+                department_ids = [d for d in series if d is not None]
+                Forecast.objects.filter(fiscal_year=active_fiscal_year, department__isnull=True).delete()
+                if department_ids:
+                    Forecast.objects.filter(
+                        fiscal_year=active_fiscal_year, department_id__in=department_ids).delete()
 
-                monthly_averages = {}
-                for m in range(1, 13):
-                    # Average spend for this month across all previous years
-                    data = historical_expenses.filter(date__month=m).aggregate(
-                        total=Sum('amount'),
-                        count=Count('date__year', distinct=True)
+                forecasts = Forecast.objects.bulk_create([
+                    Forecast(
+                        fiscal_year=active_fiscal_year,
+                        department_id=department_id,
+                        algorithm_used='SEASONAL_BASELINE'
                     )
-                    avg = data['total'] / data['count'] if data['count'] and data['count'] > 0 else Decimal('25000.00')
-                    monthly_averages[m] = avg
-
-                # 2. Get Actual Monthly Spend for Current Year (Baseline)
-                actual_monthly_spend = {}
-                for m in range(1, current_month):
-                    actual_monthly_spend[m] = Expense.objects.filter(
-                        status='APPROVED',
-                        budget_allocation__fiscal_year=active_fiscal_year,
-                        date__month=m
-                    ).aggregate(total=Sum('amount'))['total'] or Decimal('0.00')
-
-                # 3. Save Forecast Container
-                Forecast.objects.filter(fiscal_year=active_fiscal_year).delete()
-                new_forecast = Forecast.objects.create(
-                    fiscal_year=active_fiscal_year, 
-                    algorithm_used='SEASONAL_BASELINE'
-                )
-
-                # 4. Generate 12 Points (Cumulative)
-                running_total = Decimal('0.0')
-                for month_num in range(1, 13):
-                    if month_num < current_month:
-                        # Use actual data for past months
-                        running_total += actual_monthly_spend.get(month_num, Decimal('0.0'))
-                    else:
-                        # Use seasonal averages for current and future months
-                        running_total += monthly_averages.get(month_num, Decimal('0.0'))
-                    
-                    ForecastDataPoint.objects.create(
-                        forecast=new_forecast,
+                    for department_id in series
+                ])
+                ForecastDataPoint.objects.bulk_create([
+                    ForecastDataPoint(
+                        forecast=forecast,
                         month=month_num,
                         month_name=calendar.month_name[month_num],
-                        forecasted_value=round(running_total, 2)
+                        forecasted_value=value
                     )
+                    for forecast in forecasts
+                    for month_num, value in enumerate(series[forecast.department_id], start=1)
+                ])
 
-            self.stdout.write(self.style.SUCCESS(f"Forecast generated for {active_fiscal_year.name}"))
+            self.stdout.write(self.style.SUCCESS(
+                f"Forecast generated for {active_fiscal_year.name} "
+                f"({len(department_ids)} department forecast(s))"))
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error: {e}"))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f"Error: {e}"))
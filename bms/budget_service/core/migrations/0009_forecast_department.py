@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_budgetproposalitem_category_journalentry_department_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecast',
+            name='department',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='forecasts', to='core.department'),
+        ),
+        migrations.AlterField(
+            model_name='forecast',
+            name='algorithm_used',
+            field=models.CharField(choices=[('LINEAR_PROJECTION', 'Linear Projection'), ('SEASONAL_BASELINE', 'Seasonal Baseline')], default='LINEAR_PROJECTION', max_length=50),
+        ),
+    ]
@@ -1036,6 +1036,7 @@ class Forecast(models.Model):
     """
     ALGORITHM_CHOICES = [
         ('LINEAR_PROJECTION', 'Linear Projection'),
+        ('SEASONAL_BASELINE', 'Seasonal Baseline'),
         # You can add more complex algorithms here in the future
     ]
     
@@ -1044,8 +1045,9 @@ class Forecast(models.Model):
     generated_at = models.DateTimeField(auto_now_add=True, db_index=True) # Index for fast lookups
     algorithm_used = models.CharField(max_length=50, choices=ALGORITHM_CHOICES, default='LINEAR_PROJECTION')
     
-    # You could add a department ForeignKey if you want department-specific forecasts
-    # department = models.ForeignKey(Department, on_delete=models.CASCADE, null=True, blank=True)
+    # Null for the organization-wide forecast
+    department = models.ForeignKey(
+        Department, on_delete=models.CASCADE, null=True, blank=True, related_name='forecasts')
 
     class Meta:
         ordering = ['-generated_at'] # The newest forecast is the most relevant
@@ -0,0 +1,78 @@
+"""
+Monthly time series for dashboards and forecasts.
+
+Every helper here costs one query per filter set, whatever the number of
+months: amounts are grouped with TruncMonth in the database and the result
+is laid out over the requested months in memory (missing months are zero).
+"""
+import calendar
+from decimal import Decimal
+
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+ZERO = Decimal('0')
+
+
+def month_range(start_date, end_date):
+    """
+    Returns:
+        list of (year, month) from start_date's month to end_date's month inclusive
+    """
+    months = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def monthly_totals(queryset, group_by=None, date_field='date', amount_field='amount'):
+    """
+    Sum `amount_field` per calendar month in a single GROUP BY query.
+
+    Args:
+        queryset: Filtered queryset (e.g. approved Expenses)
+        group_by: Optional field to split the totals by (e.g. 'department_id')
+
+    Returns:
+        {(year, month): total}, or {group: {(year, month): total}} with group_by
+    """
+    keys = ['period'] + ([group_by] if group_by else [])
+    rows = (
+        queryset.order_by()
+        .annotate(period=TruncMonth(date_field))
+        .values(*keys)
+        .annotate(total=Sum(amount_field))
+        .values_list(*keys, 'total')
+    )
+
+    totals = {}
+    for row in rows:
+        period, total = row[0], row[-1] or ZERO
+        bucket = totals.setdefault(row[1], {}) if group_by else totals
+        key = (period.year, period.month)
+        bucket[key] = bucket.get(key, ZERO) + total
+    return totals
+
+
+def monthly_series(queryset, start_date, end_date, **kwargs):
+    """
+    Returns:
+        list of totals, one per month of month_range(start_date, end_date)
+    """
+    totals = monthly_totals(queryset, **kwargs)
+    return [totals.get(key, ZERO) for key in month_range(start_date, end_date)]
+
+
+def budget_vs_actual_rows(months, monthly_budget, actuals):
+    """Rows for MonthlyBudgetActualSerializer."""
+    return [
+        {
+            'month': month,
+            'month_name': calendar.month_name[month],
+            'budget': monthly_budget,
+            'actual': actual,
+        }
+        for (_, month), actual in zip(months, actuals)
+    ]
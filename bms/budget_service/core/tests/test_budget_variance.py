@@ -0,0 +1,97 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+
+from ..budget_variance import build_variance_tree, flatten_variance_tree
+from ..models import (
+    Account, AccountType, BudgetAllocation, BudgetProposal, Department,
+    Expense, ExpenseCategory, FiscalYear, Project
+)
+
+
+class BudgetVarianceEngineTestCase(TestCase):
+    def setUp(self):
+        self.fiscal_year = FiscalYear.objects.create(name="FY2025", start_date=date(2025, 1, 1), end_date=date(2025, 12, 31))
+        self.it = Department.objects.create(name="IT", code="IT")
+        self.hr = Department.objects.create(name="HR", code="HR")
+        account_type = AccountType.objects.create(name="Expense")
+        self.account = Account.objects.create(code="5100", name="IT Supplies", account_type=account_type,
+                                              created_by_user_id=1)
+        proposal = BudgetProposal.objects.create(
+            title="Test Proposal", department=self.it, fiscal_year=self.fiscal_year,
+            external_system_id='DTS-TEST-001', status='APPROVED',
+            performance_start_date=date(2025, 1, 1), performance_end_date=date(2025, 12, 31)
+        )
+        self.project = Project.objects.create(
+            name="Test Project", department=self.it, budget_proposal=proposal,
+            start_date=date(2025, 1, 1), end_date=date(2025, 12, 31)
+        )
+
+    def _category(self, code, level, parent=None):
+        return ExpenseCategory.objects.create(name=code, code=code, level=level, parent_category=parent)
+
+    def _allocate(self, category, amount, department=None):
+        return BudgetAllocation.objects.create(
+            fiscal_year=self.fiscal_year, department=department or self.it, project=self.project,
+            account=self.account, category=category, amount=Decimal(amount)
+        )
+
+    def _spend(self, allocation, amount, date=date(2025, 6, 15), status='APPROVED'):
+        Expense.objects.create(
+            budget_allocation=allocation, department=allocation.department, account=self.account,
+            category=allocation.category, project=self.project, status=status,
+            amount=Decimal(amount), date=date, vendor="Vendor", description="Expense",
+            submitted_by_user_id=1, submitted_by_username="tester"
+        )
+
+    def _grow_tree(self, roots, children_per_node):
+        """Three-level tree with one allocation and expense per leaf."""
+        for r in range(roots):
+            root = self._category(f"R{r}-{children_per_node}", 1)
+            for c in range(children_per_node):
+                mid = self._category(f"{root.code}.{c}", 2, root)
+                for g in range(children_per_node):
+                    leaf = self._category(f"{mid.code}.{g}", 3, mid)
+                    self._spend(self._allocate(leaf, '100.00'), '40.00')
+
+    def test_query_count_constant_as_tree_grows(self):
+        """The report costs three queries for any tree size."""
+        self._grow_tree(roots=2, children_per_node=2)
+        with self.assertNumQueries(3):
+            small = build_variance_tree(self.fiscal_year)
+
+        self._grow_tree(roots=3, children_per_node=5)
+        with self.assertNumQueries(3):
+            large = build_variance_tree(self.fiscal_year)
+
+        self.assertEqual(len(small), 2)
+        self.assertEqual(len(large), 5)
+        self.assertEqual(len(list(flatten_variance_tree(large))), 2 * (1 + 2 + 4) + 3 * (1 + 5 + 25))
+
+    def test_rollup_filters_and_order(self):
+        """Parents sum their children; department and month filters apply to the sums."""
+        root = self._category("OPS", 1)
+        software = self._category("OPS.SW", 2, root)
+        hardware = self._category("OPS.HW", 2, root)
+        self._allocate(root, '999.00')  # parent's own allocation is not rolled up
+
+        sw_it = self._allocate(software, '500.00')
+        sw_hr = self._allocate(software, '300.00', department=self.hr)
+        hw_it = self._allocate(hardware, '200.00')
+        self._spend(sw_it, '120.00', date=date(2025, 3, 10))
+        self._spend(sw_hr, '80.00', date=date(2025, 6, 1))
+        self._spend(hw_it, '50.00', date=date(2025, 3, 20))
+        self._spend(hw_it, '25.00', status='DRAFT')
+
+        [ops] = build_variance_tree(self.fiscal_year)
+        self.assertEqual([c['code'] for c in ops['children']], ["OPS.SW", "OPS.HW"])
+        self.assertEqual((ops['budget'], ops['actual'], ops['available']),
+                         (Decimal('1000.00'), Decimal('250.00'), Decimal('750.00')))
+
+        [ops_it] = build_variance_tree(self.fiscal_year, department_id=self.it.id)
+        self.assertEqual((ops_it['budget'], ops_it['actual']), (Decimal('700.00'), Decimal('170.00')))
+
+        [ops_march] = build_variance_tree(self.fiscal_year, month=3)
+        self.assertEqual((ops_march['budget'], ops_march['actual']), (Decimal('1000.00'), Decimal('170.00')))
+        self.assertEqual([d for d, _ in flatten_variance_tree([ops_march])], [0, 1, 1])
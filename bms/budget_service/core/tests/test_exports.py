@@ -0,0 +1,126 @@
+import csv
+import io
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import openpyxl
+from django.core.management import call_command
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ..models import (
+    Account, AccountType, Department, ExpenseCategory, FiscalYear, JournalEntry, JournalEntryLine
+)
+from ..views_budget import LedgerExportDownloadView, LedgerExportView, export_budget_variance_excel
+
+ADMIN = SimpleNamespace(is_authenticated=True, roles=[{'system': 'bms', 'role': 'ADMIN'}])
+
+
+class ExportTestCase(TestCase):
+    LINES = 30
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.factory = APIRequestFactory()
+
+        self.department = Department.objects.create(name="IT", code="IT")
+        account_type = AccountType.objects.create(name="Expense")
+        self.account = Account.objects.create(code="5100", name="IT Supplies", account_type=account_type,
+                                              created_by_user_id=1)
+        self.category = ExpenseCategory.objects.create(name="Supplies", code="SUP", level=1,
+                                                       classification='OPEX')
+        for i in range(self.LINES):
+            entry = JournalEntry.objects.create(
+                category='EXPENSES', description=f"Entry {i}", date=date(2025, 1, 1 + i % 28),
+                total_amount=Decimal('1000.50'), department=self.department, created_by_user_id=1
+            )
+            JournalEntryLine.objects.create(
+                journal_entry=entry, account=self.account, expense_category=self.category,
+                description=f"Line\n{i}", transaction_type='DEBIT',
+                journal_transaction_type='OPERATIONAL_EXPENDITURE', amount=Decimal('1000.50')
+            )
+
+    def _get(self, view, path, **kwargs):
+        request = self.factory.get(path)
+        force_authenticate(request, user=ADMIN)
+        return view(request, **kwargs)
+
+    def test_ledger_csv_is_streamed_from_one_query(self):
+        view = LedgerExportView.as_view()
+        with self.assertNumQueries(1):
+            response = self._get(view, '/api/ledger/export/')
+            content = b''.join(response.streaming_content).decode('utf-8')
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="ledger_export.csv"')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], ['Reference ID', 'Date', 'Category', 'Description', 'Account', 'Amount (PHP)'])
+        self.assertEqual(len(rows), self.LINES + 1)
+        self.assertEqual(rows[1][2:], ['EXPENSES', 'Line 27', 'IT Supplies', '1,000.50'])
+
+    def test_ledger_xlsx_uses_write_only_workbook(self):
+        response = self._get(LedgerExportView.as_view(), '/api/ledger/export/?export_format=xlsx')
+
+        ws = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        rows = list(ws.iter_rows(values_only=True))
+        self.assertEqual(len(rows), self.LINES + 1)
+        self.assertTrue(ws['A1'].font.b)
+        self.assertEqual(rows[1][5], 1000.5)
+        self.assertEqual(ws['F2'].number_format, '#,##0.00')
+
+    def test_export_ledger_command_prints_working_download_link(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            out = io.StringIO()
+            call_command('export_ledger', '--chunk-size', '7', stdout=out)
+            link = out.getvalue().strip().splitlines()[-1].split('Download link: ')[1]
+            token = link.rstrip('/').split('/')[-1]
+
+            response = self._get(LedgerExportDownloadView.as_view(), link, token=token)
+            content = b''.join(response.streaming_content).decode('utf-8')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(content.splitlines()), self.LINES + 1)
+
+            tampered = self._get(LedgerExportDownloadView.as_view(), link, token=token[:-1] + 'x')
+            self.assertEqual(tampered.status_code, 404)
+
+    def test_download_link_respects_department_isolation(self):
+        def general_user(department_id):
+            return SimpleNamespace(is_authenticated=True, department_id=department_id,
+                                   roles=[{'system': 'bms', 'role': 'GENERAL_USER'}])
+
+        def download(user, token):
+            request = self.factory.get('/api/ledger/export/download/')
+            force_authenticate(request, user=user)
+            return LedgerExportDownloadView.as_view()(request, token=token)
+
+        def export_token(*args):
+            out = io.StringIO()
+            call_command('export_ledger', *args, stdout=out)
+            return out.getvalue().strip().splitlines()[-1].rstrip('/').split('/')[-1]
+
+        with override_settings(MEDIA_ROOT=self.media_root):
+            company_wide = export_token()
+            own_department = export_token('--department', str(self.department.id))
+
+            self.assertEqual(download(general_user(self.department.id), company_wide).status_code, 403)
+            self.assertEqual(download(general_user(self.department.id + 1), own_department).status_code, 403)
+            self.assertEqual(download(general_user(self.department.id), own_department).status_code, 200)
+            self.assertEqual(download(SimpleNamespace(is_authenticated=True, roles=[]), own_department).status_code, 403)
+
+    def test_budget_variance_excel_keeps_layout(self):
+        fiscal_year = FiscalYear.objects.create(name="FY2025", start_date=date(2025, 1, 1),
+                                                end_date=date(2025, 12, 31))
+        response = self._get(export_budget_variance_excel,
+                             f'/api/reports/budget-variance/export/?fiscal_year_id={fiscal_year.id}')
+
+        ws = openpyxl.load_workbook(io.BytesIO(b''.join(response.streaming_content))).active
+        self.assertEqual(ws['A1'].value, "Budget Variance Report - FY2025 (Full Year)")
+        self.assertIn('A1:D1', [str(r) for r in ws.merged_cells.ranges])
+        self.assertEqual([c.value for c in ws[3]], ["Category", "Budget", "Actual", "Available"])
+        self.assertEqual(ws['A4'].value, "Supplies")
+        self.assertEqual(ws['B4'].number_format, '#,##0.00')
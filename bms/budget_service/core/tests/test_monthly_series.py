@@ -0,0 +1,162 @@
+from datetime import date, datetime
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ..models import (
+    Account, AccountType, BudgetAllocation, BudgetProposal, Department,
+    Expense, ExpenseCategory, FiscalYear, Forecast, Project
+)
+from ..monthly_series import month_range, monthly_series
+from ..views_dashboard import MonthlyBudgetActualViewSet, get_budget_forecast
+
+
+class MonthlySeriesTestCase(TestCase):
+    def setUp(self):
+        self.fiscal_year = FiscalYear.objects.create(
+            name="FY2025", start_date=date(2025, 1, 1), end_date=date(2025, 12, 31), is_active=True)
+        self.it = Department.objects.create(name="IT", code="IT")
+        self.hr = Department.objects.create(name="HR", code="HR")
+        account_type = AccountType.objects.create(name="Expense")
+        self.account = Account.objects.create(code="5100", name="IT Supplies", account_type=account_type,
+                                              created_by_user_id=1)
+        self.category = ExpenseCategory.objects.create(name="Supplies", code="SUP", level=1)
+        proposal = BudgetProposal.objects.create(
+            title="Test Proposal", department=self.it, fiscal_year=self.fiscal_year,
+            external_system_id='DTS-TEST-001', status='APPROVED',
+            performance_start_date=date(2025, 1, 1), performance_end_date=date(2025, 12, 31)
+        )
+        self.project = Project.objects.create(
+            name="Test Project", department=self.it, budget_proposal=proposal,
+            start_date=date(2025, 1, 1), end_date=date(2025, 12, 31)
+        )
+        self.allocation = BudgetAllocation.objects.create(
+            fiscal_year=self.fiscal_year, department=self.it, project=self.project,
+            account=self.account, category=self.category, amount=Decimal('120000.00')
+        )
+
+    def _spend(self, on, amount, department=None):
+        if on < self.fiscal_year.start_date:
+            allocation = self._previous_allocation()
+        else:
+            allocation = self.allocation
+        Expense.objects.create(
+            budget_allocation=allocation, department=department or self.it, account=self.account,
+            category=self.category, project=self.project, status='APPROVED',
+            amount=Decimal(amount), date=on, vendor="Vendor", description="Expense",
+            submitted_by_user_id=1, submitted_by_username="tester"
+        )
+
+    def _previous_allocation(self):
+        if not hasattr(self, 'previous_allocation'):
+            previous_year = FiscalYear.objects.create(
+                name="FY2020", start_date=date(2020, 1, 1), end_date=date(2024, 12, 31))
+            self.previous_allocation = BudgetAllocation.objects.create(
+                fiscal_year=previous_year, department=self.it, project=self.project,
+                account=self.account, category=self.category, amount=Decimal('1000000.00')
+            )
+        return self.previous_allocation
+
+    def test_month_range_spans_years(self):
+        self.assertEqual(month_range(date(2024, 11, 15), date(2025, 2, 1)),
+                         [(2024, 11), (2024, 12), (2025, 1), (2025, 2)])
+        self.assertEqual(month_range(date(2025, 3, 1), date(2025, 2, 1)), [])
+
+    def test_one_query_for_any_number_of_months(self):
+        """All months come from one TruncMonth GROUP BY query."""
+        self._spend(date(2025, 1, 10), '100.00')
+        self._spend(date(2025, 1, 20), '50.00')
+        self._spend(date(2025, 3, 5), '25.00')
+        self._spend(date(2026, 3, 5), '10.00')
+        expenses = Expense.objects.filter(status='APPROVED')
+
+        with self.assertNumQueries(1):
+            year = monthly_series(expenses, date(2025, 1, 1), date(2025, 12, 31))
+        with self.assertNumQueries(1):
+            two_years = monthly_series(expenses, date(2025, 1, 1), date(2026, 12, 31))
+
+        self.assertEqual(year[:3], [Decimal('150.00'), Decimal('0'), Decimal('25.00')])
+        self.assertEqual(len(two_years), 24)
+        self.assertEqual(two_years[14], Decimal('10.00'))
+
+        with self.assertNumQueries(1):
+            rows = MonthlyBudgetActualViewSet()._calculate_monthly_data(
+                self.it, self.fiscal_year, Decimal('120000.00'))
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(rows[0], {'month': 1, 'month_name': 'January',
+                                   'budget': Decimal('10000.00'), 'actual': Decimal('150.00')})
+
+    def test_generate_forecasts_per_department(self):
+        """Forecasts are cumulative, per department, and cost a fixed number of queries."""
+        # History: IT spent 100 and 300 in January of the two previous years
+        self._spend(date(2023, 1, 10), '100.00')
+        self._spend(date(2024, 1, 10), '300.00')
+        # Year to date
+        self._spend(date(2025, 1, 15), '50.00')
+        self._spend(date(2025, 2, 15), '70.00', department=self.hr)
+
+        now = timezone.make_aware(datetime(2025, 4, 15, 12, 0))
+        with patch('django.utils.timezone.now', return_value=now):
+            call_command('generate_forecasts', '--per-department', stdout=StringIO())
+            with CaptureQueriesContext(connection) as first:
+                call_command('generate_forecasts', '--per-department', stdout=StringIO())
+
+            # More departments and more history must not add queries
+            for i in range(3):
+                department = Department.objects.create(name=f"D{i}", code=f"D{i}")
+                for year in (2021, 2022):
+                    for month in range(1, 13):
+                        self._spend(date(year, month, 1), '10.00', department=department)
+            call_command('generate_forecasts', '--per-department', stdout=StringIO())
+            with CaptureQueriesContext(connection) as second:
+                call_command('generate_forecasts', '--per-department', stdout=StringIO())
+
+        self.assertEqual(len(first.captured_queries), len(second.captured_queries))
+        self.assertEqual(Forecast.objects.filter(fiscal_year=self.fiscal_year).count(), 1 + 5)
+
+        def values(department):
+            forecast = Forecast.objects.get(fiscal_year=self.fiscal_year, department=department)
+            return [p.forecasted_value for p in forecast.data_points.all()]
+
+        it, hr = values(self.it), values(self.hr)
+        self.assertEqual(it[:4], [Decimal('50.00'), Decimal('50.00'), Decimal('50.00'), Decimal('25050.00')])
+        self.assertEqual(hr[:4], [Decimal('0.00'), Decimal('70.00'), Decimal('70.00'), Decimal('25070.00')])
+        self.assertEqual(len(values(None)), 12)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+    def test_forecast_is_isolated_per_department(self):
+        """General Users only read their own department's forecast."""
+        self._spend(date(2025, 1, 15), '50.00')
+        self._spend(date(2025, 2, 15), '70.00', department=self.hr)
+        now = timezone.make_aware(datetime(2025, 4, 15, 12, 0))
+        with patch('django.utils.timezone.now', return_value=now):
+            call_command('generate_forecasts', '--per-department', stdout=StringIO())
+
+        def forecast(role, department_id=None, query=''):
+            user = SimpleNamespace(is_authenticated=True, department_id=department_id,
+                                   roles=[{'system': 'bms', 'role': role}])
+            request = APIRequestFactory().get(f'/api/dashboard/forecast/{query}')
+            force_authenticate(request, user=user)
+            with patch('django.utils.timezone.now', return_value=now):
+                return get_budget_forecast(request)
+
+        def values(department):
+            points = Forecast.objects.get(fiscal_year=self.fiscal_year, department=department).data_points.all()
+            return [str(p.forecasted_value) for p in points]
+
+        def served(response):
+            return [p['forecast'] for p in response.data]
+
+        self.assertEqual(served(forecast('GENERAL_USER', self.it.id)), values(self.it))
+        self.assertEqual(forecast('GENERAL_USER', self.it.id, f'?department_id={self.hr.id}').status_code, 403)
+        self.assertEqual(forecast('GENERAL_USER').data, [])
+        self.assertEqual(served(forecast('FINANCE_HEAD')), values(None))
+        self.assertEqual(served(forecast('FINANCE_HEAD', query=f'?department_id={self.hr.id}')), values(self.hr))
@@ -1,16 +1,16 @@
-import csv
 import json
+import os
 from decimal import Decimal
 
 import requests
-import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.utils import get_column_letter
 from openpyxl.styles import Font, PatternFill
 
 from django.db import transaction
-from django.db.models import Sum, Q, DecimalField
+from django.db.models import Sum, Q
 from django.db.models.functions import Coalesce
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from django.utils import timezone
 from django.conf import settings
 from django.core.mail import send_mail
@@ -27,7 +27,7 @@ from drf_spectacular.utils import (
 from .service_authentication import APIKeyAuthentication
 
 from .models import (
-    Account, AccountType, BudgetProposal, Department, ExpenseCategory,
+    Account, AccountType, BudgetProposal, Department,
     FiscalYear, BudgetAllocation, Expense, JournalEntry, JournalEntryLine,
     ProposalComment, ProposalHistory, UserActivityLog, Project
 )
@@ -35,6 +35,11 @@ from .permissions import CanSubmitForApproval, IsTrustedService, IsBMSFinanceHea
 from .pagination import FiveResultsSetPagination, SixResultsSetPagination, StandardResultsSetPagination
 from .serializers import FiscalYearSerializer
 from .views_utils import get_user_bms_role
+from .budget_variance import build_variance_tree, flatten_variance_tree
+from .exports import (
+    bold_row, currency_cell, ledger_xlsx_response, new_write_only_workbook,
+    resolve_export_token, streaming_ledger_csv_response, xlsx_response
+)
 from .serializers_budget import (
     AccountDropdownSerializer,
     AccountSetupSerializer,
@@ -271,6 +276,46 @@ class FiscalYearDropdownView(generics.ListAPIView):
 
 # MODIFICATION: Updated LedgerViewList to only show expense lines with proper categories
 
+def filter_ledger_lines(queryset, params):
+    """Ledger filters shared by LedgerViewList, LedgerExportView and export_ledger."""
+    search = params.get('search')
+    category = params.get('category')
+    transaction_type = params.get('transaction_type')
+    department_filter = params.get(
+        'department_id') or params.get('department')
+
+    if search:
+        queryset = queryset.filter(
+            Q(journal_entry__entry_id__icontains=search) |
+            Q(journal_entry__date__icontains=search) |
+            Q(journal_entry__description__icontains=search) |
+            Q(description__icontains=search) |
+            Q(expense_category__name__icontains=search) |
+            Q(account__name__icontains=search) |
+            Q(account__code__icontains=search)
+        )
+
+    if category:
+        if category.upper() in ['CAPEX', 'OPEX']:
+            queryset = queryset.filter(
+                expense_category__classification__iexact=category
+            )
+        else:
+            queryset = queryset.filter(
+                expense_category__name__icontains=category
+            )
+
+    if transaction_type:
+        queryset = queryset.filter(
+            journal_transaction_type__iexact=transaction_type)
+
+    if department_filter:
+        queryset = queryset.filter(
+            journal_entry__department_id=department_filter)
+
+    return queryset
+
+
 @extend_schema(
     tags=['Ledger View'],
     summary="Get ledger view",
@@ -314,40 +359,7 @@ class LedgerViewList(generics.ListAPIView):
             else:
                 return JournalEntryLine.objects.none()
 
-        search = self.request.query_params.get('search')
-        category = self.request.query_params.get('category')
-        transaction_type = self.request.query_params.get('transaction_type')
-        department_filter = self.request.query_params.get(
-            'department_id') or self.request.query_params.get('department')
-
-        if search:
-            queryset = queryset.filter(
-                Q(journal_entry__entry_id__icontains=search) |
-                Q(journal_entry__date__icontains=search) |
-                Q(journal_entry__description__icontains=search) |
-                Q(description__icontains=search) |
-                Q(expense_category__name__icontains=search) |
-                Q(account__name__icontains=search) |
-                Q(account__code__icontains=search)
-            )
-
-        if category:
-            if category.upper() in ['CAPEX', 'OPEX']:
-                queryset = queryset.filter(
-                    expense_category__classification__iexact=category
-                )
-            else:
-                queryset = queryset.filter(
-                    expense_category__name__icontains=category
-                )
-
-        if transaction_type:
-            queryset = queryset.filter(
-                journal_transaction_type__iexact=transaction_type)
-
-        if department_filter:
-            queryset = queryset.filter(
-                journal_entry__department_id=department_filter)
+        queryset = filter_ledger_lines(queryset, self.request.query_params)
 
         return queryset.order_by('-journal_entry__date', 'journal_entry__entry_id')
 
@@ -363,10 +375,12 @@ class LedgerViewList(generics.ListAPIView):
             name="category", description="Filter by category (e.g., EXPENSES)", required=False, type=str),
         OpenApiParameter(name="transaction_type",
                          description="Filter by transaction type", required=False, type=str),
+        OpenApiParameter(name="export_format",
+                         description="csv (default, streamed) or xlsx", required=False, type=str),
     ],
     responses={
         200: OpenApiResponse(
-            description='CSV file attachment',
+            description='CSV or XLSX file attachment',
             response=OpenApiTypes.BINARY
         )
     }
@@ -380,25 +394,38 @@ class LedgerExportView(APIView):
         list_view.request = request  # Mock the request for the view
         queryset = list_view.get_queryset()
 
-        response = HttpResponse(
-            content_type='text/csv; charset=utf-8')
-        response['Content-Disposition'] = 'attachment; filename="ledger_export.csv"'
-
-        writer = csv.writer(response)
-        # UPDATED: Match the new table columns
-        writer.writerow(['Reference ID', 'Date', 'Category',
-                        'Description', 'Account', 'Amount (PHP)'])
-
-        for line in queryset:
-            writer.writerow([
-                line.journal_entry.entry_id,
-                line.journal_entry.date.strftime('%Y-%m-%d'),
-                line.journal_entry.category,
-                line.description.replace('\n', ' ').strip(),
-                line.account.name,
-                "{:,.2f}".format(line.amount)
-            ])
-        return response
+        # Rows are read with values_list() from a server-side cursor and
+        # written as they arrive (see core.exports)
+        if request.query_params.get('export_format', 'csv').lower() == 'xlsx':
+            return ledger_xlsx_response(queryset)
+        return streaming_ledger_csv_response(queryset)
+
+
+@extend_schema(
+    tags=['Ledger View'],
+    summary="Download a ledger export generated by manage.py export_ledger",
+    responses={
+        200: OpenApiResponse(description='Export file attachment', response=OpenApiTypes.BINARY),
+        404: OpenApiResponse(description='Link invalid, expired or file removed'),
+    }
+)
+class LedgerExportDownloadView(APIView):
+    permission_classes = [IsBMSUser]
+
+    def get(self, request, token):
+        export = resolve_export_token(token)
+        if not export:
+            return Response({"error": "Export not found or link expired"}, status=status.HTTP_404_NOT_FOUND)
+        path, export_department = export
+
+        # --- DATA ISOLATION LOGIC ---
+        # Same rule as LedgerViewList: General Users only get exports of their own department
+        if get_user_bms_role(request.user) == 'GENERAL_USER':
+            department_id = getattr(request.user, 'department_id', None)
+            if not department_id or export_department != str(department_id):
+                return Response({"error": "You do not have access to this export"}, status=status.HTTP_403_FORBIDDEN)
+
+        return FileResponse(open(path, 'rb'), as_attachment=True, filename=os.path.basename(path))
 
 # Views of the Journal Entry page
 
@@ -1114,10 +1141,6 @@ def export_budget_proposal_excel(request, proposal_id):
         print(f"Error logging export activity: {e}")
     # --- END: Optional User Activity Logging ---
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Budget Proposal"
-
     # Header section
     header_labels = [
         "Title", "Project Summary", "Project Description",
@@ -1135,25 +1158,16 @@ def export_budget_proposal_excel(request, proposal_id):
         proposal.submitted_by_name or "N/A",
         proposal.status
     ]
-    for i, (label, value) in enumerate(zip(header_labels, header_values), start=1):
-        ws.append([label, value])
-        ws.cell(row=i, column=1).font = Font(
-            bold=True)  # Bold the header label
 
-    ws.append([])  # Blank row
-
-    # able Header
+    # Table Header
     table_header = ["Account", "Cost Element",
                     "Description", "Estimated Cost", "Notes"]
-    ws.append(table_header)
-    table_header_row = ws.max_row
-    for col in range(1, len(table_header) + 1):
-        ws.cell(row=table_header_row, column=col).font = Font(bold=True)
 
     # Line Items
     total_cost = 0
+    item_rows = []
     for item in proposal.items.all():
-        ws.append([
+        item_rows.append([
             item.account.name if item.account else "N/A",
             item.cost_element,
             item.description,
@@ -1161,39 +1175,34 @@ def export_budget_proposal_excel(request, proposal_id):
             item.notes or ""
         ])
         total_cost += item.estimated_cost
+    total_values = ["", "", "Total", float(total_cost)]
 
-    # Total Row
-    ws.append([])
-    total_row = ws.max_row + 1
-    ws.append(["", "", "Total", float(total_cost)])
-
-    # Bold "Total", "Estimated Cost" header, and the summed value
-    ws.cell(row=table_header_row, column=4).font = Font(
-        bold=True)  # "Estimated Cost" header
-    ws.cell(row=table_header_row, column=5).font = Font(
-        bold=True)  # "Notes" header
-    ws.cell(row=total_row, column=3).font = Font(
-        bold=True)         # "Total" label
-    ws.cell(row=total_row, column=4).font = Font(
-        bold=True)         # summed value
+    # Write-only sheets need column widths before any row is written, so
+    # auto-size from the values up front
+    widths = {}
+    for row in [[label, value] for label, value in zip(header_labels, header_values)] + [table_header] + item_rows + [total_values]:
+        for col, value in enumerate(row, start=1):
+            widths[col] = max(widths.get(col, 0), len(str(value)))
 
-    # Bold all "Description" column cells (header and values)
-    for row in range(table_header_row, ws.max_row + 1):
-        ws.cell(row=row, column=3).font = Font(bold=True)
+    wb, ws = new_write_only_workbook("Budget Proposal")
+    for col, width in widths.items():
+        ws.column_dimensions[get_column_letter(col)].width = max(width + 2, 12)
 
-    # Auto size columns
-    for col in ws.columns:
-        max_length = max(len(str(cell.value)) for cell in col)
-        ws.column_dimensions[get_column_letter(
-            col[0].column)].width = max(max_length + 2, 12)
+    for label, value in zip(header_labels, header_values):
+        ws.append(bold_row(ws, [label]) + [value])  # Bold the header label
 
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
-    filename = f"budget_proposal_{proposal.id}.xlsx"
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    wb.save(response)
+    ws.append([])  # Blank row
+    ws.append(bold_row(ws, table_header))
 
-    return response
+    # Bold all "Description" column cells (header and values)
+    for values in item_rows:
+        ws.append(values[:2] + bold_row(ws, values[2:3]) + values[3:])
+
+    # Total Row: bold "Total" label and summed value
+    ws.append([])
+    ws.append(total_values[:2] + bold_row(ws, total_values[2:]))
+
+    return xlsx_response(wb, f"budget_proposal_{proposal.id}.xlsx")
 
 
 # MODIFICATION START
@@ -1304,74 +1313,23 @@ class BudgetVarianceReportView(APIView):
             print(f"Error logging report generation activity: {e}")
         # --- END: Optional User Activity Logging ---
 
-        top_categories = ExpenseCategory.objects.filter(
-            level=1, is_active=True)
+        # Whole tree in three queries (see core.budget_variance)
+        tree = build_variance_tree(
+            fiscal_year, department_id=filter_dept_id, month=month)
 
-        def aggregate_node(category):
-            # 1. Budget Calculation
-            budget_qs = BudgetAllocation.objects.filter(
-                category=category, fiscal_year=fiscal_year, is_active=True
-            )
-            # Apply Dept Filter
-            if filter_dept_id:
-                budget_qs = budget_qs.filter(department_id=filter_dept_id)
-
-            budget = budget_qs.aggregate(total=Coalesce(
-                Sum('amount'), 0, output_field=DecimalField()))['total']
-
-            # 2. Actual Calculation
-            actual_qs = Expense.objects.filter(
-                category=category,
-                budget_allocation__fiscal_year=fiscal_year,
-                status='APPROVED'
-            )
+        def to_payload(node):
+            return {
+                "category": node['name'],
+                "code": node['code'],
+                "level": node['level'],
+                "classification": node['classification'],
+                "budget": round(node['budget'], 2),
+                "actual": round(node['actual'], 2),
+                "available": round(node['available'], 2),
+                "children": [to_payload(child) for child in node['children']]
+            }
 
-            # Apply Dept Filter
-            if filter_dept_id:
-                actual_qs = actual_qs.filter(department_id=filter_dept_id)
-
-            if month:
-                actual_qs = actual_qs.filter(date__month=month)
-
-            actual = actual_qs.aggregate(total=Coalesce(
-                Sum('amount'), 0, output_field=DecimalField()))['total']
-
-            available = budget - actual
-            children = []
-
-            for child in category.subcategories.all():
-                children.append(aggregate_node(child))
-
-            # Aggregate child totals if exists
-            if children:
-                child_budget = sum(c['budget'] for c in children)
-                child_actual = sum(c['actual'] for c in children)
-                child_available = child_budget - child_actual
-                return {
-                    "category": category.name,
-                    "code": category.code,
-                    "level": category.level,
-                    "classification": category.classification,  # Ensure field exists
-                    "budget": round(child_budget, 2),
-                    "actual": round(child_actual, 2),
-                    "available": round(child_available, 2),
-                    "children": children
-                }
-            else:
-                return {
-                    "category": category.name,
-                    "code": category.code,
-                    "level": category.level,
-                    "classification": category.classification,  # Ensure field exists
-                    "budget": round(budget, 2),
-                    "actual": round(actual, 2),
-                    "available": round(available, 2),
-                    "children": []
-                }
-        # Builds nested dictionariers, each representing top level expense categories, and its full budget/actual/available breakdown (and subcategories)
-        # aggregate_node(cat) - recursive function that computes budget, actual, and available amounts for given category (and all its children if any)
-        result = [aggregate_node(cat) for cat in top_categories]
-        return Response(result)
+        return Response([to_payload(node) for node in tree])
 
 
 @extend_schema(
@@ -1462,106 +1420,41 @@ def export_budget_variance_excel(request):
     except FiscalYear.DoesNotExist:
         return Response({"error": "Fiscal Year not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    # Re-use the logic from BudgetVarianceReportView to get the data
-    top_categories = ExpenseCategory.objects.filter(level=1, is_active=True)
-
-    def aggregate_node(category):
-        # Budget (whole year, not filtered by month)
-        budget = BudgetAllocation.objects.filter(
-            category=category, fiscal_year=fiscal_year, is_active=True
-        ).aggregate(total=Coalesce(Sum('amount'), 0, output_field=DecimalField()))['total']
+    # Same engine as BudgetVarianceReportView (three queries for the whole tree)
+    report_data = build_variance_tree(fiscal_year, month=month)
 
-        # FIXED: Apply month filter to actual expenses (same as display endpoint)
-        actual_qs = Expense.objects.filter(
-            category=category,
-            budget_allocation__fiscal_year=fiscal_year,
-            status='APPROVED'
-        )
-
-        # Apply month filter if provided
-        if month:
-            actual_qs = actual_qs.filter(date__month=month)
-
-        actual = actual_qs.aggregate(
-            total=Coalesce(Sum('amount'), 0, output_field=DecimalField())
-        )['total']
-
-        children_data = [aggregate_node(child)
-                         for child in category.subcategories.all()]
-
-        if children_data:
-            child_budget = sum(c['budget'] for c in children_data)
-            child_actual = sum(c['actual'] for c in children_data)
-            return {
-                "name": category.name,
-                "budget": child_budget,
-                "actual": child_actual,
-                "available": child_budget - child_actual,
-                "children": children_data
-            }
-        else:
-            return {
-                "name": category.name,
-                "budget": budget,
-                "actual": actual,
-                "available": budget - actual,
-                "children": []
-            }
-
-    report_data = [aggregate_node(cat) for cat in top_categories]
+    # --- Excel Generation (write-only: rows are flushed as they are added) ---
+    wb, ws = new_write_only_workbook("Budget Variance Report")
 
-    # --- Excel Generation ---
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Budget Variance Report"
+    # Column widths must be set before the first row in write-only mode
+    ws.column_dimensions['A'].width = 30
+    ws.column_dimensions['B'].width = 15
+    ws.column_dimensions['C'].width = 15
+    ws.column_dimensions['D'].width = 15
 
     # IMPROVED: Add month info to title if filtering
     if month:
-        ws.append(
-            [f"Budget Variance Report - {fiscal_year.name} (Month: {month})"])
+        title = f"Budget Variance Report - {fiscal_year.name} (Month: {month})"
     else:
-        ws.append([f"Budget Variance Report - {fiscal_year.name} (Full Year)"])
-    ws.merge_cells('A1:D1')
-    ws.cell(row=1, column=1).font = Font(bold=True, size=12)
+        title = f"Budget Variance Report - {fiscal_year.name} (Full Year)"
+    title_cell = WriteOnlyCell(ws, value=title)
+    title_cell.font = Font(bold=True, size=12)
+    ws.append([title_cell])
+    ws.merged_cells.add('A1:D1')
     ws.append([])  # Blank row
 
     header = ["Category", "Budget", "Actual", "Available"]
-    ws.append(header)
-    for col in range(1, len(header) + 1):
-        ws.cell(row=3, column=col).font = Font(bold=True)
-        # IMPROVED: Add currency number format
-        if col > 1:  # Budget, Actual, Available columns
-            ws.cell(row=3, column=col).number_format = '#,##0.00'
-
-    def write_rows(data, indent=0, start_row=4):
-        current_row = start_row
-        for item in data:
-            ws.append([
-                f"{' ' * indent * 4}{item['name']}",
-                item['budget'],
-                item['actual'],
-                item['available']
-            ])
-            # Apply currency format
-            for col in range(2, 5):  # Columns B, C, D
-                ws.cell(row=current_row, column=col).number_format = '#,##0.00'
-
-            current_row += 1
-            if item.get('children'):
-                current_row = write_rows(
-                    item['children'], indent + 1, current_row)[1]
-        return current_row, current_row
-
-    write_rows(report_data)
-
-    # Auto-size columns
-    ws.column_dimensions['A'].width = 30
-    ws.column_dimensions['B'].width = 15
-    ws.column_dimensions['C'].width = 15
-    ws.column_dimensions['D'].width = 15
+    ws.append(bold_row(ws, header[:1]) +
+              [currency_cell(ws, label, bold=True) for label in header[1:]])
 
-    response = HttpResponse(
-        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    for indent, item in flatten_variance_tree(report_data):
+        # Currency format on Budget, Actual, Available
+        ws.append([
+            f"{' ' * indent * 4}{item['name']}",
+            currency_cell(ws, item['budget']),
+            currency_cell(ws, item['actual']),
+            currency_cell(ws, item['available'])
+        ])
 
     # IMPROVED: Include month in filename
     if month:
@@ -1569,9 +1462,7 @@ def export_budget_variance_excel(request):
     else:
         filename = f"budget_variance_report_{fiscal_year.name}.xlsx"
 
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    wb.save(response)
-    return response
+    return xlsx_response(wb, filename)
 
 
 @extend_schema(
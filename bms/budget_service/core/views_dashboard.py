@@ -23,7 +23,9 @@ from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from .serializers_dashboard import ForecastSerializer
 from django.views.decorators.cache import cache_page
+from django.views.decorators.vary import vary_on_headers
 from .views_utils import get_user_bms_role
+from .monthly_series import budget_vs_actual_rows, month_range, monthly_series
 
 
 class DepartmentBudgetView(views.APIView):
@@ -347,63 +349,29 @@ class MonthlyBudgetActualViewSet(viewsets.ViewSet):
         This method distributes the annual budget across months based on fiscal year
         duration and retrieves actual expenses by month
         """
-        result = []
-
-        # Get start and end months within this fiscal year
-        start_month = fiscal_year.start_date.month
-        start_year = fiscal_year.start_date.year
-        end_month = fiscal_year.end_date.month
-        end_year = fiscal_year.end_date.year
-
-        # Calculate total months in fiscal year
-        total_months = (end_year - start_year) * 12 + \
-            (end_month - start_month) + 1
+        months = month_range(fiscal_year.start_date, fiscal_year.end_date)
 
         # If total months is zero (invalid fiscal year), return empty result
-        if total_months <= 0:
-            return result
+        if not months:
+            return []
 
         # Distribute budget evenly across months (simple approach)
-        monthly_budget = total_budget / total_months
-
-        # For each month in the fiscal year
-        current_year = start_year
-        current_month = start_month
-
-        for _ in range(total_months):
-            # Base query for expenses in this month
-            expense_query = Expense.objects.filter(
-                department=department,
-                status='APPROVED',
-                date__year=current_year,
-                date__month=current_month,
-                budget_allocation__fiscal_year=fiscal_year
-            )
-
-            # Apply project filter if specified
-            if project_id:
-                expense_query = expense_query.filter(project_id=project_id)
-
-            # Get actual expenses for this month
-            actual_expenses = expense_query.aggregate(
-                total=Sum('amount'))['total'] or 0
+        monthly_budget = total_budget / len(months)
 
-            # Add to result
-            result.append({
-                'month': current_month,
-                'month_name': calendar.month_name[current_month],
-                'budget': monthly_budget,
-                'actual': actual_expenses
-            })
+        # Actual expenses for every month in one grouped query
+        expense_query = Expense.objects.filter(
+            department=department,
+            status='APPROVED',
+            budget_allocation__fiscal_year=fiscal_year
+        )
 
-            # Move to next month
-            if current_month == 12:
-                current_month = 1
-                current_year += 1
-            else:
-                current_month += 1
+        # Apply project filter if specified
+        if project_id:
+            expense_query = expense_query.filter(project_id=project_id)
 
-        return result
+        actuals = monthly_series(
+            expense_query, fiscal_year.start_date, fiscal_year.end_date)
+        return budget_vs_actual_rows(months, monthly_budget, actuals)
 
     @extend_schema(
 
@@ -512,54 +480,20 @@ class MonthlyBudgetActualViewSet(viewsets.ViewSet):
         This distributes the budget according to project duration rather than 
         fiscal year, which is likely more accurate for project-specific views.
         """
-        result = []
-
-        # Get project start and end months
-        start_month = project.start_date.month
-        start_year = project.start_date.year
-        end_month = project.end_date.month
-        end_year = project.end_date.year
-
-        # Calculate total months in project
-        total_months = (end_year - start_year) * 12 + \
-            (end_month - start_month) + 1
+        months = month_range(project.start_date, project.end_date)
 
         # If total months is zero (invalid project dates), return empty result
-        if total_months <= 0:
-            return result
+        if not months:
+            return []
 
         # Distribute budget evenly across months
-        monthly_budget = budget_allocation.amount / Decimal(total_months)
+        monthly_budget = budget_allocation.amount / Decimal(len(months))
 
-        # For each month in the project
-        current_year = start_year
-        current_month = start_month
-
-        for _ in range(total_months):
-            # Get actual expenses for this month
-            actual_expenses = Expense.objects.filter(
-                project=project,
-                status='APPROVED',
-                date__year=current_year,
-                date__month=current_month
-            ).aggregate(total=Sum('amount'))['total'] or 0
-
-            # Add to result
-            result.append({
-                'month': current_month,
-                'month_name': calendar.month_name[current_month],
-                'budget': monthly_budget,
-                'actual': actual_expenses
-            })
-
-            # Move to next month
-            if current_month == 12:
-                current_month = 1
-                current_year += 1
-            else:
-                current_month += 1
-
-        return result
+        # Actual expenses for every month of the project in one grouped query
+        actuals = monthly_series(
+            Expense.objects.filter(project=project, status='APPROVED'),
+            project.start_date, project.end_date)
+        return budget_vs_actual_rows(months, monthly_budget, actuals)
 
 
 @extend_schema(
@@ -900,22 +834,13 @@ def overall_monthly_budget_actual(request):
     # Simple even distribution of budget across 12 months for the chart
     monthly_budget = total_budget / 12
 
-    monthly_data = []
-    for month_num in range(1, 13):
-        # --- MODIFICATION START ---
-        # Filtered expense query base
-        actual_expenses = expense_query_base.filter(
-            date__year=fiscal_year.start_date.year,
-            date__month=month_num
-        ).aggregate(total=Coalesce(Sum('amount'), Decimal('0')))['total']
-        # --- MODIFICATION END ---
-
-        monthly_data.append({
-            'month': month_num,
-            'month_name': calendar.month_name[month_num],
-            'budget': monthly_budget,
-            'actual': actual_expenses
-        })
+    # Calendar months of the fiscal year's start year, one grouped query
+    year_start = date(fiscal_year.start_date.year, 1, 1)
+    year_end = date(fiscal_year.start_date.year, 12, 31)
+    months = month_range(year_start, year_end)
+    actuals = monthly_series(
+        expense_query_base.filter(date__year=year_start.year), year_start, year_end)
+    monthly_data = budget_vs_actual_rows(months, monthly_budget, actuals)
 
     serializer = MonthlyBudgetActualSerializer(monthly_data, many=True)
     return Response(serializer.data)
@@ -1048,12 +973,15 @@ Added Robustness: The function now includes checks to handle cases where there i
     parameters=[
         OpenApiParameter(name='fiscal_year_id', type=int, required=False,
                          description="ID of the fiscal year. If not provided, the current active fiscal year will be used."),
+        OpenApiParameter(name='department_id', type=int, required=False,
+                         description="Department forecast (generate_forecasts --per-department). If not provided, the organization-wide forecast is returned (General Users always get their own department's)."),
     ],
     responses={200: ForecastSerializer(many=True)},
 )
 @api_view(['GET'])
 @permission_classes([IsBMSUser])  # Use specific BMS permission
 @cache_page(60 * 5)  # (cache for 300 seconds = 5 minutes)
+@vary_on_headers('Authorization', 'Cookie')  # Response depends on the user's role and department
 def get_budget_forecast(request):
     """
     Retrieves a pre-calculated forecast from the database.
@@ -1071,11 +999,27 @@ def get_budget_forecast(request):
        - It does NOT perform any forecasting calculations itself; it only reads from the database.
     3. If no forecast exists for the fiscal year, it returns a message indicating that a forecast must be generated first.
     4. If a forecast exists, it serializes and returns all the monthly data points (cumulative forecast values).
-    5. (Optional) Data isolation for roles: Currently, all users see the same forecast. If department-specific forecasts are needed, logic can be added here.
+    5. Data isolation: General Users (department heads) only see their own department's
+       forecast (generated with generate_forecasts --per-department), as on the other dashboard views.
+       Finance Heads and Admins see the organization-wide forecast, or any department's via department_id.
     """
     fiscal_year_id = request.query_params.get('fiscal_year_id')
+    department_id = request.query_params.get('department_id')
     user = request.user
 
+    # --- DATA ISOLATION LOGIC ---
+    bms_role = get_user_bms_role(user)
+    if bms_role == 'GENERAL_USER':
+        user_department_id = getattr(user, 'department_id', None)
+        if not user_department_id:
+            return Response([], status=status.HTTP_200_OK)
+        if department_id and str(department_id) != str(user_department_id):
+            return Response(
+                {"error": "You can only view your own department's forecast."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        department_id = user_department_id
+
     # Determine the fiscal year (either by ID or by finding the active one)
     today = timezone.now().date()
     if fiscal_year_id:
@@ -1092,9 +1036,12 @@ def get_budget_forecast(request):
 
     # --- NEW, FAST RETRIEVAL LOGIC (US-019) ---
     # Get the most recent forecast generated for this fiscal year
-    latest_forecast = Forecast.objects.filter(
-        fiscal_year=fiscal_year
-    ).select_related('fiscal_year').prefetch_related('data_points').first()
+    forecasts = Forecast.objects.filter(fiscal_year=fiscal_year)
+    if department_id:
+        forecasts = forecasts.filter(department_id=department_id)
+    else:
+        forecasts = forecasts.filter(department__isnull=True)
+    latest_forecast = forecasts.select_related('fiscal_year').prefetch_related('data_points').first()
 
     if not latest_forecast:
         # If no forecast has been generated yet, return an empty list
@@ -1107,19 +1054,6 @@ def get_budget_forecast(request):
     # Get all the data points associated with that forecast, ordered by month
     data_points = latest_forecast.data_points.all()
 
-    # Optional: Apply data isolation for FINANCE_HEAD users
-    # Note: This assumes forecasts are organization-wide. If
-    # department-specific forecasts are needed, add a department field
-    # to the Forecast model and filter accordingly
-    bms_role = get_user_bms_role(user)
-
-    # For now, all users see the same forecast
-    # If you need department-specific forecasts later, uncomment and modify:
-    # if bms_role == 'FINANCE_HEAD':
-    #     department_id = getattr(user, 'department_id', None)
-    #     if department_id and latest_forecast.department_id != department_id:
-    #         return Response([], status=status.HTTP_200_OK)
-
     # Serialize and return the forecast data points (one per month, cumulative)
     serializer = ForecastSerializer(data_points, many=True)
     return Response(serializer.data)
@@ -1153,6 +1087,7 @@ def get_forecast_accuracy(request):
     # 2. Forecast Spend
     # Find the forecast generated for this year
     relevant_forecast = Forecast.objects.filter(
+        department__isnull=True,
         fiscal_year__start_date__lte=last_month_date,
         fiscal_year__end_date__gte=last_month_date
     ).order_by('-generated_at').first()
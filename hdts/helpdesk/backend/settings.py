@@ -31,6 +31,25 @@ ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
 
 # Service URLs for inter-service communication
 DJANGO_AUTH_SERVICE = os.environ.get('DJANGO_AUTH_SERVICE', 'http://localhost:8003')
+# Shared with the auth service; sent as X-API-Key to its internal endpoints
+INTERNAL_SERVICE_API_KEY = os.environ.get('INTERNAL_SERVICE_API_KEY', '')
+
+# Shared cache for core.profile_resolver. Without it every process (web
+# workers and the Celery worker) keeps its own LocMem cache.
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', '')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+
+# External employee profile cache (core.profile_resolver), in seconds.
+# Unknown ids are cached for the shorter negative TTL.
+EXTERNAL_PROFILE_CACHE_TTL = int(os.environ.get('EXTERNAL_PROFILE_CACHE_TTL', 300))
+EXTERNAL_PROFILE_NEGATIVE_TTL = int(os.environ.get('EXTERNAL_PROFILE_NEGATIVE_TTL', 60))
+EXTERNAL_PROFILE_BULK_SIZE = int(os.environ.get('EXTERNAL_PROFILE_BULK_SIZE', 100))
 
 # Application definition
 
@@ -143,6 +162,11 @@ CORS_ALLOW_CREDENTIALS = True
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# When set (e.g. '/protected-media/'), authorized media/attachment downloads
+# are handed to nginx via X-Accel-Redirect instead of streamed by Django.
+# Must match an `internal` location aliased to MEDIA_ROOT.
+SECURE_MEDIA_X_ACCEL_REDIRECT = os.environ.get('SECURE_MEDIA_X_ACCEL_REDIRECT', '')
+
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
         'rest_framework.renderers.JSONRenderer',
@@ -227,4 +251,17 @@ CELERY_TASK_ROUTES = {
     'hdts.tasks.sync_hdts_user': {'queue': 'hdts.user.sync'},
     # Route ticket workflow task to the workflow_api worker queue
     'tickets.tasks.receive_ticket': {'queue': 'TICKET_TASKS_PRODUCTION'},
-}
\ No newline at end of file
+    'tickets.tasks.receive_ticket_batch': {'queue': 'TICKET_TASKS_PRODUCTION'},
+    'tickets.tasks.receive_ticket_status_batch': {'queue': 'TICKET_TASKS_PRODUCTION'},
+}
+
+# Tickets per tickets.tasks.receive_ticket_batch message (core.workflow_push)
+WORKFLOW_PUSH_BATCH_SIZE = int(os.environ.get('WORKFLOW_PUSH_BATCH_SIZE', 100))
+
+# auto_close_resolved_tickets: tickets per transaction, and batches per hourly
+# run (the rest is closed on the next run)
+AUTO_CLOSE_BATCH_SIZE = int(os.environ.get('AUTO_CLOSE_BATCH_SIZE', 1000))
+AUTO_CLOSE_MAX_BATCHES = int(os.environ.get('AUTO_CLOSE_MAX_BATCHES', 50))
+
+# Ticket numbers each process reserves per counter UPDATE (core.ticket_numbers)
+TICKET_NUMBER_BLOCK_SIZE = int(os.environ.get('TICKET_NUMBER_BLOCK_SIZE', 50))
\ No newline at end of file
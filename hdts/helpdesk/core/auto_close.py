@@ -0,0 +1,136 @@
+"""
+Set-based closing of tickets left in 'Resolved' status.
+
+Each batch is one transaction:
+
+1. pick up to AUTO_CLOSE_BATCH_SIZE ids of Resolved tickets older than the
+   cutoff (row-locked with SKIP LOCKED where the database supports it);
+2. one UPDATE sets status/time_closed/date_completed and computes
+   resolution_time in the database for tickets that do not have one;
+3. one bulk INSERT adds the auto-close comments;
+4. on commit, the closed ticket numbers are sent to TTS in one message.
+
+A run stops after AUTO_CLOSE_MAX_BATCHES batches; anything left is picked
+up by the next beat run. If a run is interrupted, committed batches stay
+closed (with their comments) and the rest are still 'Resolved', so the next
+run resumes without duplicating comments. Signals are not fired: the only
+Ticket post_save receiver acts on 'Open' tickets.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, DateTimeField, DurationField, ExpressionWrapper, F, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+AUTO_CLOSE_AFTER = timedelta(hours=72)
+AUTO_CLOSE_COMMENT = "Ticket automatically closed after 72 hours in Resolved status."
+
+
+def _send_status_sync(ticket_numbers):
+    from .tasks import push_ticket_statuses_to_workflow
+    try:
+        push_ticket_statuses_to_workflow.delay([
+            {'ticket_number': number, 'status': 'Closed'} for number in ticket_numbers
+        ])
+    except Exception as e:
+        # TTS keeps its previous status; the tickets are still closed here
+        logger.error(f"❌ Failed to send auto-close status sync for {len(ticket_numbers)} tickets: {e}")
+
+
+def _close_batch(cutoff, now, batch_size):
+    """
+    Close one batch of tickets.
+
+    Returns:
+        list of ticket numbers closed by this batch ([] when nothing is left)
+    """
+    from .models import Ticket, TicketComment
+
+    with transaction.atomic():
+        ids = list(
+            Ticket.objects.select_for_update(skip_locked=True)
+            .filter(status='Resolved', update_date__lte=cutoff)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return []
+
+        Ticket.objects.filter(id__in=ids, status='Resolved').update(
+            status='Closed',
+            time_closed=now,
+            date_completed=now,
+            update_date=now,
+            resolution_time=Case(
+                When(
+                    resolution_time__isnull=True,
+                    submit_date__isnull=False,
+                    then=ExpressionWrapper(
+                        Value(now, output_field=DateTimeField()) - F('submit_date'),
+                        output_field=DurationField(),
+                    ),
+                ),
+                default=F('resolution_time'),
+                output_field=DurationField(),
+            ),
+        )
+
+        # Only rows this run closed (a concurrent run would use another timestamp)
+        closed = list(
+            Ticket.objects.filter(id__in=ids, status='Closed', time_closed=now)
+            .values_list('id', 'ticket_number')
+        )
+        TicketComment.objects.bulk_create([
+            TicketComment(ticket_id=ticket_id, user=None, comment=AUTO_CLOSE_COMMENT, is_internal=False)
+            for ticket_id, _ in closed
+        ])
+
+        numbers = [number for _, number in closed if number]
+        if numbers:
+            transaction.on_commit(lambda: _send_status_sync(numbers))
+        return [number for _, number in closed]
+
+
+def close_resolved_tickets(now=None, batch_size=None, max_batches=None):
+    """
+    Close every ticket that has been 'Resolved' for AUTO_CLOSE_AFTER.
+
+    Sets date_completed but does NOT set csat_rating or feedback (only
+    manual close does that).
+
+    Args:
+        now: Reference time (defaults to timezone.now())
+        batch_size: Tickets per transaction (default settings.AUTO_CLOSE_BATCH_SIZE)
+        max_batches: Batches per run (default settings.AUTO_CLOSE_MAX_BATCHES)
+
+    Returns:
+        dict with 'closed' count, 'batches' run and whether 'remaining' work
+        was left for the next run
+    """
+    from .models import Ticket
+
+    now = now or timezone.now()
+    batch_size = max(1, batch_size or getattr(settings, 'AUTO_CLOSE_BATCH_SIZE', 1000))
+    max_batches = max(1, max_batches or getattr(settings, 'AUTO_CLOSE_MAX_BATCHES', 50))
+    cutoff = now - AUTO_CLOSE_AFTER
+
+    closed = batches = 0
+    remaining = False
+    while True:
+        if batches >= max_batches:
+            remaining = Ticket.objects.filter(status='Resolved', update_date__lte=cutoff).exists()
+            break
+        numbers = _close_batch(cutoff, now, batch_size)
+        if not numbers:
+            break
+        batches += 1
+        closed += len(numbers)
+        logger.info(f"✅ Auto-closed batch {batches}: {len(numbers)} tickets")
+
+    if remaining:
+        logger.warning(f"⚠️ Auto-close stopped after {batches} batches; the rest will close on the next run")
+    return {'closed': closed, 'batches': batches, 'remaining': remaining}
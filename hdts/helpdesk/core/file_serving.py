@@ -0,0 +1,225 @@
+"""
+Streaming file responses for media and attachment downloads.
+
+serve_file() never reads a whole file into memory:
+
+- full downloads use FileResponse, so gunicorn hands the file to
+  wsgi.file_wrapper / sendfile (zero-copy);
+- single ranges (Range: bytes=a-b) return 206 over a bounded file that
+  still exposes fileno(), so sendfile applies there too;
+- multiple ranges return 206 multipart/byteranges, streamed in chunks;
+- ETag / Last-Modified are derived from the file's stat, and
+  If-None-Match / If-Modified-Since / If-Range are honoured (304);
+- with SECURE_MEDIA_X_ACCEL_REDIRECT set (e.g. '/protected-media/'), the
+  view only authorizes and nginx streams the file itself (see the
+  internal location in tts/Docker/nginx/nginx.conf).
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import get_random_string
+from django.utils.http import http_date, parse_http_date_safe
+
+CHUNK_SIZE = 64 * 1024
+MAX_RANGES = 16
+
+_RANGE_RE = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
+
+class RangeFile:
+    """
+    Read-only view of bytes [start, start + length) of an open file.
+
+    fileno() is kept so gunicorn's sendfile can use the current offset and
+    the response Content-Length; everything else sees a bounded read().
+    """
+
+    def __init__(self, fileobj, start, length):
+        self._file = fileobj
+        self._remaining = length
+        fileobj.seek(start)
+
+    def read(self, size=-1):
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+def guess_content_type(path):
+    content_type, _ = mimetypes.guess_type(path)
+    return content_type or 'application/octet-stream'
+
+
+def file_etag(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def parse_range_header(header, size):
+    """
+    Parse a 'bytes=' Range header.
+
+    Returns:
+        list of (start, end) inclusive ranges, [] if none are satisfiable,
+        or None if the header is absent, malformed or asks for too many ranges
+        (in which case the full file is served).
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    specs = header[len('bytes='):].split(',')
+    if len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        match = _RANGE_RE.match(spec)
+        if not match:
+            return None
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return None
+        elif last:
+            # Suffix range: the last N bytes
+            start = max(size - int(last), 0)
+            end = size - 1
+            if int(last) == 0:
+                continue
+        else:
+            return None
+        if start < size:
+            ranges.append((start, end))
+    return ranges
+
+
+def _if_range_matches(request, etag, last_modified):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and since >= last_modified
+
+
+def _multipart_stream(path, ranges, size, content_type, boundary):
+    with open(path, 'rb') as fileobj:
+        for start, end in ranges:
+            yield (
+                f'\r\n--{boundary}\r\n'
+                f'Content-Type: {content_type}\r\n'
+                f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n'
+            ).encode()
+            part = RangeFile(fileobj, start, end - start + 1)
+            for chunk in iter(lambda: part.read(CHUNK_SIZE), b''):
+                yield chunk
+        yield f'\r\n--{boundary}--\r\n'.encode()
+
+
+def _multipart_length(ranges, size, content_type, boundary):
+    length = len(f'\r\n--{boundary}--\r\n')
+    for start, end in ranges:
+        length += len(
+            f'\r\n--{boundary}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n'
+        ) + end - start + 1
+    return length
+
+
+def _x_accel_path(full_path):
+    prefix = getattr(settings, 'SECURE_MEDIA_X_ACCEL_REDIRECT', '')
+    if not prefix:
+        return None
+    relative = os.path.relpath(full_path, os.path.abspath(settings.MEDIA_ROOT))
+    if relative.startswith('..'):
+        return None
+    return prefix.rstrip('/') + '/' + quote(relative.replace(os.sep, '/'))
+
+
+def content_disposition(disposition, filename):
+    """Header value that survives non-ASCII and quote characters in filenames."""
+    ascii_name = filename.encode('ascii', 'ignore').decode().replace('"', '') or 'download'
+    value = f'{disposition}; filename="{ascii_name}"'
+    if ascii_name != filename:
+        value += f"; filename*=UTF-8''{quote(filename)}"
+    return value
+
+
+def serve_file(request, full_path, content_type=None, filename=None, disposition='inline'):
+    """
+    Stream a file from disk with Range and conditional-request support.
+
+    Args:
+        request: The incoming request (Range / If-* headers are read from it)
+        full_path: Absolute path of an existing file (already authorized)
+        content_type: Defaults to a guess from the file name
+        filename: Name for Content-Disposition (defaults to the basename)
+        disposition: 'inline' or 'attachment'
+
+    Returns:
+        FileResponse (200/206), StreamingHttpResponse (206 multipart),
+        HttpResponse (304/412/416 or X-Accel-Redirect)
+    """
+    stat = os.stat(full_path)
+    size = stat.st_size
+    content_type = content_type or guess_content_type(full_path)
+    etag = file_etag(stat)
+    last_modified = int(stat.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    accel_path = _x_accel_path(full_path)
+    ranges = None
+    if accel_path is None and request.method in ('GET', 'HEAD') and _if_range_matches(request, etag, last_modified):
+        ranges = parse_range_header(request.META.get('HTTP_RANGE'), size)
+
+    if accel_path is not None:
+        # nginx serves the bytes (including Range) from the internal location
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = accel_path
+    elif ranges == []:
+        response = HttpResponse(status=416, content_type=content_type)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    elif ranges and len(ranges) == 1:
+        start, end = ranges[0]
+        response = FileResponse(RangeFile(open(full_path, 'rb'), start, end - start + 1),
+                                content_type=content_type, status=206)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    elif ranges:
+        boundary = get_random_string(24)
+        response = StreamingHttpResponse(
+            _multipart_stream(full_path, ranges, size, content_type, boundary),
+            status=206,
+            content_type=f'multipart/byteranges; boundary={boundary}',
+        )
+        response['Content-Length'] = _multipart_length(ranges, size, content_type, boundary)
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+        response['Content-Length'] = size
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = content_disposition(disposition, filename or os.path.basename(full_path))
+    return response
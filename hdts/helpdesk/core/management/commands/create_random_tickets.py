@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
 from core.models import Ticket, Employee
+from core.ticket_numbers import allocate_ticket_numbers
 import random
+import time
 from datetime import datetime, timedelta
 
 class Command(BaseCommand):
@@ -8,6 +10,8 @@ class Command(BaseCommand):
 
     def add_arguments(self, parser):
         parser.add_argument('num_tickets', type=int, help='Number of random tickets to create')
+        parser.add_argument('--batch-size', type=int, default=0,
+                            help='Insert with bulk_create in batches of this size (default: one save() per ticket)')
 
     def handle(self, *args, **options):
         num_tickets = options['num_tickets']
@@ -42,7 +46,10 @@ class Command(BaseCommand):
             'Follow up needed.',
         ]
 
+        batch_size = options['batch_size']
         created_count = 0
+        pending = []
+        started = time.perf_counter()
         for _ in range(num_tickets):
             employee = random.choice(employees)
             category = random.choice(categories)
@@ -53,19 +60,45 @@ class Command(BaseCommand):
             description = random.choice(descriptions)
             scheduled_date = datetime.now().date() + timedelta(days=random.randint(1, 30)) if random.choice([True, False]) else None
 
+            ticket = Ticket(
+                employee=employee,
+                subject=subject,
+                category=category,
+                description=description,
+                scheduled_date=scheduled_date,
+                priority=priority,
+                department=department,
+                status=status,
+            )
+            if batch_size:
+                pending.append(ticket)
+                if len(pending) >= batch_size:
+                    created_count += self._bulk_create(pending)
+                    pending = []
+                continue
+
             try:
-                Ticket.objects.create(
-                    employee=employee,
-                    subject=subject,
-                    category=category,
-                    description=description,
-                    scheduled_date=scheduled_date,
-                    priority=priority,
-                    department=department,
-                    status=status,
-                )
+                ticket.save()
                 created_count += 1
             except Exception as e:
                 self.stdout.write(self.style.WARNING(f'Failed to create ticket: {e}'))
 
-        self.stdout.write(self.style.SUCCESS(f'Successfully created {created_count} random tickets.'))
\ No newline at end of file
+        if pending:
+            created_count += self._bulk_create(pending)
+
+        elapsed = time.perf_counter() - started
+        rate = created_count / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully created {created_count} random tickets in {elapsed:.2f}s ({rate:,.0f} tickets/s).'
+        ))
+
+    def _bulk_create(self, tickets):
+        # bulk_create skips Ticket.save(), so number the batch up front
+        for ticket, number in zip(tickets, allocate_ticket_numbers(len(tickets))):
+            ticket.ticket_number = number
+        try:
+            Ticket.objects.bulk_create(tickets)
+            return len(tickets)
+        except Exception as e:
+            self.stdout.write(self.style.WARNING(f'Failed to create {len(tickets)} tickets: {e}'))
+            return 0
@@ -0,0 +1,53 @@
+"""
+Management command to (re)send Open tickets to the workflow API.
+
+Tickets are sent as tickets.tasks.receive_ticket_batch messages; the workflow
+API upserts them, so tickets it already has are not duplicated.
+
+Usage:
+    python manage.py push_open_tickets_to_workflow
+    python manage.py push_open_tickets_to_workflow --batch-size 200
+    python manage.py push_open_tickets_to_workflow --ticket-number TX20250101000001
+"""
+
+from django.core.management.base import BaseCommand
+from core.models import Ticket
+from core.workflow_push import push_ticket_batches, ticket_workflow_payload
+
+
+class Command(BaseCommand):
+    help = 'Send Open tickets to the workflow API in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Tickets per message (default: WORKFLOW_PUSH_BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--ticket-number',
+            action='append',
+            dest='ticket_numbers',
+            help='Only send this ticket (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        tickets = (
+            Ticket.objects.filter(status='Open')
+            .select_related('employee')
+            .prefetch_related('attachments')
+            .order_by('id')
+        )
+        if options['ticket_numbers']:
+            tickets = tickets.filter(ticket_number__in=options['ticket_numbers'])
+
+        tickets_data = [ticket_workflow_payload(ticket) for ticket in tickets.iterator(chunk_size=500)]
+        if not tickets_data:
+            self.stdout.write('No Open tickets to send')
+            return
+
+        sent = push_ticket_batches(tickets_data, options['batch_size'])
+        if sent < len(tickets_data):
+            self.stderr.write(f'Failed to enqueue {len(tickets_data) - sent} of {len(tickets_data)} tickets')
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} Open tickets to the workflow API'))
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from core.models import Ticket, Employee
 import random
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 
@@ -91,6 +92,7 @@ class Command(BaseCommand):
             return
 
         created = 0
+        started = time.perf_counter()
         for i in range(count):
             category = random.choice(CATEGORY_CHOICES)
             # choose employee first so we can reference company_id in subject
@@ -209,4 +211,6 @@ class Command(BaseCommand):
             except Exception as e:
                 self.stderr.write(f'Failed to create ticket #{i+1}: {e}')
 
-        self.stdout.write(self.style.SUCCESS(f'Finished creating {created} tickets'))
+        elapsed = time.perf_counter() - started
+        rate = created / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(f'Finished creating {created} tickets in {elapsed:.2f}s ({rate:,.0f} tickets/s)'))
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from core.models import Ticket, Employee
+from core.workflow_push import batched_workflow_push
 import random
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
@@ -91,116 +92,118 @@ class Command(BaseCommand):
             return
 
         created = 0
-        for i in range(count):
-            category = random.choice(CATEGORY_CHOICES)
-            # choose employee first so we can reference company_id in subject
-            employee = random.choice(employees)
-            ticket_kwargs = {}
-            # create a unique, human-friendly subject without 'Auto-generated' or '#N'
-            descriptor = ''
-            if category == 'IT Support':
-                descriptor = random.choice(IT_SUBCATS)
-            elif category in ('Asset Check In', 'Asset Check Out'):
-                descriptor = random.choice(list(ASSET_NAMES.keys()))
-            elif category == 'New Budget Proposal':
-                descriptor = random.choice(BUDGET_SUBCATS)
-            else:
-                descriptor = 'General Inquiry'
-
-            # use timestamp to help uniqueness and readability
-            subject = f"{category} - {descriptor} ({employee.company_id}) {datetime.now().strftime('%Y%m%d%H%M%S')}"
-            description = f"This is a seeded ticket for {category}. Details autogenerated for testing."
-
-            ticket_kwargs['subject'] = subject
-            ticket_kwargs['description'] = description
-            ticket_kwargs['employee'] = employee
-
-            if category == 'IT Support':
-                sub = random.choice(IT_SUBCATS)
-                ticket_kwargs['category'] = 'IT Support'
-                ticket_kwargs['sub_category'] = sub
-                # device type and asset
-                device = random.choice(DEVICE_TYPES)
-                ticket_kwargs['dynamic_data'] = {
-                    'device_type': device,
-                }
-                if device in ASSET_NAMES:
-                    asset = random.choice(ASSET_NAMES[device])
-                    ticket_kwargs['asset_name'] = asset
-                    # generate serial number based on asset name
-                    ticket_kwargs['serial_number'] = f"SN-{abs(hash(asset)) % 1000000:06d}"
-                ticket_kwargs['department'] = 'IT Department'
-                # priority
-                ticket_kwargs['priority'] = random.choice(PRIORITIES) if random.random() < 0.5 else None
-                ticket_kwargs['location'] = random.choice(LOCATIONS)
-
-            elif category in ('Asset Check In', 'Asset Check Out'):
-                ticket_kwargs['category'] = category
-                product = random.choice(list(ASSET_NAMES.keys()))
-                ticket_kwargs['sub_category'] = product
-                ticket_kwargs['asset_name'] = random.choice(ASSET_NAMES.get(product, []))
-                ticket_kwargs['serial_number'] = f"SN-{random.randint(100000,999999)}"
-                ticket_kwargs['department'] = 'Asset Department'
-                # for check out, add expected return date
-                if category == 'Asset Check Out':
-                    days = random.randint(1, 60)
-                    exp = datetime.now() + timedelta(days=days)
-                    ticket_kwargs['expected_return_date'] = exp.date()
-
-            elif category == 'New Budget Proposal':
-                ticket_kwargs['category'] = 'New Budget Proposal'
-                sub = random.choice(BUDGET_SUBCATS)
-                ticket_kwargs['sub_category'] = sub
-                # optional cost elements
-                if random.random() < 0.7:
-                    ce = random.choice(COST_ELEMENTS.get(sub, []))
-                    ticket_kwargs['cost_items'] = {'cost_element': ce}
-                    # Ensure Decimal with two decimal places
-                    val = Decimal(str(round(random.uniform(1000, 500000), 2))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-                    ticket_kwargs['requested_budget'] = val
-                ticket_kwargs['department'] = 'Budget Department'
-                # performance dates
-                start = datetime.now().date()
-                end = start + timedelta(days=random.randint(30, 365))
-                ticket_kwargs['performance_start_date'] = start
-                ticket_kwargs['performance_end_date'] = end
-
-            else:
-                ticket_kwargs['category'] = 'Others'
-                ticket_kwargs['sub_category'] = None
-                ticket_kwargs['department'] = None
-
-            # All tickets will be Open status - set priority and department
-            ticket_kwargs['priority'] = random.choice(PRIORITIES)
-            if not ticket_kwargs.get('department'):
-                if ticket_kwargs['category'] == 'IT Support':
+        # Opened tickets reach the workflow API as receive_ticket_batch messages
+        with batched_workflow_push():
+            for i in range(count):
+                category = random.choice(CATEGORY_CHOICES)
+                # choose employee first so we can reference company_id in subject
+                employee = random.choice(employees)
+                ticket_kwargs = {}
+                # create a unique, human-friendly subject without 'Auto-generated' or '#N'
+                descriptor = ''
+                if category == 'IT Support':
+                    descriptor = random.choice(IT_SUBCATS)
+                elif category in ('Asset Check In', 'Asset Check Out'):
+                    descriptor = random.choice(list(ASSET_NAMES.keys()))
+                elif category == 'New Budget Proposal':
+                    descriptor = random.choice(BUDGET_SUBCATS)
+                else:
+                    descriptor = 'General Inquiry'
+
+                # use timestamp to help uniqueness and readability
+                subject = f"{category} - {descriptor} ({employee.company_id}) {datetime.now().strftime('%Y%m%d%H%M%S')}"
+                description = f"This is a seeded ticket for {category}. Details autogenerated for testing."
+
+                ticket_kwargs['subject'] = subject
+                ticket_kwargs['description'] = description
+                ticket_kwargs['employee'] = employee
+
+                if category == 'IT Support':
+                    sub = random.choice(IT_SUBCATS)
+                    ticket_kwargs['category'] = 'IT Support'
+                    ticket_kwargs['sub_category'] = sub
+                    # device type and asset
+                    device = random.choice(DEVICE_TYPES)
+                    ticket_kwargs['dynamic_data'] = {
+                        'device_type': device,
+                    }
+                    if device in ASSET_NAMES:
+                        asset = random.choice(ASSET_NAMES[device])
+                        ticket_kwargs['asset_name'] = asset
+                        # generate serial number based on asset name
+                        ticket_kwargs['serial_number'] = f"SN-{abs(hash(asset)) % 1000000:06d}"
                     ticket_kwargs['department'] = 'IT Department'
-                elif ticket_kwargs['category'] in ('Asset Check In', 'Asset Check Out'):
+                    # priority
+                    ticket_kwargs['priority'] = random.choice(PRIORITIES) if random.random() < 0.5 else None
+                    ticket_kwargs['location'] = random.choice(LOCATIONS)
+
+                elif category in ('Asset Check In', 'Asset Check Out'):
+                    ticket_kwargs['category'] = category
+                    product = random.choice(list(ASSET_NAMES.keys()))
+                    ticket_kwargs['sub_category'] = product
+                    ticket_kwargs['asset_name'] = random.choice(ASSET_NAMES.get(product, []))
+                    ticket_kwargs['serial_number'] = f"SN-{random.randint(100000,999999)}"
                     ticket_kwargs['department'] = 'Asset Department'
-                elif ticket_kwargs['category'] == 'New Budget Proposal':
+                    # for check out, add expected return date
+                    if category == 'Asset Check Out':
+                        days = random.randint(1, 60)
+                        exp = datetime.now() + timedelta(days=days)
+                        ticket_kwargs['expected_return_date'] = exp.date()
+
+                elif category == 'New Budget Proposal':
+                    ticket_kwargs['category'] = 'New Budget Proposal'
+                    sub = random.choice(BUDGET_SUBCATS)
+                    ticket_kwargs['sub_category'] = sub
+                    # optional cost elements
+                    if random.random() < 0.7:
+                        ce = random.choice(COST_ELEMENTS.get(sub, []))
+                        ticket_kwargs['cost_items'] = {'cost_element': ce}
+                        # Ensure Decimal with two decimal places
+                        val = Decimal(str(round(random.uniform(1000, 500000), 2))).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+                        ticket_kwargs['requested_budget'] = val
                     ticket_kwargs['department'] = 'Budget Department'
+                    # performance dates
+                    start = datetime.now().date()
+                    end = start + timedelta(days=random.randint(30, 365))
+                    ticket_kwargs['performance_start_date'] = start
+                    ticket_kwargs['performance_end_date'] = end
+
                 else:
-                    ticket_kwargs['department'] = random.choice(['IT Department', 'Asset Department', 'Budget Department'])
-
-            # scheduled date optional
-            if random.random() < 0.3:
-                ticket_kwargs['scheduled_date'] = datetime.now().date() + timedelta(days=random.randint(0, 30))
-
-            # create the ticket
-            try:
-                # Create ticket with 'New' status first
-                t = Ticket(**ticket_kwargs, status='New')
-                t.full_clean()
-                t.save()
+                    ticket_kwargs['category'] = 'Others'
+                    ticket_kwargs['sub_category'] = None
+                    ticket_kwargs['department'] = None
+
+                # All tickets will be Open status - set priority and department
+                ticket_kwargs['priority'] = random.choice(PRIORITIES)
+                if not ticket_kwargs.get('department'):
+                    if ticket_kwargs['category'] == 'IT Support':
+                        ticket_kwargs['department'] = 'IT Department'
+                    elif ticket_kwargs['category'] in ('Asset Check In', 'Asset Check Out'):
+                        ticket_kwargs['department'] = 'Asset Department'
+                    elif ticket_kwargs['category'] == 'New Budget Proposal':
+                        ticket_kwargs['department'] = 'Budget Department'
+                    else:
+                        ticket_kwargs['department'] = random.choice(['IT Department', 'Asset Department', 'Budget Department'])
+
+                # scheduled date optional
+                if random.random() < 0.3:
+                    ticket_kwargs['scheduled_date'] = datetime.now().date() + timedelta(days=random.randint(0, 30))
+
+                # create the ticket
+                try:
+                    # Create ticket with 'New' status first
+                    t = Ticket(**ticket_kwargs, status='New')
+                    t.full_clean()
+                    t.save()
                 
-                # Update to 'Open' status to trigger the Celery workflow signal
-                t.status = 'Open'
-                t.save()
+                    # Update to 'Open' status to trigger the Celery workflow signal
+                    t.status = 'Open'
+                    t.save()
                 
-                created += 1
-                if created % 10 == 0:
-                    self.stdout.write(self.style.SUCCESS(f'Created {created} tickets'))
-            except Exception as e:
-                self.stderr.write(f'Failed to create ticket #{i+1}: {e}')
+                    created += 1
+                    if created % 10 == 0:
+                        self.stdout.write(self.style.SUCCESS(f'Created {created} tickets'))
+                except Exception as e:
+                    self.stderr.write(f'Failed to create ticket #{i+1}: {e}')
 
         self.stdout.write(self.style.SUCCESS(f'Finished creating {created} Open tickets (Celery tasks triggered)'))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_add_created_by_field'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketNumberCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.CharField(max_length=8, unique=True)),
+                ('last_value', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
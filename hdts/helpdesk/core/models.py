@@ -1,5 +1,4 @@
 import re
-import random
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.core.exceptions import ValidationError
@@ -224,22 +223,19 @@ SUBCATEGORY_CHOICES = [
     ('IT Consultation Request', 'IT Consultation Request'),
     ('Data Backup/Restore', 'Data Backup/Restore'),
 ]
+class TicketNumberCounter(models.Model):
+    """Last ticket number suffix reserved per UTC day (see core.ticket_numbers)."""
+    day = models.CharField(max_length=8, unique=True)
+    last_value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day}: {self.last_value}"
+
+
 def generate_unique_ticket_number():
-    from .models import Ticket  # safe import for migrations
-    from datetime import datetime
-    date_part = datetime.utcnow().strftime('%Y%m%d')
-    # Attempt up to a few times to avoid collisions
-    for _ in range(10):
-        rand = f"{random.randint(0, 999999):06d}"
-        candidate = f"TX{date_part}{rand}"
-        if not Ticket.objects.filter(ticket_number=candidate).exists():
-            return candidate
-    # Fallback to uuid-like random
-    while True:
-        candidate = f"TX{date_part}{random.randint(0, 9999999):07d}"
-        if not Ticket.objects.filter(ticket_number=candidate).exists():
-            return candidate
-            
+    from .ticket_numbers import ticket_number_allocator
+    return ticket_number_allocator.allocate()[0]
+
 class Ticket(models.Model):
     ticket_number = models.CharField(max_length=32, unique=True, blank=True, null=True)
 
@@ -311,80 +307,11 @@ def send_ticket_to_workflow(sender, instance, created, **kwargs):
     if not created and instance.status == "Open":
         # Delay pushing to external workflow; do not allow broker/worker errors
         # to crash the request/DB transaction (e.g., when RabbitMQ is down).
+        # Inside batched_workflow_push() the ticket joins the current batch.
         try:
-            from .tasks import push_ticket_to_workflow  # Import here!
-            
-            # Build ticket data dictionary manually to ensure JSON serialization
-            # and avoid issues with file objects or request context
-            ticket_data = {
-                'id': instance.id,
-                'ticket_number': instance.ticket_number,
-                'subject': instance.subject,
-                'category': instance.category,
-                'sub_category': instance.sub_category,
-                'description': instance.description,
-                'scheduled_date': str(instance.scheduled_date) if instance.scheduled_date else None,
-                'priority': instance.priority,
-                'department': instance.department,
-                'asset_name': instance.asset_name,
-                'serial_number': instance.serial_number,
-                'location': instance.location,
-                'expected_return_date': str(instance.expected_return_date) if instance.expected_return_date else None,
-                'issue_type': instance.issue_type,
-                'other_issue': instance.other_issue,
-                'performance_start_date': str(instance.performance_start_date) if instance.performance_start_date else None,
-                'performance_end_date': str(instance.performance_end_date) if instance.performance_end_date else None,
-                'approved_by': instance.approved_by,
-                'rejected_by': instance.rejected_by,
-                'cost_items': instance.cost_items,
-                'requested_budget': str(instance.requested_budget) if instance.requested_budget else None,
-                'fiscal_year': instance.fiscal_year,
-                'department_input': instance.department_input,
-                'dynamic_data': instance.dynamic_data,
-                'status': instance.status,
-                'submit_date': instance.submit_date.isoformat() if instance.submit_date else None,
-                'update_date': instance.update_date.isoformat() if instance.update_date else None,
-                'rejection_reason': instance.rejection_reason,
-                'date_completed': instance.date_completed.isoformat() if instance.date_completed else None,
-                'csat_rating': instance.csat_rating,
-                'feedback': instance.feedback,
-            }
-            
-            # Add employee info if available (for assignment context)
-            if instance.employee:
-                ticket_data['employee_id'] = instance.employee.id
-                ticket_data['employee_company_id'] = instance.employee.company_id
-                ticket_data['employee_email'] = instance.employee.email
-                ticket_data['employee'] = {
-                    'first_name': instance.employee.first_name,
-                    'last_name': instance.employee.last_name,
-                    'email': instance.employee.email,
-                    'company_id': instance.employee.company_id,
-                    'department': instance.employee.department,
-                }
-            elif instance.employee_cookie_id:
-                ticket_data['employee_cookie_id'] = instance.employee_cookie_id
-            
-            # Add attachment info (just metadata, not file contents)
-            attachments = []
-            for att in instance.attachments.all():
-                attachments.append({
-                    'id': att.id,
-                    'file_name': att.file_name,
-                    'file_type': att.file_type,
-                    'file_size': att.file_size,
-                    'file_path': att.file.name if att.file else None,
-                })
-            ticket_data['attachments'] = attachments
-            
-            try:
-                push_ticket_to_workflow.delay(ticket_data)
-                print(f"[send_ticket_to_workflow] enqueued workflow job for ticket {instance.ticket_number}")
-            except Exception as enqueue_err:
-                # Log the enqueue failure and continue — do not re-raise
-                import logging, traceback
-                logger = logging.getLogger(__name__)
-                logger.exception("Failed to enqueue push_ticket_to_workflow: %s", enqueue_err)
+            from .workflow_push import push_ticket, ticket_workflow_payload  # Import here!
+
+            push_ticket(ticket_workflow_payload(instance))
         except Exception:
             # If importing or serializing fails, log and continue
             import logging
@@ -0,0 +1,458 @@
+"""
+Batched, cache-backed resolution of external (auth service) employee profiles.
+
+The cache is Django's default cache: process-local LocMem unless
+CACHE_REDIS_URL configures a shared Redis cache. Profiles fetched by the
+prefetch task are also stored in ExternalEmployee, so with a per-process
+cache, web workers still find them in step 2 below.
+
+resolve_many(user_ids) returns {user_id: profile} in at most:
+
+1. one cache.get_many() for ids resolved recently (including ids the auth
+   service does not know, which are negatively cached for a shorter TTL);
+2. one ExternalEmployee IN query for the rest;
+3. one bulk request per EXTERNAL_PROFILE_BULK_SIZE ids to
+   /api/v1/hdts/employees/internal/bulk/ over a pooled requests.Session,
+   only when fetch_remote=True. The endpoint requires the shared
+   INTERNAL_SERVICE_API_KEY, sent as X-API-Key; without a key (or when the
+   auth service rejects it) profiles are fetched one id at a time and an
+   error is logged once per process.
+
+List pages call it with fetch_remote=False and queue the misses to
+core.tasks.prefetch_external_profiles, so they never wait on the network.
+
+Profiles have the same shape get_external_employee_data() always returned:
+id, first_name, last_name, email, company_id, department, image.
+Unknown ids resolve to {}.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'hdts:external_profile:'
+NOT_FOUND = '__not_found__'
+REMOTE_TIMEOUT = 5
+MAX_REMOTE_WORKERS = 8
+
+
+def _normalize_ids(user_ids):
+    ids = []
+    for user_id in user_ids or []:
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            continue
+        if user_id not in ids:
+            ids.append(user_id)
+    return ids
+
+
+def profile_from_employee(employee):
+    """Profile dict for a local ExternalEmployee row."""
+    try:
+        image = str(employee.image.url) if employee.image else None
+    except ValueError:
+        image = None
+    return {
+        'id': employee.external_user_id or employee.external_employee_id or employee.company_id,
+        'first_name': employee.first_name,
+        'last_name': employee.last_name,
+        'email': employee.email,
+        'company_id': employee.company_id,
+        'department': employee.department,
+        'image': image,
+    }
+
+
+def profile_from_auth(data):
+    """Profile dict for an auth service employee/user payload."""
+    return {
+        'id': data.get('id'),
+        'first_name': data.get('first_name', '') or '',
+        'last_name': data.get('last_name', '') or '',
+        'email': data.get('email', '') or '',
+        'company_id': data.get('company_id') or data.get('employee_id'),
+        'department': data.get('department', '') or '',
+        'image': data.get('profile_picture') or data.get('image'),
+    }
+
+
+class ExternalProfileResolver:
+    """Resolves auth user ids to profiles, counting where each answer came from."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._logged = set()
+        self.reset_stats()
+
+    # ------------------------------------------------------------------ config
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'EXTERNAL_PROFILE_CACHE_TTL', 300)
+
+    @property
+    def negative_ttl(self):
+        return getattr(settings, 'EXTERNAL_PROFILE_NEGATIVE_TTL', 60)
+
+    @property
+    def bulk_size(self):
+        return getattr(settings, 'EXTERNAL_PROFILE_BULK_SIZE', 100)
+
+    @property
+    def auth_service_url(self):
+        return (getattr(settings, 'DJANGO_AUTH_SERVICE', None) or '').rstrip('/')
+
+    @property
+    def api_key(self):
+        return getattr(settings, 'INTERNAL_SERVICE_API_KEY', '')
+
+    @property
+    def session(self):
+        """One keep-alive session per thread (requests.Session is not thread-safe)."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_REMOTE_WORKERS)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._local.session = session
+        return session
+
+    # ------------------------------------------------------------------- stats
+
+    def _count(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                self._stats[name] += value
+
+    def stats(self):
+        """
+        Returns:
+            dict with cache_hits, negative_hits, local_hits, remote_hits,
+            remote_requests and misses (ids nobody knew) since the last reset
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = {
+                'cache_hits': 0,
+                'negative_hits': 0,
+                'local_hits': 0,
+                'remote_hits': 0,
+                'remote_requests': 0,
+                'misses': 0,
+            }
+
+    def _log_once(self, key, message):
+        """Log a configuration problem at error level the first time it is seen."""
+        with self._lock:
+            if key in self._logged:
+                return
+            self._logged.add(key)
+        logger.error(message)
+
+    # ------------------------------------------------------------------- cache
+
+    def _cache_key(self, user_id):
+        return f'{CACHE_KEY_PREFIX}{user_id}'
+
+    def _cache_profiles(self, profiles):
+        if profiles:
+            cache.set_many({self._cache_key(uid): p for uid, p in profiles.items()}, self.ttl)
+
+    def _cache_not_found(self, user_ids):
+        if user_ids:
+            cache.set_many({self._cache_key(uid): NOT_FOUND for uid in user_ids}, self.negative_ttl)
+
+    def invalidate(self, user_ids):
+        cache.delete_many([self._cache_key(uid) for uid in _normalize_ids(user_ids)])
+
+    # ------------------------------------------------------------------- local
+
+    def _load_local(self, user_ids):
+        """
+        One query matching external_user_id, then external_employee_id, then
+        company_id - the same precedence the old per-id lookups used.
+
+        Returns:
+            {user_id: ExternalEmployee}
+        """
+        from .models import ExternalEmployee
+
+        by_user, by_employee, by_company = {}, {}, {}
+        rows = ExternalEmployee.objects.filter(
+            Q(external_user_id__in=user_ids)
+            | Q(external_employee_id__in=user_ids)
+            | Q(company_id__in=[str(uid) for uid in user_ids])
+        )
+        for row in rows:
+            if row.external_user_id is not None:
+                by_user.setdefault(row.external_user_id, row)
+            if row.external_employee_id is not None:
+                by_employee.setdefault(row.external_employee_id, row)
+            if row.company_id:
+                by_company.setdefault(row.company_id, row)
+
+        found = {}
+        for uid in user_ids:
+            row = by_user.get(uid) or by_employee.get(uid) or by_company.get(str(uid))
+            if row is not None:
+                found[uid] = row
+        return found
+
+    # ------------------------------------------------------------------ remote
+
+    def _get(self, path, params=None):
+        self._count(remote_requests=1)
+        headers = {'X-API-Key': self.api_key} if self.api_key else None
+        return self.session.get(f'{self.auth_service_url}{path}', params=params,
+                                headers=headers, timeout=REMOTE_TIMEOUT)
+
+    def _fetch_one(self, user_id):
+        """Per-id lookup used when the bulk endpoint is unavailable."""
+        for path in (f'/api/v1/hdts/employees/internal/{user_id}/',
+                     f'/api/v1/users/management/{user_id}/'):
+            try:
+                response = self._get(path)
+                if response.status_code == 200:
+                    return response.json()
+            except Exception as e:
+                logger.warning(f"⚠️ Profile lookup {path} failed: {e}")
+        return None
+
+    def _fetch_bulk(self, user_ids):
+        """
+        Returns:
+            ({user_id: payload}, ids the auth service did not know), or None
+            if the bulk endpoint is unavailable (older auth deployments) or
+            rejects this service's INTERNAL_SERVICE_API_KEY
+        """
+        found, missing = {}, []
+        for start in range(0, len(user_ids), self.bulk_size):
+            chunk = user_ids[start:start + self.bulk_size]
+            response = self._get('/api/v1/hdts/employees/internal/bulk/',
+                                 params={'ids': ','.join(str(uid) for uid in chunk)})
+            if response.status_code in (401, 403):
+                self._log_once('bulk-rejected', (
+                    f"❌ Auth service rejected the bulk profile request (HTTP {response.status_code}); "
+                    "check that INTERNAL_SERVICE_API_KEY matches on both services. "
+                    "Falling back to one request per profile."
+                ))
+                return None
+            if response.status_code in (404, 405):
+                return None
+            response.raise_for_status()
+            body = response.json()
+            for item in body.get('results', []):
+                if item.get('id') is not None:
+                    found[int(item['id'])] = item
+            missing.extend(uid for uid in chunk if uid not in found)
+        return found, missing
+
+    def _fetch_remote(self, user_ids):
+        """
+        Fetch payloads for user_ids from the auth service.
+
+        Ids the HDTS employee table does not know may still be staff users,
+        so they are looked up individually (concurrently) on the management
+        endpoint, as the old helper did.
+
+        Returns:
+            {user_id: payload}; raises on transport errors
+        """
+        if not self.auth_service_url or not user_ids:
+            return {}
+
+        if self.api_key:
+            bulk = self._fetch_bulk(user_ids)
+        else:
+            self._log_once('no-api-key', (
+                "❌ INTERNAL_SERVICE_API_KEY is not set; profiles are fetched "
+                "from the auth service one request per id."
+            ))
+            bulk = None
+        if bulk is None:
+            found, leftovers = {}, user_ids
+        else:
+            found, leftovers = bulk
+            leftovers = [uid for uid in leftovers if uid not in found]
+
+        if leftovers:
+            fetch = self._fetch_one if bulk is None else self._fetch_management
+            workers = min(MAX_REMOTE_WORKERS, len(leftovers))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for uid, payload in zip(leftovers, pool.map(fetch, leftovers)):
+                    if payload:
+                        found[uid] = payload
+        return found
+
+    def _fetch_management(self, user_id):
+        try:
+            response = self._get(f'/api/v1/users/management/{user_id}/')
+            if response.status_code == 200:
+                return response.json()
+        except Exception as e:
+            logger.warning(f"⚠️ Management profile lookup for {user_id} failed: {e}")
+        return None
+
+    def store(self, payloads):
+        """
+        Upsert auth payloads into ExternalEmployee, matching rows by
+        external_employee_id, then email (one query for the lookup).
+        """
+        from .models import ExternalEmployee
+
+        if not payloads:
+            return
+        ext_ids = [p.get('id') for p in payloads if p.get('id') is not None]
+        emails = [p.get('email') for p in payloads if p.get('email')]
+        existing = ExternalEmployee.objects.filter(
+            Q(external_employee_id__in=ext_ids) | Q(email__in=emails)
+        )
+        by_ext = {e.external_employee_id: e for e in existing if e.external_employee_id is not None}
+        by_email = {e.email: e for e in existing}
+
+        for data in payloads:
+            obj = by_ext.get(data.get('id')) or by_email.get(data.get('email')) or ExternalEmployee()
+            if not (data.get('email') or obj.email):
+                continue
+            obj.email = data.get('email') or obj.email
+            obj.username = data.get('username') or obj.username
+            obj.first_name = data.get('first_name') or obj.first_name
+            obj.last_name = data.get('last_name') or obj.last_name
+            obj.middle_name = data.get('middle_name') or obj.middle_name
+            obj.suffix = data.get('suffix') or obj.suffix
+            obj.phone_number = data.get('phone_number') or obj.phone_number
+            obj.company_id = data.get('company_id') or data.get('employee_id') or obj.company_id
+            obj.department = data.get('department') or obj.department
+            obj.external_employee_id = data.get('id') or obj.external_employee_id
+            try:
+                obj.save()
+            except Exception as e:
+                logger.warning(f"⚠️ Failed to cache ExternalEmployee {obj.email}: {e}")
+
+    # ----------------------------------------------------------------- resolve
+
+    def resolve_many(self, user_ids, fetch_remote=True):
+        """
+        Resolve auth user ids to profile dicts.
+
+        Args:
+            user_ids: Iterable of ids (ints or numeric strings)
+            fetch_remote: If False, only the cache and local table are used;
+                unresolved ids are left out of the result (and not
+                negatively cached) so callers can queue a prefetch
+
+        Returns:
+            {user_id: profile}; ids known to be unknown map to {}
+        """
+        ids = _normalize_ids(user_ids)
+        if not ids:
+            return {}
+
+        result = {}
+        cached = cache.get_many([self._cache_key(uid) for uid in ids])
+        pending = []
+        for uid in ids:
+            value = cached.get(self._cache_key(uid))
+            if value == NOT_FOUND:
+                result[uid] = {}
+                self._count(negative_hits=1)
+            elif value is not None:
+                result[uid] = value
+                self._count(cache_hits=1)
+            else:
+                pending.append(uid)
+        if not pending:
+            return result
+
+        try:
+            local_rows = self._load_local(pending)
+        except Exception as e:
+            logger.warning(f"⚠️ ExternalEmployee lookup failed: {e}")
+            local_rows = {}
+
+        complete, fallback, unresolved = {}, {}, []
+        for uid in pending:
+            row = local_rows.get(uid)
+            if row is not None and row.company_id:
+                complete[uid] = profile_from_employee(row)
+            else:
+                if row is not None:
+                    # Rows without company_id are refreshed from auth when allowed
+                    fallback[uid] = profile_from_employee(row)
+                unresolved.append(uid)
+        self._count(local_hits=len(complete))
+        self._cache_profiles(complete)
+        result.update(complete)
+
+        if not unresolved:
+            return result
+        if not fetch_remote:
+            result.update(fallback)
+            return result
+
+        try:
+            payloads = self._fetch_remote(unresolved)
+        except Exception as e:
+            logger.warning(f"⚠️ Bulk profile fetch failed: {e}")
+            result.update(fallback)
+            return result
+
+        try:
+            self.store(list(payloads.values()))
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to persist fetched profiles: {e}")
+
+        fetched = {uid: profile_from_auth(data) for uid, data in payloads.items()}
+        stale = {uid: p for uid, p in fallback.items() if uid not in fetched}
+        not_found = [uid for uid in unresolved if uid not in fetched and uid not in stale]
+
+        self._cache_profiles({**fetched, **stale})
+        self._cache_not_found(not_found)
+        self._count(remote_hits=len(fetched), local_hits=len(stale), misses=len(not_found))
+
+        result.update(fetched)
+        result.update(stale)
+        result.update({uid: {} for uid in not_found})
+        return result
+
+    def resolve(self, user_id, fetch_remote=True):
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return {}
+        return self.resolve_many([user_id], fetch_remote=fetch_remote).get(user_id, {})
+
+
+profile_resolver = ExternalProfileResolver()
+
+
+def resolve_many(user_ids, fetch_remote=True):
+    """Module-level shortcut for profile_resolver.resolve_many()."""
+    return profile_resolver.resolve_many(user_ids, fetch_remote=fetch_remote)
+
+
+def queue_prefetch(user_ids):
+    """Warm the profile cache in the background; never raises."""
+    ids = _normalize_ids(user_ids)
+    if not ids:
+        return
+    try:
+        from .tasks import prefetch_external_profiles
+        prefetch_external_profiles.delay(ids)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not queue profile prefetch: {e}")
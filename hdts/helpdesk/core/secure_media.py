@@ -1,5 +1,4 @@
 import os
-import mimetypes
 from django.http import HttpResponse, Http404, HttpResponseForbidden
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
@@ -12,6 +11,7 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from django.contrib.auth import get_user_model
 from .models import TicketAttachment, Ticket
+from .file_serving import guess_content_type, serve_file
 import logging
 
 logger = logging.getLogger(__name__)
@@ -98,31 +98,11 @@ def serve_media_file(file_path, request, skip_auth_check=False):
     if not os.path.exists(full_path):
         raise Http404("File not found")
     
-    # Determine content type
-    content_type, _ = mimetypes.guess_type(full_path)
-    if not content_type:
-        content_type = 'application/octet-stream'
-    
-    # Get file info
+    content_type = guess_content_type(full_path)
     filename = os.path.basename(full_path)
-    file_size = os.path.getsize(full_path)
     
-    # Read and serve file
+    # Stream the file (Range / conditional requests handled by serve_file)
     try:
-        with open(full_path, 'rb') as f:
-            file_data = f.read()
-        
-        response = HttpResponse(file_data, content_type=content_type)
-        
-        # Set CORS headers for frontend access
-        response["Access-Control-Allow-Origin"] = "*"
-        response["Access-Control-Allow-Headers"] = "Authorization, Range, X-API-Key"
-        response["Access-Control-Expose-Headers"] = "Content-Range, Content-Length, Content-Disposition"
-        
-        # Set file info headers
-        response["Content-Length"] = file_size
-        response["X-Served-By"] = "django-secure-media"
-        
         # Set Content-Disposition based on file type
         file_ext = os.path.splitext(filename)[1].lower()
         
@@ -138,10 +118,18 @@ def serve_media_file(file_path, request, skip_auth_check=False):
         
         # Check if file should be downloaded or displayed inline
         if content_type in download_types or file_ext in download_extensions:
-            response["Content-Disposition"] = f'attachment; filename="{filename}"'
+            disposition = 'attachment'
         else:
             # Display inline for images, PDFs, and other viewable content
-            response["Content-Disposition"] = f'inline; filename="{filename}"'
+            disposition = 'inline'
+        
+        response = serve_file(request, full_path, content_type=content_type, disposition=disposition)
+        
+        # Set CORS headers for frontend access
+        response["Access-Control-Allow-Origin"] = "*"
+        response["Access-Control-Allow-Headers"] = "Authorization, Range, If-None-Match, If-Modified-Since, X-API-Key"
+        response["Access-Control-Expose-Headers"] = "Content-Range, Content-Length, Content-Disposition, Accept-Ranges, ETag"
+        response["X-Served-By"] = "django-secure-media"
         
         return response
         
@@ -202,17 +190,7 @@ def secure_attachment_download(request, attachment_id):
         
         file_path = attachment.file.path
         if os.path.exists(file_path):
-            with open(file_path, 'rb') as fh:
-                file_data = fh.read()
-            
-            content_type, _ = mimetypes.guess_type(file_path)
-            if not content_type:
-                content_type = 'application/octet-stream'
-            
-            response = HttpResponse(file_data, content_type=content_type)
-            response['Content-Disposition'] = f'attachment; filename="{attachment.file_name}"'
-            response['Content-Length'] = len(file_data)
-            return response
+            return serve_file(request, file_path, filename=attachment.file_name, disposition='attachment')
         else:
             raise Http404("File not found")
             
@@ -1,6 +1,4 @@
 from celery import shared_task
-from django.utils import timezone
-from datetime import timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,6 +8,11 @@ def push_ticket_to_workflow(ticket_data):
     # This will be picked up and executed by `workflow_api`
     pass
 
+@shared_task(name='tickets.tasks.receive_ticket_batch')
+def push_tickets_to_workflow(tickets_data):
+    # Executed by `workflow_api`: a list of receive_ticket payloads (see core.workflow_push)
+    pass
+
 @shared_task(name='send_ticket_status')
 def update_ticket_status_from_queue(ticket_number, new_status):
     from .models import Ticket
@@ -21,52 +24,24 @@ def update_ticket_status_from_queue(ticket_number, new_status):
     except Ticket.DoesNotExist:
         print(f"Ticket with ticket_number {ticket_number} does not exist")
 
+@shared_task(name='tickets.tasks.receive_ticket_status_batch')
+def push_ticket_statuses_to_workflow(updates):
+    # Executed by `workflow_api`: [{'ticket_number': ..., 'status': ...}, ...]
+    pass
+
 @shared_task(name='auto_close_resolved_tickets')
 def auto_close_resolved_tickets():
     """
     Automatically close tickets that have been in 'Resolved' status for 72 hours or more.
     Sets date_completed but does NOT set csat_rating or feedback (only manual close does that).
+    Closes in set-based batches; see core.auto_close.
     """
-    from .models import Ticket, TicketComment
-    
-    # Calculate the cutoff time (72 hours ago)
-    cutoff_time = timezone.now() - timedelta(hours=72)
-    
-    # Find all tickets that are Resolved and have been updated more than 72 hours ago
-    resolved_tickets = Ticket.objects.filter(
-        status='Resolved',
-        update_date__lte=cutoff_time
+    from .auto_close import close_resolved_tickets
+
+    result = close_resolved_tickets()
+    return f"Auto-closed {result['closed']} tickets in {result['batches']} batches" + (
+        " (more pending)" if result['remaining'] else ""
     )
-    
-    closed_count = 0
-    for ticket in resolved_tickets:
-        try:
-            ticket.status = 'Closed'
-            ticket.time_closed = timezone.now()
-            ticket.date_completed = timezone.now()
-            
-            # Calculate resolution time if not already set
-            if ticket.submit_date and not ticket.resolution_time:
-                ticket.resolution_time = timezone.now() - ticket.submit_date
-            
-            ticket.save()
-            
-            # Add a comment noting the auto-closure
-            TicketComment.objects.create(
-                ticket=ticket,
-                user=None,
-                comment="Ticket automatically closed after 72 hours in Resolved status.",
-                is_internal=False
-            )
-            
-            closed_count += 1
-            print(f"Auto-closed ticket {ticket.ticket_number}")
-            
-        except Exception as e:
-            print(f"Error auto-closing ticket {ticket.ticket_number}: {e}")
-            continue
-    
-    return f"Auto-closed {closed_count} tickets"
 
 
 @shared_task(name='hdts.tasks.sync_hdts_employee')
@@ -285,53 +260,26 @@ def process_hdts_employee_sync(employee_data):
 @shared_task(name='core.tasks.prefetch_external_profiles')
 def prefetch_external_profiles(user_ids):
     """
-    Given a list of external user IDs (external_user_id from auth), fetch each
-    from the auth internal endpoint and upsert into ExternalEmployee. This
+    Given a list of external user IDs (external_user_id from auth), fetch them
+    from the auth bulk endpoint and upsert into ExternalEmployee. This
     runs asynchronously to warm the cache and avoid blocking web requests.
     """
     try:
         from django.conf import settings
-        import requests
-        from .models import ExternalEmployee
+        from .profile_resolver import profile_resolver
 
-        auth_service = getattr(settings, 'DJANGO_AUTH_SERVICE', None)
-        if not auth_service:
+        if not getattr(settings, 'DJANGO_AUTH_SERVICE', None):
             return {'status': 'no-auth-service'}
 
-        results = []
-        for uid in (user_ids or []):
-            try:
-                api_url = f"{auth_service}/api/v1/hdts/employees/internal/{uid}/"
-                r = requests.get(api_url, timeout=5)
-                if r.status_code == 200:
-                    data = r.json()
-                    # Reuse existing sync processor to upsert
-                    try:
-                        process_hdts_employee_sync({
-                            'action': 'update',
-                            'employee_id': data.get('id'),
-                            'user_id': data.get('id'),
-                            'email': data.get('email'),
-                            'username': data.get('username'),
-                            'first_name': data.get('first_name'),
-                            'last_name': data.get('last_name'),
-                            'middle_name': data.get('middle_name'),
-                            'suffix': data.get('suffix'),
-                            'phone_number': data.get('phone_number'),
-                            'company_id': data.get('company_id'),
-                            'department': data.get('department'),
-                            'status': data.get('status'),
-                            'profile_picture': data.get('profile_picture'),
-                        })
-                        results.append({'id': uid, 'status': 'cached'})
-                    except Exception as _e:
-                        results.append({'id': uid, 'status': 'error', 'error': str(_e)})
-                else:
-                    results.append({'id': uid, 'status': 'not_found', 'code': r.status_code})
-            except Exception as e:
-                results.append({'id': uid, 'status': 'request_error', 'error': str(e)})
+        # Drop cached entries so rows without company_id are refreshed too
+        profile_resolver.invalidate(user_ids)
+        profiles = profile_resolver.resolve_many(user_ids, fetch_remote=True)
 
-        return {'status': 'completed', 'results': results}
+        results = [
+            {'id': uid, 'status': 'cached' if profile else 'not_found'}
+            for uid, profile in profiles.items()
+        ]
+        return {'status': 'completed', 'results': results, 'stats': profile_resolver.stats()}
     except Exception as e:
         logger.exception('prefetch_external_profiles failed')
         return {'status': 'failed', 'error': str(e)}
@@ -1,3 +1,530 @@
-from django.test import TestCase
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import Mock, PropertyMock, patch
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from .auto_close import AUTO_CLOSE_COMMENT, close_resolved_tickets
+from .file_serving import RangeFile, _multipart_length, parse_range_header, serve_file
+from .models import ExternalEmployee, Ticket, TicketComment, TicketNumberCounter
+from .profile_resolver import CACHE_KEY_PREFIX, NOT_FOUND, ExternalProfileResolver
+from .ticket_numbers import TicketNumberAllocator, ticket_number_allocator
+from .workflow_push import batched_workflow_push, push_ticket_batches
+
+
+@patch('core.tasks.push_ticket_statuses_to_workflow.delay')
+class AutoCloseResolvedTicketsTests(TestCase):
+    """Tests for the set-based auto-close of Resolved tickets"""
+
+    TICKETS = 10500
+    BATCH_SIZE = 2000
+
+    def setUp(self):
+        self.now = timezone.now()
+        self.old = self.now - timedelta(hours=80)
+
+    def _tickets(self, count, status='Resolved', update_date=None, prefix='TX', **extra):
+        Ticket.objects.bulk_create([
+            Ticket(ticket_number=f'{prefix}{i:06d}', subject='s', category='c', description='d', status=status, **extra)
+            for i in range(count)
+        ], batch_size=1000)
+        Ticket.objects.filter(ticket_number__startswith=prefix).update(
+            update_date=update_date or self.old,
+            submit_date=self.now - timedelta(days=5),
+        )
+
+    def test_closes_10k_tickets_in_bounded_batches(self, mock_sync):
+        """Test that 10k+ tickets close with one UPDATE and one status sync per batch"""
+        self._tickets(self.TICKETS)
+        self._tickets(5, update_date=self.now - timedelta(hours=1), prefix='RECENT')
+        self._tickets(5, status='In Progress', prefix='OPEN')
+
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            result = close_resolved_tickets(now=self.now, batch_size=self.BATCH_SIZE)
+
+        batches = -(-self.TICKETS // self.BATCH_SIZE)
+        self.assertEqual(result, {'closed': self.TICKETS, 'batches': batches, 'remaining': False})
+        sql = [q['sql'] for q in queries.captured_queries]
+        self.assertEqual(len([q for q in sql if q.startswith('UPDATE "core_ticket"')]), batches)
+        # Bulk inserts may be split by the backend's parameter limit, but
+        # nothing runs per ticket
+        self.assertLess(len(sql), self.TICKETS // 20)
+
+        closed = Ticket.objects.filter(status='Closed')
+        self.assertEqual(closed.count(), self.TICKETS)
+        self.assertFalse(closed.filter(time_closed__isnull=True).exists())
+        self.assertEqual(closed.filter(resolution_time=timedelta(days=5)).count(), self.TICKETS)
+        self.assertEqual(TicketComment.objects.filter(comment=AUTO_CLOSE_COMMENT).count(), self.TICKETS)
+        self.assertEqual(Ticket.objects.filter(status='Resolved').count(), 5)
+
+        self.assertEqual(mock_sync.call_count, batches)
+        synced = [u['ticket_number'] for call in mock_sync.call_args_list for u in call.args[0]]
+        self.assertEqual(len(synced), self.TICKETS)
+        self.assertEqual(len(set(synced)), self.TICKETS)
+
+    def test_existing_resolution_time_is_kept(self, mock_sync):
+        """Test that resolution_time is only computed when missing"""
+        self._tickets(3, resolution_time=timedelta(hours=2))
+
+        close_resolved_tickets(now=self.now)
+
+        self.assertEqual(
+            set(Ticket.objects.values_list('resolution_time', flat=True)), {timedelta(hours=2)}
+        )
+
+    def test_max_batches_leaves_rest_for_next_run(self, mock_sync):
+        """Test that a run stops after max_batches and the next run finishes"""
+        self._tickets(25)
+
+        first = close_resolved_tickets(now=self.now, batch_size=10, max_batches=2)
+        second = close_resolved_tickets(now=self.now + timedelta(minutes=1), batch_size=10, max_batches=2)
+
+        self.assertEqual(first, {'closed': 20, 'batches': 2, 'remaining': True})
+        self.assertEqual(second, {'closed': 5, 'batches': 1, 'remaining': False})
+
+    def test_interrupted_run_resumes_without_duplicates(self, mock_sync):
+        """Test that a failed batch rolls back and a rerun closes the rest exactly once"""
+        self._tickets(30)
+        real_bulk_create = TicketComment.objects.bulk_create
+        calls = []
+
+        def flaky_bulk_create(objs, *args, **kwargs):
+            calls.append(len(objs))
+            if len(calls) == 2:
+                raise RuntimeError('worker killed')
+            return real_bulk_create(objs, *args, **kwargs)
+
+        with patch.object(TicketComment.objects, 'bulk_create', side_effect=flaky_bulk_create):
+            with self.assertRaises(RuntimeError):
+                close_resolved_tickets(now=self.now, batch_size=10)
+
+        self.assertEqual(Ticket.objects.filter(status='Closed').count(), 10)
+        self.assertEqual(TicketComment.objects.count(), 10)
+
+        result = close_resolved_tickets(now=self.now + timedelta(minutes=1), batch_size=10)
+
+        self.assertEqual(result['closed'], 20)
+        self.assertFalse(Ticket.objects.filter(status='Resolved').exists())
+        self.assertEqual(TicketComment.objects.count(), 30)
+        self.assertEqual(TicketComment.objects.values('ticket').distinct().count(), 30)
+
+
+@override_settings(TICKET_NUMBER_BLOCK_SIZE=50)
+@patch('core.tasks.push_tickets_to_workflow.delay')
+@patch('core.tasks.push_ticket_to_workflow.delay')
+class WorkflowPushTests(TestCase):
+    """Tests for sending Open tickets to the workflow API one by one and in batches"""
+
+    def _open_tickets(self, count):
+        tickets = []
+        for i in range(count):
+            ticket = Ticket.objects.create(subject=f's{i}', category='c', description='d', status='New')
+            ticket.status = 'Open'
+            ticket.save()
+            tickets.append(ticket)
+        return tickets
+
+    def test_opened_ticket_is_sent_alone(self, mock_single, mock_batch):
+        ticket, = self._open_tickets(1)
+
+        mock_single.assert_called_once()
+        payload = mock_single.call_args.args[0]
+        self.assertEqual((payload['ticket_number'], payload['status'], payload['attachments']),
+                         (ticket.ticket_number, 'Open', []))
+        mock_batch.assert_not_called()
+
+    def test_batched_block_sends_chunks_after_commit(self, mock_single, mock_batch):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with batched_workflow_push(batch_size=2):
+                tickets = self._open_tickets(5)
+                with batched_workflow_push():  # nested blocks join the outer one
+                    tickets += self._open_tickets(1)
+                mock_batch.assert_not_called()
+
+        self.assertEqual(len(callbacks), 1)
+        mock_single.assert_not_called()
+        sent = [[payload['ticket_number'] for payload in call.args[0]] for call in mock_batch.call_args_list]
+        self.assertEqual([len(chunk) for chunk in sent], [2, 2, 2])
+        self.assertEqual(sum(sent, []), [ticket.ticket_number for ticket in tickets])
+
+    def test_failed_block_sends_nothing(self, mock_single, mock_batch):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with batched_workflow_push():
+                    self._open_tickets(2)
+                    raise RuntimeError('import failed')
+            self._open_tickets(1)
+
+        mock_batch.assert_not_called()
+        self.assertEqual(mock_single.call_count, 1)
+
+    def test_enqueue_failure_is_reported(self, mock_single, mock_batch):
+        mock_batch.side_effect = [None, ConnectionError('broker down')]
+        self.assertEqual(push_ticket_batches([{'id': i} for i in range(3)], batch_size=2), 2)
+
+    @override_settings(WORKFLOW_PUSH_BATCH_SIZE=2)
+    def test_resync_command_sends_open_tickets_in_batches(self, mock_single, mock_batch):
+        tickets = self._open_tickets(3)
+        Ticket.objects.create(subject='closed', category='c', description='d', status='Closed')
+
+        with self.assertNumQueries(2):
+            call_command('push_open_tickets_to_workflow', stdout=StringIO())
+
+        self.assertEqual([[payload['id'] for payload in call.args[0]] for call in mock_batch.call_args_list],
+                         [[tickets[0].id, tickets[1].id], [tickets[2].id]])
+
+
+class TicketNumberAllocatorTests(TransactionTestCase):
+    """Tests for counter-backed ticket numbers (no exists() probing)"""
+
+    def setUp(self):
+        ticket_number_allocator.reset()
+        self.day = timezone.now().strftime('%Y%m%d')
+
+    def _ticket(self):
+        return Ticket.objects.create(subject='s', category='c', description='d')
+
+    def test_format_and_one_counter_update_per_block(self):
+        """Test that numbers are TX<yyyymmdd><n> and only block reservations hit the database"""
+        with CaptureQueriesContext(connection) as queries:
+            numbers = [self._ticket().ticket_number for _ in range(120)]
+
+        self.assertEqual(numbers[:2], [f'TX{self.day}000001', f'TX{self.day}000002'])
+        self.assertEqual(len(set(numbers)), 120)
+        counter_sql = [q['sql'] for q in queries.captured_queries if 'core_ticketnumbercounter' in q['sql']]
+        self.assertEqual(len([q for q in counter_sql if q.startswith('UPDATE')]), 3)
+        # Only the once-per-day scan for numbers issued before the counter existed
+        ticket_selects = [q['sql'] for q in queries.captured_queries
+                          if q['sql'].startswith('SELECT') and 'FROM "core_ticket"' in q['sql']]
+        self.assertEqual(len(ticket_selects), 1)
+        self.assertIn('LIKE', ticket_selects[0])
+
+    def test_concurrent_inserts_get_distinct_numbers(self):
+        """Test that threads and separate allocators (one per worker) never collide"""
+        workers = [TicketNumberAllocator(block_size=7) for _ in range(3)]
+        numbers, errors = [], []
+        lock = threading.Lock()
+        # SQLite's shared-cache test database rejects concurrent writers
+        # outright ("table is locked"), so there DB access is serialized;
+        # threads and workers still interleave between inserts.
+        db_lock = threading.Lock() if connection.vendor == 'sqlite' else contextlib.nullcontext()
+
+        def insert(allocator):
+            try:
+                for _ in range(40):
+                    with db_lock:
+                        number = allocator.allocate()[0]
+                        Ticket.objects.create(ticket_number=number, subject='s', category='c', description='d')
+                    with lock:
+                        numbers.append(number)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=insert, args=(workers[i % 3],)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(numbers), 240)
+        self.assertEqual(len(set(numbers)), 240)
+        self.assertEqual(Ticket.objects.count(), 240)
+
+    def test_rolled_back_transaction_keeps_no_leftovers(self):
+        """Test that numbers reserved in a rolled-back transaction are not reused by this process"""
+        other_worker = TicketNumberAllocator()
+        try:
+            with transaction.atomic():
+                rolled_back = self._ticket().ticket_number
+                raise RuntimeError('rollback')
+        except RuntimeError:
+            pass
+
+        reissued = other_worker.allocate()[0]
+        self.assertEqual(reissued, rolled_back)
+        self.assertNotEqual(self._ticket().ticket_number, reissued)
+
+    def test_continues_after_numbers_issued_today(self):
+        """Test that a new day's counter starts above suffixes already in use"""
+        Ticket.objects.create(ticket_number=f'TX{self.day}000500', subject='s', category='c', description='d')
+
+        self.assertEqual(self._ticket().ticket_number, f'TX{self.day}000501')
+        self.assertEqual(TicketNumberCounter.objects.get(day=self.day).last_value, 550)
+
+
+def _response(status_code, body=None):
+    response = Mock(status_code=status_code)
+    response.json.return_value = body or {}
+    return response
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    DJANGO_AUTH_SERVICE='http://auth.test',
+    INTERNAL_SERVICE_API_KEY='internal-key',
+    EXTERNAL_PROFILE_BULK_SIZE=2,
+)
+class ExternalProfileResolverTests(TestCase):
+    """Tests for the cache / local table / auth service lookup order of resolve_many"""
+
+    def setUp(self):
+        cache.clear()
+        self.resolver = ExternalProfileResolver()
+        self.session = Mock()
+        # Per-id lookups run on pool threads, each with its own session
+        patcher = patch.object(ExternalProfileResolver, 'session', new_callable=PropertyMock,
+                               return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _bulk(self, *payloads, missing=()):
+        return _response(200, {'results': list(payloads), 'missing': list(missing)})
+
+    def test_cache_hit_skips_database_and_network(self):
+        """Test that cached profiles and negative entries are served from one get_many"""
+        cache.set(f'{CACHE_KEY_PREFIX}1', {'id': 1, 'first_name': 'Ana'})
+        cache.set(f'{CACHE_KEY_PREFIX}2', NOT_FOUND)
+
+        with self.assertNumQueries(0):
+            result = self.resolver.resolve_many([1, '2', 1])
+
+        self.assertEqual(result, {1: {'id': 1, 'first_name': 'Ana'}, 2: {}})
+        self.session.get.assert_not_called()
+        stats = self.resolver.stats()
+        self.assertEqual(stats['cache_hits'], 1)
+        self.assertEqual(stats['negative_hits'], 1)
+
+    def test_local_rows_resolve_in_one_query(self):
+        """Test that complete ExternalEmployee rows are used and cached without a remote call"""
+        ExternalEmployee.objects.create(email='a@x.test', first_name='Ana', company_id='MA0001', external_user_id=7)
+        ExternalEmployee.objects.create(email='b@x.test', first_name='Ben', company_id='MA0002', external_employee_id=8)
+
+        with self.assertNumQueries(1):
+            result = self.resolver.resolve_many([7, 8])
+
+        self.assertEqual(result[7]['first_name'], 'Ana')
+        self.assertEqual(result[8]['company_id'], 'MA0002')
+        self.session.get.assert_not_called()
+        self.assertEqual(self.resolver.stats()['local_hits'], 2)
+        self.assertEqual(cache.get(f'{CACHE_KEY_PREFIX}7')['email'], 'a@x.test')
+
+    def test_remote_bulk_fetch_and_negative_cache(self):
+        """Test that unknown ids are fetched in bulk chunks with the service key, and misses cached"""
+        self.session.get.side_effect = [
+            self._bulk({'id': 1, 'first_name': 'Ana', 'email': 'a@x.test', 'company_id': 'MA0001'}, missing=[2]),
+            self._bulk({'id': 3, 'first_name': 'Cy', 'email': 'c@x.test', 'company_id': 'MA0003'}),
+            _response(404),  # management lookup for id 2
+        ]
+
+        result = self.resolver.resolve_many([1, 2, 3])
+
+        self.assertEqual(result[1]['first_name'], 'Ana')
+        self.assertEqual(result[3]['company_id'], 'MA0003')
+        self.assertEqual(result[2], {})
+        bulk_call = self.session.get.call_args_list[0]
+        self.assertEqual(bulk_call.args[0], 'http://auth.test/api/v1/hdts/employees/internal/bulk/')
+        self.assertEqual(bulk_call.kwargs['params'], {'ids': '1,2'})
+        self.assertEqual(bulk_call.kwargs['headers'], {'X-API-Key': 'internal-key'})
+        self.assertTrue(ExternalEmployee.objects.filter(email='c@x.test', external_employee_id=3).exists())
+        self.assertEqual(self.resolver.stats(), {
+            'cache_hits': 0, 'negative_hits': 0, 'local_hits': 0,
+            'remote_hits': 2, 'remote_requests': 3, 'misses': 1,
+        })
+
+        # Second pass is answered by the cache, including the negative entry
+        self.session.get.reset_mock()
+        self.assertEqual(self.resolver.resolve_many([1, 2, 3]), result)
+        self.session.get.assert_not_called()
+        self.assertEqual(self.resolver.stats()['cache_hits'], 2)
+        self.assertEqual(self.resolver.stats()['negative_hits'], 1)
+
+    def test_rejected_service_key_falls_back_to_per_id_lookups(self):
+        """Test that a 403 from the bulk endpoint is treated like an older auth deployment"""
+        self.session.get.side_effect = [
+            _response(403),
+            _response(200, {'id': 5, 'first_name': 'Eve', 'email': 'e@x.test'}),
+        ]
+
+        with self.assertLogs('core.profile_resolver', level='ERROR') as logs:
+            result = self.resolver.resolve_many([5])
+
+        self.assertEqual(result[5]['first_name'], 'Eve')
+        self.assertEqual(self.session.get.call_args_list[1].args[0],
+                         'http://auth.test/api/v1/hdts/employees/internal/5/')
+        self.assertIn('INTERNAL_SERVICE_API_KEY', logs.output[0])
+
+    @override_settings(INTERNAL_SERVICE_API_KEY='')
+    def test_missing_service_key_skips_bulk_endpoint(self):
+        """Test that without a key no doomed bulk request is sent and the problem is logged once"""
+        self.session.get.side_effect = [
+            _response(200, {'id': 5, 'first_name': 'Eve', 'email': 'e@x.test'}),
+            _response(200, {'id': 6, 'first_name': 'Fay', 'email': 'f@x.test'}),
+        ]
+
+        with self.assertLogs('core.profile_resolver', level='ERROR') as logs:
+            self.resolver.resolve_many([5])
+            self.resolver.resolve_many([6])
+
+        self.assertEqual([call.args[0] for call in self.session.get.call_args_list], [
+            'http://auth.test/api/v1/hdts/employees/internal/5/',
+            'http://auth.test/api/v1/hdts/employees/internal/6/',
+        ])
+        self.assertEqual(len(logs.output), 1)
+
+    def test_without_fetch_remote_misses_are_left_for_prefetch(self):
+        """Test that fetch_remote=False returns local fallbacks and does not cache misses"""
+        ExternalEmployee.objects.create(email='p@x.test', first_name='Pat', external_user_id=9)
+
+        result = self.resolver.resolve_many([9, 10], fetch_remote=False)
+
+        self.assertEqual(result, {9: result[9]})
+        self.assertEqual(result[9]['first_name'], 'Pat')
+        self.session.get.assert_not_called()
+        self.assertIsNone(cache.get(f'{CACHE_KEY_PREFIX}10'))
+        self.assertEqual(self.resolver.stats()['misses'], 0)
+
+    def test_remote_failure_keeps_local_fallback(self):
+        """Test that transport errors return incomplete local rows instead of raising"""
+        ExternalEmployee.objects.create(email='p@x.test', first_name='Pat', external_user_id=9)
+        self.session.get.side_effect = ConnectionError('auth down')
+
+        result = self.resolver.resolve_many([9])
+
+        self.assertEqual(result[9]['first_name'], 'Pat')
+        self.assertIsNone(cache.get(f'{CACHE_KEY_PREFIX}9'))
+
+
+class FileServingTests(SimpleTestCase):
+    """Tests for Range, multipart/byteranges, conditional and X-Accel handling in serve_file"""
+
+    CONTENT = bytes(range(256)) * 40  # 10240 bytes
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.path = os.path.join(self.media_root, 'attachments', 'report.pdf')
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'wb') as f:
+            f.write(self.CONTENT)
+        self.factory = RequestFactory()
+
+    def _serve(self, **headers):
+        response = serve_file(self.factory.get('/media/attachments/report.pdf', **headers), self.path)
+        self.addCleanup(response.close)
+        return response
+
+    def _body(self, response):
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def test_parse_range_header(self):
+        self.assertEqual(parse_range_header('bytes=0-99', 1000), [(0, 99)])
+        self.assertEqual(parse_range_header('bytes=900-', 1000), [(900, 999)])
+        self.assertEqual(parse_range_header('bytes=-100', 1000), [(900, 999)])
+        self.assertEqual(parse_range_header('bytes=990-2000', 1000), [(990, 999)])
+        self.assertEqual(parse_range_header('bytes=0-1,5-6', 1000), [(0, 1), (5, 6)])
+        self.assertEqual(parse_range_header('bytes=1000-1100', 1000), [])
+        self.assertIsNone(parse_range_header(None, 1000))
+        self.assertIsNone(parse_range_header('bytes=5-1', 1000))
+        self.assertIsNone(parse_range_header('items=0-1', 1000))
+        self.assertIsNone(parse_range_header('bytes=' + ','.join(['0-1'] * 17), 1000))
+
+    def test_range_file_is_bounded(self):
+        with open(self.path, 'rb') as f:
+            part = RangeFile(f, 100, 50)
+            self.assertEqual(part.read(20), self.CONTENT[100:120])
+            self.assertEqual(part.read(), self.CONTENT[120:150])
+            self.assertEqual(part.read(), b'')
+            self.assertEqual(part.fileno(), f.fileno())
+
+    def test_full_download(self):
+        response = self._serve()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Length'], str(len(self.CONTENT)))
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self._body(response), self.CONTENT)
+
+    def test_single_range(self):
+        response = self._serve(HTTP_RANGE='bytes=100-299')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-299/{len(self.CONTENT)}')
+        self.assertEqual(response['Content-Length'], '200')
+        self.assertEqual(self._body(response), self.CONTENT[100:300])
+
+    def test_suffix_range(self):
+        response = self._serve(HTTP_RANGE='bytes=-500')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 9740-10239/{len(self.CONTENT)}')
+        self.assertEqual(self._body(response), self.CONTENT[-500:])
+
+    def test_multiple_ranges_stream_multipart_with_exact_length(self):
+        response = self._serve(HTTP_RANGE='bytes=0-9,5000-70000')
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response['Content-Type'].startswith('multipart/byteranges; boundary='))
+        boundary = response['Content-Type'].split('boundary=')[1]
+
+        body = self._body(response)
+        self.assertEqual(len(body), int(response['Content-Length']))
+        self.assertEqual(len(body), _multipart_length([(0, 9), (5000, 10239)], len(self.CONTENT),
+                                                      'application/pdf', boundary))
+        parts = body.split(f'--{boundary}'.encode())
+        self.assertEqual(len(parts), 4)  # preamble, two parts, closing '--'
+        self.assertIn(f'Content-Range: bytes 0-9/{len(self.CONTENT)}'.encode(), parts[1])
+        self.assertTrue(parts[1].endswith(b'\r\n\r\n' + self.CONTENT[:10] + b'\r\n'))
+        self.assertTrue(parts[2].endswith(b'\r\n\r\n' + self.CONTENT[5000:] + b'\r\n'))
+
+    def test_unsatisfiable_range(self):
+        response = self._serve(HTTP_RANGE='bytes=20000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.CONTENT)}')
+
+    def test_not_modified(self):
+        first = self._serve()
+        etag, last_modified = first['ETag'], first['Last-Modified']
+
+        self.assertEqual(self._serve(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self._serve(HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+        self.assertEqual(self._serve(HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_if_range_mismatch_serves_full_file(self):
+        etag = self._serve()['ETag']
+
+        matched = self._serve(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag)
+        self.assertEqual(matched.status_code, 206)
+
+        stale = self._serve(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale-etag"')
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(self._body(stale), self.CONTENT)
+
+        old_date = self._serve(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=http_date(0))
+        self.assertEqual(old_date.status_code, 200)
+
+    def test_x_accel_redirect(self):
+        with override_settings(MEDIA_ROOT=self.media_root, SECURE_MEDIA_X_ACCEL_REDIRECT='/protected-media/'):
+            response = self._serve(HTTP_RANGE='bytes=0-9')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/attachments/report.pdf')
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+
+        # Files outside MEDIA_ROOT are never handed to nginx
+        with override_settings(MEDIA_ROOT=os.path.join(self.media_root, 'other'),
+                               SECURE_MEDIA_X_ACCEL_REDIRECT='/protected-media/'):
+            response = self._serve()
+        self.assertNotIn('X-Accel-Redirect', response)
+        self.assertEqual(self._body(response), self.CONTENT)
@@ -0,0 +1,112 @@
+"""
+Ticket number allocation: TX<yyyymmdd><n>, n counting up per UTC day.
+
+Numbers come from TicketNumberCounter (one row per day) instead of random
+suffixes probed with exists(). Each process reserves a block of
+TICKET_NUMBER_BLOCK_SIZE numbers with one UPDATE and hands them out from
+memory, so inserts normally cost no extra query and two workers can never
+pick the same number. Unused numbers of a block are simply skipped.
+
+A block reserved inside an outer transaction.atomic() would be given back
+if that transaction rolled back while this process still held it, so in
+that case only the numbers needed right now are reserved.
+"""
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+PREFIX = 'TX'
+
+
+def format_ticket_number(day, n):
+    return f"{PREFIX}{day}{n:06d}"
+
+
+def _highest_issued(day):
+    """Largest suffix already used for the day (tickets numbered before the counter existed)."""
+    from .models import Ticket
+
+    prefix = f"{PREFIX}{day}"
+    highest = 0
+    for number in Ticket.objects.filter(ticket_number__startswith=prefix).values_list('ticket_number', flat=True).iterator():
+        suffix = number[len(prefix):]
+        if suffix.isdigit():
+            highest = max(highest, int(suffix))
+    return highest
+
+
+def reserve_block(day, size):
+    """
+    Reserve `size` consecutive numbers for `day` ('YYYYMMDD').
+
+    Returns:
+        (first, last) inclusive
+    """
+    from .models import TicketNumberCounter
+
+    with transaction.atomic():
+        counters = TicketNumberCounter.objects.filter(day=day)
+        if not counters.update(last_value=F('last_value') + size):
+            try:
+                with transaction.atomic():
+                    TicketNumberCounter.objects.create(day=day, last_value=_highest_issued(day) + size)
+            except IntegrityError:
+                # Another worker created today's row first
+                counters.update(last_value=F('last_value') + size)
+        last = counters.values_list('last_value', flat=True).get()
+    return last - size + 1, last
+
+
+class TicketNumberAllocator:
+    """Hands out ticket numbers from per-process blocks (thread-safe)."""
+
+    def __init__(self, block_size=None):
+        self._block_size = block_size
+        self._lock = threading.Lock()
+        self._day = None
+        self._next = self._end = 0
+
+    @property
+    def block_size(self):
+        return max(1, self._block_size or getattr(settings, 'TICKET_NUMBER_BLOCK_SIZE', 50))
+
+    def reset(self):
+        with self._lock:
+            self._day = None
+            self._next = self._end = 0
+
+    def allocate(self, count=1):
+        """
+        Returns:
+            list of `count` unique ticket numbers for the current UTC day
+        """
+        day = timezone.now().strftime('%Y%m%d')
+        with self._lock:
+            if self._day != day:
+                self._day, self._next, self._end = day, 0, 0
+
+            numbers = []
+            while len(numbers) < count:
+                if self._next > self._end or not self._next:
+                    needed = count - len(numbers)
+                    if connection.in_atomic_block:
+                        # Never keep leftovers that a rollback could release
+                        first, last = reserve_block(day, needed)
+                        numbers.extend(format_ticket_number(day, n) for n in range(first, last + 1))
+                        break
+                    self._next, self._end = reserve_block(day, max(needed, self.block_size))
+                take = min(count - len(numbers), self._end - self._next + 1)
+                numbers.extend(format_ticket_number(day, n) for n in range(self._next, self._next + take))
+                self._next += take
+            return numbers
+
+
+ticket_number_allocator = TicketNumberAllocator()
+
+
+def allocate_ticket_numbers(count):
+    """Reserve numbers for bulk_create() (one query per block, not per ticket)."""
+    return ticket_number_allocator.allocate(count)
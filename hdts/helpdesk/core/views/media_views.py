@@ -1,12 +1,12 @@
 import os
-import mimetypes
-from django.http import FileResponse, Http404
+from django.http import Http404
 from django.conf import settings
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
 from ..authentication import CookieJWTAuthentication
+from ..file_serving import serve_file
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 
@@ -32,17 +32,10 @@ def serve_protected_media(request, file_path):
     if not os.path.exists(full_path) or not os.path.isfile(full_path):
         raise Http404("File not found")
     
-    # Determine content type
-    content_type, _ = mimetypes.guess_type(full_path)
-    if content_type is None:
-        content_type = 'application/octet-stream'
-    
-    # Open and serve the file
+    # Stream the file (Range / conditional requests supported)
     try:
-        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
-        response['Content-Disposition'] = f'inline; filename="{os.path.basename(full_path)}"'
-        return response
-    except Exception as e:
+        return serve_file(request, full_path)
+    except OSError as e:
         raise Http404(f"Error serving file: {str(e)}")
 
 
@@ -72,19 +65,14 @@ def serve_ticket_attachment(request, file_path):
     if not os.path.exists(full_path) or not os.path.isfile(full_path):
         raise Http404("File not found")
     
-    # Determine content type
-    content_type, _ = mimetypes.guess_type(full_path)
-    if content_type is None:
-        content_type = 'application/octet-stream'
-    
-    # Open and serve the file
+    # Stream the file (Range / conditional requests supported)
     try:
-        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
-        response['Content-Disposition'] = f'inline; filename="{os.path.basename(full_path)}"'
+        response = serve_file(request, full_path)
         # Add CORS headers for cross-origin access
         response['Access-Control-Allow-Origin'] = '*'
+        response['Access-Control-Expose-Headers'] = 'Content-Range, Content-Length, Accept-Ranges, ETag'
         return response
-    except Exception as e:
+    except OSError as e:
         raise Http404(f"Error serving file: {str(e)}")
 
 
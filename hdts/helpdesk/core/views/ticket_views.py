@@ -5,7 +5,7 @@ import traceback
 from datetime import datetime
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.http import FileResponse, Http404, HttpResponse
+from django.http import Http404, HttpResponse
 from django.conf import settings
 from rest_framework import viewsets, status
 from rest_framework.response import Response
@@ -18,7 +18,9 @@ from rest_framework.reverse import reverse
 from ..authentication import CookieJWTAuthentication, ExternalUser
 from ..models import Ticket, TicketAttachment, TicketComment, ActivityLog, PRIORITY_LEVELS, DEPARTMENT_CHOICES
 from ..serializers import TicketSerializer, TicketAttachmentSerializer
+from ..file_serving import serve_file
 from .permissions import IsAdminOrCoordinator, IsEmployeeOrAdmin
+from ..profile_resolver import queue_prefetch, resolve_many
 from .helpers import _actor_display_name, get_external_employee_data
 
 
@@ -281,11 +283,8 @@ def get_ticket_detail(request, ticket_id):
         }
 
         # Batch-resolve external profiles to avoid per-comment remote calls.
-        try:
-            from ..models import ExternalEmployee
-        except Exception:
-            ExternalEmployee = None
-
+        # Short-circuited statuses never wait on the auth service; their
+        # misses are prefetched in the background below.
         external_ids = set()
         if getattr(ticket, 'employee_cookie_id', None):
             external_ids.add(ticket.employee_cookie_id)
@@ -293,29 +292,11 @@ def get_ticket_detail(request, ticket_id):
             if not c.user and getattr(c, 'user_cookie_id', None):
                 external_ids.add(c.user_cookie_id)
 
-        cache_map = {}
-        if ExternalEmployee and external_ids:
-            try:
-                from django.db.models import Q
-                ids_list = list(external_ids)
-                # Query by both external_user_id and external_employee_id to find cached records
-                qs = ExternalEmployee.objects.filter(
-                    Q(external_user_id__in=ids_list) | Q(external_employee_id__in=ids_list)
-                )
-                for e in qs:
-                    profile = {
-                        'first_name': e.first_name,
-                        'last_name': e.last_name,
-                        'company_id': e.company_id,
-                        'department': e.department,
-                        'email': e.email,
-                    }
-                    if e.external_user_id:
-                        cache_map[int(e.external_user_id)] = profile
-                    if e.external_employee_id:
-                        cache_map[int(e.external_employee_id)] = profile
-            except Exception:
-                cache_map = {}
+        cache_map = {
+            uid: profile
+            for uid, profile in resolve_many(external_ids, fetch_remote=not short_circuit).items()
+            if profile
+        }
 
         # short_circuit already computed above
 
@@ -345,28 +326,16 @@ def get_ticket_detail(request, ticket_id):
                     'employee_cookie_id': cid
                 }
             else:
-                if short_circuit:
-                    # Provide minimal placeholder quickly
-                    employee_data = {
-                        'id': cid,
-                        'first_name': None,
-                        'last_name': None,
-                        'company_id': None,
-                        'department': None,
-                        'email': None,
-                        'employee_cookie_id': cid
-                    }
-                else:
-                    profile = get_external_employee_data(cid)
-                    employee_data = {
-                        'id': cid,
-                        'first_name': profile.get('first_name'),
-                        'last_name': profile.get('last_name'),
-                        'company_id': profile.get('company_id'),
-                        'department': profile.get('department'),
-                        'email': profile.get('email'),
-                        'employee_cookie_id': cid
-                    }
+                # Unknown to the auth service, or not fetched yet (short_circuit)
+                employee_data = {
+                    'id': cid,
+                    'first_name': None,
+                    'last_name': None,
+                    'company_id': None,
+                    'department': None,
+                    'email': None,
+                    'employee_cookie_id': cid
+                }
         else:
             employee_data = {
                 'id': None,
@@ -388,12 +357,7 @@ def get_ticket_detail(request, ticket_id):
                     missing.append(int(eid))
 
             if short_circuit and missing:
-                try:
-                    from ..tasks import prefetch_external_profiles
-                    prefetch_external_profiles.delay(missing)
-                except Exception:
-                    # Ignore prefetch failures; don't block the request
-                    pass
+                queue_prefetch(missing)
         except Exception:
             pass
         
@@ -527,13 +491,10 @@ def get_ticket_by_number(request, ticket_number):
             } if ticket.assigned_to else None,
         }
 
-        # Batch-resolve external profiles to avoid per-comment remote calls (same as get_ticket_detail)
-        try:
-            from ..models import ExternalEmployee
-            from django.db.models import Q
-        except Exception:
-            ExternalEmployee = None
+        # Short-circuit remote HTTP lookups for these statuses to speed up loading
+        short_circuit = getattr(ticket, 'status', '') in ('Open', 'Withdrawn', 'Closed', 'Rejected')
 
+        # Batch-resolve external profiles to avoid per-comment remote calls (same as get_ticket_detail)
         external_ids = set()
         if getattr(ticket, 'employee_cookie_id', None):
             external_ids.add(ticket.employee_cookie_id)
@@ -541,30 +502,13 @@ def get_ticket_by_number(request, ticket_number):
             if not c.user and getattr(c, 'user_cookie_id', None):
                 external_ids.add(c.user_cookie_id)
 
-        cache_map = {}
-        if ExternalEmployee and external_ids:
-            try:
-                ids_list = list(external_ids)
-                qs = ExternalEmployee.objects.filter(
-                    Q(external_user_id__in=ids_list) | Q(external_employee_id__in=ids_list)
-                )
-                for e in qs:
-                    profile = {
-                        'first_name': e.first_name,
-                        'last_name': e.last_name,
-                        'company_id': e.company_id,
-                        'department': e.department,
-                        'email': e.email,
-                    }
-                    if e.external_user_id:
-                        cache_map[int(e.external_user_id)] = profile
-                    if e.external_employee_id:
-                        cache_map[int(e.external_employee_id)] = profile
-            except Exception:
-                cache_map = {}
-
-        # Short-circuit remote HTTP lookups for these statuses to speed up loading
-        short_circuit = getattr(ticket, 'status', '') in ('Open', 'Withdrawn', 'Closed', 'Rejected')
+        cache_map = {
+            uid: profile
+            for uid, profile in resolve_many(external_ids, fetch_remote=not short_circuit).items()
+            if profile
+        }
+        if short_circuit:
+            queue_prefetch([uid for uid in external_ids if int(uid) not in cache_map])
         
         employee_data = None
         if ticket.employee:
@@ -590,7 +534,7 @@ def get_ticket_by_number(request, ticket_number):
                     'email': prof.get('email'),
                     'employee_cookie_id': cid
                 }
-            elif short_circuit:
+            else:
                 employee_data = {
                     'id': cid,
                     'first_name': None,
@@ -600,17 +544,6 @@ def get_ticket_by_number(request, ticket_number):
                     'email': None,
                     'employee_cookie_id': cid
                 }
-            else:
-                profile = get_external_employee_data(cid)
-                employee_data = {
-                    'id': cid,
-                    'first_name': profile.get('first_name'),
-                    'last_name': profile.get('last_name'),
-                    'company_id': profile.get('company_id'),
-                    'department': profile.get('department'),
-                    'email': profile.get('email'),
-                    'employee_cookie_id': cid
-                }
         
         ticket_data['employee'] = employee_data
         ticket_data['comments'] = []
@@ -1118,19 +1051,22 @@ def get_csat_feedback(request):
             csat_rating__isnull=False
         ).select_related('employee').order_by('-update_date')
         
+        # One cache/DB pass for every external submitter; misses are warmed
+        # in the background rather than fetched per row.
+        external_ids = {t.employee_cookie_id for t in tickets if not t.employee and t.employee_cookie_id}
+        profiles = resolve_many(external_ids, fetch_remote=False)
+        queue_prefetch([uid for uid in external_ids if int(uid) not in profiles])
+
         feedback_data = []
         for ticket in tickets:
             employee_name = 'Unknown'
             if ticket.employee:
                 employee_name = f"{ticket.employee.first_name} {ticket.employee.last_name}"
             elif ticket.employee_cookie_id:
-                try:
-                    profile = get_external_employee_data(ticket.employee_cookie_id)
-                    first = profile.get('first_name', '')
-                    last = profile.get('last_name', '')
-                    employee_name = f"{first} {last}".strip() or 'External User'
-                except Exception:
-                    employee_name = 'External User'
+                profile = profiles.get(int(ticket.employee_cookie_id)) or {}
+                first = profile.get('first_name') or ''
+                last = profile.get('last_name') or ''
+                employee_name = f"{first} {last}".strip() or 'External User'
             
             feedback_data.append({
                 'id': ticket.id,
@@ -1242,9 +1178,7 @@ def download_attachment(request, ticket_id):
         if not attachment.file:
             return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        response = FileResponse(attachment.file.open('rb'))
-        response['Content-Disposition'] = f'attachment; filename="{attachment.file_name}"'
-        return response
+        return serve_file(request, attachment.file.path, filename=attachment.file_name, disposition='attachment')
             
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
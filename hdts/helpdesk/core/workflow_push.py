@@ -0,0 +1,159 @@
+"""
+Sending Open tickets to the workflow API (TTS).
+
+Each ticket that becomes 'Open' is pushed by core.models.send_ticket_to_workflow
+as one tickets.tasks.receive_ticket message. Code that opens many tickets at
+once (seeding, imports, the push_open_tickets_to_workflow resync command)
+wraps the work in batched_workflow_push(): payloads are collected and sent
+as tickets.tasks.receive_ticket_batch messages of WORKFLOW_PUSH_BATCH_SIZE
+tickets, so TTS resolves workflows and round-robin slots once per batch
+instead of once per ticket (see tickets.intake in workflow_api).
+"""
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _str(value):
+    return str(value) if value else None
+
+
+def ticket_workflow_payload(ticket):
+    """
+    JSON-serializable ticket dict in the receive_ticket format.
+
+    Attachments are sent as metadata only; use prefetch_related('attachments')
+    and select_related('employee') when building many payloads.
+    """
+    ticket_data = {
+        'id': ticket.id,
+        'ticket_number': ticket.ticket_number,
+        'subject': ticket.subject,
+        'category': ticket.category,
+        'sub_category': ticket.sub_category,
+        'description': ticket.description,
+        'scheduled_date': _str(ticket.scheduled_date),
+        'priority': ticket.priority,
+        'department': ticket.department,
+        'asset_name': ticket.asset_name,
+        'serial_number': ticket.serial_number,
+        'location': ticket.location,
+        'expected_return_date': _str(ticket.expected_return_date),
+        'issue_type': ticket.issue_type,
+        'other_issue': ticket.other_issue,
+        'performance_start_date': _str(ticket.performance_start_date),
+        'performance_end_date': _str(ticket.performance_end_date),
+        'approved_by': ticket.approved_by,
+        'rejected_by': ticket.rejected_by,
+        'cost_items': ticket.cost_items,
+        'requested_budget': _str(ticket.requested_budget),
+        'fiscal_year': ticket.fiscal_year,
+        'department_input': ticket.department_input,
+        'dynamic_data': ticket.dynamic_data,
+        'status': ticket.status,
+        'submit_date': _isoformat(ticket.submit_date),
+        'update_date': _isoformat(ticket.update_date),
+        'rejection_reason': ticket.rejection_reason,
+        'date_completed': _isoformat(ticket.date_completed),
+        'csat_rating': ticket.csat_rating,
+        'feedback': ticket.feedback,
+    }
+
+    # Add employee info if available (for assignment context)
+    if ticket.employee:
+        ticket_data['employee_id'] = ticket.employee.id
+        ticket_data['employee_company_id'] = ticket.employee.company_id
+        ticket_data['employee_email'] = ticket.employee.email
+        ticket_data['employee'] = {
+            'first_name': ticket.employee.first_name,
+            'last_name': ticket.employee.last_name,
+            'email': ticket.employee.email,
+            'company_id': ticket.employee.company_id,
+            'department': ticket.employee.department,
+        }
+    elif ticket.employee_cookie_id:
+        ticket_data['employee_cookie_id'] = ticket.employee_cookie_id
+
+    ticket_data['attachments'] = [
+        {
+            'id': att.id,
+            'file_name': att.file_name,
+            'file_type': att.file_type,
+            'file_size': att.file_size,
+            'file_path': att.file.name if att.file else None,
+        }
+        for att in ticket.attachments.all()
+    ]
+    return ticket_data
+
+
+def push_ticket(ticket_data):
+    """Send one ticket, or add it to the open batched_workflow_push() block."""
+    buffer = getattr(_state, 'buffer', None)
+    if buffer is not None:
+        buffer.append(ticket_data)
+        return
+
+    from .tasks import push_ticket_to_workflow
+    try:
+        push_ticket_to_workflow.delay(ticket_data)
+        logger.info(f"Enqueued workflow job for ticket {ticket_data.get('ticket_number')}")
+    except Exception as e:
+        # Log the enqueue failure and continue — do not re-raise
+        logger.exception(f"Failed to enqueue push_ticket_to_workflow: {e}")
+
+
+def push_ticket_batches(tickets_data, batch_size=None):
+    """
+    Send ticket payloads as receive_ticket_batch messages.
+
+    Returns:
+        number of tickets whose batch was enqueued
+    """
+    batch_size = max(1, batch_size or getattr(settings, 'WORKFLOW_PUSH_BATCH_SIZE', 100))
+    from .tasks import push_tickets_to_workflow
+
+    sent = 0
+    for start in range(0, len(tickets_data), batch_size):
+        chunk = tickets_data[start:start + batch_size]
+        try:
+            push_tickets_to_workflow.delay(chunk)
+            sent += len(chunk)
+        except Exception as e:
+            logger.exception(f"Failed to enqueue a workflow batch of {len(chunk)} tickets: {e}")
+    return sent
+
+
+@contextmanager
+def batched_workflow_push(batch_size=None):
+    """
+    Collect the tickets opened inside the block and send them in batches.
+
+    Batches are sent when the block exits (after the surrounding
+    transaction commits, if any); nothing is sent if the block raises.
+    Nested blocks join the outermost one.
+    """
+    if getattr(_state, 'buffer', None) is not None:
+        yield
+        return
+
+    _state.buffer = []
+    try:
+        yield
+        tickets_data = _state.buffer
+    finally:
+        _state.buffer = None
+
+    if tickets_data:
+        transaction.on_commit(lambda: push_ticket_batches(tickets_data, batch_size))
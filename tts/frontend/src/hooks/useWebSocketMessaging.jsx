@@ -89,6 +89,10 @@ export const useWebSocketMessaging = (ticketId, userId = 'anonymous', setMessage
     switch (data.type) {
       case 'connection_established':
         console.log('[useWebSocketMessaging] Connection confirmed:', data);
+        // Users already online; later presence_update events are incremental
+        if (data.users) {
+          setConnectedUsers(data.users.filter(u => String(u) !== String(userId)));
+        }
         break;
         
       case 'message_sent':
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.core.files.storage import default_storage
 from django.conf import settings
 import hashlib
@@ -9,6 +9,9 @@ from tickets.models import Ticket
 from PIL import Image
 import io
 
+# Read size for streaming hashes of uploads
+HASH_CHUNK_SIZE = 64 * 1024
+
 def comment_document_upload_path(instance, filename):
     """Generate upload path for comment documents"""
     # Use the file hash as part of the path for deduplication
@@ -49,7 +52,9 @@ class Comment(models.Model):
     
     @property
     def replies(self):
-        """Get all replies to this comment"""
+        """Get all replies to this comment (preloaded by CommentThreadLoader when available)"""
+        if hasattr(self, '_loaded_replies'):
+            return self._loaded_replies
         return Comment.objects.filter(parent=self.comment_id).order_by('created_at')
     
     def __str__(self):
@@ -129,61 +134,97 @@ class DocumentStorage(models.Model):
     
     def calculate_image_info(self, file_content):
         """
-        Calculate image dimensions and ratio if the file is an image
+        Calculate image dimensions and ratio if the file is an image.
+        Accepts bytes or a seekable file object; only the image header is
+        parsed (Image.open is lazy and load() is never called).
         """
         try:
             # Check if content type indicates it's an image
             if not self.content_type.startswith('image/'):
                 return
             
-            # Try to open as image
-            image = Image.open(io.BytesIO(file_content))
+            if isinstance(file_content, (bytes, bytearray)):
+                file_content = io.BytesIO(file_content)
+            file_content.seek(0)
+            
+            # Try to open as image (reads the header only)
+            with Image.open(file_content) as image:
+                width, height = image.size
             self.is_image = True
-            self.image_width = image.width
-            self.image_height = image.height
+            self.image_width = width
+            self.image_height = height
             
             # Calculate ratio (width/height)
-            if image.height > 0:
-                self.image_ratio = round(image.width / image.height, 4)
+            if height > 0:
+                self.image_ratio = round(width / height, 4)
             
         except Exception as e:
             # Not a valid image or error processing
             self.is_image = False
             print(f"Error processing image {self.original_filename}: {str(e)}")
     
+    @staticmethod
+    def hash_file(file_obj, chunk_size=HASH_CHUNK_SIZE):
+        """
+        SHA-256 of a file object, read in chunks.
+        
+        Returns:
+            tuple: (hex digest, size in bytes)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        file_obj.seek(0)
+        if hasattr(file_obj, 'chunks'):
+            chunks = file_obj.chunks(chunk_size)
+        else:
+            chunks = iter(lambda: file_obj.read(chunk_size), b'')
+        for chunk in chunks:
+            digest.update(chunk)
+            size += len(chunk)
+        file_obj.seek(0)  # Reset file pointer
+        return digest.hexdigest(), size
+    
     @classmethod
     def create_from_file(cls, file_obj, user_id, firstname, lastname):
         """
         Create or get existing DocumentStorage from uploaded file.
         Returns tuple (document_storage, created)
+        
+        The upload is never read into memory as a whole: it is hashed in
+        chunks, and storage streams it from the upload's temp file. If a
+        concurrent upload of the same content wins the unique file_hash
+        insert, the file stored here is deleted and the winner returned.
         """
-        # Calculate file hash
-        file_obj.seek(0)
-        file_content = file_obj.read()
-        file_hash = hashlib.sha256(file_content).hexdigest()
-        file_obj.seek(0)  # Reset file pointer
+        file_hash, file_size = cls.hash_file(file_obj)
         
         # Check if document already exists
-        try:
-            existing_doc = cls.objects.get(file_hash=file_hash)
+        existing_doc = cls.objects.filter(file_hash=file_hash).first()
+        if existing_doc:
             return existing_doc, False
-        except cls.DoesNotExist:
-            # Create new document
-            doc = cls(
-                file_hash=file_hash,
-                original_filename=file_obj.name,
-                file_size=len(file_content),
-                content_type=getattr(file_obj, 'content_type', 'application/octet-stream'),
-                uploaded_by_user_id=user_id,
-                uploaded_by_name=f"{firstname} {lastname}"
-            )
-            
-            # Calculate image info before saving
-            doc.calculate_image_info(file_content)
-            
-            doc.file_path.save(file_obj.name, file_obj, save=False)
-            doc.save()
-            return doc, True
+        
+        # Create new document
+        doc = cls(
+            file_hash=file_hash,
+            original_filename=file_obj.name,
+            file_size=file_size,
+            content_type=getattr(file_obj, 'content_type', None) or 'application/octet-stream',
+            uploaded_by_user_id=user_id,
+            uploaded_by_name=f"{firstname} {lastname}"
+        )
+        
+        # Calculate image info before saving
+        doc.calculate_image_info(file_obj)
+        file_obj.seek(0)
+        
+        doc.file_path.save(os.path.basename(file_obj.name), file_obj, save=False)
+        try:
+            with transaction.atomic():
+                doc.save()
+        except IntegrityError:
+            # Lost the dedup race: drop our copy, keep the stored one
+            default_storage.delete(doc.file_path.name)
+            return cls.objects.get(file_hash=file_hash), False
+        return doc, True
     
     def delete(self, *args, **kwargs):
         """Override delete to remove file from storage"""
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CommentCursorPagination(CursorPagination):
+    """
+    Keyset pagination for top-level comments (newest first).
+    Pages cost the same no matter how deep the client scrolls, and new
+    comments arriving over WebSocket do not shift later pages.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
@@ -24,6 +24,13 @@ class DocumentStorageSerializer(serializers.ModelSerializer):
             # Fallback for WebSocket context where request is not available
             return f"{settings.MEDIA_BASE_URL}/api/attachments/{obj.id}/download/"
 
+def ratings_summary(comment):
+    """Thumbs up/down counts, preferring CommentThreadLoader's annotated counts."""
+    return {
+        'thumbs_up': getattr(comment, 'ratings_up', comment.thumbs_up_count),
+        'thumbs_down': getattr(comment, 'ratings_down', comment.thumbs_down_count)
+    }
+
 class CommentDocumentSerializer(serializers.ModelSerializer):
     document = DocumentStorageSerializer(read_only=True)
     
@@ -70,17 +77,13 @@ class ReplySerializer(serializers.ModelSerializer):
         read_only_fields = ['comment_id', 'created_at', 'thumbs_up_count', 'thumbs_down_count', 'documents']
     
     def get_ratings_summary(self, obj):
-        return {
-            'thumbs_up': obj.thumbs_up_count,
-            'thumbs_down': obj.thumbs_down_count
-        }
+        return ratings_summary(obj)
     
     def get_ratings(self, obj):
         """Return individual ratings for tracking user reactions"""
-        # Use fresh query to avoid cached/stale data after rating changes
-        from .models import CommentRating
-        ratings = CommentRating.objects.filter(comment=obj)
-        return CommentRatingSerializer(ratings, many=True).data
+        # Served from the loader's prefetch when present; otherwise a fresh
+        # query (refresh_from_db after a rating change drops the prefetch)
+        return CommentRatingSerializer(obj.ratings.all(), many=True).data
     
     def validate(self, data):
         # Only validate required fields if they're not already set
@@ -138,17 +141,13 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ['comment_id', 'created_at', 'thumbs_up_count', 'thumbs_down_count', 'replies', 'documents']
     
     def get_ratings_summary(self, obj):
-        return {
-            'thumbs_up': obj.thumbs_up_count,
-            'thumbs_down': obj.thumbs_down_count
-        }
+        return ratings_summary(obj)
     
     def get_ratings(self, obj):
         """Return individual ratings for tracking user reactions"""
-        # Use fresh query to avoid cached/stale data after rating changes
-        from .models import CommentRating
-        ratings = CommentRating.objects.filter(comment=obj)
-        return CommentRatingSerializer(ratings, many=True).data
+        # Served from the loader's prefetch when present; otherwise a fresh
+        # query (refresh_from_db after a rating change drops the prefetch)
+        return CommentRatingSerializer(obj.ratings.all(), many=True).data
     
     def validate(self, data):
         # More flexible validation - only check for required fields if they're missing
@@ -1,6 +1,7 @@
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from datetime import datetime
+from django.db.models import Count, Prefetch, Q, prefetch_related_objects
 from .models import Comment, CommentDocument, DocumentStorage
 from .serializers import CommentSerializer
 import logging
@@ -8,6 +9,68 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+class CommentThreadLoader:
+    """
+    Loads top-level comments together with their replies, ratings and
+    attached documents in a fixed number of queries, whatever the page size:
+
+    1. the top-level comments (with annotated thumbs up/down counts)
+    2. their replies (same annotations)
+    3. ratings of every loaded comment
+    4. document attachments (with their DocumentStorage rows)
+
+    Replies are attached in memory, so Comment.replies and the serializers'
+    ratings/documents fields do not hit the database again.
+    """
+    
+    @staticmethod
+    def with_rating_counts(queryset):
+        """Annotate ratings_up / ratings_down and join the ticket."""
+        return queryset.select_related('ticket').annotate(
+            ratings_up=Count('ratings', filter=Q(ratings__rating=True)),
+            ratings_down=Count('ratings', filter=Q(ratings__rating=False)),
+        )
+    
+    @classmethod
+    def top_level_for_ticket(cls, ticket):
+        """Queryset of a ticket's top-level comments, newest first."""
+        return cls.with_rating_counts(
+            Comment.objects.filter(ticket=ticket, parent=None)
+        ).order_by('-created_at')
+    
+    @classmethod
+    def load(cls, comments):
+        """
+        Attach replies, ratings and documents to top-level comments.
+        
+        Args:
+            comments: Queryset or list of top-level comments (annotated
+                with with_rating_counts to avoid count fallbacks)
+        
+        Returns:
+            list: The same comments, ready for CommentSerializer(many=True)
+        """
+        comments = list(comments)
+        if not comments:
+            return comments
+        
+        replies_by_parent = {comment.comment_id: [] for comment in comments}
+        replies = list(cls.with_rating_counts(
+            Comment.objects.filter(parent__in=list(replies_by_parent))
+        ).order_by('created_at'))
+        for reply in replies:
+            replies_by_parent[reply.parent].append(reply)
+        for comment in comments:
+            comment._loaded_replies = replies_by_parent[comment.comment_id]
+        
+        prefetch_related_objects(
+            comments + replies,
+            'ratings',
+            Prefetch('documents', queryset=CommentDocument.objects.select_related('document')),
+        )
+        return comments
+
+
 class CommentNotificationService:
     """
     Service class for handling comment notifications via WebSocket
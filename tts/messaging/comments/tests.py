@@ -0,0 +1,146 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image, ImageFile
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from tickets.models import Ticket
+from .models import HASH_CHUNK_SIZE, Comment, CommentDocument, CommentRating, DocumentStorage
+from .serializers import CommentSerializer
+from .services import CommentThreadLoader
+from .viewsets import CommentViewSet
+
+
+class CommentThreadLoaderTests(TestCase):
+    """Query-count regression tests for loading comment threads"""
+
+    def setUp(self):
+        self.ticket = Ticket.objects.create(ticket_id='T10001')
+        self.document = DocumentStorage.objects.create(
+            file_hash='a' * 64,
+            original_filename='log.txt',
+            file_size=10,
+            content_type='text/plain',
+            file_path='comments/documents/log.txt',
+            uploaded_by_user_id='1',
+            uploaded_by_name='Ann Agent',
+        )
+
+    def _comment(self, parent=None, **extra):
+        return Comment.objects.create(
+            ticket=self.ticket, user_id='1', firstname='Ann', lastname='Agent',
+            role='Agent', content='text', parent=parent, **extra
+        )
+
+    def _add_threads(self, count, with_documents=True):
+        for _ in range(count):
+            comment = self._comment()
+            if with_documents:
+                CommentDocument.objects.create(
+                    comment=comment, document=self.document,
+                    attached_by_user_id='1', attached_by_name='Ann Agent',
+                )
+            for user_id, rating in (('2', True), ('3', True), ('4', False)):
+                CommentRating.objects.create(
+                    comment=comment, user_id=user_id, firstname='U', lastname='R', role='Agent', rating=rating
+                )
+            reply = self._comment(parent=comment.comment_id)
+            CommentRating.objects.create(
+                comment=reply, user_id='2', firstname='U', lastname='R', role='Agent', rating=False
+            )
+
+    def _serialize_ticket(self):
+        comments = CommentThreadLoader.load(CommentThreadLoader.top_level_for_ticket(self.ticket))
+        return CommentSerializer(comments, many=True).data
+
+    def test_query_count_is_constant(self):
+        """Test that serializing a ticket's threads costs the same queries for 2 or 20 threads"""
+        self._add_threads(2)
+        with self.assertNumQueries(4):
+            self._serialize_ticket()
+
+        self._add_threads(18)
+        with self.assertNumQueries(4):
+            data = self._serialize_ticket()
+        self.assertEqual(len(data), 20)
+
+    def test_tree_and_counts(self):
+        """Test that replies, ratings and documents come from the preloaded data"""
+        self._add_threads(1)
+        comment = self._serialize_ticket()[0]
+
+        self.assertEqual(comment['ratings_summary'], {'thumbs_up': 2, 'thumbs_down': 1})
+        self.assertEqual(len(comment['ratings']), 3)
+        self.assertEqual(comment['documents'][0]['document']['original_filename'], 'log.txt')
+        self.assertEqual(len(comment['replies']), 1)
+        self.assertEqual(comment['replies'][0]['ratings_summary'], {'thumbs_up': 0, 'thumbs_down': 1})
+
+    def test_list_uses_cursor_pagination(self):
+        """Test that the list endpoint pages top-level comments by cursor"""
+        self._add_threads(3, with_documents=False)
+        factory = APIRequestFactory()
+        user = SimpleNamespace(
+            is_authenticated=True, user_id=1, roles=[{'system': 'tts', 'role': 'Agent'}]
+        )
+        view = CommentViewSet.as_view({'get': 'list'})
+
+        request = factory.get('/comments/', {'ticket_id': self.ticket.ticket_id, 'page_size': 2})
+        force_authenticate(request, user=user)
+        first = view(request).data
+
+        self.assertEqual(len(first['results']), 2)
+        self.assertIsNotNone(first['next'])
+
+        request = factory.get(first['next'])
+        force_authenticate(request, user=user)
+        second = view(request).data
+
+        self.assertEqual(len(second['results']), 1)
+        seen = [c['comment_id'] for c in first['results'] + second['results']]
+        self.assertEqual(len(set(seen)), 3)
+
+
+class DocumentStorageIngestTests(TestCase):
+    """Tests for streaming attachment ingest"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def _upload(self, name, content, content_type):
+        return SimpleUploadedFile(name, content, content_type=content_type)
+
+    def test_hash_and_dedup(self):
+        """Test that chunked hashing matches SHA-256 and identical content is stored once"""
+        content = os.urandom(3 * HASH_CHUNK_SIZE + 123)
+
+        doc, created = DocumentStorage.create_from_file(self._upload('a.bin', content, 'application/pdf'), '1', 'Ann', 'Agent')
+        again, created_again = DocumentStorage.create_from_file(self._upload('b.bin', content, 'application/pdf'), '2', 'Bob', 'Agent')
+
+        self.assertTrue(created)
+        self.assertFalse(created_again)
+        self.assertEqual(again.pk, doc.pk)
+        self.assertEqual(doc.file_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(doc.file_size, len(content))
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, 'comments', 'documents'))), 1)
+
+    def test_image_dimensions_from_header(self):
+        """Test that image width/height/ratio are read without decoding pixel data"""
+        buffer = io.BytesIO()
+        Image.new('RGB', (40, 20)).save(buffer, format='PNG')
+
+        with patch.object(ImageFile.ImageFile, 'load', side_effect=AssertionError('pixel data decoded')):
+            doc, _ = DocumentStorage.create_from_file(self._upload('shot.png', buffer.getvalue(), 'image/png'), '1', 'Ann', 'Agent')
+
+        self.assertTrue(doc.is_image)
+        self.assertEqual((doc.image_width, doc.image_height, doc.image_ratio), (40, 20, 2.0))
@@ -9,8 +9,9 @@ import logging
 
 from .models import Comment, CommentRating, DocumentStorage, CommentDocument
 from .serializers import CommentSerializer, CommentRatingSerializer
+from .pagination import CommentCursorPagination
 from .permissions import CommentPermission
-from .services import CommentNotificationService, DocumentAttachmentService
+from .services import CommentNotificationService, CommentThreadLoader, DocumentAttachmentService
 from tickets.models import Ticket
 
 logger = logging.getLogger(__name__)
@@ -25,6 +26,7 @@ class CommentViewSet(viewsets.ModelViewSet):
     lookup_field = 'comment_id'
     parser_classes = [JSONParser, MultiPartParser, FormParser]
     permission_classes = [CommentPermission]
+    pagination_class = CommentCursorPagination
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -55,19 +57,31 @@ class CommentViewSet(viewsets.ModelViewSet):
         
         # Filter to top-level comments for list views
         if self.action == 'list':
-            qs = qs.filter(parent=None)
+            qs = CommentThreadLoader.with_rating_counts(qs.filter(parent=None))
             ticket_id = self.request.query_params.get('ticket_id')
             if ticket_id:
                 qs = qs.filter(ticket__ticket_id=ticket_id)
         
         return qs.order_by('-created_at')
     
+    def list(self, request, *args, **kwargs):
+        """Cursor-paginated top-level comments with replies, ratings and documents preloaded"""
+        queryset = self.filter_queryset(self.get_queryset())
+        
+        page = self.paginate_queryset(queryset)
+        comments = CommentThreadLoader.load(page if page is not None else queryset)
+        serializer = self.get_serializer(comments, many=True)
+        
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+    
     @action(detail=False, methods=['get'], url_path='by-ticket/(?P<ticket_id>[^/.]+)')
     def comments_by_ticket(self, request, ticket_id=None):
         """Get all comments for a specific ticket ID"""
         try:
             ticket = Ticket.objects.get(ticket_id=ticket_id)
-            comments = Comment.objects.filter(ticket=ticket, parent=None).order_by('-created_at')
+            comments = CommentThreadLoader.load(CommentThreadLoader.top_level_for_ticket(ticket))
             serializer = self.get_serializer(comments, many=True)
             return Response(serializer.data)
         except Ticket.DoesNotExist:
@@ -232,12 +232,31 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
 ]
 
-# Channels configuration (using in-memory backend for development)
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
-    },
-}
+# Channels configuration (Redis when DJANGO_CHANNEL_REDIS_URL is set so
+# several Daphne/worker processes share groups; in-memory for development)
+CHANNEL_REDIS_URL = config('DJANGO_CHANNEL_REDIS_URL', default='')
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [CHANNEL_REDIS_URL],
+                'capacity': config('DJANGO_CHANNEL_CAPACITY', default=1000, cast=int),
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
+
+# Ticket chat presence (tickets/presence.py). Must be shared by all workers,
+# so it follows the channel layer's Redis unless set explicitly; connections
+# that miss heartbeats for PRESENCE_TTL seconds are dropped.
+PRESENCE_REDIS_URL = config('DJANGO_PRESENCE_REDIS_URL', default=CHANNEL_REDIS_URL)
+PRESENCE_TTL = config('DJANGO_PRESENCE_TTL', default=90, cast=int)
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -283,7 +302,9 @@ MEDIA_ROOT = BASE_DIR / 'media'
 MEDIA_BASE_URL = config('DJANGO_MEDIA_BASE_URL', default='http://localhost:8005' if not IS_PRODUCTION else 'https://yourdomain.com')
 
 # File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
+# Uploads above this are spooled to a temp file, so attachment ingest
+# (DocumentStorage.create_from_file) streams them instead of holding them in RAM
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 FILE_UPLOAD_PERMISSIONS = 0o644
 
@@ -3,13 +3,13 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth.models import AnonymousUser
 from .models import Ticket, Message
+from .presence import get_presence_store
 from .serializers import MessageSerializer
 
 
 class TicketMessagingConsumer(AsyncWebsocketConsumer):
-    # Class-level tracking of connected users per ticket
-    connected_users = {}  # {ticket_id: {channel_name: user_identifier}}
-    
+    # Online users live in the shared presence store (see presence.py) so
+    # every worker process reports the same list
     async def connect(self):
         self.ticket_id = self.scope['url_route']['kwargs']['ticket_id']
         
@@ -50,12 +50,8 @@ class TicketMessagingConsumer(AsyncWebsocketConsumer):
         await self.accept()
         
         # Track connected user
-        if self.ticket_id not in self.connected_users:
-            self.connected_users[self.ticket_id] = {}
-        self.connected_users[self.ticket_id][self.channel_name] = self.user_display_name
-        
-        # Get list of all connected users for this ticket
-        connected_list = list(set(self.connected_users.get(self.ticket_id, {}).values()))
+        self.presence = get_presence_store()
+        delta = await self.presence.join(self.ticket_id, self.channel_name, self.user_display_name)
         
         # Send connection confirmation with online users
         await self.send(text_data=json.dumps({
@@ -63,40 +59,18 @@ class TicketMessagingConsumer(AsyncWebsocketConsumer):
             'ticket_id': self.ticket_id,
             'user_id': str(self.user_id),
             'message': f'Connected to ticket {self.ticket_id}',
-            'users': connected_list
+            'users': delta.users
         }))
         
-        # Notify others that user joined
-        await self.channel_layer.group_send(
-            self.ticket_group_name,
-            {
-                'type': 'user_presence',
-                'user': self.user_display_name,
-                'status': 'online',
-                'users': connected_list
-            }
-        )
+        # Notify others that user joined (and of anyone whose connection expired)
+        await self.broadcast_presence(delta)
 
     async def disconnect(self, close_code):
-        # Remove user from connected users
-        if self.ticket_id in self.connected_users:
-            self.connected_users[self.ticket_id].pop(self.channel_name, None)
-            if not self.connected_users[self.ticket_id]:
-                del self.connected_users[self.ticket_id]
-        
-        # Get updated list of connected users
-        connected_list = list(set(self.connected_users.get(self.ticket_id, {}).values()))
-        
-        # Notify others that user left
-        await self.channel_layer.group_send(
-            self.ticket_group_name,
-            {
-                'type': 'user_presence',
-                'user': self.user_display_name,
-                'status': 'offline',
-                'users': connected_list
-            }
-        )
+        # connect() may have failed before joining presence
+        if hasattr(self, 'presence'):
+            delta = await self.presence.leave(self.ticket_id, self.channel_name)
+            # Only announces the user as offline once their last connection is gone
+            await self.broadcast_presence(delta)
         
         # Leave ticket group
         await self.channel_layer.group_discard(
@@ -116,7 +90,10 @@ class TicketMessagingConsumer(AsyncWebsocketConsumer):
             message_type = data.get('type')
             
             if message_type == 'ping':
+                # The ping doubles as the presence heartbeat
+                delta = await self.presence.heartbeat(self.ticket_id, self.channel_name, self.user_display_name)
                 await self.send(text_data=json.dumps({'type': 'pong'}))
+                await self.broadcast_presence(delta)
             
             elif message_type == 'typing_start':
                 await self.channel_layer.group_send(
@@ -144,6 +121,18 @@ class TicketMessagingConsumer(AsyncWebsocketConsumer):
                 'message': 'Invalid JSON data'
             }))
 
+    async def broadcast_presence(self, delta):
+        """Send one presence event per user that came online or went offline."""
+        for user, presence_status in [(u, 'online') for u in delta.joined] + [(u, 'offline') for u in delta.left]:
+            await self.channel_layer.group_send(
+                self.ticket_group_name,
+                {
+                    'type': 'user_presence',
+                    'user': user,
+                    'status': presence_status,
+                }
+            )
+
     # Handle message broadcasts
     async def message_broadcast(self, event):
         await self.send(text_data=json.dumps(event['data']))
@@ -162,11 +151,11 @@ class TicketMessagingConsumer(AsyncWebsocketConsumer):
 
     # Handle user presence (online/offline)
     async def user_presence(self, event):
+        # Incremental: clients apply the join/leave to the list they got on connect
         await self.send(text_data=json.dumps({
             'type': 'presence_update',
             'user': event['user'],
             'status': event['status'],
-            'users': event.get('users', [])
         }))
 
     @database_sync_to_async
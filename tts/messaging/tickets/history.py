@@ -0,0 +1,99 @@
+import base64
+from datetime import datetime
+
+from django.db.models import Q, prefetch_related_objects
+
+from .models import Message
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(message):
+    raw = f"{message.created_at.isoformat()}|{message.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Returns:
+        (created_at, id) of the message the cursor points at
+
+    Raises:
+        InvalidCursor: if the cursor was not produced by encode_cursor
+    """
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(str(exc))
+
+
+class MessageHistoryLoader:
+    """
+    Keyset-paginated message history for a ticket.
+
+    Pages are bounded by (created_at, id) instead of an offset, so loading an
+    older page costs the same however long the ticket is, and messages
+    arriving meanwhile do not shift the pages. A page is loaded in a fixed
+    number of queries whatever its size:
+
+    1. the messages (with their ticket joined)
+    2. reactions
+    3. attachments
+
+    Reaction counts are tallied from the prefetched reactions by
+    MessageSerializer.get_reaction_counts, so they need no query of their own.
+    """
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    @staticmethod
+    def for_ticket(ticket):
+        return Message.objects.filter(ticket_id=ticket, is_deleted=False).select_related('ticket_id')
+
+    @staticmethod
+    def load(messages):
+        """Prefetch reactions and attachments for a list of messages."""
+        messages = list(messages)
+        if messages:
+            prefetch_related_objects(messages, 'reactions', 'attachments')
+        return messages
+
+    @classmethod
+    def page(cls, ticket, before=None, after=None, page_size=None):
+        """
+        One page of history, in chronological order.
+
+        Args:
+            before: cursor; return the newest messages older than it ("load older")
+            after: cursor; return the oldest messages newer than it (catching
+                up after a reconnect). Without either, the latest page is returned.
+
+        Returns:
+            (messages, has_more) where has_more means more messages exist
+            beyond the page in the direction that was read
+        """
+        page_size = min(page_size or cls.DEFAULT_PAGE_SIZE, cls.MAX_PAGE_SIZE)
+        queryset = cls.for_ticket(ticket)
+
+        if after is not None:
+            created_at, pk = decode_cursor(after)
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk)
+            ).order_by('created_at', 'pk')
+        else:
+            if before is not None:
+                created_at, pk = decode_cursor(before)
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+                )
+            queryset = queryset.order_by('-created_at', '-pk')
+
+        messages = list(queryset[:page_size + 1])
+        has_more = len(messages) > page_size
+        messages = messages[:page_size]
+        if after is None:
+            messages.reverse()
+        return cls.load(messages), has_more
@@ -0,0 +1,148 @@
+"""
+Presence registry for TicketMessagingConsumer.
+
+Every websocket connection is a member of its ticket's presence set with an
+expiry of now + PRESENCE_TTL, renewed by the client's ping heartbeat. A
+connection that stops heartbeating (closed tab, crashed worker) simply
+expires and is pruned by the next operation on that ticket, so no process
+has to be alive to clean up after it.
+
+Each operation returns a PresenceDelta: the users that came online or went
+offline because of it (including ones whose last connection expired), so
+consumers broadcast incremental join/leave events instead of the full list.
+
+The store is Redis (DJANGO_PRESENCE_REDIS_URL, defaulting to the channel
+layer's Redis) so every Daphne/worker process sees the same presence; without
+it an in-process store is used, which is only correct for a single process
+(development and tests).
+"""
+import json
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from django.conf import settings
+
+
+@dataclass
+class PresenceDelta:
+    joined: List[str] = field(default_factory=list)
+    left: List[str] = field(default_factory=list)
+    users: List[str] = field(default_factory=list)
+
+
+def presence_ttl():
+    return getattr(settings, 'PRESENCE_TTL', 90)
+
+
+def _delta(before, after):
+    return PresenceDelta(
+        joined=sorted(after - before),
+        left=sorted(before - after),
+        users=sorted(after),
+    )
+
+
+class LocalPresenceStore:
+    """In-process store with the same semantics as RedisPresenceStore."""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.tickets = {}  # {ticket_id: {channel_name: (user, expires_at)}}
+
+    def _apply(self, ticket_id, update):
+        members = self.tickets.setdefault(str(ticket_id), {})
+        before = {user for user, _ in members.values()}
+        now = self.clock()
+        for channel_name, (_, expires_at) in list(members.items()):
+            if expires_at <= now:
+                del members[channel_name]
+        update(members, now)
+        after = {user for user, _ in members.values()}
+        if not members:
+            del self.tickets[str(ticket_id)]
+        return _delta(before, after)
+
+    async def join(self, ticket_id, channel_name, user):
+        def update(members, now):
+            members[channel_name] = (user, now + presence_ttl())
+        return self._apply(ticket_id, update)
+
+    heartbeat = join
+
+    async def leave(self, ticket_id, channel_name):
+        return self._apply(ticket_id, lambda members, now: members.pop(channel_name, None))
+
+
+# KEYS: expiries zset (channel -> expires_at), names hash (channel -> user)
+# ARGV: now, op ('join' or 'leave'), channel, user, expires_at, key_ttl
+# Returns the distinct users before and after as JSON; pruning, the
+# update and the read are atomic so concurrent workers agree on deltas.
+PRESENCE_SCRIPT = """
+local function users()
+  local seen, out = {}, {}
+  for _, name in ipairs(redis.call('HVALS', KEYS[2])) do
+    if not seen[name] then seen[name] = true; table.insert(out, name) end
+  end
+  return out
+end
+
+local before = users()
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if #expired > 0 then
+  redis.call('ZREM', KEYS[1], unpack(expired))
+  redis.call('HDEL', KEYS[2], unpack(expired))
+end
+
+if ARGV[2] == 'join' then
+  redis.call('ZADD', KEYS[1], ARGV[5], ARGV[3])
+  redis.call('HSET', KEYS[2], ARGV[3], ARGV[4])
+else
+  redis.call('ZREM', KEYS[1], ARGV[3])
+  redis.call('HDEL', KEYS[2], ARGV[3])
+end
+
+if redis.call('ZCARD', KEYS[1]) > 0 then
+  redis.call('EXPIRE', KEYS[1], ARGV[6])
+  redis.call('EXPIRE', KEYS[2], ARGV[6])
+end
+return cjson.encode({before = before, after = users()})
+"""
+
+
+class RedisPresenceStore:
+    key_prefix = 'messaging:presence'
+
+    def __init__(self, url):
+        import redis.asyncio as redis
+
+        self.client = redis.from_url(url, decode_responses=True)
+        self.script = self.client.register_script(PRESENCE_SCRIPT)
+
+    async def _run(self, ticket_id, op, channel_name, user=''):
+        now = time.time()
+        ttl = presence_ttl()
+        keys = [f'{self.key_prefix}:{ticket_id}:expiries', f'{self.key_prefix}:{ticket_id}:names']
+        raw = await self.script(keys=keys, args=[now, op, channel_name, user, now + ttl, int(ttl * 2)])
+        result = json.loads(raw)
+        # cjson encodes empty arrays as {}
+        return _delta(set(result['before'] or []), set(result['after'] or []))
+
+    async def join(self, ticket_id, channel_name, user):
+        return await self._run(ticket_id, 'join', channel_name, user)
+
+    heartbeat = join
+
+    async def leave(self, ticket_id, channel_name):
+        return await self._run(ticket_id, 'leave', channel_name)
+
+
+_store = None
+
+
+def get_presence_store():
+    global _store
+    if _store is None:
+        url: Optional[str] = getattr(settings, 'PRESENCE_REDIS_URL', '')
+        _store = RedisPresenceStore(url) if url else LocalPresenceStore()
+    return _store
@@ -0,0 +1,156 @@
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from . import presence
+from .models import Message, MessageAttachment, MessageReaction, Ticket
+from .presence import LocalPresenceStore
+from .routing import websocket_urlpatterns
+from .views import MessageViewSet
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@override_settings(PRESENCE_TTL=90)
+class LocalPresenceStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = LocalPresenceStore(clock=self.clock)
+
+    def run_op(self, op, *args):
+        return async_to_sync(getattr(self.store, op))('T1', *args)
+
+    def test_join_and_leave_are_deltas_per_user(self):
+        self.assertEqual(self.run_op('join', 'c1', 'Ann').joined, ['Ann'])
+        # Second tab of the same user is not a new join
+        delta = self.run_op('join', 'c2', 'Ann')
+        self.assertEqual((delta.joined, delta.users), ([], ['Ann']))
+
+        self.assertEqual(self.run_op('leave', 'c1').left, [])
+        self.assertEqual(self.run_op('leave', 'c2').left, ['Ann'])
+        self.assertEqual(self.store.tickets, {})
+
+    def test_connections_without_heartbeat_expire(self):
+        self.run_op('join', 'c1', 'Ann')
+        self.run_op('join', 'c2', 'Bob')
+
+        self.clock.now += 60
+        self.run_op('heartbeat', 'c2', 'Bob')
+        self.clock.now += 60
+
+        # Ann's worker died without disconnecting: the next operation drops her
+        delta = self.run_op('heartbeat', 'c2', 'Bob')
+        self.assertEqual((delta.left, delta.users), (['Ann'], ['Bob']))
+
+
+class TicketPresenceConsumerTests(SimpleTestCase):
+    def setUp(self):
+        patcher = patch.object(presence, '_store', LocalPresenceStore())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_presence_events_are_incremental(self):
+        async def scenario():
+            app = URLRouter(websocket_urlpatterns)
+            first = WebsocketCommunicator(app, '/ws/tickets/T1/')
+            await first.connect()
+            established = await first.receive_json_from()
+            self.assertEqual(established['users'], ['Anonymous'])
+            self.assertEqual((await first.receive_json_from())['status'], 'online')
+
+            # A second connection of the same (anonymous) user announces nothing
+            second = WebsocketCommunicator(app, '/ws/tickets/T1/')
+            await second.connect()
+            await second.receive_json_from()
+            self.assertTrue(await first.receive_nothing())
+
+            await second.send_json_to({'type': 'ping'})
+            self.assertEqual(await second.receive_json_from(), {'type': 'pong'})
+
+            await second.disconnect()
+            self.assertTrue(await first.receive_nothing())
+            await first.disconnect()
+
+        async_to_sync(scenario)()
+
+
+class MessageHistoryTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.ticket = Ticket.objects.create(ticket_id='T20001')
+        self.user = SimpleNamespace(
+            is_authenticated=True, user_id=1, username='agent', roles=[{'system': 'tts', 'role': 'Agent'}]
+        )
+
+    def _add_messages(self, count):
+        for i in range(count):
+            message = Message.objects.create(ticket_id=self.ticket, sender='Ann', message=f'msg {i}')
+            attachment = MessageAttachment.objects.create(
+                filename='a.txt', file=SimpleUploadedFile('a.txt', b'x'), content_type='text/plain'
+            )
+            message.attachments.add(attachment)
+            for user_id, emoji in (('2', '👍'), ('3', '👍'), ('4', '🔥')):
+                MessageReaction.objects.create(message=message, user='U', user_id=user_id, reaction=emoji)
+
+    def _get(self, action, **params):
+        request = APIRequestFactory().get(f'/messages/{action}/', {'ticket_id': self.ticket.ticket_id, **params})
+        force_authenticate(request, user=self.user)
+        return MessageViewSet.as_view({'get': action.replace('-', '_')})(request)
+
+    def test_query_count_is_constant(self):
+        """Ticket lookup, page, reactions and attachments; counts come from the reactions"""
+        self._add_messages(3)
+        with self.assertNumQueries(4):
+            small = self._get('history')
+        self._add_messages(30)
+        with self.assertNumQueries(4):
+            large = self._get('history')
+        with self.assertNumQueries(4):
+            self._get('by-ticket')
+
+        self.assertEqual(len(small.data['messages']), 3)
+        self.assertEqual(len(large.data['messages']), 33)
+        self.assertEqual(large.data['messages'][0]['reaction_counts'], {'👍': 2, '🔥': 1})
+        self.assertEqual(len(large.data['messages'][0]['attachments']), 1)
+
+    def test_load_older_and_since_cursor(self):
+        for i in range(7):
+            Message.objects.create(ticket_id=self.ticket, sender='Ann', message=f'msg {i}')
+
+        latest = self._get('history', page_size=3).data
+        self.assertEqual([m['message'] for m in latest['messages']], ['msg 4', 'msg 5', 'msg 6'])
+        self.assertTrue(latest['has_more'])
+
+        older = self._get('history', page_size=3, before=latest['older_cursor']).data
+        self.assertEqual([m['message'] for m in older['messages']], ['msg 1', 'msg 2', 'msg 3'])
+        oldest = self._get('history', page_size=3, before=older['older_cursor']).data
+        self.assertEqual([m['message'] for m in oldest['messages']], ['msg 0'])
+        self.assertFalse(oldest['has_more'])
+
+        # A reconnecting client asks only for the gap
+        Message.objects.create(ticket_id=self.ticket, sender='Bob', message='while away')
+        gap = self._get('history', after=latest['newer_cursor']).data
+        self.assertEqual([m['message'] for m in gap['messages']], ['while away'])
+        caught_up = self._get('history', after=gap['newer_cursor']).data
+        self.assertEqual((caught_up['messages'], caught_up['newer_cursor']), ([], gap['newer_cursor']))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self._get('history', before='not-a-cursor').status_code, 400)
@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from django.db import transaction
 from django.http import FileResponse
 from drf_spectacular.utils import extend_schema
+from .history import InvalidCursor, MessageHistoryLoader, encode_cursor
 from .models import Ticket, Message, MessageAttachment, MessageReaction
 from .serializers import (
     MessageSerializer, MessageAttachmentSerializer, 
@@ -134,7 +135,7 @@ class MessageViewSet(viewsets.ModelViewSet):
         
         try:
             ticket = Ticket.objects.get(ticket_id=ticket_id)
-            messages = ticket.messages.filter(is_deleted=False)
+            messages = MessageHistoryLoader.load(MessageHistoryLoader.for_ticket(ticket))
             serializer = MessageSerializer(messages, many=True, context={'request': request})
             
             return Response({
@@ -149,6 +150,71 @@ class MessageViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    @extend_schema(
+        summary="Get a page of a ticket's message history",
+        description=(
+            "Keyset-paginated history, oldest first within the page. Without a cursor the latest "
+            "page is returned; pass `before=<older_cursor>` to load older messages, or "
+            "`after=<newer_cursor>` to fetch only the messages sent since (e.g. after a "
+            "websocket reconnect)."
+        ),
+        responses={200: MessageSerializer(many=True)},
+        tags=['Messages']
+    )
+    @action(detail=False, methods=['get'], url_path='history')
+    def history(self, request):
+        """Get one page of messages for a ticket"""
+        ticket_id = request.query_params.get('ticket_id')
+        before = request.query_params.get('before')
+        after = request.query_params.get('after')
+        
+        if not ticket_id:
+            return Response(
+                {'error': 'ticket_id parameter is required'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if before and after:
+            return Response(
+                {'error': 'Use either before or after, not both'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            page_size = int(request.query_params.get('page_size', MessageHistoryLoader.DEFAULT_PAGE_SIZE))
+            if page_size < 1:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {'error': 'page_size must be a positive integer'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            ticket = Ticket.objects.get(ticket_id=ticket_id)
+        except Ticket.DoesNotExist:
+            return Response(
+                {'error': 'Ticket not found'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            messages, has_more = MessageHistoryLoader.page(ticket, before=before, after=after, page_size=page_size)
+        except InvalidCursor:
+            return Response(
+                {'error': 'Invalid cursor'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = MessageSerializer(messages, many=True, context={'request': request})
+        return Response({
+            "ticket_id": ticket.ticket_id,
+            "ticket_status": ticket.status,
+            "messages": serializer.data,
+            # has_more refers to the direction read: older messages, or newer ones for `after`
+            "has_more": has_more,
+            "older_cursor": encode_cursor(messages[0]) if messages else before,
+            "newer_cursor": encode_cursor(messages[-1]) if messages else after,
+        }, status=status.HTTP_200_OK)
+
     @extend_schema(
         summary="Edit a message",
         description="Edit the content of an existing message. Only the message author can edit their own messages.",
@@ -67,6 +67,25 @@ def get_user_info(user_id):
         return None
 
 
+def get_user_emails(user_ids):
+    """
+    Get emails for several users with a single cache lookup.
+    Use this when fanning out one notification to many recipients.
+    
+    Args:
+        user_ids (iterable): User IDs from auth service
+    
+    Returns:
+        dict: {user_id: email} for users found and active
+    """
+    try:
+        from .models import UserEmailCache
+        return UserEmailCache.get_emails(user_ids)
+    except Exception as e:
+        logger.error(f"Error getting emails for users {list(user_ids)}: {str(e)}")
+        return {}
+
+
 def send_notification_email(
     user_id,
     subject,
@@ -91,9 +110,10 @@ def send_notification_email(
     Returns:
         tuple: (success: bool, error: str or None)
     """
-    # Get user email if not provided
-    if not user_email:
-        user_email = get_user_email(user_id)
+    # One cache lookup serves both the address and the greeting name
+    user_info = get_user_info(user_id)
+    if not user_email and user_info and user_info.get('is_active'):
+        user_email = user_info.get('email')
     
     if not user_email:
         logger.warning(f"Cannot send email notification - no email for user {user_id}")
@@ -101,7 +121,6 @@ def send_notification_email(
     
     try:
         from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@tickettracking.local')
-        user_info = get_user_info(user_id)
 
         template_context = dict(context or {})
         if user_info:
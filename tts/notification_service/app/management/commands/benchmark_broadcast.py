@@ -0,0 +1,79 @@
+"""
+Measure sustained WebSocket notification throughput through the configured
+channel layer.
+
+Subscribes one fake consumer per user, pushes notifications in batches with
+the same group_send path Celery workers use (websocket_utils.group_send_all)
+and reports delivered notifications per second.
+
+Usage:
+    python manage.py benchmark_broadcast
+    python manage.py benchmark_broadcast --count 20000 --users 200 --batch-size 100
+    DJANGO_CHANNEL_REDIS_URL=redis://localhost:6379/0 python manage.py benchmark_broadcast
+"""
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.websocket_utils import build_notification_message, get_channel_layer, group_send_all
+
+
+class Command(BaseCommand):
+    help = 'Benchmark notification fan-out throughput over the channel layer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=10000, help='Notifications to send')
+        parser.add_argument('--users', type=int, default=100, help='Distinct recipient users')
+        parser.add_argument('--batch-size', type=int, default=100, help='Notifications per group_send batch')
+
+    def handle(self, *args, **options):
+        channel_layer = get_channel_layer()
+        if channel_layer is None:
+            self.stderr.write(self.style.ERROR('No channel layer configured'))
+            return
+
+        self.stdout.write(f"Channel layer: {type(channel_layer).__module__}.{type(channel_layer).__name__}")
+        elapsed, delivered = asyncio.run(self._run(channel_layer, **options))
+
+        rate = delivered / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"[OK] {delivered}/{options['count']} notifications delivered in {elapsed:.2f}s "
+            f"({rate:,.0f} notifications/s, batch size {options['batch_size']})"
+        ))
+
+    async def _run(self, channel_layer, count, users, batch_size, **kwargs):
+        channels = []
+        for user_id in range(users):
+            channel_name = await channel_layer.new_channel()
+            await channel_layer.group_add(f'notifications_bench_{user_id}', channel_name)
+            channels.append(channel_name)
+
+        delivered = 0
+        expected = [count // users + (1 if user_id < count % users else 0) for user_id in range(users)]
+
+        async def drain(channel_name, remaining):
+            nonlocal delivered
+            while remaining:
+                await channel_layer.receive(channel_name)
+                delivered += 1
+                remaining -= 1
+
+        receivers = [asyncio.ensure_future(drain(ch, n)) for ch, n in zip(channels, expected)]
+
+        notification = {'id': 'bench', 'subject': 'Benchmark', 'message': 'x' * 200}
+        started = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            await group_send_all(channel_layer, [
+                (f'notifications_bench_{index % users}', build_notification_message(notification, 'new'))
+                for index in range(offset, min(offset + batch_size, count))
+            ])
+        try:
+            await asyncio.wait_for(asyncio.gather(*receivers), timeout=60)
+        except asyncio.TimeoutError:
+            self.stderr.write(self.style.WARNING('[WARNING] Timed out waiting for deliveries (channel capacity?)'))
+        elapsed = time.perf_counter() - started
+
+        for user_id, channel_name in enumerate(channels):
+            await channel_layer.group_discard(f'notifications_bench_{user_id}', channel_name)
+        return elapsed, delivered
@@ -34,37 +34,68 @@ class UserEmailCache(models.Model):
             return f"{self.first_name} {self.last_name}"
         return self.first_name or self.last_name or f"User {self.user_id}"
     
+    def to_info(self):
+        """Serializable user info dict (what get_user_info returns)."""
+        return {
+            'user_id': self.user_id,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'full_name': self.full_name,
+            'is_active': self.is_active,
+            'synced_at': self.synced_at.isoformat() if self.synced_at else None
+        }
+    
+    @classmethod
+    def get_user_infos(cls, user_ids):
+        """
+        Get user info for many user IDs with at most one query.
+        Served from the process-local TTL cache where possible.
+        
+        Returns:
+            dict: {user_id: info dict} for users present in the cache table
+        """
+        from .user_cache import user_info_cache
+        
+        user_ids = list(dict.fromkeys(int(user_id) for user_id in user_ids))
+        found, missing = user_info_cache.get_many(user_ids)
+        if missing:
+            loaded = {user_id: None for user_id in missing}
+            for entry in cls.objects.filter(user_id__in=missing):
+                loaded[entry.user_id] = entry.to_info()
+            user_info_cache.set_many(loaded)
+            found.update(loaded)
+        return {user_id: info for user_id, info in found.items() if info is not None}
+    
+    @classmethod
+    def get_emails(cls, user_ids):
+        """
+        Get emails for many user IDs with at most one query.
+        
+        Returns:
+            dict: {user_id: email} for active users only
+        """
+        return {
+            user_id: info['email']
+            for user_id, info in cls.get_user_infos(user_ids).items()
+            if info['is_active']
+        }
+    
     @classmethod
     def get_email(cls, user_id):
         """Get email for a user ID. Returns None if not found."""
-        try:
-            cache_entry = cls.objects.get(user_id=user_id)
-            if cache_entry.is_active:
-                return cache_entry.email
-            return None
-        except cls.DoesNotExist:
-            return None
+        return cls.get_emails([user_id]).get(int(user_id))
     
     @classmethod
     def get_user_info(cls, user_id):
         """Get full user info for a user ID."""
-        try:
-            cache_entry = cls.objects.get(user_id=user_id)
-            return {
-                'user_id': cache_entry.user_id,
-                'email': cache_entry.email,
-                'first_name': cache_entry.first_name,
-                'last_name': cache_entry.last_name,
-                'full_name': cache_entry.full_name,
-                'is_active': cache_entry.is_active,
-                'synced_at': cache_entry.synced_at.isoformat()
-            }
-        except cls.DoesNotExist:
-            return None
+        return cls.get_user_infos([user_id]).get(int(user_id))
     
     @classmethod
     def sync_user(cls, user_id, email, first_name='', last_name='', is_active=True):
         """Sync a single user's data. Creates or updates the cache entry."""
+        from .user_cache import user_info_cache
+        
         cache_entry, created = cls.objects.update_or_create(
             user_id=user_id,
             defaults={
@@ -74,33 +105,60 @@ class UserEmailCache(models.Model):
                 'is_active': is_active,
             }
         )
+        user_info_cache.invalidate([cache_entry.user_id])
         return cache_entry, created
     
     @classmethod
-    def bulk_sync(cls, users_data):
-        """Bulk sync multiple users."""
-        created_count = 0
-        updated_count = 0
+    def bulk_sync(cls, users_data, batch_size=1000):
+        """
+        Bulk sync multiple users with a single upsert per batch
+        (INSERT ... ON CONFLICT (user_id) DO UPDATE).
         
+        Returns:
+            tuple: (created_count, updated_count)
+        """
+        from .user_cache import user_info_cache
+        
+        # Last entry wins if a user appears twice in the payload
+        entries = {}
+        now = timezone.now()
         for user_data in users_data:
-            _, created = cls.sync_user(
-                user_id=user_data['user_id'],
+            user_id = int(user_data['user_id'])
+            entries[user_id] = cls(
+                user_id=user_id,
                 email=user_data['email'],
-                first_name=user_data.get('first_name', ''),
-                last_name=user_data.get('last_name', ''),
-                is_active=user_data.get('is_active', True)
+                first_name=user_data.get('first_name') or '',
+                last_name=user_data.get('last_name') or '',
+                is_active=user_data.get('is_active', True),
+                synced_at=now,
             )
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
+        if not entries:
+            return 0, 0
+        
+        user_ids = list(entries)
+        existing_count = 0
+        for i in range(0, len(user_ids), batch_size):
+            existing_count += cls.objects.filter(user_id__in=user_ids[i:i + batch_size]).count()
         
-        return created_count, updated_count
+        cls.objects.bulk_create(
+            entries.values(),
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['user_id'],
+            update_fields=['email', 'first_name', 'last_name', 'is_active', 'synced_at'],
+        )
+        user_info_cache.invalidate(user_ids)
+        
+        return len(entries) - existing_count, existing_count
     
     @classmethod
     def delete_user(cls, user_id):
         """Remove a user from the cache."""
-        return cls.objects.filter(user_id=user_id).delete()
+        from .user_cache import user_info_cache
+        
+        result = cls.objects.filter(user_id=user_id).delete()
+        user_info_cache.invalidate([int(user_id)])
+        return result
 
 
 # =============================================================================
@@ -20,6 +20,18 @@ def _broadcast_notification_websocket(notification):
         logger.warning(f"WebSocket broadcast failed for notification {notification.id}: {e}")
 
 
+def _broadcast_notifications_websocket(notifications):
+    """Broadcast a batch of notifications in one channel-layer / HTTP call."""
+    try:
+        from .websocket_utils import broadcast_notifications, serialize_notification
+        broadcast_notifications([
+            (notification.user_id, serialize_notification(notification))
+            for notification in notifications
+        ])
+    except Exception as e:
+        logger.warning(f"WebSocket broadcast failed for {len(notifications)} notifications: {e}")
+
+
 def _create_and_broadcast_notification(**kwargs):
     """
     Create an InAppNotification and broadcast it via WebSocket.
@@ -35,11 +47,48 @@ def _create_and_broadcast_notification(**kwargs):
     return notification
 
 
+def _send_emails_for_notifications(emails):
+    """
+    Queue the email counterparts of several in-app notifications.
+    Recipient addresses are looked up together (one cache query) and passed
+    to the email task, so the worker does not look them up again.
+    
+    Args:
+        emails (list): dicts with user_id, subject, message, notification_type
+            and optional context
+    
+    Returns:
+        int: Number of email tasks queued
+    """
+    from .email_service import get_user_emails
+    
+    user_emails = get_user_emails(email['user_id'] for email in emails)
+    queued = 0
+    for email in emails:
+        user_email = user_emails.get(int(email['user_id']))
+        if not user_email:
+            logger.warning(f"Skipping email notification - no email for user {email['user_id']}")
+            continue
+        if _queue_email_task(user_email=user_email, **email):
+            queued += 1
+    return queued
+
+
 def _send_email_for_notification(user_id, subject, message, notification_type, context=None):
     """
     Helper to send email counterpart for in-app notification.
     Fires off an async email task to avoid blocking the main notification task.
     """
+    return _send_emails_for_notifications([{
+        'user_id': user_id,
+        'subject': subject,
+        'message': message,
+        'notification_type': notification_type,
+        'context': context,
+    }]) == 1
+
+
+def _queue_email_task(user_id, subject, message, notification_type, context=None, user_email=None):
     try:
         # Import the Celery app to send task
         from notification_service.celery import app
@@ -52,7 +101,8 @@ def _send_email_for_notification(user_id, subject, message, notification_type, c
                 'subject': subject,
                 'message': message,
                 'notification_type': notification_type,
-                'context': context
+                'context': context,
+                'user_email': user_email
             },
             queue='notification-queue-default'
         )
@@ -64,10 +114,11 @@ def _send_email_for_notification(user_id, subject, message, notification_type, c
 
 
 @shared_task(name="notifications.send_email_async")
-def send_email_async(user_id, subject, message, notification_type, context=None):
+def send_email_async(user_id, subject, message, notification_type, context=None, user_email=None):
     """
     Async task to send email notification.
     This runs separately so it doesn't block the main notification task.
+    user_email is the address looked up when the task was queued, if any.
     """
     try:
         from .email_service import send_notification_email, get_template_for_notification
@@ -79,7 +130,8 @@ def send_email_async(user_id, subject, message, notification_type, context=None)
             message=message,
             notification_type=notification_type,
             template_name=template,
-            context=context
+            context=context,
+            user_email=user_email
         )
         
         if success:
@@ -272,35 +324,36 @@ def send_task_transfer_notification(
         logger.info(f"✅ Created transfer-in notification {notification_in.id} for user {to_user_id}")
         
         # Send email counterparts
-        _send_email_for_notification(
-            user_id=from_user_id,
-            subject=subject_out,
-            message=f"Your task '{task_title}' has been transferred to another team member by {transfer_by}." + (f" Reason: {transfer_notes}" if transfer_notes else ""),
-            notification_type='task_transfer_out',
-            context={
-                'task_title': task_title,
-                'ticket_subject': task_title,
-                'ticket_number': from_ticket_number,
-                'transferred_by': transfer_by,
-                'transfer_notes': transfer_notes,
-                'direction': 'out'
-            }
-        )
-        
-        _send_email_for_notification(
-            user_id=to_user_id,
-            subject=subject_in,
-            message=f"Task '{task_title}' has been transferred to you by {transfer_by}." + (f" Notes: {transfer_notes}" if transfer_notes else ""),
-            notification_type='task_transfer_in',
-            context={
-                'task_title': task_title,
-                'ticket_subject': task_title,
-                'ticket_number': to_ticket_number,
-                'transferred_by': transfer_by,
-                'transfer_notes': transfer_notes,
-                'direction': 'in'
-            }
-        )
+        _send_emails_for_notifications([
+            {
+                'user_id': from_user_id,
+                'subject': subject_out,
+                'message': f"Your task '{task_title}' has been transferred to another team member by {transfer_by}." + (f" Reason: {transfer_notes}" if transfer_notes else ""),
+                'notification_type': 'task_transfer_out',
+                'context': {
+                    'task_title': task_title,
+                    'ticket_subject': task_title,
+                    'ticket_number': from_ticket_number,
+                    'transferred_by': transfer_by,
+                    'transfer_notes': transfer_notes,
+                    'direction': 'out'
+                }
+            },
+            {
+                'user_id': to_user_id,
+                'subject': subject_in,
+                'message': f"Task '{task_title}' has been transferred to you by {transfer_by}." + (f" Notes: {transfer_notes}" if transfer_notes else ""),
+                'notification_type': 'task_transfer_in',
+                'context': {
+                    'task_title': task_title,
+                    'ticket_subject': task_title,
+                    'ticket_number': to_ticket_number,
+                    'transferred_by': transfer_by,
+                    'transfer_notes': transfer_notes,
+                    'direction': 'in'
+                }
+            },
+        ])
         
         return {
             "status": "success",
@@ -410,37 +463,38 @@ def send_escalation_notification(
         logger.info(f"✅ Created escalation-in notification {notification_in.id} for user {to_user_id}")
         
         # Send email counterparts
-        _send_email_for_notification(
-            user_id=from_user_id,
-            subject=subject_out,
-            message=f"Task '{task_title}' has been escalated from {escalated_from_role} to {escalated_to_role}." + (f" Reason: {escalation_reason}" if escalation_reason else ""),
-            notification_type='task_escalation_out',
-            context={
-                'task_title': task_title,
-                'ticket_subject': task_title,
-                'ticket_number': from_ticket_number,
-                'escalated_from_role': escalated_from_role,
-                'escalated_to_role': escalated_to_role,
-                'escalation_reason': escalation_reason,
-                'direction': 'out'
-            }
-        )
-        
-        _send_email_for_notification(
-            user_id=to_user_id,
-            subject=subject_in,
-            message=f"You have received an escalated task '{task_title}' as {escalated_to_role}." + (f" Reason: {escalation_reason}" if escalation_reason else ""),
-            notification_type='task_escalation_in',
-            context={
-                'task_title': task_title,
-                'ticket_subject': task_title,
-                'ticket_number': to_ticket_number,
-                'escalated_from_role': escalated_from_role,
-                'escalated_to_role': escalated_to_role,
-                'escalation_reason': escalation_reason,
-                'direction': 'in'
-            }
-        )
+        _send_emails_for_notifications([
+            {
+                'user_id': from_user_id,
+                'subject': subject_out,
+                'message': f"Task '{task_title}' has been escalated from {escalated_from_role} to {escalated_to_role}." + (f" Reason: {escalation_reason}" if escalation_reason else ""),
+                'notification_type': 'task_escalation_out',
+                'context': {
+                    'task_title': task_title,
+                    'ticket_subject': task_title,
+                    'ticket_number': from_ticket_number,
+                    'escalated_from_role': escalated_from_role,
+                    'escalated_to_role': escalated_to_role,
+                    'escalation_reason': escalation_reason,
+                    'direction': 'out'
+                }
+            },
+            {
+                'user_id': to_user_id,
+                'subject': subject_in,
+                'message': f"You have received an escalated task '{task_title}' as {escalated_to_role}." + (f" Reason: {escalation_reason}" if escalation_reason else ""),
+                'notification_type': 'task_escalation_in',
+                'context': {
+                    'task_title': task_title,
+                    'ticket_subject': task_title,
+                    'ticket_number': to_ticket_number,
+                    'escalated_from_role': escalated_from_role,
+                    'escalated_to_role': escalated_to_role,
+                    'escalation_reason': escalation_reason,
+                    'direction': 'in'
+                }
+            },
+        ])
         
         return {
             "status": "success",
@@ -975,6 +1029,7 @@ def bulk_create_notifications(notifications_data):
         # Bulk create all prepared notifications
         if notifications:
             InAppNotification.objects.bulk_create(notifications)
+            _broadcast_notifications_websocket(notifications)
             
         return {
             "status": "success",
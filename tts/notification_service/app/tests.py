@@ -1,3 +1,314 @@
-from django.test import TestCase
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from . import tasks, user_cache, websocket_utils
+from .models import UserEmailCache
+from .user_cache import UserInfoTTLCache, user_info_cache
+from .websocket_utils import broadcast_notifications, group_send_many
+
+
+def _response(status_code):
+    return Mock(status_code=status_code)
+
+
+class ChannelLayerTestMixin:
+    """Subscribes a channel per user to its notifications group."""
+
+    def subscribe(self, layer, *user_ids):
+        channels = {}
+        for user_id in user_ids:
+            channels[user_id] = async_to_sync(layer.new_channel)()
+            async_to_sync(layer.group_add)(f'notifications_{user_id}', channels[user_id])
+        return channels
+
+    def receive(self, layer, channel):
+        return async_to_sync(layer.receive)(channel)
+
+
+class GroupSendManyTests(ChannelLayerTestMixin, SimpleTestCase):
+    """Tests for sending a batch of group messages in one async_to_sync hop"""
+
+    def test_each_message_reaches_its_group(self):
+        layer = InMemoryChannelLayer()
+        channels = self.subscribe(layer, 1, 2)
+
+        sent = group_send_many([
+            ('notifications_1', {'type': 'notification_message', 'n': 'a'}),
+            ('notifications_2', {'type': 'notification_message', 'n': 'b'}),
+            ('notifications_1', {'type': 'notification_message', 'n': 'c'}),
+        ], layer)
+
+        self.assertTrue(sent)
+        self.assertEqual({self.receive(layer, channels[1])['n'], self.receive(layer, channels[1])['n']}, {'a', 'c'})
+        self.assertEqual(self.receive(layer, channels[2])['n'], 'b')
+
+    def test_layer_errors_are_reported(self):
+        layer = Mock()
+        layer.group_send.side_effect = RuntimeError('layer down')
+        self.assertFalse(group_send_many([('notifications_1', {'type': 'x'})], layer))
+
+    def test_empty_batch(self):
+        self.assertTrue(group_send_many([], InMemoryChannelLayer()))
+
+
+class BroadcastNotificationsTests(ChannelLayerTestMixin, SimpleTestCase):
+    """Tests for choosing between the shared channel layer and the internal endpoints"""
+
+    NOTIFICATIONS = [(1, {'id': 'n1'}), (2, {'id': 'n2'}), (1, {'id': 'n3'})]
+
+    def setUp(self):
+        self.session = Mock()
+        patcher = patch.object(websocket_utils, '_http_session', self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _posted(self):
+        return [(call.args[0], call.kwargs['json']) for call in self.session.post.call_args_list]
+
+    def test_shared_layer_sends_directly(self):
+        layer = InMemoryChannelLayer()
+        channels = self.subscribe(layer, 1, 2)
+        with patch.object(websocket_utils, 'get_channel_layer', return_value=layer), \
+                patch.object(websocket_utils, 'channel_layer_is_shared', return_value=True):
+            self.assertTrue(broadcast_notifications(self.NOTIFICATIONS, action='read'))
+
+        self.session.post.assert_not_called()
+        message = self.receive(layer, channels[2])
+        self.assertEqual((message['type'], message['notification'], message['action']),
+                         ('notification_message', {'id': 'n2'}, 'read'))
+        self.assertEqual(self.receive(layer, channels[1])['notification'], {'id': 'n1'})
+        self.assertEqual(self.receive(layer, channels[1])['notification'], {'id': 'n3'})
+
+    @override_settings(NOTIFICATION_SERVICE_INTERNAL_URL='http://daphne.test')
+    def test_in_memory_layer_posts_one_batch(self):
+        self.session.post.return_value = _response(200)
+
+        self.assertTrue(broadcast_notifications(self.NOTIFICATIONS))
+
+        self.assertEqual(self._posted(), [('http://daphne.test/api/v1/app/internal/broadcast-batch/', {
+            'notifications': [
+                {'user_id': 1, 'notification': {'id': 'n1'}},
+                {'user_id': 2, 'notification': {'id': 'n2'}},
+                {'user_id': 1, 'notification': {'id': 'n3'}},
+            ],
+            'action': 'new',
+        })])
+
+    @override_settings(NOTIFICATION_SERVICE_INTERNAL_URL='http://daphne.test')
+    def test_missing_batch_endpoint_falls_back_to_single_posts(self):
+        self.session.post.side_effect = [_response(404), _response(200), _response(200), _response(200)]
+
+        self.assertTrue(broadcast_notifications(self.NOTIFICATIONS))
+
+        posted = self._posted()
+        self.assertEqual(len(posted), 4)
+        self.assertEqual({url for url, _ in posted[1:]}, {'http://daphne.test/api/v1/app/internal/broadcast/'})
+        self.assertEqual([payload['user_id'] for _, payload in posted[1:]], [1, 2, 1])
+
+    def test_fallback_reports_partial_failure(self):
+        self.session.post.side_effect = [_response(405), _response(200), _response(500), _response(200)]
+        self.assertFalse(broadcast_notifications(self.NOTIFICATIONS))
+
+    def test_unreachable_daphne_is_not_retried_per_notification(self):
+        self.session.post.side_effect = ConnectionError('refused')
+
+        self.assertFalse(broadcast_notifications(self.NOTIFICATIONS))
+        self.assertEqual(self.session.post.call_count, 1)
+
+    def test_server_error_is_not_retried_per_notification(self):
+        self.session.post.return_value = _response(500)
+
+        self.assertFalse(broadcast_notifications(self.NOTIFICATIONS))
+        self.assertEqual(self.session.post.call_count, 1)
+
+    def test_empty_batch_sends_nothing(self):
+        self.assertTrue(broadcast_notifications([]))
+        self.session.post.assert_not_called()
+
+
+class InternalBroadcastBatchViewTests(ChannelLayerTestMixin, SimpleTestCase):
+    """Tests for the batch endpoint Celery workers post to with an in-memory layer"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('internal-broadcast-batch')
+        self.layer = get_channel_layer()
+
+    def test_delivers_each_notification_to_its_user(self):
+        channels = self.subscribe(self.layer, 7, 8)
+
+        response = self.client.post(self.url, {
+            'notifications': [
+                {'user_id': 7, 'notification': {'id': 'a'}},
+                {'user_id': 8, 'notification': {'id': 'b'}},
+            ],
+            'action': 'deleted',
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'success': True, 'count': 2, 'action': 'deleted'})
+        message = self.receive(self.layer, channels[7])
+        self.assertEqual((message['notification'], message['action']), ({'id': 'a'}, 'deleted'))
+        self.assertEqual(self.receive(self.layer, channels[8])['notification'], {'id': 'b'})
+
+    def test_skips_incomplete_items(self):
+        response = self.client.post(self.url, {
+            'notifications': [
+                {'user_id': 7, 'notification': {'id': 'a'}},
+                {'user_id': 8},
+                {'notification': {'id': 'c'}},
+            ],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['count'], response.data['action']), (1, 'new'))
+
+    def test_rejects_batches_without_valid_items(self):
+        self.assertEqual(self.client.post(self.url, {}, format='json').status_code, 400)
+        response = self.client.post(self.url, {'notifications': [{'user_id': 7}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class UserEmailCacheTests(TestCase):
+    """Tests for the batched UserEmailCache sync and lookups"""
+
+    def setUp(self):
+        user_info_cache.invalidate()
+        self.addCleanup(user_info_cache.invalidate)
+
+    def _users(self, *user_ids, **extra):
+        return [dict({'user_id': user_id, 'email': f'user{user_id}@example.com'}, **extra) for user_id in user_ids]
+
+    def test_bulk_sync_upserts(self):
+        self.assertEqual(UserEmailCache.bulk_sync(self._users(1, 2, 3)), (3, 0))
+
+        created, updated = UserEmailCache.bulk_sync(
+            self._users(2, 4) + [{'user_id': '3', 'email': 'new3@example.com', 'first_name': 'Cy', 'is_active': False}],
+            batch_size=2,
+        )
+
+        self.assertEqual((created, updated), (1, 2))
+        self.assertEqual(UserEmailCache.objects.count(), 4)
+        three = UserEmailCache.objects.get(user_id=3)
+        self.assertEqual((three.email, three.first_name, three.is_active), ('new3@example.com', 'Cy', False))
+
+    def test_bulk_sync_last_duplicate_wins(self):
+        UserEmailCache.bulk_sync([{'user_id': 1, 'email': 'old@example.com'},
+                                  {'user_id': 1, 'email': 'new@example.com'}])
+        self.assertEqual(UserEmailCache.objects.get(user_id=1).email, 'new@example.com')
+
+    def test_get_emails_uses_one_query_then_memory(self):
+        UserEmailCache.bulk_sync(self._users(*range(1, 51)) + self._users(51, is_active=False))
+        user_ids = list(range(1, 53))
+
+        with self.assertNumQueries(1):
+            emails = UserEmailCache.get_emails(user_ids)
+        self.assertEqual(len(emails), 50)
+        self.assertEqual(emails[7], 'user7@example.com')
+        self.assertNotIn(51, emails)  # inactive
+        self.assertNotIn(52, emails)  # unknown
+
+        # Known-missing ids are cached too
+        with self.assertNumQueries(0):
+            self.assertEqual(UserEmailCache.get_emails(user_ids), emails)
+
+    def test_sync_and_delete_invalidate(self):
+        UserEmailCache.sync_user(1, 'a@example.com')
+        self.assertEqual(UserEmailCache.get_email(1), 'a@example.com')
+
+        UserEmailCache.sync_user(1, 'b@example.com')
+        self.assertEqual(UserEmailCache.get_email(1), 'b@example.com')
+
+        UserEmailCache.bulk_sync(self._users(1))
+        self.assertEqual(UserEmailCache.get_email(1), 'user1@example.com')
+
+        UserEmailCache.delete_user(1)
+        self.assertIsNone(UserEmailCache.get_email(1))
+
+    def test_entries_expire_after_ttl(self):
+        UserEmailCache.sync_user(1, 'a@example.com')
+        UserEmailCache.get_email(1)
+        # Changed by another worker: no local invalidation
+        UserEmailCache.objects.filter(user_id=1).update(email='b@example.com')
+
+        with patch.object(user_cache.time, 'monotonic', return_value=user_cache.time.monotonic() + 299):
+            self.assertEqual(UserEmailCache.get_email(1), 'a@example.com')
+        with patch.object(user_cache.time, 'monotonic', return_value=user_cache.time.monotonic() + 301):
+            self.assertEqual(UserEmailCache.get_email(1), 'b@example.com')
+
+
+@patch('notification_service.celery.app.send_task')
+class NotificationEmailQueueTests(TestCase):
+    """Tests for looking up recipient emails once when queueing email tasks"""
+
+    def setUp(self):
+        user_info_cache.invalidate()
+        self.addCleanup(user_info_cache.invalidate)
+        UserEmailCache.sync_user(1, 'from@example.com')
+        UserEmailCache.sync_user(2, 'to@example.com')
+        user_info_cache.invalidate()
+
+    def _queued(self, send_task):
+        return [(call.kwargs['kwargs']['user_id'], call.kwargs['kwargs']['user_email'])
+                for call in send_task.call_args_list]
+
+    def test_transfer_emails_use_one_lookup(self, send_task):
+        with patch.object(tasks, '_create_and_broadcast_notification', return_value=Mock(id='n')), \
+                self.assertNumQueries(1):
+            result = tasks.send_task_transfer_notification(1, 2, 'T1', 'T2', 'Task', transferred_by_id=3)
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(self._queued(send_task), [(1, 'from@example.com'), (2, 'to@example.com')])
+
+    def test_recipients_without_email_are_skipped(self, send_task):
+        UserEmailCache.sync_user(2, 'to@example.com', is_active=False)
+
+        queued = tasks._send_emails_for_notifications([
+            {'user_id': user_id, 'subject': 's', 'message': 'm', 'notification_type': 'system'}
+            for user_id in (1, 2, 99)
+        ])
+
+        self.assertEqual(queued, 1)
+        self.assertEqual(self._queued(send_task), [(1, 'from@example.com')])
+        self.assertFalse(tasks._send_email_for_notification(99, 's', 'm', 'system'))
+
+    @patch('app.email_service.send_mail', return_value=1)
+    def test_email_task_uses_the_queued_address(self, send_mail, send_task):
+        UserEmailCache.sync_user(1, 'new@example.com')
+
+        self.assertTrue(tasks.send_email_async(1, 's', 'm', 'system', user_email='from@example.com'))
+        self.assertEqual(send_mail.call_args.kwargs['recipient_list'], ['from@example.com'])
+
+
+@override_settings(USER_EMAIL_CACHE_MAX_ENTRIES=3)
+class UserInfoTTLCacheTests(SimpleTestCase):
+    """Tests for the size bound of the process-local user info cache"""
+
+    def test_evicts_least_recently_used(self):
+        cache = UserInfoTTLCache()
+        cache.set_many({1: {'id': 1}, 2: {'id': 2}, 3: None})
+        cache.get_many([1])  # 2 is now the least recently used
+        cache.set_many({4: {'id': 4}})
+
+        found, missing = cache.get_many([1, 2, 3, 4])
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(found, {1: {'id': 1}, 3: None, 4: {'id': 4}})
+        self.assertEqual(missing, [2])
+
+    def test_large_batches_stay_bounded(self):
+        cache = UserInfoTTLCache()
+        cache.set_many({user_id: None for user_id in range(100)})
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.get_many([97, 98, 99])[1], [])
+
+    def test_expired_entries_are_dropped(self):
+        cache = UserInfoTTLCache()
+        cache.set_many({1: {'id': 1}})
+        with patch.object(user_cache.time, 'monotonic', return_value=user_cache.time.monotonic() + 301):
+            self.assertEqual(cache.get_many([1]), ({}, [1]))
+        self.assertEqual(len(cache), 0)
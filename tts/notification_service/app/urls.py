@@ -31,6 +31,7 @@ from .views import (
     
     # Internal endpoints for WebSocket broadcasting
     InternalBroadcastView,
+    InternalBroadcastBatchView,
     InternalBroadcastCountView,
 )
 
@@ -112,5 +113,6 @@ urlpatterns = [
     
     # Internal endpoints for WebSocket broadcasting (called by Celery workers)
     path('internal/broadcast/', InternalBroadcastView.as_view(), name='internal-broadcast'),
+    path('internal/broadcast-batch/', InternalBroadcastBatchView.as_view(), name='internal-broadcast-batch'),
     path('internal/broadcast-count/', InternalBroadcastCountView.as_view(), name='internal-broadcast-count'),
 ]
\ No newline at end of file
@@ -1,13 +1,90 @@
 """
 User email cache - imports from models for backward compatibility.
 The actual model is defined in models.py
+
+Also holds the process-local TTL cache that sits in front of
+UserEmailCache lookups, so fan-out emails do not query the table once per
+recipient. Entries are dropped on sync/delete in this process and expire
+after USER_EMAIL_CACHE_TTL seconds everywhere else. At most
+USER_EMAIL_CACHE_MAX_ENTRIES users are kept; the least recently used go
+first.
 """
 
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
 from .models import UserEmailCache
 
-__all__ = ['UserEmailCache']
+__all__ = ['UserEmailCache', 'user_info_cache']
+
+
+class UserInfoTTLCache:
+    """
+    Thread-safe {user_id: user info dict or None} map with per-entry expiry,
+    bounded to max_entries in least-recently-used order.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'USER_EMAIL_CACHE_TTL', 300)
+
+    @property
+    def max_entries(self):
+        return getattr(settings, 'USER_EMAIL_CACHE_MAX_ENTRIES', 10000)
+
+    def get_many(self, user_ids):
+        """
+        Returns:
+            (found, missing): dict of cached entries (None = known missing
+            user) and the list of ids that must be loaded
+        """
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for user_id in user_ids:
+                entry = self._entries.get(user_id)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(user_id)
+                    found[user_id] = entry[1]
+                else:
+                    if entry is not None:
+                        del self._entries[user_id]
+                    missing.append(user_id)
+        return found, missing
+
+    def set_many(self, infos):
+        expires_at = time.monotonic() + self.ttl
+        max_entries = self.max_entries
+        with self._lock:
+            for user_id, info in infos.items():
+                self._entries[user_id] = (expires_at, info)
+                self._entries.move_to_end(user_id)
+            while len(self._entries) > max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids=None):
+        """Drop the given ids, or everything if user_ids is None."""
+        with self._lock:
+            if user_ids is None:
+                self._entries.clear()
+                return
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_info_cache = UserInfoTTLCache()
 
 
 def delete_user(user_id):
     """Remove a user from the cache."""
-    return UserEmailCache.objects.filter(user_id=user_id).delete()
+    return UserEmailCache.delete_user(user_id)
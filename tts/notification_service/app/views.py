@@ -549,6 +549,40 @@ class InternalBroadcastView(APIView):
         })
 
 
+class InternalBroadcastBatchView(APIView):
+    """
+    Internal endpoint for broadcasting a batch of notifications in one call.
+    Used by Celery workers when the channel layer is not shared (in-memory).
+    """
+    authentication_classes = []
+    permission_classes = []
+    
+    def post(self, request):
+        from .websocket_utils import group_send_many, build_notification_message
+        
+        notifications = request.data.get('notifications') or []
+        action = request.data.get('action', 'new')
+        
+        messages = [
+            (f"notifications_{item['user_id']}", build_notification_message(item['notification'], action))
+            for item in notifications
+            if item.get('user_id') and item.get('notification')
+        ]
+        if not messages:
+            return Response(
+                {'error': 'notifications with user_id and notification are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        success = group_send_many(messages)
+        
+        return Response({
+            'success': success,
+            'count': len(messages),
+            'action': action
+        })
+
+
 class InternalBroadcastCountView(APIView):
     """
     Internal endpoint for broadcasting unread count updates.
@@ -1,9 +1,13 @@
 """
 WebSocket utilities for broadcasting notifications in real-time.
+
+When CHANNEL_LAYERS points at a shared backend (DJANGO_CHANNEL_REDIS_URL),
+Celery workers group_send straight to the consumers. With the in-memory
+layer they fall back to the internal broadcast endpoints of the Daphne
+process, batched and over a keep-alive session.
 """
-import json
+import asyncio
 import logging
-import threading
 from datetime import datetime
 import requests
 from django.conf import settings
@@ -27,99 +31,178 @@ def get_channel_layer():
         return None
 
 
+def channel_layer_is_shared(channel_layer=None):
+    """
+    True if group_send from this process reaches consumers in the Daphne
+    process (e.g. RedisChannelLayer). InMemoryChannelLayer is per-process,
+    so Celery workers have to go through the internal broadcast endpoint.
+    """
+    channel_layer = channel_layer or get_channel_layer()
+    if channel_layer is None:
+        return False
+    from channels.layers import InMemoryChannelLayer
+    return not isinstance(channel_layer, InMemoryChannelLayer)
+
+
+def build_notification_message(notification_data, action):
+    return {
+        'type': 'notification_message',  # This maps to notification_message handler in consumer
+        'notification': notification_data,
+        'action': action,
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+async def group_send_all(channel_layer, messages):
+    """Send [(group_name, message), ...] concurrently on one event loop."""
+    await asyncio.gather(*(
+        channel_layer.group_send(group_name, message)
+        for group_name, message in messages
+    ))
+
+
+def group_send_many(messages, channel_layer=None):
+    """
+    Send many group messages with a single async_to_sync hop.
+    
+    Args:
+        messages: List of (group_name, message) tuples
+    
+    Returns:
+        bool: True if the messages were handed to the channel layer
+    """
+    from asgiref.sync import async_to_sync
+    
+    channel_layer = channel_layer or get_channel_layer()
+    if not channel_layer:
+        logger.debug("No channel layer available, skipping WebSocket broadcast")
+        return False
+    if not messages:
+        return True
+    
+    try:
+        async_to_sync(group_send_all)(channel_layer, messages)
+        return True
+    except Exception as e:
+        logger.error(f"[WebSocket] Error broadcasting {len(messages)} messages: {e}")
+        return False
+
+
+_http_session = None
+
+
+def _internal_post_status(path, payload):
+    """
+    POST to the Daphne process over a pooled keep-alive session.
+    
+    Returns:
+        The response status code, or None if the request did not complete
+    """
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+    
+    base_url = getattr(settings, 'NOTIFICATION_SERVICE_INTERNAL_URL', 'http://localhost:8006')
+    try:
+        response = _http_session.post(f"{base_url}{path}", json=payload, timeout=5.0)
+    except Exception as e:
+        logger.debug(f"[WebSocket] Internal broadcast error: {e}")
+        return None
+    if response.status_code != 200:
+        logger.warning(f"[WebSocket] Internal broadcast {path} failed: {response.status_code}")
+    return response.status_code
+
+
+def _internal_post(path, payload):
+    """POST to the Daphne process; True if it accepted the broadcast."""
+    return _internal_post_status(path, payload) == 200
+
+
 def broadcast_notification_internal(user_id, notification_data, action='new'):
     """
     Broadcast a notification via the internal HTTP endpoint.
-    Uses fire-and-forget pattern to avoid blocking the caller.
+    Kept for callers that must go through the Daphne process.
     
     Args:
         user_id: The user ID to send the notification to
         notification_data: Dictionary containing notification data
         action: The action type ('new', 'read', 'deleted')
     """
-    def _do_broadcast():
-        try:
-            base_url = getattr(settings, 'NOTIFICATION_SERVICE_INTERNAL_URL', 'http://localhost:8006')
-            url = f"{base_url}/api/v1/app/internal/broadcast/"
-            
-            payload = {
-                'user_id': user_id,
-                'notification': notification_data,
-                'action': action
-            }
-            
-            response = requests.post(
-                url,
-                json=payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=5.0
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"[WebSocket] Broadcast triggered for user {user_id}")
-            else:
-                logger.warning(f"[WebSocket] Broadcast failed: {response.status_code}")
-                
-        except Exception as e:
-            logger.debug(f"[WebSocket] Broadcast error: {e}")
-    
-    # Fire-and-forget: launch in background thread
-    thread = threading.Thread(target=_do_broadcast, daemon=True)
-    thread.start()
-    logger.info(f"[WebSocket] Broadcast queued for user {user_id}")
-    return True
+    return _internal_post('/api/v1/app/internal/broadcast/', {
+        'user_id': user_id,
+        'notification': notification_data,
+        'action': action
+    })
 
 
 def broadcast_notification_direct(user_id, notification_data, action='new'):
     """
     Broadcast a notification directly via channel layer.
-    This only works when called from within the Daphne process.
+    With InMemoryChannelLayer this only works inside the Daphne process.
     
     Args:
         user_id: The user ID to send the notification to
         notification_data: Dictionary containing notification data
         action: The action type ('new', 'read', 'deleted')
     """
-    from asgiref.sync import async_to_sync
+    success = group_send_many([(f'notifications_{user_id}', build_notification_message(notification_data, action))])
+    if success:
+        logger.info(f"[WebSocket] Direct broadcast {action} notification to user {user_id}")
+    return success
+
+
+def broadcast_notifications(notifications, action='new'):
+    """
+    Broadcast a batch of notifications to their users.
     
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        logger.debug("No channel layer available, skipping WebSocket broadcast")
-        return False
+    Shared channel layer: one group_send per notification, all from this
+    process. In-memory layer: one HTTP call to the Daphne process for the
+    whole batch, or one call per notification if that process predates the
+    batch endpoint (404/405).
     
-    try:
-        group_name = f'notifications_{user_id}'
-        
-        # Prepare the message
-        message = {
-            'type': 'notification_message',  # This maps to notification_message handler in consumer
-            'notification': notification_data,
-            'action': action,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        # Send to the user's notification group
-        async_to_sync(channel_layer.group_send)(group_name, message)
-        
-        logger.info(f"[WebSocket] Direct broadcast {action} notification to user {user_id}")
+    Args:
+        notifications: List of (user_id, notification_data) tuples
+        action: The action type ('new', 'read', 'deleted')
+    
+    Returns:
+        bool: True if the batch was delivered to the channel layer / endpoint
+    """
+    if not notifications:
         return True
-        
-    except Exception as e:
-        logger.error(f"[WebSocket] Error broadcasting notification: {e}")
-        return False
+    
+    channel_layer = get_channel_layer()
+    if channel_layer_is_shared(channel_layer):
+        return group_send_many([
+            (f'notifications_{user_id}', build_notification_message(notification_data, action))
+            for user_id, notification_data in notifications
+        ], channel_layer)
+    
+    status_code = _internal_post_status('/api/v1/app/internal/broadcast-batch/', {
+        'notifications': [
+            {'user_id': user_id, 'notification': notification_data}
+            for user_id, notification_data in notifications
+        ],
+        'action': action
+    })
+    if status_code in (404, 405):
+        results = [
+            broadcast_notification_internal(user_id, notification_data, action)
+            for user_id, notification_data in notifications
+        ]
+        return all(results)
+    return status_code == 200
 
 
 def broadcast_notification(user_id, notification_data, action='new'):
     """
     Broadcast a notification to a specific user via WebSocket.
-    Uses HTTP internal endpoint to ensure broadcast happens in Daphne process.
     
     Args:
         user_id: The user ID to send the notification to
         notification_data: Dictionary containing notification data
         action: The action type ('new', 'read', 'deleted')
     """
-    return broadcast_notification_internal(user_id, notification_data, action)
+    return broadcast_notifications([(user_id, notification_data)], action)
 
 
 def broadcast_unread_count(user_id, unread_count):
@@ -130,27 +213,18 @@ def broadcast_unread_count(user_id, unread_count):
         user_id: The user ID to send the count update to
         unread_count: The new unread count
     """
-    try:
-        base_url = getattr(settings, 'NOTIFICATION_SERVICE_INTERNAL_URL', 'http://localhost:8006')
-        url = f"{base_url}/api/v1/app/internal/broadcast-count/"
-        
-        payload = {
-            'user_id': user_id,
-            'unread_count': unread_count
-        }
-        
-        response = requests.post(
-            url,
-            json=payload,
-            headers={'Content-Type': 'application/json'},
-            timeout=5
-        )
-        
-        return response.status_code == 200
-        
-    except Exception as e:
-        logger.error(f"[WebSocket] Error broadcasting count update: {e}")
-        return False
+    channel_layer = get_channel_layer()
+    if channel_layer_is_shared(channel_layer):
+        return group_send_many([(f'notifications_{user_id}', {
+            'type': 'notification_count_update',
+            'unread_count': unread_count,
+            'timestamp': datetime.now().isoformat()
+        })], channel_layer)
+    
+    return _internal_post('/api/v1/app/internal/broadcast-count/', {
+        'user_id': user_id,
+        'unread_count': unread_count
+    })
 
 
 def serialize_notification(notification):
@@ -102,12 +102,26 @@ WSGI_APPLICATION = 'notification_service.wsgi.application'
 ASGI_APPLICATION = 'notification_service.asgi.application'
 
 # Channel layers configuration for WebSocket support
-# Using InMemoryChannelLayer - broadcasts must happen within the Daphne process
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer'
+# With DJANGO_CHANNEL_REDIS_URL set, Celery workers group_send directly to
+# the Daphne consumers. Without it, InMemoryChannelLayer is used and workers
+# broadcast through the internal endpoints of the Daphne process.
+CHANNEL_REDIS_URL = config('DJANGO_CHANNEL_REDIS_URL', default='')
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [CHANNEL_REDIS_URL],
+                'capacity': config('DJANGO_CHANNEL_CAPACITY', default=1000, cast=int),
+            },
+        }
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer'
+        }
     }
-}
 
 
 # Database
@@ -273,6 +287,11 @@ NOTIFICATION_QUEUE = config('DJANGO_NOTIFICATION_QUEUE', default='notification-q
 INAPP_NOTIFICATION_QUEUE = config('DJANGO_INAPP_NOTIFICATION_QUEUE', default='inapp-notification-queue')
 USER_SYNC_QUEUE = config('DJANGO_USER_SYNC_QUEUE', default='user-email-sync-queue')
 
+# Seconds a worker keeps UserEmailCache lookups in memory (sync/delete invalidate locally),
+# and how many users it keeps at most (least recently used are evicted first)
+USER_EMAIL_CACHE_TTL = config('DJANGO_USER_EMAIL_CACHE_TTL', default=300, cast=int)
+USER_EMAIL_CACHE_MAX_ENTRIES = config('DJANGO_USER_EMAIL_CACHE_MAX_ENTRIES', default=10000, cast=int)
+
 CELERY_TASK_ROUTES = {
     # User email sync tasks (from auth service)
     'notifications.sync_user_email': {'queue': USER_SYNC_QUEUE},
@@ -1,3 +1,38 @@
 from django.contrib import admin
+from .models import DailyRollup, WorkflowDailyRollup, StepDailyRollup, UserDailyRollup, PriorityDailyRollup
 
-# Reporting app has no models - only uses existing models for analytics
+ROLLUP_COUNTERS = ['tasks_created', 'tasks_completed', 'items_assigned', 'items_resolved', 'items_breached']
+
+
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', *ROLLUP_COUNTERS, 'updated_at']
+    date_hierarchy = 'date'
+
+
+@admin.register(WorkflowDailyRollup)
+class WorkflowDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'workflow_id', *ROLLUP_COUNTERS]
+    list_filter = ['workflow_id']
+    date_hierarchy = 'date'
+
+
+@admin.register(StepDailyRollup)
+class StepDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'step_id', *ROLLUP_COUNTERS]
+    list_filter = ['step_id']
+    date_hierarchy = 'date'
+
+
+@admin.register(UserDailyRollup)
+class UserDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'user_id', *ROLLUP_COUNTERS]
+    search_fields = ['user_id']
+    date_hierarchy = 'date'
+
+
+@admin.register(PriorityDailyRollup)
+class PriorityDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'priority', *ROLLUP_COUNTERS]
+    list_filter = ['priority']
+    date_hierarchy = 'date'
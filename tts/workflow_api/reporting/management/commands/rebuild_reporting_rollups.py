@@ -0,0 +1,64 @@
+"""
+Management command to rebuild the pre-aggregated reporting rollup tables
+from the raw Task / TaskItem / TaskItemHistory rows.
+
+Rollups are normally maintained incrementally by reporting.signals and were
+backfilled by migration reporting.0002; run this after bulk imports or to
+repair drift.
+
+Usage:
+    python manage.py rebuild_reporting_rollups
+    python manage.py rebuild_reporting_rollups --start-date 2025-01-01 --end-date 2025-01-31
+"""
+
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+
+from reporting.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Rebuild reporting rollup tables (per day, workflow, step, user and priority)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--start-date',
+            type=str,
+            help='First day to rebuild (ISO format: YYYY-MM-DD). Defaults to all history.',
+        )
+        parser.add_argument(
+            '--end-date',
+            type=str,
+            help='Last day to rebuild (ISO format: YYYY-MM-DD). Defaults to all history.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows fetched/inserted per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        start_date = self._parse_date(options.get('start_date'), '--start-date')
+        end_date = self._parse_date(options.get('end_date'), '--end-date')
+        if start_date and end_date and start_date > end_date:
+            raise CommandError('--start-date must not be after --end-date')
+
+        self.stdout.write('Rebuilding reporting rollups...')
+        written = rebuild_rollups(
+            start_date=start_date,
+            end_date=end_date,
+            batch_size=max(1, options['batch_size']),
+        )
+
+        for dimension, count in written.items():
+            self.stdout.write(f'  {dimension}: {count} rows')
+        self.stdout.write(self.style.SUCCESS('✓ Reporting rollups rebuilt'))
+
+    def _parse_date(self, value, flag):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'{flag} must be in YYYY-MM-DD format')
@@ -0,0 +1,142 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Calendar day the counters belong to')),
+                ('tasks_created', models.IntegerField(default=0)),
+                ('tasks_completed', models.IntegerField(default=0)),
+                ('tasks_completed_on_time', models.IntegerField(default=0, help_text='Completed at or before target_resolution')),
+                ('resolution_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolution_time - created_at) over completed tasks')),
+                ('items_assigned', models.IntegerField(default=0)),
+                ('items_in_progress', models.IntegerField(default=0)),
+                ('items_resolved', models.IntegerField(default=0)),
+                ('items_escalated', models.IntegerField(default=0)),
+                ('items_reassigned', models.IntegerField(default=0)),
+                ('items_breached', models.IntegerField(default=0)),
+                ('action_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolved_at - assigned_on) over resolved items')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date'],
+                'abstract': False,
+                'constraints': [models.UniqueConstraint(fields=('date',), name='uniq_daily_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PriorityDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Calendar day the counters belong to')),
+                ('tasks_created', models.IntegerField(default=0)),
+                ('tasks_completed', models.IntegerField(default=0)),
+                ('tasks_completed_on_time', models.IntegerField(default=0, help_text='Completed at or before target_resolution')),
+                ('resolution_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolution_time - created_at) over completed tasks')),
+                ('items_assigned', models.IntegerField(default=0)),
+                ('items_in_progress', models.IntegerField(default=0)),
+                ('items_resolved', models.IntegerField(default=0)),
+                ('items_escalated', models.IntegerField(default=0)),
+                ('items_reassigned', models.IntegerField(default=0)),
+                ('items_breached', models.IntegerField(default=0)),
+                ('action_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolved_at - assigned_on) over resolved items')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('priority', models.CharField(max_length=20)),
+            ],
+            options={
+                'ordering': ['date'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['priority', 'date'], name='reporting_p_priorit_05ab1e_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'priority'), name='uniq_priority_daily_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StepDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Calendar day the counters belong to')),
+                ('tasks_created', models.IntegerField(default=0)),
+                ('tasks_completed', models.IntegerField(default=0)),
+                ('tasks_completed_on_time', models.IntegerField(default=0, help_text='Completed at or before target_resolution')),
+                ('resolution_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolution_time - created_at) over completed tasks')),
+                ('items_assigned', models.IntegerField(default=0)),
+                ('items_in_progress', models.IntegerField(default=0)),
+                ('items_resolved', models.IntegerField(default=0)),
+                ('items_escalated', models.IntegerField(default=0)),
+                ('items_reassigned', models.IntegerField(default=0)),
+                ('items_breached', models.IntegerField(default=0)),
+                ('action_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolved_at - assigned_on) over resolved items')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('step_id', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['date'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['step_id', 'date'], name='reporting_s_step_id_dd480f_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'step_id'), name='uniq_step_daily_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Calendar day the counters belong to')),
+                ('tasks_created', models.IntegerField(default=0)),
+                ('tasks_completed', models.IntegerField(default=0)),
+                ('tasks_completed_on_time', models.IntegerField(default=0, help_text='Completed at or before target_resolution')),
+                ('resolution_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolution_time - created_at) over completed tasks')),
+                ('items_assigned', models.IntegerField(default=0)),
+                ('items_in_progress', models.IntegerField(default=0)),
+                ('items_resolved', models.IntegerField(default=0)),
+                ('items_escalated', models.IntegerField(default=0)),
+                ('items_reassigned', models.IntegerField(default=0)),
+                ('items_breached', models.IntegerField(default=0)),
+                ('action_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolved_at - assigned_on) over resolved items')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user_id', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['date'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['user_id', 'date'], name='reporting_u_user_id_7571af_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'user_id'), name='uniq_user_daily_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkflowDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Calendar day the counters belong to')),
+                ('tasks_created', models.IntegerField(default=0)),
+                ('tasks_completed', models.IntegerField(default=0)),
+                ('tasks_completed_on_time', models.IntegerField(default=0, help_text='Completed at or before target_resolution')),
+                ('resolution_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolution_time - created_at) over completed tasks')),
+                ('items_assigned', models.IntegerField(default=0)),
+                ('items_in_progress', models.IntegerField(default=0)),
+                ('items_resolved', models.IntegerField(default=0)),
+                ('items_escalated', models.IntegerField(default=0)),
+                ('items_reassigned', models.IntegerField(default=0)),
+                ('items_breached', models.IntegerField(default=0)),
+                ('action_seconds', models.BigIntegerField(default=0, help_text='Sum of (resolved_at - assigned_on) over resolved items')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('workflow_id', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['date'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['workflow_id', 'date'], name='reporting_w_workflo_59faf2_idx')],
+                'constraints': [models.UniqueConstraint(fields=('date', 'workflow_id'), name='uniq_workflow_daily_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def backfill_rollups(apps, schema_editor):
+    from reporting.rollups import rebuild_rollups
+
+    rebuild_rollups(apps=apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reporting', '0001_reporting_rollups'),
+        ('task', '0012_taskitem_sla_breach_index'),
+        ('tickets', '0002_remove_workflowticket_tickets_wor_status_6eae60_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,107 @@
+from django.db import models
+
+
+class RollupFacts(models.Model):
+    """
+    Pre-aggregated daily counters shared by every reporting rollup table.
+    Rows are incremented by reporting.signals and rebuilt by the
+    rebuild_reporting_rollups management command.
+    """
+    date = models.DateField(help_text="Calendar day the counters belong to")
+
+    # Task-level facts
+    tasks_created = models.IntegerField(default=0)
+    tasks_completed = models.IntegerField(default=0)
+    tasks_completed_on_time = models.IntegerField(default=0, help_text="Completed at or before target_resolution")
+    resolution_seconds = models.BigIntegerField(default=0, help_text="Sum of (resolution_time - created_at) over completed tasks")
+
+    # TaskItem-level facts
+    items_assigned = models.IntegerField(default=0)
+    items_in_progress = models.IntegerField(default=0)
+    items_resolved = models.IntegerField(default=0)
+    items_escalated = models.IntegerField(default=0)
+    items_reassigned = models.IntegerField(default=0)
+    items_breached = models.IntegerField(default=0)
+    action_seconds = models.BigIntegerField(default=0, help_text="Sum of (resolved_at - assigned_on) over resolved items")
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+        ordering = ['date']
+
+
+class DailyRollup(RollupFacts):
+    """System-wide counters per day."""
+
+    class Meta(RollupFacts.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['date'], name='uniq_daily_rollup'),
+        ]
+
+    def __str__(self):
+        return f'DailyRollup {self.date}'
+
+
+class WorkflowDailyRollup(RollupFacts):
+    """Counters per day per workflow."""
+    workflow_id = models.IntegerField()
+
+    class Meta(RollupFacts.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'workflow_id'], name='uniq_workflow_daily_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['workflow_id', 'date']),
+        ]
+
+    def __str__(self):
+        return f'WorkflowDailyRollup {self.date} workflow={self.workflow_id}'
+
+
+class StepDailyRollup(RollupFacts):
+    """TaskItem counters per day per workflow step."""
+    step_id = models.IntegerField()
+
+    class Meta(RollupFacts.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'step_id'], name='uniq_step_daily_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['step_id', 'date']),
+        ]
+
+    def __str__(self):
+        return f'StepDailyRollup {self.date} step={self.step_id}'
+
+
+class UserDailyRollup(RollupFacts):
+    """TaskItem counters per day per assigned user."""
+    user_id = models.IntegerField()
+
+    class Meta(RollupFacts.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'user_id'], name='uniq_user_daily_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['user_id', 'date']),
+        ]
+
+    def __str__(self):
+        return f'UserDailyRollup {self.date} user={self.user_id}'
+
+
+class PriorityDailyRollup(RollupFacts):
+    """Counters per day per ticket priority."""
+    priority = models.CharField(max_length=20)
+
+    class Meta(RollupFacts.Meta):
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'priority'], name='uniq_priority_daily_rollup'),
+        ]
+        indexes = [
+            models.Index(fields=['priority', 'date']),
+        ]
+
+    def __str__(self):
+        return f'PriorityDailyRollup {self.date} priority={self.priority}'
@@ -0,0 +1,403 @@
+"""
+Incremental reporting rollups.
+
+Task, TaskItem and TaskItemHistory writes are folded into small per-day
+fact tables (see reporting.models) so dashboards read a few hundred
+pre-aggregated rows instead of scanning the whole task history.
+
+- record_* functions are called from reporting.signals for each new event
+  (record_bulk_* by bulk writers such as tickets.intake, whose
+  bulk_create skips signals, and by the SLA scanner, which records
+  breaches in TaskItem.sla_breached_at rather than in history).
+- rebuild_rollups() recomputes the tables from the raw rows (used by the
+  rebuild_reporting_rollups management command and the backfill migration).
+
+Increments are deferred with transaction.on_commit, so the shared per-day
+rows are never locked for the duration of the caller's transaction and
+rolled-back writes are never counted.
+- rollup_series() / rollup_totals() are the read side used by the views.
+"""
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from reporting.models import (
+    DailyRollup,
+    WorkflowDailyRollup,
+    StepDailyRollup,
+    UserDailyRollup,
+    PriorityDailyRollup,
+)
+
+logger = logging.getLogger(__name__)
+
+# dimension name -> (model, key field); the 'day' dimension has no key
+ROLLUP_DIMENSIONS = {
+    'day': (DailyRollup, None),
+    'workflow': (WorkflowDailyRollup, 'workflow_id'),
+    'step': (StepDailyRollup, 'step_id'),
+    'user': (UserDailyRollup, 'user_id'),
+    'priority': (PriorityDailyRollup, 'priority'),
+}
+
+COUNTER_FIELDS = [
+    'tasks_created',
+    'tasks_completed',
+    'tasks_completed_on_time',
+    'resolution_seconds',
+    'items_assigned',
+    'items_in_progress',
+    'items_resolved',
+    'items_escalated',
+    'items_reassigned',
+    'items_breached',
+    'action_seconds',
+]
+
+# TaskItemHistory status -> counter incremented when that status is appended
+HISTORY_STATUS_COUNTERS = {
+    'in progress': 'items_in_progress',
+    'resolved': 'items_resolved',
+    'escalated': 'items_escalated',
+    'reassigned': 'items_reassigned',
+    'breached': 'items_breached',
+}
+
+
+def rollups_enabled():
+    """Rollups can be switched off (e.g. during large imports) via settings."""
+    return getattr(settings, 'REPORTING_ROLLUPS_ENABLED', True)
+
+
+def rollup_day(dt):
+    """Calendar day (in the active timezone) a timestamp is bucketed into."""
+    if dt is None:
+        dt = timezone.now()
+    if timezone.is_aware(dt):
+        dt = timezone.localtime(dt)
+    return dt.date()
+
+
+# ==================== INCREMENTAL UPDATES ====================
+
+def increment(day, dimensions, **deltas):
+    """
+    Add `deltas` to the rollup rows of `day` for every dimension.
+
+    `dimensions` maps dimension name to its key, e.g.
+    {'workflow': 3, 'step': 12, 'user': 7, 'priority': 'High'}.
+    Dimensions with a missing key are skipped; 'day' is always updated.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    for name, (model, key_field) in ROLLUP_DIMENSIONS.items():
+        lookup = {'date': day}
+        if key_field:
+            key = dimensions.get(name)
+            if key is None or key == '':
+                continue
+            lookup[key_field] = key
+        _apply_deltas(model, lookup, deltas)
+
+
+def _apply_deltas(model, lookup, deltas):
+    """Atomically add deltas to one rollup row, creating it on first use."""
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    updates['updated_at'] = timezone.now()
+
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another worker created the row between our UPDATE and INSERT
+        model.objects.filter(**lookup).update(**updates)
+
+
+def _safe_increment(event, day, dimensions, **deltas):
+    """Apply the increment once the current transaction (if any) commits."""
+    def apply():
+        try:
+            increment(day, dimensions, **deltas)
+        except Exception as e:
+            logger.error(f"❌ Failed to update reporting rollups for {event}: {e}", exc_info=True)
+
+    transaction.on_commit(apply)
+
+
+def _task_dimensions(task):
+    ticket = task.ticket_id if task.ticket_id_id else None
+    return {
+        'workflow': task.workflow_id_id,
+        'priority': ticket.priority if ticket else None,
+    }
+
+
+def _task_item_dimensions(task_item):
+    task = task_item.task
+    dimensions = _task_dimensions(task)
+    dimensions['step'] = task_item.assigned_on_step_id or task.current_step_id
+    dimensions['user'] = task_item.role_user.user_id if task_item.role_user_id else None
+    return dimensions
+
+
+def record_task_created(task):
+    """A new Task counts towards tasks_created on its creation day."""
+    if not rollups_enabled():
+        return
+    _safe_increment(
+        f"task {task.task_id} created",
+        rollup_day(task.created_at),
+        _task_dimensions(task),
+        tasks_created=1,
+    )
+
+
+def record_task_completed(task):
+    """A Task entering 'completed' counts towards completion and SLA facts."""
+    if not rollups_enabled():
+        return
+    completed_at = task.resolution_time or timezone.now()
+    on_time = bool(task.target_resolution and completed_at <= task.target_resolution)
+    resolution_seconds = max(0, int((completed_at - task.created_at).total_seconds())) if task.created_at else 0
+    _safe_increment(
+        f"task {task.task_id} completed",
+        rollup_day(completed_at),
+        _task_dimensions(task),
+        tasks_completed=1,
+        tasks_completed_on_time=1 if on_time else 0,
+        resolution_seconds=resolution_seconds,
+    )
+
+
+def record_task_item_assigned(task_item):
+    """A new TaskItem counts towards items_assigned on its assignment day."""
+    if not rollups_enabled():
+        return
+    _safe_increment(
+        f"task item {task_item.task_item_id} assigned",
+        rollup_day(task_item.assigned_on),
+        _task_item_dimensions(task_item),
+        items_assigned=1,
+    )
+
+
+def record_history_entry(history):
+    """An appended TaskItemHistory row counts towards its status counter."""
+    if not rollups_enabled():
+        return
+    counter = HISTORY_STATUS_COUNTERS.get(history.status)
+    if not counter:
+        return
+    task_item = history.task_item
+    deltas = {counter: 1}
+    if history.status == 'resolved' and task_item.assigned_on:
+        deltas['action_seconds'] = max(0, int((history.created_at - task_item.assigned_on).total_seconds()))
+    _safe_increment(
+        f"history {history.task_item_history_id} ({history.status})",
+        rollup_day(history.created_at),
+        _task_item_dimensions(task_item),
+        **deltas,
+    )
+
+
+def record_bulk_intake(tasks, task_items):
+    """
+    Fold bulk-created Tasks and TaskItems into the rollups.
+
+    bulk_create() does not send post_save, so batched intake calls this
+    instead; events sharing a day and dimensions become one increment.
+    """
+    if not rollups_enabled():
+        return
+    grouped = defaultdict(lambda: defaultdict(int))
+    for task in tasks:
+        dimensions = _task_dimensions(task)
+        grouped[(rollup_day(task.created_at), tuple(sorted(dimensions.items())))]['tasks_created'] += 1
+    for task_item in task_items:
+        dimensions = _task_item_dimensions(task_item)
+        grouped[(rollup_day(task_item.assigned_on), tuple(sorted(dimensions.items())))]['items_assigned'] += 1
+    for (day, dimensions), deltas in grouped.items():
+        _safe_increment(f"bulk intake ({day})", day, dict(dimensions), **deltas)
+
+
+def record_bulk_breaches(task_items, breached_at):
+    """
+    Items the SLA scanner marked as breached (TaskItem.sla_breached_at,
+    no history row) count towards items_breached on the breach day.
+    """
+    if not rollups_enabled():
+        return
+    grouped = defaultdict(int)
+    for task_item in task_items:
+        grouped[tuple(sorted(_task_item_dimensions(task_item).items()))] += 1
+    day = rollup_day(breached_at)
+    for dimensions, count in grouped.items():
+        _safe_increment(f"SLA breaches ({day})", day, dict(dimensions), items_breached=count)
+
+
+# ==================== REBUILD ====================
+
+def rebuild_rollups(start_date=None, end_date=None, batch_size=1000, apps=None):
+    """
+    Recompute rollup rows from Task / TaskItem / TaskItemHistory.
+
+    Only days within [start_date, end_date] (inclusive, either may be None)
+    are replaced. `apps` is the historical app registry when called from a
+    migration. Returns {dimension: rows_written}.
+    """
+    if apps is None:
+        from django.apps import apps
+    Task = apps.get_model('task', 'Task')
+    TaskItem = apps.get_model('task', 'TaskItem')
+    TaskItemHistory = apps.get_model('task', 'TaskItemHistory')
+
+    def in_range(day):
+        return (start_date is None or day >= start_date) and (end_date is None or day <= end_date)
+
+    # (dimension, key) -> day -> counters
+    facts = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+
+    def add(day, dimensions, **deltas):
+        if not in_range(day):
+            return
+        for name in ROLLUP_DIMENSIONS:
+            key = None if name == 'day' else dimensions.get(name)
+            if name != 'day' and (key is None or key == ''):
+                continue
+            counters = facts[(name, key)][day]
+            for field, value in deltas.items():
+                counters[field] += value
+
+    tasks = Task.objects.values_list(
+        'created_at', 'status', 'resolution_time', 'target_resolution', 'updated_at',
+        'workflow_id', 'ticket_id__priority',
+    ).order_by().iterator(chunk_size=batch_size)
+    for created_at, task_status, resolution_time, target_resolution, updated_at, workflow_id, priority in tasks:
+        dimensions = {'workflow': workflow_id, 'priority': priority}
+        add(rollup_day(created_at), dimensions, tasks_created=1)
+        if task_status == 'completed':
+            completed_at = resolution_time or updated_at
+            add(
+                rollup_day(completed_at), dimensions,
+                tasks_completed=1,
+                tasks_completed_on_time=1 if target_resolution and completed_at <= target_resolution else 0,
+                resolution_seconds=max(0, int((completed_at - created_at).total_seconds())),
+            )
+
+    items = TaskItem.objects.values_list(
+        'assigned_on', 'assigned_on_step_id', 'task__current_step_id', 'role_user__user_id',
+        'task__workflow_id', 'task__ticket_id__priority',
+    ).order_by().iterator(chunk_size=batch_size)
+    for assigned_on, step_id, current_step_id, user_id, workflow_id, priority in items:
+        dimensions = {
+            'workflow': workflow_id,
+            'priority': priority,
+            'step': step_id or current_step_id,
+            'user': user_id,
+        }
+        add(rollup_day(assigned_on), dimensions, items_assigned=1)
+
+    breached_items = TaskItem.objects.filter(sla_breached_at__isnull=False).values_list(
+        'sla_breached_at', 'assigned_on_step_id', 'task__current_step_id', 'role_user__user_id',
+        'task__workflow_id', 'task__ticket_id__priority',
+    ).order_by().iterator(chunk_size=batch_size)
+    for breached_at, step_id, current_step_id, user_id, workflow_id, priority in breached_items:
+        dimensions = {
+            'workflow': workflow_id,
+            'priority': priority,
+            'step': step_id or current_step_id,
+            'user': user_id,
+        }
+        add(rollup_day(breached_at), dimensions, items_breached=1)
+
+    history = TaskItemHistory.objects.filter(
+        status__in=list(HISTORY_STATUS_COUNTERS)
+    ).values_list(
+        'created_at', 'status', 'task_item__assigned_on', 'task_item__assigned_on_step_id',
+        'task_item__task__current_step_id', 'task_item__role_user__user_id',
+        'task_item__task__workflow_id', 'task_item__task__ticket_id__priority',
+    ).order_by().iterator(chunk_size=batch_size)
+    for created_at, entry_status, assigned_on, step_id, current_step_id, user_id, workflow_id, priority in history:
+        dimensions = {
+            'workflow': workflow_id,
+            'priority': priority,
+            'step': step_id or current_step_id,
+            'user': user_id,
+        }
+        deltas = {HISTORY_STATUS_COUNTERS[entry_status]: 1}
+        if entry_status == 'resolved' and assigned_on:
+            deltas['action_seconds'] = max(0, int((created_at - assigned_on).total_seconds()))
+        add(rollup_day(created_at), dimensions, **deltas)
+
+    written = {}
+    with transaction.atomic():
+        for name, (rollup_model, key_field) in ROLLUP_DIMENSIONS.items():
+            model = apps.get_model('reporting', rollup_model.__name__)
+            stale = model.objects.all()
+            if start_date:
+                stale = stale.filter(date__gte=start_date)
+            if end_date:
+                stale = stale.filter(date__lte=end_date)
+            stale.delete()
+
+            rows = []
+            for (dimension, key), days in facts.items():
+                if dimension != name:
+                    continue
+                for day, counters in days.items():
+                    row = model(date=day, **counters)
+                    if key_field:
+                        setattr(row, key_field, key)
+                    rows.append(row)
+            model.objects.bulk_create(rows, batch_size=batch_size)
+            written[name] = len(rows)
+
+    logger.info(f"✅ Rebuilt reporting rollups: {written}")
+    return written
+
+
+# ==================== READ SIDE ====================
+
+def _filtered_rows(dimension, start_date=None, end_date=None):
+    if dimension not in ROLLUP_DIMENSIONS:
+        raise ValueError(f"Unknown rollup dimension '{dimension}'. Expected one of: {', '.join(ROLLUP_DIMENSIONS)}")
+    model, key_field = ROLLUP_DIMENSIONS[dimension]
+    rows = model.objects.all()
+    if start_date:
+        rows = rows.filter(date__gte=start_date)
+    if end_date:
+        rows = rows.filter(date__lte=end_date)
+    return rows, key_field
+
+
+def rollup_series(start_date=None, end_date=None):
+    """Daily system-wide counters as {date: {counter: value}}."""
+    rows, _ = _filtered_rows('day', start_date, end_date)
+    return {
+        row['date']: {field: row[field] for field in COUNTER_FIELDS}
+        for row in rows.values('date', *COUNTER_FIELDS)
+    }
+
+
+def rollup_totals(dimension, start_date=None, end_date=None):
+    """
+    Counters summed over the date range, one dict per dimension key
+    (a single dict for the 'day' dimension).
+    """
+    rows, key_field = _filtered_rows(dimension, start_date, end_date)
+    sums = {field: Sum(field) for field in COUNTER_FIELDS}
+    if key_field is None:
+        totals = rows.aggregate(**sums)
+        return [{field: totals[field] or 0 for field in COUNTER_FIELDS}]
+    return [
+        {key_field: row[key_field], **{field: row[field] or 0 for field in COUNTER_FIELDS}}
+        for row in rows.values(key_field).annotate(**sums).order_by(key_field)
+    ]
@@ -0,0 +1,25 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from task.models import Task, TaskItem, TaskItemHistory
+from reporting import rollups
+
+
+@receiver(post_save, sender=Task)
+def rollup_task(sender, instance, created, **kwargs):
+    if created:
+        rollups.record_task_created(instance)
+    # Set by Task.save() only when the task moves into 'completed'
+    if getattr(instance, '_entered_completed', False):
+        rollups.record_task_completed(instance)
+
+
+@receiver(post_save, sender=TaskItem)
+def rollup_task_item(sender, instance, created, **kwargs):
+    if created:
+        rollups.record_task_item_assigned(instance)
+
+
+@receiver(post_save, sender=TaskItemHistory)
+def rollup_task_item_history(sender, instance, created, **kwargs):
+    if created:
+        rollups.record_history_entry(instance)
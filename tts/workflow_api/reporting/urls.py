@@ -56,6 +56,9 @@ from .views import (
     SLABreachRiskForecastView,
     WorkloadForecastView,
     ComprehensiveForecastView,
+    
+    # Pre-aggregated rollups
+    RollupReportView,
 )
 
 app_name = 'reporting'
@@ -123,4 +126,7 @@ urlpatterns = [
     path('forecast/sla-risk/', SLABreachRiskForecastView.as_view(), name='forecast-sla-risk'),
     path('forecast/workload/', WorkloadForecastView.as_view(), name='forecast-workload'),
     path('forecast/dashboard/', ComprehensiveForecastView.as_view(), name='forecast-dashboard'),
+    
+    # ==================== PRE-AGGREGATED ROLLUPS ====================
+    path('rollups/', RollupReportView.as_view(), name='rollups'),
 ]
@@ -1,7 +1,5 @@
 from datetime import datetime, timedelta
 from django.utils import timezone
-from django.db.models import OuterRef
-from task.models import TaskItemHistory
 
 # ==================== HELPER UTILITIES ====================
 
@@ -118,17 +116,9 @@ def calculate_task_item_sla_status(item, current_status, now=None):
     return 'on_track' if item.target_resolution > now else 'at_risk'
 
 
-def get_latest_status_subquery():
-    """Get subquery for latest task item status."""
-    return TaskItemHistory.objects.filter(
-        task_item_id=OuterRef('task_item_id')
-    ).order_by('-created_at').values('status')[:1]
-
-
 def get_task_item_current_status(item):
-    """Get current status from task item's history."""
-    latest_history = item.taskitemhistory_set.order_by('-created_at').first()
-    return latest_history.status if latest_history else 'new'
+    """Get current status (mirrored from the task item's latest history)."""
+    return item.status
 
 
 def safe_percentage(value, total):
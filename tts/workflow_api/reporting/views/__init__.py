@@ -56,3 +56,6 @@ from .forecasting_views import (
     WorkloadForecastView,
     ComprehensiveForecastView
 )
+from .rollup_views import (
+    RollupReportView
+)
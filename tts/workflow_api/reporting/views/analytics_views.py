@@ -1,5 +1,3 @@
-from django.db.models import Count
-from django.db.models.functions import TruncDate
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework.response import Response
@@ -7,10 +5,12 @@ from rest_framework import status
 
 from reporting.views.base import BaseReportingView
 from reporting.utils import safe_percentage, apply_date_filter
+from reporting.rollups import rollup_day, rollup_series
 
-from task.models import Task, TaskItemHistory
 from tickets.models import WorkflowTicket
 
+TRACKED_ITEM_COUNTERS = ['items_assigned', 'items_in_progress', 'items_escalated', 'items_reassigned', 'items_resolved']
+
 # ==================== ANALYTICS VIEWS ====================
 
 class TicketTrendAnalyticsView(BaseReportingView):
@@ -21,29 +21,14 @@ class TicketTrendAnalyticsView(BaseReportingView):
             days = int(request.query_params.get('days', 30))
             cutoff_date = timezone.now() - timedelta(days=days)
             
-            created_trends = Task.objects.filter(
-                created_at__gte=cutoff_date
-            ).annotate(date=TruncDate('created_at')).values('date').annotate(
-                count=Count('task_id')
-            ).order_by('date')
-            
-            resolved_trends = Task.objects.filter(
-                status='completed', resolution_time__gte=cutoff_date
-            ).annotate(date=TruncDate('resolution_time')).values('date').annotate(
-                count=Count('task_id')
-            ).order_by('date')
-            
-            # Merge trends by date
-            data_by_date = {}
-            for trend in created_trends:
-                date_str = str(trend['date'])
-                data_by_date.setdefault(date_str, {'created': 0, 'resolved': 0})
-                data_by_date[date_str]['created'] = trend['count']
+            # Read daily created/completed counts from the rollup table
+            series = rollup_series(start_date=rollup_day(cutoff_date), end_date=rollup_day(timezone.now()))
             
-            for trend in resolved_trends:
-                date_str = str(trend['date'])
-                data_by_date.setdefault(date_str, {'created': 0, 'resolved': 0})
-                data_by_date[date_str]['resolved'] = trend['count']
+            data_by_date = {
+                str(day): {'created': counters['tasks_created'], 'resolved': counters['tasks_completed']}
+                for day, counters in series.items()
+                if counters['tasks_created'] or counters['tasks_completed']
+            }
             
             data = [{'date': date, **values} for date, values in sorted(data_by_date.items())]
             
@@ -66,29 +51,19 @@ class TaskItemTrendAnalyticsView(BaseReportingView):
         try:
             days = int(request.query_params.get('days', 30))
             cutoff_date = timezone.now() - timedelta(days=days)
-            tracked_statuses = ['new', 'in progress', 'escalated', 'reassigned', 'resolved']
-            
-            trends = TaskItemHistory.objects.filter(
-                created_at__gte=cutoff_date, status__in=tracked_statuses
-            ).annotate(date=TruncDate('created_at')).values('date', 'status').annotate(
-                count=Count('task_item_history_id')
-            ).order_by('date', 'status')
             
-            # Organize by date
-            data_by_date = {}
-            for trend in trends:
-                date_str = str(trend['date'])
-                data_by_date.setdefault(date_str, {s: 0 for s in tracked_statuses})
-                data_by_date[date_str][trend['status']] = trend['count']
+            # Read daily item counters from the rollup table ('new' == newly assigned items)
+            series = rollup_series(start_date=rollup_day(cutoff_date), end_date=rollup_day(timezone.now()))
             
             data = [{
-                'date': date,
-                'new': statuses.get('new', 0),
-                'in_progress': statuses.get('in progress', 0),
-                'escalated': statuses.get('escalated', 0),
-                'transferred': statuses.get('reassigned', 0),
-                'resolved': statuses.get('resolved', 0),
-            } for date, statuses in sorted(data_by_date.items())]
+                'date': str(day),
+                'new': counters['items_assigned'],
+                'in_progress': counters['items_in_progress'],
+                'escalated': counters['items_escalated'],
+                'transferred': counters['items_reassigned'],
+                'resolved': counters['items_resolved'],
+            } for day, counters in sorted(series.items())
+                if any(counters[field] for field in TRACKED_ITEM_COUNTERS)]
             
             summary = {
                 'new': sum(d['new'] for d in data),
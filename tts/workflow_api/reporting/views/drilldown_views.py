@@ -197,14 +197,14 @@ class DrilldownUserTasksView(BaseReportingView):
                 'task', 'task__ticket_id', 'role_user', 'assigned_on_step'
             ).filter(role_user__user_id=user_id)
             queryset = apply_date_filter(queryset, request, date_field='assigned_on')
+            if status_filter:
+                queryset = queryset.filter(status=status_filter)
 
             now = timezone.now()
             filtered_items = []
 
             for item in queryset:
                 current_status = get_task_item_current_status(item)
-                if status_filter and current_status != status_filter:
-                    continue
 
                 time_to_action = None
                 if item.acted_on and item.assigned_on:
@@ -380,12 +380,12 @@ class DrilldownTaskItemsByStatusView(BaseReportingView):
             status_filter = request.query_params.get('status')
             queryset = TaskItem.objects.select_related('task', 'task__ticket_id', 'role_user', 'assigned_on_step').all()
             queryset = apply_date_filter(queryset, request, date_field='assigned_on')
+            if status_filter:
+                queryset = queryset.filter(status=status_filter)
 
             filtered_items = []
             for item in queryset:
                 current_status = get_task_item_current_status(item)
-                if status_filter and current_status != status_filter:
-                    continue
                 filtered_items.append({**extract_task_item_data(item, include_status=False), 'status': current_status})
 
             paginated, pagination = paginate_list(filtered_items, request)
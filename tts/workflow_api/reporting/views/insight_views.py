@@ -9,6 +9,7 @@ from reporting.utils import (
     apply_date_filter,
     get_date_range_display
 )
+from reporting.rollups import rollup_day, rollup_series
 
 from task.models import Task, TaskItem
 
@@ -370,16 +371,15 @@ class OperationalInsightsView(BaseReportingView):
                 'recommendation': 'These long-running tasks may indicate systemic issues. Review and prioritize resolution.',
             })
         
-        # Spike detection - compare today's volume to rolling average
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        today_created = Task.objects.filter(created_at__gte=today_start).count()
+        # Spike detection - compare today's volume to rolling average (from daily rollups)
+        today = rollup_day(now)
+        series = rollup_series(start_date=today - timedelta(days=7), end_date=today)
+        today_created = series.get(today, {}).get('tasks_created', 0)
         
         # Last 7 days average
-        week_ago = today_start - timedelta(days=7)
-        week_tasks = Task.objects.filter(
-            created_at__gte=week_ago,
-            created_at__lt=today_start
-        ).count()
+        week_tasks = sum(
+            counters['tasks_created'] for day, counters in series.items() if day < today
+        )
         daily_avg = week_tasks / 7 if week_tasks > 0 else 0
         
         if daily_avg > 0 and today_created > daily_avg * 2:
@@ -592,13 +592,14 @@ class AnomalyDetectionView(BaseReportingView):
             
             anomalies = []
             
-            # Volume anomaly detection
+            # Volume anomaly detection (read from the daily rollup table)
+            today = rollup_day(now)
+            series = rollup_series(start_date=today - timedelta(days=days - 1), end_date=today)
             daily_volumes = []
             for i in range(days):
-                day_start = (now - timedelta(days=i)).replace(hour=0, minute=0, second=0, microsecond=0)
-                day_end = day_start + timedelta(days=1)
-                count = Task.objects.filter(created_at__gte=day_start, created_at__lt=day_end).count()
-                daily_volumes.append({'date': day_start.date().isoformat(), 'count': count})
+                day = today - timedelta(days=i)
+                count = series.get(day, {}).get('tasks_created', 0)
+                daily_volumes.append({'date': day.isoformat(), 'count': count})
             
             if daily_volumes:
                 avg_volume = sum(d['count'] for d in daily_volumes) / len(daily_volumes)
@@ -1,5 +1,4 @@
-from django.db.models import Count, Q, F, Case, When, IntegerField, Avg, Max, Min, Subquery, Value
-from django.db.models.functions import Coalesce
+from django.db.models import Count, Q, F, Case, When, IntegerField, Avg, Max, Min
 from django.utils import timezone
 from datetime import timedelta
 from rest_framework.response import Response
@@ -7,8 +6,7 @@ from rest_framework import status
 
 from reporting.views.base import BaseReportingView
 from reporting.utils import (
-    apply_date_filter, get_date_range_display, safe_percentage,
-    get_latest_status_subquery
+    apply_date_filter, get_date_range_display, safe_percentage
 )
 
 from task.models import Task, TaskItem
@@ -190,7 +188,7 @@ class AggregatedTasksReportView(BaseReportingView):
         """Calculate SLA compliance data."""
         sla_items = queryset.filter(target_resolution__isnull=False)
         sla_items_with_status = sla_items.annotate(
-            latest_status=Coalesce(Subquery(get_latest_status_subquery()), Value('new'))
+            latest_status=F('status')
         )
         
         all_statuses = ['new', 'in progress', 'resolved', 'escalated', 'reassigned']
@@ -241,7 +239,7 @@ class AggregatedTasksReportView(BaseReportingView):
             total = user_items.count()
             
             user_items_with_status = user_items.annotate(
-                latest_status=Coalesce(Subquery(get_latest_status_subquery()), Value('new'))
+                latest_status=F('status')
             )
             
             counts = {
@@ -275,7 +273,7 @@ class AggregatedTasksReportView(BaseReportingView):
             
             # Status distribution
             queryset_with_status = queryset.annotate(
-                latest_status=Coalesce(Subquery(get_latest_status_subquery()), Value('new'))
+                latest_status=F('status')
             )
             status_data = [{
                 'status': item['latest_status'],
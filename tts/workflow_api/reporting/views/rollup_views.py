@@ -0,0 +1,48 @@
+from rest_framework.response import Response
+from rest_framework import status
+
+from reporting.views.base import BaseReportingView
+from reporting.utils import parse_date, build_base_response, safe_percentage
+from reporting.rollups import ROLLUP_DIMENSIONS, rollup_totals
+
+# ==================== ROLLUP (PRE-AGGREGATED) ENDPOINTS ====================
+
+class RollupReportView(BaseReportingView):
+    """
+    Pre-aggregated counters summed over a date range, grouped by dimension.
+
+    Query Parameters:
+        - dimension: day (default), workflow, step, user, priority
+        - start_date / end_date: YYYY-MM-DD (inclusive)
+    """
+
+    def get(self, request):
+        try:
+            dimension = request.query_params.get('dimension', 'day')
+            if dimension not in ROLLUP_DIMENSIONS:
+                return Response(
+                    {'error': f"Invalid dimension '{dimension}'. Expected one of: {', '.join(ROLLUP_DIMENSIONS)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            start = parse_date(request.query_params.get('start_date'))
+            end = parse_date(request.query_params.get('end_date'), end_of_day=True)
+            rows = rollup_totals(
+                dimension,
+                start_date=start.date() if start else None,
+                end_date=end.date() if end else None,
+            )
+            
+            for row in rows:
+                completed = row['tasks_completed']
+                resolved = row['items_resolved']
+                row['sla_compliance_rate'] = round(safe_percentage(row['tasks_completed_on_time'], completed), 1)
+                row['avg_resolution_hours'] = round(row['resolution_seconds'] / completed / 3600, 2) if completed else None
+                row['avg_action_hours'] = round(row['action_seconds'] / resolved / 3600, 2) if resolved else None
+            
+            return Response(build_base_response(request, {
+                'dimension': dimension,
+                'rows': rows,
+            }), status=status.HTTP_200_OK)
+        except Exception as e:
+            return self.handle_exception(e)
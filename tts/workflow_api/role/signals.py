@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from role.models import Roles, RoleUsers
+
+
+@receiver(post_save, sender=Roles)
+@receiver(post_delete, sender=Roles)
+@receiver(post_save, sender=RoleUsers)
+@receiver(post_delete, sender=RoleUsers)
+def invalidate_assignment_role_users(sender, instance, **kwargs):
+    # Role sync from the auth service changes who is eligible for round-robin
+    from task.utils.assignment import invalidate_role_users_cache
+    invalidate_role_users_cache()
@@ -20,17 +20,17 @@ class TaskAdmin(admin.ModelAdmin):
 
 @admin.register(TaskItem)
 class TaskItemAdmin(admin.ModelAdmin):
-    list_display = ['task_item_id', 'task', 'get_user_id', 'get_user_full_name', 'get_role', 'get_latest_status', 'assigned_on']
-    list_filter = ['role_user__role_id', 'assigned_on']
+    list_display = ['task_item_id', 'task', 'get_user_id', 'get_user_full_name', 'get_role', 'status', 'assigned_on']
+    list_filter = ['status', 'role_user__role_id', 'assigned_on']
     search_fields = ['task__task_id', 'role_user__user_id', 'role_user__user_full_name']
-    readonly_fields = ['task_item_id', 'assigned_on']
+    readonly_fields = ['task_item_id', 'assigned_on', 'status', 'status_updated_on']
     
     fieldsets = (
         ('Assignment Info', {
             'fields': ('task_item_id', 'task', 'role_user')
         }),
         ('Assignment Details', {
-            'fields': ('origin', 'assigned_on', 'notes')
+            'fields': ('origin', 'assigned_on', 'status', 'status_updated_on', 'notes')
         }),
         ('Transfer Info', {
             'fields': ('transferred_to', 'transferred_by'),
@@ -53,11 +53,6 @@ class TaskItemAdmin(admin.ModelAdmin):
     def get_role(self, obj):
         return obj.role_user.role_id.name if obj.role_user else None
     get_role.short_description = 'Role'
-    
-    def get_latest_status(self, obj):
-        latest_history = obj.taskitemhistory_set.order_by('-created_at').first()
-        return latest_history.status if latest_history else 'N/A'
-    get_latest_status.short_description = 'Status'
 
 
 @admin.register(TaskItemHistory)
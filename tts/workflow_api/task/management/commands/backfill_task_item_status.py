@@ -0,0 +1,91 @@
+"""
+Django management command to backfill TaskItem.status / status_updated_on
+from the latest TaskItemHistory entry of each task item.
+
+Usage:
+    python manage.py backfill_task_item_status
+    python manage.py backfill_task_item_status --batch-size 500
+    python manage.py backfill_task_item_status --dry-run
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from task.models import TaskItem, TaskItemHistory
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Backfill the denormalized TaskItem status from TaskItemHistory'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of task items processed per batch (default: 1000)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many task items would change without writing'
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        dry_run = options['dry_run']
+
+        self.stdout.write(self.style.SUCCESS('Backfilling TaskItem status from history...'))
+
+        last_pk = 0
+        scanned = 0
+        changed = 0
+
+        while True:
+            items = list(
+                TaskItem.objects.filter(task_item_id__gt=last_pk)
+                .order_by('task_item_id')
+                .only('task_item_id', 'status', 'status_updated_on')[:batch_size]
+            )
+            if not items:
+                break
+            last_pk = items[-1].task_item_id
+            scanned += len(items)
+
+            latest = self._latest_history_for([item.task_item_id for item in items])
+
+            to_update = []
+            for item in items:
+                entry = latest.get(item.task_item_id)
+                if entry is None:
+                    continue
+                status, created_at = entry
+                if item.status != status or item.status_updated_on != created_at:
+                    item.status = status
+                    item.status_updated_on = created_at
+                    to_update.append(item)
+
+            changed += len(to_update)
+            if to_update and not dry_run:
+                with transaction.atomic():
+                    TaskItem.objects.bulk_update(to_update, ['status', 'status_updated_on'])
+
+            self.stdout.write(f"Processed {scanned} task items ({changed} out of sync)")
+
+        verb = 'would be updated' if dry_run else 'updated'
+        self.stdout.write(self.style.SUCCESS(f"Done: {changed} of {scanned} task items {verb}"))
+        logger.info(f"backfill_task_item_status: {changed}/{scanned} task items {verb}")
+
+    def _latest_history_for(self, task_item_ids):
+        """Return {task_item_id: (status, created_at)} for the newest history row of each item."""
+        latest = {}
+        rows = TaskItemHistory.objects.filter(
+            task_item_id__in=task_item_ids
+        ).order_by('task_item_id', '-created_at', '-task_item_history_id').values_list(
+            'task_item_id', 'status', 'created_at'
+        )
+        for task_item_id, status, created_at in rows:
+            if task_item_id not in latest:
+                latest[task_item_id] = (status, created_at)
+        return latest
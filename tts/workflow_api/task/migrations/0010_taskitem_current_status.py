@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('role', '0001_initial'),
+        ('step', '0001_initial'),
+        ('task', '0009_rename_task_id_to_task_item_id_in_failed_notification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskitem',
+            name='status',
+            field=models.CharField(choices=[('new', 'New'), ('in progress', 'In Progress'), ('resolved', 'Resolved'), ('reassigned', 'Reassigned'), ('escalated', 'Escalated'), ('breached', 'Breached')], default='new', help_text='Current status (mirrors the latest TaskItemHistory entry)', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='taskitem',
+            name='status_updated_on',
+            field=models.DateTimeField(blank=True, help_text='When the current status was recorded', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='taskitem',
+            index=models.Index(fields=['role_user', 'status'], name='task_taskit_role_us_2a74b6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskitem',
+            index=models.Index(fields=['status', 'status_updated_on'], name='task_taskit_status_45d5bc_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.1 on 2026-10-16 19:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('role', '0001_initial'),
+        ('step', '0001_initial'),
+        ('task', '0010_taskitem_current_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskitem',
+            name='sla_breached_at',
+            field=models.DateTimeField(blank=True, help_text='When the SLA scanner recorded the breach', null=True),
+        ),
+        migrations.AddField(
+            model_name='taskitem',
+            name='sla_warning_sent_at',
+            field=models.DateTimeField(blank=True, help_text='When the SLA warning notification was sent', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='taskitem',
+            index=models.Index(fields=['status', 'target_resolution'], name='task_taskit_status_a8dc85_idx'),
+        ),
+    ]
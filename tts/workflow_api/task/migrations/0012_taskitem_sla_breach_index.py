@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-16 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('role', '0001_initial'),
+        ('step', '0001_initial'),
+        ('task', '0011_taskitem_sla_scan'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskitem',
+            index=models.Index(fields=['status', 'sla_breached_at', 'target_resolution'], name='task_taskit_status_23cc01_idx'),
+        ),
+    ]
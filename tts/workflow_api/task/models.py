@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 
 
 # Status choices for tasks
@@ -86,11 +87,18 @@ class Task(models.Model):
                 from task.utils.target_resolution import calculate_target_resolution_for_task
                 self.target_resolution = calculate_target_resolution_for_task(
                     ticket=self.ticket_id,
-                    workflow=self.workflow_id
+                    workflow=self.workflow_id,
+                    workflow_version=self.workflow_version
                 )
             except Exception as e:
                 print(f"⚠️ Failed to calculate task target resolution: {e}")
         
+        # Lets the reporting rollups count a completion once, not on every re-save
+        self._entered_completed = self.status == 'completed' and (
+            self._state.adding
+            or not Task.objects.filter(pk=self.pk, status='completed').exists()
+        )
+        
         super().save(*args, **kwargs)
 
     def mark_as_completed(self):
@@ -150,22 +158,66 @@ class TaskItem(models.Model):
         help_text="The step where this task item was assigned"
     )
     
+    # Denormalized copy of the latest TaskItemHistory row.
+    # Written only by TaskItemHistory.save() (or backfill_task_item_status),
+    # never by a regular TaskItem.save() on an existing row.
+    status = models.CharField(
+        max_length=50,
+        choices=TASK_ITEM_STATUS_CHOICES,
+        default='new',
+        help_text="Current status (mirrors the latest TaskItemHistory entry)"
+    )
+    status_updated_on = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the current status was recorded"
+    )
+    
+    # Idempotency markers written by the SLA scanner (task.utils.sla_monitor)
+    sla_warning_sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the SLA warning notification was sent"
+    )
+    sla_breached_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When the SLA scanner recorded the breach"
+    )
+    
+    # Fields owned by TaskItemHistory / the SLA scanner; excluded from full saves of existing rows
+    HISTORY_OWNED_FIELDS = ('status', 'status_updated_on', 'sla_warning_sent_at', 'sla_breached_at')
+    
     class Meta:
         ordering = ['task']
+        indexes = [
+            models.Index(fields=['role_user', 'status']),
+            models.Index(fields=['status', 'status_updated_on']),
+            # Due-time range scans by the SLA scanner
+            models.Index(fields=['status', 'target_resolution']),
+            models.Index(fields=['status', 'sla_breached_at', 'target_resolution']),
+        ]
     
     def __str__(self):
         return f'TaskItem {self.task_item_id}: User {self.role_user.user_id} → Task {self.task_id}'
     
+    def save(self, *args, **kwargs):
+        # A stale in-memory instance must not overwrite the status mirrored
+        # from TaskItemHistory, so full saves of existing rows skip those fields.
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.HISTORY_OWNED_FIELDS
+            ]
+        super().save(*args, **kwargs)
+    
     def to_dict(self):
         """Convert to dictionary for API responses"""
-        # Get the most recent history entry for this task item
-        latest_history = self.taskitemhistory_set.order_by('-created_at').first()
-        
         return {
             'user_id': self.role_user.user_id,
             'user_full_name': self.role_user.user_full_name,
             'role': self.role_user.role_id.name,
-            'status': latest_history.status if latest_history else None,
+            'status': self.status,
             'notes': self.notes,
             'assigned_on': self.assigned_on.isoformat() if self.assigned_on else None,
             'acted_on': self.acted_on.isoformat() if self.acted_on else None,
@@ -199,6 +251,30 @@ class TaskItemHistory(models.Model):
     
     def __str__(self):
         return f'TaskItemHistory {self.task_item_history_id}: TaskItem {self.task_item_id} - Status {self.status}'
+    
+    def save(self, *args, **kwargs):
+        """
+        Append the history row and mirror it onto TaskItem.status in the
+        same transaction. Older entries never overwrite a newer status.
+        """
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                self.sync_task_item_status()
+    
+    def sync_task_item_status(self):
+        """Copy this entry's status onto its TaskItem if it is the latest one."""
+        updated = TaskItem.objects.filter(
+            Q(status_updated_on__isnull=True) | Q(status_updated_on__lte=self.created_at),
+            pk=self.task_item_id,
+        ).update(status=self.status, status_updated_on=self.created_at)
+        
+        # Keep the caller's TaskItem instance consistent with the database
+        if updated and TaskItemHistory.task_item.is_cached(self):
+            self.task_item.status = self.status
+            self.task_item.status_updated_on = self.created_at
+        return updated
 
 
 class FailedNotification(models.Model):
@@ -35,9 +35,8 @@ class TaskItemSerializer(serializers.ModelSerializer):
         read_only_fields = ['task_item_id', 'assigned_on', 'target_resolution', 'resolution_time', 'transferred_to_user_id', 'transferred_to_user_name', 'origin', 'task_history']
     
     def get_status(self, obj):
-        """Get latest status from TaskItemHistory"""
-        latest_history = obj.taskitemhistory_set.order_by('-created_at').first()
-        return latest_history.status if latest_history else 'new'
+        """Get current status (mirrored from the latest TaskItemHistory)"""
+        return obj.status
     
     def get_task_history(self, obj):
         """Get all history records for this task item"""
@@ -142,8 +141,8 @@ class UserTaskListSerializer(serializers.ModelSerializer):
     ticket_owner_name = serializers.CharField(source='task.ticket_owner.user_full_name', read_only=True, allow_null=True)
     ticket_owner_role = serializers.CharField(source='task.ticket_owner.role_id.name', read_only=True, allow_null=True)
     
-    # Status and history - from latest TaskItemHistory
-    status = serializers.SerializerMethodField()
+    # Status and history - mirrored from latest TaskItemHistory
+    status = serializers.CharField(read_only=True)
     status_updated_on = serializers.SerializerMethodField()
     
     # Transfer and origin fields
@@ -192,15 +191,9 @@ class UserTaskListSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
     
-    def get_status(self, obj):
-        """Get latest status from TaskItemHistory"""
-        latest_history = obj.taskitemhistory_set.order_by('-created_at').first()
-        return latest_history.status if latest_history else 'new'
-    
     def get_status_updated_on(self, obj):
-        """Get latest status update time from TaskItemHistory"""
-        latest_history = obj.taskitemhistory_set.order_by('-created_at').first()
-        return latest_history.created_at if latest_history else obj.assigned_on
+        """Get latest status update time, falling back to assignment time"""
+        return obj.status_updated_on or obj.assigned_on
     
     def get_transferred_to_user_id(self, obj):
         """Get transferred_to user ID"""
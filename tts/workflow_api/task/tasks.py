@@ -75,7 +75,7 @@ def send_assignment_notification(user_id, ticket_number, task_title, role_name):
             "status": "error",
             "message": str(e),
             "user_id": user_id,
-            "task_item_id": task_item_id
+            "ticket_number": ticket_number
         }
 
 
@@ -484,6 +484,76 @@ def send_sla_breach_notification(
         }
 
 
+@shared_task(name="task.send_bulk_sla_notifications")
+def send_bulk_sla_notifications(kind, notifications):
+    """
+    Send a batch of SLA warning or breach notifications (queued by the SLA scanner).
+    
+    Args:
+        kind (str): 'warning' or 'breach'
+        notifications (list): Dicts with user_id, task_item_id, task_title,
+            target_resolution and time_remaining (warning) or breach_duration (breach)
+    
+    Returns:
+        dict: Status with count of notifications sent
+    """
+    sent_count = 0
+    failed_count = 0
+    
+    for notification in notifications:
+        try:
+            if kind == 'breach':
+                result = send_sla_breach_notification(
+                    user_id=notification['user_id'],
+                    task_item_id=notification['task_item_id'],
+                    task_title=notification['task_title'],
+                    target_resolution=notification['target_resolution'],
+                    breach_duration=notification.get('breach_duration')
+                )
+            else:
+                result = send_sla_warning_notification(
+                    user_id=notification['user_id'],
+                    task_item_id=notification['task_item_id'],
+                    task_title=notification['task_title'],
+                    time_remaining=notification.get('time_remaining'),
+                    target_resolution=notification['target_resolution']
+                )
+            if result['status'] == 'success':
+                sent_count += 1
+            else:
+                failed_count += 1
+        except Exception as e:
+            logger.error(
+                f"❌ Error sending SLA {kind} notification for {notification}: {str(e)}",
+                exc_info=True
+            )
+            failed_count += 1
+    
+    logger.info(f"📊 Bulk SLA {kind} notifications: {sent_count} sent, {failed_count} failed")
+    
+    return {
+        "status": "completed",
+        "sent_count": sent_count,
+        "failed_count": failed_count,
+        "total": len(notifications)
+    }
+
+
+@shared_task(name="task.scan_sla_deadlines")
+def scan_sla_deadlines():
+    """
+    Periodic SLA scan (scheduled by Celery beat, see workflow_api/celery.py).
+    Records breaches and sends warnings for newly due task items.
+    """
+    from task.utils.sla_monitor import scan_sla_deadlines as run_scan
+    
+    try:
+        return {"status": "success", **run_scan()}
+    except Exception as e:
+        logger.error(f"❌ SLA scan failed: {str(e)}", exc_info=True)
+        return {"status": "error", "message": str(e)}
+
+
 # =============================================================================
 # BULK ASSIGNMENT NOTIFICATIONS
 # =============================================================================
@@ -497,7 +567,7 @@ def send_bulk_assignment_notifications(assignments_data):
     Args:
         assignments_data (list): List of dicts with keys:
             - user_id (int)
-            - task_item_id (str)
+            - ticket_number (str) (older payloads may only carry task_item_id)
             - task_title (str)
             - role_name (str)
     
@@ -508,13 +578,13 @@ def send_bulk_assignment_notifications(assignments_data):
         >>> send_bulk_assignment_notifications.delay([
         ...     {
         ...         "user_id": 6,
-        ...         "task_item_id": "123",
+        ...         "ticket_number": "TX20251227638396",
         ...         "task_title": "Review Ticket",
         ...         "role_name": "Reviewer"
         ...     },
         ...     {
         ...         "user_id": 7,
-        ...         "task_item_id": "124",
+        ...         "ticket_number": "TX20251227638397",
         ...         "task_title": "Approve Ticket",
         ...         "role_name": "Approver"
         ...     }
@@ -528,7 +598,7 @@ def send_bulk_assignment_notifications(assignments_data):
             try:
                 result = send_assignment_notification(
                     user_id=assignment['user_id'],
-                    task_item_id=assignment['task_item_id'],
+                    ticket_number=assignment.get('ticket_number') or assignment.get('task_item_id'),
                     task_title=assignment['task_title'],
                     role_name=assignment['role_name']
                 )
@@ -11,6 +11,7 @@ from task.utils.assignment import assign_users_for_step
 from authentication import JWTCookieAuthentication
 from step.models import Steps, StepTransition
 from workflow.models import WorkflowVersion
+from workflow.compiled import get_compiled_version
 
 logger = logging.getLogger(__name__)
 
@@ -110,17 +111,13 @@ class TaskTransitionView(CreateAPIView):
         # Validate user is assigned to this task with "new" or "in progress" status
         user_assignment = None
         try:
-            # Get TaskItem by user
-            task_item = TaskItem.objects.select_related('role_user').get(
+            # Get the user's TaskItem whose current status is 'new' or 'in progress'
+            user_assignment = TaskItem.objects.select_related('role_user').filter(
                 task=task,
-                role_user__user_id=current_user_id
-            )
-            
-            # Check if latest history status is 'new' or 'in progress'
-            latest_history = task_item.taskitemhistory_set.order_by('-created_at').first()
-            if latest_history and latest_history.status in ['new', 'in progress']:
-                user_assignment = task_item
-            else:
+                role_user__user_id=current_user_id,
+                status__in=['new', 'in progress']
+            ).order_by('-assigned_on').first()
+            if user_assignment is None:
                 raise TaskItem.DoesNotExist
                 
         except TaskItem.DoesNotExist:
@@ -142,8 +139,7 @@ class TaskTransitionView(CreateAPIView):
         # If user has 'new' status, update to 'in progress' and sync to HDTS
         try:
             from task.models import TaskItemHistory
-            latest_history = user_assignment.taskitemhistory_set.order_by('-created_at').first()
-            if latest_history and latest_history.status == 'new':
+            if user_assignment.status == 'new':
                 # Create 'in progress' status record
                 TaskItemHistory.objects.create(
                     task_item=user_assignment,
@@ -191,9 +187,13 @@ class TaskTransitionView(CreateAPIView):
             
             # Check if this step is referenced as a from_step in any transition
             # If it is NOT referenced, this is an end step
-            step_has_outgoing_transitions = StepTransition.objects.filter(
-                from_step_id=current_step
-            ).exists()
+            compiled = get_compiled_version(task.workflow_version)
+            if compiled and current_step.step_id in compiled:
+                step_has_outgoing_transitions = compiled.has_outgoing(current_step.step_id)
+            else:
+                step_has_outgoing_transitions = StepTransition.objects.filter(
+                    from_step_id=current_step
+                ).exists()
             
             if step_has_outgoing_transitions:
                 return Response(
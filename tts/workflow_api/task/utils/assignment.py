@@ -3,19 +3,71 @@ Utility functions for user assignment and round-robin logic.
 These functions are used across tasks, steps, and transitions.
 """
 
+import time
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
 from django.utils import timezone
 from tickets.models import RoundRobin
 from task.models import TaskItem, TaskItemHistory, FailedNotification
-from role.models import Roles, RoleUsers
+from role.models import RoleUsers
 from task.tasks import send_assignment_notification as notify_task
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Active RoleUsers per role are cached; role sync bumps the generation
+# (see role/signals.py) so every cached list is invalidated at once.
+# The generation is only shared when DJANGO_CACHE_REDIS_URL is set; with the
+# default per-process LocMem cache, other workers see role changes after
+# ROLE_USERS_CACHE_TIMEOUT.
+ROLE_USERS_CACHE_TIMEOUT = 60  # seconds, safety net for cross-process staleness
+ROLE_USERS_GENERATION_KEY = 'assignment:role_users:generation'
+
+
+def _role_users_generation():
+    generation = cache.get(ROLE_USERS_GENERATION_KEY)
+    if generation is None:
+        cache.add(ROLE_USERS_GENERATION_KEY, int(time.time() * 1000), timeout=None)
+        generation = cache.get(ROLE_USERS_GENERATION_KEY, 0)
+    return generation
+
+
+def invalidate_role_users_cache():
+    """Drop every cached active-users list (called on Roles/RoleUsers changes)."""
+    try:
+        cache.incr(ROLE_USERS_GENERATION_KEY)
+    except ValueError:
+        cache.set(ROLE_USERS_GENERATION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def get_active_role_users(role_name):
+    """
+    Active RoleUsers for a role, ordered by user_id, served from cache.
+    
+    Args:
+        role_name: Name of the role
+    
+    Returns:
+        List of RoleUsers instances (role_id preloaded)
+    """
+    key = f'assignment:role_users:{_role_users_generation()}:{role_name}'
+    role_users = cache.get(key)
+    if role_users is None:
+        role_users = list(RoleUsers.objects.filter(
+            role_id__name=role_name,
+            is_active=True
+        ).select_related('role_id').order_by('user_id'))
+        cache.set(key, role_users, timeout=ROLE_USERS_CACHE_TIMEOUT)
+    return role_users
+
 
 def fetch_users_for_role(role_name):
     """
-    Fetch users for a role from the RoleUsers model.
+    Fetch active user IDs for a role, ordered by user_id.
+    
+    The order matches get_active_role_users(), so round-robin slots
+    (`slot % len(user_ids)`) always map to the same user.
     
     Args:
         role_name: Name of the role
@@ -24,21 +76,77 @@ def fetch_users_for_role(role_name):
         List of user IDs: [3, 6, 7, ...]
     """
     try:
-        role = Roles.objects.get(name=role_name)
-        user_ids = list(RoleUsers.objects.filter(
-            role_id=role,
-            is_active=True
-        ).values_list('user_id', flat=True))
-        logger.info(f"[OK] Found {len(user_ids)} users for role '{role_name}'")
+        user_ids = [role_user.user_id for role_user in get_active_role_users(role_name)]
+        if user_ids:
+            logger.info(f"[OK] Found {len(user_ids)} users for role '{role_name}'")
+        else:
+            logger.warning(f"[ERROR] No active users for role '{role_name}'")
         return user_ids
-    except Roles.DoesNotExist:
-        logger.warning(f"[ERROR] Role '{role_name}' not found")
-        return []
     except Exception as e:
         logger.error(f"[ERROR] Error fetching users: {e}")
         return []
 
 
+def claim_round_robin_slots(role_name, count=1):
+    """
+    Atomically reserve `count` consecutive round-robin slots for a role.
+    
+    The counter is incremented with a single UPDATE (which takes the row
+    lock) and read back inside the same transaction, so concurrent workers
+    always receive disjoint slot ranges. The lock is held only for this
+    short transaction, never across TaskItem creation or notifications.
+    
+    Args:
+        role_name: Role name the counter belongs to
+        count: Number of slots to reserve
+    
+    Returns:
+        range of slot numbers; callers map them onto users with `slot % len(users)`
+    """
+    if count <= 0:
+        return range(0)
+    
+    with transaction.atomic():
+        updated = RoundRobin.objects.filter(role_name=role_name).update(
+            current_index=F('current_index') + count,
+            updated_at=timezone.now()
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    RoundRobin.objects.create(role_name=role_name, current_index=count)
+                return range(0, count)
+            except IntegrityError:
+                # Another worker created the row first; increment theirs
+                RoundRobin.objects.filter(role_name=role_name).update(
+                    current_index=F('current_index') + count,
+                    updated_at=timezone.now()
+                )
+        end = RoundRobin.objects.filter(role_name=role_name).values_list('current_index', flat=True).get()
+    
+    return range(end - count, end)
+
+
+def claim_round_robin_users(role_name, count=1):
+    """
+    Pick the next `count` users of a role in round-robin order.
+    
+    Batch counterpart of the single-task helpers: one counter update
+    covers all `count` assignments.
+    
+    Args:
+        role_name: Role name
+        count: Number of assignments to hand out
+    
+    Returns:
+        List of RoleUsers (length `count`), or [] if the role has no active users
+    """
+    role_users = get_active_role_users(role_name)
+    if not role_users:
+        return []
+    return [role_users[slot % len(role_users)] for slot in claim_round_robin_slots(role_name, count)]
+
+
 def apply_round_robin_assignment(task, user_ids, role_name, step=None):
     """
     Apply round-robin logic to assign users to tasks.
@@ -59,13 +167,8 @@ def apply_round_robin_assignment(task, user_ids, role_name, step=None):
     # Use provided step or fall back to task.current_step
     target_step = step or task.current_step
 
-    round_robin_state, _ = RoundRobin.objects.get_or_create(
-        role_name=role_name,
-        defaults={"current_index": 0}
-    )
-
-    current_index = round_robin_state.current_index
-    user_index = current_index % len(user_ids)
+    slot = claim_round_robin_slots(role_name)[0]
+    user_index = slot % len(user_ids)
     user_id = user_ids[user_index]
 
     # Calculate target resolution for TaskItem using WEIGHTED SLA
@@ -77,7 +180,8 @@ def apply_round_robin_assignment(task, user_ids, role_name, step=None):
             target_resolution = calculate_target_resolution_for_task_item(
                 ticket=task.ticket_id,
                 step=target_step,
-                workflow=task.workflow_id
+                workflow=task.workflow_id,
+                workflow_version=task.workflow_version
             )
             if target_resolution:
                 logger.info(f"[OK] Calculated TASK ITEM target resolution: {target_resolution}")
@@ -90,15 +194,21 @@ def apply_round_robin_assignment(task, user_ids, role_name, step=None):
         logger.error(f"[ERROR] Failed to calculate TaskItem target resolution: {e}", exc_info=True)
 
     # Get RoleUsers record for this user and role
-    try:
-        role_users = RoleUsers.objects.select_related('role_id').get(
-            user_id=user_id,
-            role_id__name=role_name,
-            is_active=True
-        )
-    except RoleUsers.DoesNotExist:
-        logger.error(f"[ERROR] RoleUsers record not found for user {user_id} and role '{role_name}'")
-        return []
+    role_users = next(
+        (role_user for role_user in get_active_role_users(role_name) if role_user.user_id == user_id),
+        None
+    )
+    if role_users is None:
+        # Not in the cached list (e.g. activated moments ago); ask the database
+        try:
+            role_users = RoleUsers.objects.select_related('role_id').get(
+                user_id=user_id,
+                role_id__name=role_name,
+                is_active=True
+            )
+        except RoleUsers.DoesNotExist:
+            logger.error(f"[ERROR] RoleUsers record not found for user {user_id} and role '{role_name}'")
+            return []
 
     # Create TaskItem for the assigned user
     # Include assigned_on_step in lookup to allow same user to be assigned at different steps
@@ -145,10 +255,6 @@ def apply_round_robin_assignment(task, user_ids, role_name, step=None):
     else:
         logger.info(f"[WARNING] TaskItem already exists: User {user_id} for Task {task.task_id}")
 
-    # Update round-robin state for next assignment
-    round_robin_state.current_index = (current_index + 1) % len(user_ids)
-    round_robin_state.save()
-    
     logger.info(f"[OK] Assigned user {user_id} from role '{role_name}' (round-robin index: {user_index})")
 
     return [task_item]
@@ -195,27 +301,12 @@ def assign_users_for_escalation(task, escalate_to_role, reason, from_user_id=Non
         logger.error("❌ No escalate_to_role provided for escalation")
         return []
     
-    # Fetch all active users for the escalate_to role
-    role_users_qs = RoleUsers.objects.filter(
-        role_id=escalate_to_role,
-        is_active=True
-    ).select_related('role_id')
-    
-    if not role_users_qs.exists():
+    # Pick the next active user of the escalate_to role (round-robin)
+    selected = claim_round_robin_users(escalate_to_role.name)
+    if not selected:
         logger.warning(f"❌ No active users found for escalated role '{escalate_to_role.name}'")
         return []
-    
-    # Get round-robin state for this escalated role
-    round_robin_state, _ = RoundRobin.objects.get_or_create(
-        role_name=escalate_to_role.name,
-        defaults={"current_index": 0}
-    )
-    
-    # Convert queryset to list for round-robin indexing
-    role_users_list = list(role_users_qs)
-    current_index = round_robin_state.current_index
-    user_index = current_index % len(role_users_list)
-    selected_role_user = role_users_list[user_index]
+    selected_role_user = selected[0]
     
     # Get the most recent assignment's target resolution to inherit
     original_target_resolution = None
@@ -277,10 +368,6 @@ def assign_users_for_escalation(task, escalate_to_role, reason, from_user_id=Non
     except Exception as e:
         logger.error(f"⚠️ Failed to send escalation notification: {e}")
     
-    # Update round-robin state for next escalation
-    round_robin_state.current_index = (current_index + 1) % len(role_users_list)
-    round_robin_state.save()
-    
     logger.info(f"🚨 Task {task.task_id} escalated to user {selected_role_user.user_id} in role '{escalate_to_role.name}' (reason: {reason})")
     
     return [task_item]
@@ -302,42 +389,17 @@ def assign_ticket_owner(task):
         RoleUsers instance if assigned, None otherwise
     """
     try:
-        # Get all active users with the Ticket Coordinator role
-        role = Roles.objects.filter(name=TICKET_COORDINATOR_ROLE).first()
-        
-        if not role:
-            logger.warning(f"⚠️ Role '{TICKET_COORDINATOR_ROLE}' not found. Ticket owner not assigned.")
-            return None
-        
-        role_users_qs = RoleUsers.objects.filter(
-            role_id=role,
-            is_active=True
-        ).select_related('role_id')
-        
-        if not role_users_qs.exists():
+        # Pick the next active Ticket Coordinator (round-robin)
+        selected = claim_round_robin_users(TICKET_COORDINATOR_ROLE)
+        if not selected:
             logger.warning(f"⚠️ No active users found for role '{TICKET_COORDINATOR_ROLE}'. Ticket owner not assigned.")
             return None
-        
-        # Get or create round-robin state for Ticket Coordinator
-        round_robin_state, _ = RoundRobin.objects.get_or_create(
-            role_name=TICKET_COORDINATOR_ROLE,
-            defaults={"current_index": 0}
-        )
-        
-        # Convert queryset to list for round-robin indexing
-        role_users_list = list(role_users_qs)
-        current_index = round_robin_state.current_index
-        user_index = current_index % len(role_users_list)
-        selected_owner = role_users_list[user_index]
+        selected_owner = selected[0]
         
         # Assign the ticket owner to the task
         task.ticket_owner = selected_owner
         task.save(update_fields=['ticket_owner'])
         
-        # Update round-robin state for next assignment
-        round_robin_state.current_index = (current_index + 1) % len(role_users_list)
-        round_robin_state.save()
-        
         logger.info(f"👑 Ticket owner assigned: User {selected_owner.user_id} ({selected_owner.user_full_name}) for Task {task.task_id}")
         
         # Send notification to ticket owner
@@ -0,0 +1,167 @@
+"""
+SLA Deadline Scanner
+
+Run periodically by Celery beat (task.scan_sla_deadlines). Each run:
+
+1. Breaches: open TaskItems whose target_resolution has passed get
+   sla_breached_at set and a breach notification. The item keeps its
+   status, so the assignee can still act on it.
+2. Warnings: open TaskItems due within SLA_WARNING_LEAD_MINUTES get a
+   warning notification.
+
+Breaches are found through the (status, sla_breached_at, target_resolution)
+index, so already-breached items are skipped without a lower time bound;
+warnings are a range scan on (status, target_resolution).
+sla_warning_sent_at / sla_breached_at are claimed before notifications are
+queued, so an item is never notified twice even if runs overlap.
+"""
+
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from task.models import TaskItem, FailedNotification
+import logging
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ('new', 'in progress')
+
+
+def _setting_minutes(name, default):
+    return timedelta(minutes=getattr(settings, name, default))
+
+
+def _humanize(delta):
+    """'2h 15m' style duration for notification text."""
+    total_minutes = max(0, int(delta.total_seconds() // 60))
+    hours, minutes = divmod(total_minutes, 60)
+    return f"{hours}h {minutes}m" if hours else f"{minutes}m"
+
+
+def _claim_batch(queryset, batch_size, claim_field, now):
+    """
+    Lock and mark up to `batch_size` items of `queryset`.
+
+    Returns the claimed TaskItems (with task, ticket and role user loaded).
+    Rows locked by a concurrent scanner are skipped, not waited on.
+    """
+    ids = list(queryset.order_by('target_resolution', 'task_item_id').values_list('task_item_id', flat=True)[:batch_size])
+    if not ids:
+        return []
+
+    items = list(
+        queryset.filter(task_item_id__in=ids)
+        .select_for_update(skip_locked=True, of=('self',))
+        .select_related('task__ticket_id', 'role_user__role_id', 'assigned_on_step')
+    )
+    if items:
+        TaskItem.objects.filter(
+            task_item_id__in=[item.task_item_id for item in items]
+        ).update(**{claim_field: now})
+    return items
+
+
+def _notification_payload(item, now, **extra):
+    ticket = item.task.ticket_id
+    return {
+        'user_id': item.role_user.user_id,
+        'task_item_id': str(item.task_item_id),
+        'task_title': str(ticket.ticket_number) if ticket else f"Task {item.task_id}",
+        'target_resolution': item.target_resolution.isoformat(),
+        'role_name': item.role_user.role_id.name,
+        **extra,
+    }
+
+
+def _queue_notifications(kind, notifications):
+    """Send one batched Celery task for the claimed items; park failures for retry."""
+    from task.tasks import send_bulk_sla_notifications
+
+    if not notifications:
+        return
+    try:
+        send_bulk_sla_notifications.delay(kind, notifications)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to queue SLA {kind} notifications: {e}")
+        FailedNotification.objects.bulk_create([
+            FailedNotification(
+                user_id=notification['user_id'],
+                task_item_id=notification['task_item_id'],
+                task_title=notification['task_title'],
+                role_name=notification['role_name'],
+                error_message=f"SLA {kind}: {e}",
+                status='pending'
+            )
+            for notification in notifications
+        ])
+
+
+def process_breaches(now, batch_size=500):
+    """Mark open items past their target as breached. Returns the count."""
+    from reporting.rollups import record_bulk_breaches
+
+    due = TaskItem.objects.filter(
+        status__in=OPEN_STATUSES,
+        sla_breached_at__isnull=True,
+        target_resolution__lte=now,
+    )
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            items = _claim_batch(due, batch_size, 'sla_breached_at', now)
+            if not items:
+                break
+            record_bulk_breaches(items, now)
+            notifications = [
+                _notification_payload(item, now, breach_duration=_humanize(now - item.target_resolution))
+                for item in items
+            ]
+            transaction.on_commit(lambda n=notifications: _queue_notifications('breach', n))
+        total += len(items)
+        logger.info(f"🔴 SLA breach recorded for {len(items)} task items")
+    return total
+
+
+def process_warnings(now, lead, batch_size=500):
+    """Warn assignees of open items due within `lead`. Returns the count."""
+    upcoming = TaskItem.objects.filter(
+        status__in=OPEN_STATUSES,
+        sla_warning_sent_at__isnull=True,
+        target_resolution__gt=now,
+        target_resolution__lte=now + lead,
+    )
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            items = _claim_batch(upcoming, batch_size, 'sla_warning_sent_at', now)
+            if not items:
+                break
+            notifications = [
+                _notification_payload(item, now, time_remaining=_humanize(item.target_resolution - now))
+                for item in items
+            ]
+            transaction.on_commit(lambda n=notifications: _queue_notifications('warning', n))
+        total += len(items)
+        logger.info(f"⚠️ SLA warning sent for {len(items)} task items")
+    return total
+
+
+def scan_sla_deadlines(now=None, batch_size=None):
+    """
+    One scanner pass (breaches first, then warnings).
+
+    Returns:
+        dict: {'breached': int, 'warned': int}
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or getattr(settings, 'SLA_SCAN_BATCH_SIZE', 500)
+    lead = _setting_minutes('SLA_WARNING_LEAD_MINUTES', 120)
+
+    breached = process_breaches(now, batch_size)
+    warned = process_warnings(now, lead, batch_size)
+
+    logger.info(f"[OK] SLA scan at {now.isoformat()}: {breached} breached, {warned} warned")
+    return {'breached': breached, 'warned': warned}
@@ -10,6 +10,7 @@ Calculates target resolution times for tasks based on:
 
 from datetime import timedelta
 from django.utils import timezone
+from workflow.compiled import get_compiled_version
 import logging
 
 logger = logging.getLogger(__name__)
@@ -56,13 +57,15 @@ def get_sla_for_priority(workflow, priority):
     return sla
 
 
-def calculate_step_weight_percentage(step, workflow):
+def calculate_step_weight_percentage(step, workflow, workflow_version=None):
     """
     Calculate what percentage of the total workflow time this step represents.
     
     Args:
         step: Steps model instance
         workflow: Workflows model instance (for context)
+        workflow_version: Optional WorkflowVersion; when given, the weight
+            fraction comes from its compiled definition (no query)
     
     Returns:
         float: Percentage (0-1) of the total workflow time for this step
@@ -71,6 +74,10 @@ def calculate_step_weight_percentage(step, workflow):
         If step has weight 2.5 and total workflow weight is 10:
         Returns 0.25 (25%)
     """
+    compiled = get_compiled_version(workflow_version)
+    if compiled and step.step_id in compiled:
+        return compiled.weight_fraction(step.step_id)
+    
     # Get all steps in the workflow
     from step.models import Steps
     
@@ -87,7 +94,20 @@ def calculate_step_weight_percentage(step, workflow):
     return step_percentage
 
 
-def calculate_target_resolution_for_task(ticket, workflow):
+def resolve_sla(workflow, priority, workflow_version=None):
+    """
+    SLA for a priority from the WorkflowVersion snapshot (compiled, no query),
+    falling back to the live workflow fields.
+    """
+    compiled = get_compiled_version(workflow_version)
+    if compiled:
+        sla = compiled.sla_for_priority(priority)
+        if sla:
+            return sla
+    return get_sla_for_priority(workflow, priority)
+
+
+def calculate_target_resolution_for_task(ticket, workflow, workflow_version=None):
     """
     Calculate the target resolution time for a TASK using FULL SLA (not weighted).
     
@@ -101,6 +121,7 @@ def calculate_target_resolution_for_task(ticket, workflow):
     Args:
         ticket: WorkflowTicket model instance (contains priority)
         workflow: Workflows model instance (contains SLA per priority)
+        workflow_version: Optional WorkflowVersion whose SLA snapshot is used
     
     Returns:
         datetime: Target resolution datetime, or None if calculation fails
@@ -118,7 +139,7 @@ def calculate_target_resolution_for_task(ticket, workflow):
         logger.info(f"[INFO] Calculating TASK target resolution for ticket {ticket.ticket_number}, priority: {priority}")
         
         # Get FULL SLA for this priority (no weighting)
-        sla = get_sla_for_priority(workflow, priority)
+        sla = resolve_sla(workflow, priority, workflow_version)
         if not sla:
             logger.warning(f"[WARNING] Cannot calculate target resolution: no SLA for priority '{priority}'")
             return None
@@ -142,7 +163,7 @@ def calculate_target_resolution_for_task(ticket, workflow):
         return None
 
 
-def calculate_target_resolution_for_task_item(ticket, step, workflow):
+def calculate_target_resolution_for_task_item(ticket, step, workflow, workflow_version=None):
     """
     Calculate the target resolution time for a TASK ITEM using WEIGHTED SLA.
     
@@ -157,6 +178,8 @@ def calculate_target_resolution_for_task_item(ticket, step, workflow):
         ticket: WorkflowTicket model instance (contains priority)
         step: Steps model instance (contains weight)
         workflow: Workflows model instance (contains SLA per priority)
+        workflow_version: Optional WorkflowVersion; its compiled definition
+            supplies the SLA and step weight without querying Steps
     
     Returns:
         datetime: Target resolution datetime, or None if calculation fails
@@ -176,13 +199,13 @@ def calculate_target_resolution_for_task_item(ticket, step, workflow):
         logger.info(f"[INFO] Calculating TASK ITEM target resolution for ticket {ticket.ticket_number}, priority: {priority}")
         
         # Get SLA for this priority
-        sla = get_sla_for_priority(workflow, priority)
+        sla = resolve_sla(workflow, priority, workflow_version)
         if not sla:
             logger.warning(f"[WARNING] Cannot calculate target resolution: no SLA for priority '{priority}'")
             return None
         
         # Calculate step weight percentage
-        step_percentage = calculate_step_weight_percentage(step, workflow)
+        step_percentage = calculate_step_weight_percentage(step, workflow, workflow_version)
         
         # Calculate time allocation for this step (weighted)
         step_sla = sla * step_percentage
@@ -17,6 +17,7 @@ from .serializers import TaskSerializer, UserTaskListSerializer, TaskCreateSeria
 from authentication import JWTCookieAuthentication, SystemRolePermission
 from step.models import Steps, StepTransition
 from tickets.models import WorkflowTicket
+from workflow.compiled import get_compiled_version
 from role.models import RoleUsers
 
 logger = logging.getLogger(__name__)
@@ -53,7 +54,7 @@ class UserTaskListView(ListAPIView):
             'task__current_step', 
             'role_user', 
             'assigned_on_step'
-        ).prefetch_related('taskitemhistory_set')
+        )
         
         # Apply role filter if provided
         role = self.request.query_params.get('role')
@@ -63,7 +64,7 @@ class UserTaskListView(ListAPIView):
         return queryset
     
     def filter_queryset(self, queryset):
-        """Override to filter by status from history after serialization"""
+        """Apply workflow and assignment status filters"""
         queryset = super().filter_queryset(queryset)
         
         # Handle status filter if provided (filter in Python since it's from history)
@@ -74,14 +75,7 @@ class UserTaskListView(ListAPIView):
             queryset = queryset.filter(task__workflow_id=workflow_id)
         
         if assignment_status:
-            # Filter in memory based on latest history status
-            filtered_list = []
-            for item in queryset:
-                latest_history = item.taskitemhistory_set.order_by('-created_at').first()
-                status = latest_history.status if latest_history else 'new'
-                if status == assignment_status:
-                    filtered_list.append(item.id)
-            queryset = queryset.filter(id__in=filtered_list)
+            queryset = queryset.filter(status=assignment_status)
         
         return queryset
 
@@ -121,7 +115,7 @@ class AllTasksListView(ListAPIView):
             'task__current_step', 
             'role_user', 
             'assigned_on_step'
-        ).prefetch_related('taskitemhistory_set')
+        )
         
         # Apply role filter if provided
         role = self.request.query_params.get('role')
@@ -158,7 +152,7 @@ class AllTasksListView(ListAPIView):
         return queryset
     
     def filter_queryset(self, queryset):
-        """Override to filter by status from history after serialization"""
+        """Apply workflow and assignment status filters"""
         queryset = super().filter_queryset(queryset)
         
         # Handle status filter if provided
@@ -169,14 +163,7 @@ class AllTasksListView(ListAPIView):
             queryset = queryset.filter(task__workflow_id=workflow_id)
         
         if assignment_status:
-            # Filter in memory based on latest history status
-            filtered_list = []
-            for item in queryset:
-                latest_history = item.taskitemhistory_set.order_by('-created_at').first()
-                status = latest_history.status if latest_history else 'new'
-                if status == assignment_status:
-                    filtered_list.append(item.id)
-            queryset = queryset.filter(id__in=filtered_list)
+            queryset = queryset.filter(status=assignment_status)
         
         return queryset
 
@@ -712,20 +699,19 @@ class TaskViewSet(viewsets.ModelViewSet):
             'role_user', 
             'role_user__role_id',
             'assigned_on_step'
-        ).prefetch_related('taskitemhistory_set').order_by('-assigned_on').first()
+        ).order_by('-assigned_on').first()
         
         current_owner = None
         is_owner = False
         user_task_item = None
         
         if most_recent_task_item:
-            owner_status = most_recent_task_item.taskitemhistory_set.order_by('-created_at').first()
             current_owner = {
                 'task_item_id': most_recent_task_item.task_item_id,
                 'user_id': most_recent_task_item.role_user.user_id,
                 'user_full_name': most_recent_task_item.role_user.user_full_name,
                 'role': most_recent_task_item.role_user.role_id.name if most_recent_task_item.role_user.role_id else None,
-                'status': owner_status.status if owner_status else 'new',
+                'status': most_recent_task_item.status,
                 'origin': most_recent_task_item.origin,
                 'assigned_on': most_recent_task_item.assigned_on.isoformat() if most_recent_task_item.assigned_on else None,
             }
@@ -877,8 +863,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         # Validate task item status - can only transfer unacted, non-escalated items
-        latest_history = task_item.taskitemhistory_set.order_by('-created_at').first()
-        current_status = latest_history.status if latest_history else 'new'
+        current_status = task_item.status
         
         if current_status in ['resolved', 'escalated', 'reassigned', 'breached']:
             return Response(
@@ -1043,9 +1028,8 @@ class TaskViewSet(viewsets.ModelViewSet):
         user_id = request.user.user_id
         task_item_id = task_item.task_item_id
         
-        # ========== TaskItem's OWN status from history ==========
-        latest_history = task_item.taskitemhistory_set.order_by('-created_at').first()
-        current_status = latest_history.status if latest_history else 'new'
+        # ========== TaskItem's OWN status (mirrored from history) ==========
+        current_status = task_item.status
         
         # Auto-mark as 'in progress' on first view
         if current_status == 'new':
@@ -1077,19 +1061,27 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get transitions from THIS step
-        available_transitions = StepTransition.objects.filter(
-            from_step_id=step
-        ).select_related('to_step_id', 'to_step_id__role_id')
+        # Get transitions from THIS step (compiled WorkflowVersion when available)
+        compiled = get_compiled_version(task_item.task.workflow_version_id)
+        if compiled and step.step_id in compiled:
+            available_transitions = [
+                (t.transition_id, t.name, compiled.steps.get(t.to_step_id))
+                for t in compiled.outgoing(step.step_id)
+            ]
+        else:
+            available_transitions = [
+                (t.transition_id, t.name, t.to_step_id)
+                for t in StepTransition.objects.filter(from_step_id=step).select_related('to_step_id')
+            ]
         
         available_actions = [
             {
-                'transition_id': str(t.transition_id),
-                'id': t.transition_id,
-                'name': t.name or f'{step.name} → {t.to_step_id.name if t.to_step_id else "End"}',
-                'description': t.to_step_id.description if t.to_step_id else 'Complete workflow',
+                'transition_id': str(transition_id),
+                'id': transition_id,
+                'name': name or f'{step.name} → {to_step.name if to_step else "End"}',
+                'description': to_step.description if to_step else 'Complete workflow',
             }
-            for t in available_transitions
+            for transition_id, name, to_step in available_transitions
         ]
         
         if not available_actions:
@@ -1100,7 +1092,7 @@ class TaskViewSet(viewsets.ModelViewSet):
                 'description': step.description or f'Complete {step.name}',
             })
         
-        step_transition_id = str(available_transitions.first().transition_id) if available_transitions.exists() else None
+        step_transition_id = str(available_transitions[0][0]) if available_transitions else None
         
         # ========== TICKET DATA ==========
         ticket = task_item.task.ticket_id
@@ -1116,17 +1108,16 @@ class TaskViewSet(viewsets.ModelViewSet):
         # ========== CURRENT OWNER (most recent TaskItem for this ticket's task) ==========
         most_recent = TaskItem.objects.filter(
             task=task_item.task
-        ).select_related('role_user', 'role_user__role_id').prefetch_related('taskitemhistory_set').order_by('-assigned_on').first()
+        ).select_related('role_user', 'role_user__role_id').order_by('-assigned_on').first()
         
         current_owner = None
         if most_recent:
-            owner_status = most_recent.taskitemhistory_set.order_by('-created_at').first()
             current_owner = {
                 'task_item_id': most_recent.task_item_id,
                 'user_id': most_recent.role_user.user_id,
                 'user_full_name': most_recent.role_user.user_full_name,
                 'role': most_recent.role_user.role_id.name if most_recent.role_user.role_id else None,
-                'status': owner_status.status if owner_status else 'new',
+                'status': most_recent.status,
                 'origin': most_recent.origin,
                 'assigned_on': most_recent.assigned_on.isoformat() if most_recent.assigned_on else None,
             }
@@ -1421,8 +1412,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         # Check if the original assignment is already escalated
-        latest_history = current_assignment.taskitemhistory_set.order_by('-created_at').first()
-        current_status = latest_history.status if latest_history else 'new'
+        current_status = current_assignment.status
         
         if current_status == 'escalated':
             return Response(
@@ -1435,12 +1425,9 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Check if any existing task item for the CURRENT role already has escalated status
         # This prevents escalating if the current role has already been escalated
         current_role = current_assignment.role_user.role_id
-        escalated_in_current_role = False
-        for item in TaskItem.objects.filter(task=task, role_user__role_id=current_role).prefetch_related('taskitemhistory_set'):
-            item_latest_history = item.taskitemhistory_set.order_by('-created_at').first()
-            if item_latest_history and item_latest_history.status == 'escalated':
-                escalated_in_current_role = True
-                break
+        escalated_in_current_role = TaskItem.objects.filter(
+            task=task, role_user__role_id=current_role, status='escalated'
+        ).exists()
         
         if escalated_in_current_role:
             return Response(
@@ -1449,12 +1436,9 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         # Check if any existing task item for the escalate_to role already has escalated status
-        escalated_in_target_role = False
-        for item in TaskItem.objects.filter(task=task, role_user__role_id=escalate_to_role).prefetch_related('taskitemhistory_set'):
-            item_latest_history = item.taskitemhistory_set.order_by('-created_at').first()
-            if item_latest_history and item_latest_history.status == 'escalated':
-                escalated_in_target_role = True
-                break
+        escalated_in_target_role = TaskItem.objects.filter(
+            task=task, role_user__role_id=escalate_to_role, status='escalated'
+        ).exists()
         
         if escalated_in_target_role:
             return Response(
@@ -1554,8 +1538,7 @@ class TaskViewSet(viewsets.ModelViewSet):
             )
         
         # Validate task item status - can only transfer unacted, non-escalated items
-        latest_history = task_item.taskitemhistory_set.order_by('-created_at').first()
-        current_status = latest_history.status if latest_history else 'new'
+        current_status = task_item.status
         
         if current_status in ['resolved', 'escalated', 'reassigned', 'breached']:
             return Response(
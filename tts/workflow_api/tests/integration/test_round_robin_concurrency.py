@@ -0,0 +1,161 @@
+"""
+Integration Tests for Concurrent Round-Robin Assignment
+=======================================================
+
+Many workers claim round-robin slots for the same role at once. Every claim
+must receive its own slot range (no two tasks get the same slot) and the
+users must end up evenly loaded.
+
+The threaded tests need a database with real row locking (PostgreSQL) and
+are skipped on SQLite, which serialises writers at the file level and
+rejects concurrent writes. RoundRobinInterleavedClaimTests runs everywhere:
+it interleaves the workers' claims in one thread and checks the same
+invariants, plus the path where two workers race to create the counter.
+
+Run with: python manage.py test tests.integration.test_round_robin_concurrency
+"""
+import threading
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+from django.db import connection, connections
+from django.db.models import QuerySet
+
+from tests.base import BaseTestCase, BaseTransactionTestCase
+from role.models import Roles, RoleUsers
+from tickets.models import RoundRobin
+from task.utils.assignment import claim_round_robin_slots, claim_round_robin_users
+
+
+WORKERS = 8
+CLAIMS_PER_WORKER = 25
+
+
+@unittest.skipUnless(connection.features.has_select_for_update, "requires row-level locking")
+class RoundRobinConcurrencyTests(BaseTransactionTestCase):
+    """Stress the atomic slot claim from several threads"""
+
+    def setUp(self):
+        self.role = Roles.objects.create(role_id=1, name="Support Agent", system="tts")
+        for user_id in (1, 2, 3, 4):
+            RoleUsers.objects.create(role_id=self.role, user_id=user_id, is_active=True)
+
+    def _run_workers(self, target):
+        errors = []
+        barrier = threading.Barrier(WORKERS)
+
+        def worker():
+            try:
+                barrier.wait()
+                target()
+            except Exception as e:  # surfaced via the assertion below
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_concurrent_claims_get_unique_slots(self):
+        """Test that concurrent single-slot claims never share a slot"""
+        slots = []
+        lock = threading.Lock()
+
+        def claim():
+            for _ in range(CLAIMS_PER_WORKER):
+                slot = claim_round_robin_slots("Support Agent")[0]
+                with lock:
+                    slots.append(slot)
+
+        self._run_workers(claim)
+
+        total = WORKERS * CLAIMS_PER_WORKER
+        self.assertEqual(sorted(slots), list(range(total)))
+        self.assertEqual(RoundRobin.objects.get(role_name="Support Agent").current_index, total)
+
+    def test_concurrent_batch_claims_distribute_evenly(self):
+        """Test that concurrent batch claims load every user equally"""
+        assigned = Counter()
+        lock = threading.Lock()
+
+        def claim():
+            for _ in range(CLAIMS_PER_WORKER):
+                role_users = claim_round_robin_users("Support Agent", 2)
+                with lock:
+                    assigned.update(ru.user_id for ru in role_users)
+
+        self._run_workers(claim)
+
+        expected = WORKERS * CLAIMS_PER_WORKER * 2 // 4
+        self.assertEqual(dict(assigned), {1: expected, 2: expected, 3: expected, 4: expected})
+
+
+class RoundRobinInterleavedClaimTests(BaseTestCase):
+    """Slot and user distribution of interleaved claims (runs on SQLite)"""
+
+    def setUp(self):
+        self.role = Roles.objects.create(role_id=1, name="Support Agent", system="tts")
+        for user_id in (1, 2, 3, 4):
+            RoleUsers.objects.create(role_id=self.role, user_id=user_id, is_active=True)
+
+    def _cursor(self):
+        return RoundRobin.objects.get(role_name="Support Agent").current_index
+
+    def test_interleaved_claims_get_contiguous_unique_slots(self):
+        """Test that claims of mixed sizes from several workers never overlap"""
+        claims = {worker: [] for worker in range(WORKERS)}
+        for round_number in range(CLAIMS_PER_WORKER):
+            for worker in range(WORKERS):
+                count = 1 + (worker + round_number) % 3
+                claims[worker].extend(claim_round_robin_slots("Support Agent", count))
+
+        slots = [slot for worker_slots in claims.values() for slot in worker_slots]
+        self.assertEqual(sorted(slots), list(range(len(slots))))
+        self.assertEqual(self._cursor(), len(slots))
+
+    def test_interleaved_batch_claims_distribute_evenly(self):
+        """Test that batch claims keep every user equally loaded"""
+        assigned = Counter()
+        for _ in range(CLAIMS_PER_WORKER):
+            for _ in range(WORKERS):
+                assigned.update(ru.user_id for ru in claim_round_robin_users("Support Agent", 2))
+
+        expected = WORKERS * CLAIMS_PER_WORKER * 2 // 4
+        self.assertEqual(dict(assigned), {1: expected, 2: expected, 3: expected, 4: expected})
+        self.assertEqual(self._cursor(), WORKERS * CLAIMS_PER_WORKER * 2)
+
+    def test_cursor_advances_across_batch_sizes(self):
+        """Test that each claim resumes the rotation where the previous one stopped"""
+        batches = [claim_round_robin_users("Support Agent", count) for count in (3, 1, 6)]
+
+        self.assertEqual([[ru.user_id for ru in batch] for batch in batches],
+                         [[1, 2, 3], [4], [1, 2, 3, 4, 1, 2]])
+        self.assertEqual(self._cursor(), 10)
+        self.assertEqual(list(claim_round_robin_slots("Support Agent", 0)), [])
+        self.assertEqual(self._cursor(), 10)
+
+    def test_lost_counter_creation_race(self):
+        """Test that a worker whose counter INSERT loses the race still gets its own slots"""
+        first = claim_round_robin_slots("Support Agent", 2)
+        real_update = QuerySet.update
+        calls = []
+
+        def update(queryset, **kwargs):
+            calls.append(kwargs)
+            if len(calls) == 1:
+                # The counter row did not exist yet when this worker looked
+                return 0
+            return real_update(queryset, **kwargs)
+
+        with patch.object(QuerySet, 'update', update):
+            second = claim_round_robin_slots("Support Agent", 3)
+
+        self.assertEqual(list(first), [0, 1])
+        self.assertEqual(list(second), [2, 3, 4])
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self._cursor(), 5)
@@ -238,6 +238,28 @@ class TaskTransitionTestCase(BaseTestCase):
         new_history = new_item.taskitemhistory_set.order_by('-created_at').first()
         self.assertEqual(new_history.status, 'new')
         
+    @patch('task.tasks.send_bulk_sla_notifications.delay')
+    def test_assignee_can_resolve_after_sla_breach(self, mock_sla_notify, mock_notify):
+        """Test that an item the SLA scanner marked as breached can still be resolved"""
+        from task.utils.sla_monitor import scan_sla_deadlines
+
+        TaskItem.objects.filter(pk=self.task_item_triage.pk).update(
+            target_resolution=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(scan_sla_deadlines()['breached'], 1)
+
+        self._authenticate_as_user(100)
+        response = self.client.post('/transitions/', {
+            'task_id': self.task.task_id,
+            'transition_id': self.transition_1to2.transition_id,
+            'notes': 'Resolved after the SLA passed'
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.task_item_triage.refresh_from_db()
+        self.assertEqual(self.task_item_triage.status, 'resolved')
+        self.assertIsNotNone(self.task_item_triage.sla_breached_at)
+
     def test_invalid_transition_skip_steps(self, mock_notify):
         """Test invalid transition attempting to skip steps"""
         # Authenticate as triage user
@@ -0,0 +1,158 @@
+"""
+Unit tests for the incremental reporting rollup tables.
+
+Run with: python manage.py test tests.unit.reporting.test_rollups
+"""
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+
+from tests.base import BaseTestCase
+from task.models import Task, TaskItem, TaskItemHistory
+from workflow.models import Workflows
+from step.models import Steps
+from role.models import Roles, RoleUsers
+from tickets.models import WorkflowTicket
+from reporting.models import DailyRollup, WorkflowDailyRollup, UserDailyRollup, PriorityDailyRollup
+from reporting.rollups import rollup_day, rollup_series, rollup_totals
+
+
+class ReportingRollupTests(BaseTestCase):
+    """Test that rollups are maintained incrementally and can be rebuilt"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.role = Roles.objects.create(role_id=1, name="Support Agent", system="tts")
+        
+        self.workflow = Workflows.objects.create(
+            user_id=1,
+            name="Rollup Workflow",
+            description="Workflow for rollup tests",
+            workflow_id=1,
+            category="Support",
+            sub_category="General",
+            department="IT",
+            status="deployed",
+            is_published=True,
+            low_sla=timedelta(hours=24),
+            medium_sla=timedelta(hours=12),
+            high_sla=timedelta(hours=4),
+            urgent_sla=timedelta(hours=1),
+        )
+        
+        self.step = Steps.objects.create(
+            step_id=1,
+            workflow_id=self.workflow,
+            role_id=self.role,
+            name="Assessment",
+            order=1,
+            weight=1.0,
+            is_initialized=True,
+            is_start=True,
+            is_end=True,
+        )
+        
+        self.role_user = RoleUsers.objects.create(
+            role_id=self.role,
+            user_id=7,
+            user_full_name="Jane Agent",
+            is_active=True
+        )
+        
+        self.today = rollup_day(timezone.now())
+
+    def _create_task(self, ticket_number, priority='High'):
+        ticket = WorkflowTicket.objects.create(
+            ticket_number=ticket_number,
+            priority=priority,
+            ticket_data={'priority': priority},
+        )
+        task = Task.objects.create(
+            ticket_id=ticket,
+            workflow_id=self.workflow,
+            current_step=self.step,
+            target_resolution=timezone.now() + timedelta(hours=4),
+        )
+        item = TaskItem.objects.create(task=task, role_user=self.role_user, assigned_on_step=self.step)
+        TaskItemHistory.objects.create(task_item=item, status='new')
+        return task, item
+
+    def _snapshot(self):
+        return {
+            'day': rollup_totals('day'),
+            'workflow': rollup_totals('workflow'),
+            'user': rollup_totals('user'),
+            'priority': rollup_totals('priority'),
+            'step': rollup_totals('step'),
+        }
+
+    def test_task_events_update_rollups(self):
+        """Test that task creation, resolution and completion increment rollups"""
+        with self.captureOnCommitCallbacks(execute=True):
+            task, item = self._create_task('TX-ROLLUP-1')
+            self._create_task('TX-ROLLUP-2', priority='Low')
+            
+            TaskItemHistory.objects.create(task_item=item, status='in progress')
+            TaskItemHistory.objects.create(task_item=item, status='resolved')
+            task.status = 'completed'
+            task.save()
+            # Re-saving a completed task must not double count
+            task.save()
+            Task.objects.get(pk=task.pk).save()
+        
+        daily = DailyRollup.objects.get(date=self.today)
+        self.assertEqual(daily.tasks_created, 2)
+        self.assertEqual(daily.tasks_completed, 1)
+        self.assertEqual(daily.tasks_completed_on_time, 1)
+        self.assertEqual(daily.items_assigned, 2)
+        self.assertEqual(daily.items_in_progress, 1)
+        self.assertEqual(daily.items_resolved, 1)
+        
+        self.assertEqual(WorkflowDailyRollup.objects.get(date=self.today, workflow_id=1).tasks_created, 2)
+        self.assertEqual(UserDailyRollup.objects.get(date=self.today, user_id=7).items_assigned, 2)
+        self.assertEqual(PriorityDailyRollup.objects.get(date=self.today, priority='High').tasks_completed, 1)
+        self.assertEqual(PriorityDailyRollup.objects.get(date=self.today, priority='Low').tasks_completed, 0)
+        
+        self.assertEqual(rollup_series(start_date=self.today)[self.today]['tasks_created'], 2)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        """Test that rebuilding from raw rows reproduces the incremental counters"""
+        with self.captureOnCommitCallbacks(execute=True):
+            task, item = self._create_task('TX-ROLLUP-3')
+            TaskItemHistory.objects.create(task_item=item, status='escalated')
+            task.status = 'completed'
+            task.save()
+        
+        incremental = self._snapshot()
+        DailyRollup.objects.all().delete()
+        
+        call_command('rebuild_reporting_rollups', stdout=io.StringIO())
+        
+        rebuilt = self._snapshot()
+        for dimension in incremental:
+            for row in incremental[dimension] + rebuilt[dimension]:
+                # Timing sums depend on save order; counts must match exactly
+                row.pop('resolution_seconds', None)
+                row.pop('action_seconds', None)
+        self.assertEqual(incremental, rebuilt)
+
+    def test_rollups_wait_for_commit(self):
+        """Test that increments run after commit and rolled-back writes are not counted"""
+        with self.captureOnCommitCallbacks() as callbacks:
+            task, item = self._create_task('TX-ROLLUP-4')
+            try:
+                with transaction.atomic():
+                    TaskItemHistory.objects.create(task_item=item, status='resolved')
+                    raise RuntimeError('rolled back')
+            except RuntimeError:
+                pass
+            self.assertFalse(DailyRollup.objects.exists())
+        
+        for callback in callbacks:
+            callback()
+        
+        daily = DailyRollup.objects.get(date=self.today)
+        self.assertEqual((daily.tasks_created, daily.items_assigned, daily.items_resolved), (1, 1, 0))
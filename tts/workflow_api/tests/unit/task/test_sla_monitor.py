@@ -0,0 +1,109 @@
+"""
+Unit tests for the periodic SLA scanner (task.utils.sla_monitor).
+
+Run with: python manage.py test tests.unit.task.test_sla_monitor
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.utils import timezone
+
+from tests.base import BaseTestCase
+from task.models import Task, TaskItem, TaskItemHistory
+from task.utils.sla_monitor import scan_sla_deadlines
+from workflow.models import Workflows
+from step.models import Steps
+from role.models import Roles, RoleUsers
+from tickets.models import WorkflowTicket
+
+
+@patch('task.tasks.send_bulk_sla_notifications.delay')
+class SLAScannerTests(BaseTestCase):
+    """Test breach recording, warnings and idempotency of the SLA scanner"""
+
+    def setUp(self):
+        self.now = timezone.now()
+
+        role = Roles.objects.create(role_id=1, name="Support Agent", system="tts")
+        self.role_user = RoleUsers.objects.create(role_id=role, user_id=7, user_full_name="Alice")
+        workflow = Workflows.objects.create(
+            user_id=1,
+            name="SLA Workflow",
+            description="Workflow for SLA scanner tests",
+            category="Support",
+            sub_category="General",
+            department="IT",
+        )
+        step = Steps.objects.create(
+            step_id=1, workflow_id=workflow, role_id=role, name="Support", order=1, weight=1.0,
+        )
+        ticket = WorkflowTicket.objects.create(ticket_number="TX-SLA", ticket_data={}, priority="High")
+        self.task = Task.objects.create(ticket_id=ticket, workflow_id=workflow, current_step=step)
+
+        self.overdue = self._item(self.now - timedelta(minutes=5))
+        self.due_soon = self._item(self.now + timedelta(minutes=30))
+        self.far_off = self._item(self.now + timedelta(days=2))
+        self.resolved = self._item(self.now - timedelta(hours=1), status='resolved')
+
+    def _item(self, target_resolution, status='new'):
+        item = TaskItem.objects.create(task=self.task, role_user=self.role_user, target_resolution=target_resolution)
+        TaskItemHistory.objects.create(task_item=item, status=status)
+        return item
+
+    def test_breach_and_warning_recorded(self, mock_notify):
+        """Test that overdue items are marked breached and items due soon are warned"""
+        with self.captureOnCommitCallbacks(execute=True):
+            result = scan_sla_deadlines(now=self.now)
+
+        self.assertEqual(result, {'breached': 1, 'warned': 1})
+
+        self.overdue.refresh_from_db()
+        # The breach is only a marker; the assignee can still act on the item
+        self.assertEqual(self.overdue.status, 'new')
+        self.assertEqual(self.overdue.sla_breached_at, self.now)
+        self.assertFalse(TaskItemHistory.objects.filter(status='breached').exists())
+
+        self.due_soon.refresh_from_db()
+        self.assertEqual(self.due_soon.status, 'new')
+        self.assertIsNotNone(self.due_soon.sla_warning_sent_at)
+
+        kinds = {call.args[0]: call.args[1] for call in mock_notify.call_args_list}
+        self.assertEqual([n['task_item_id'] for n in kinds['breach']], [str(self.overdue.task_item_id)])
+        self.assertEqual([n['task_item_id'] for n in kinds['warning']], [str(self.due_soon.task_item_id)])
+        self.resolved.refresh_from_db()
+        self.assertIsNone(self.resolved.sla_breached_at)
+
+    def test_second_scan_is_idempotent(self, mock_notify):
+        """Test that items are never notified twice"""
+        with self.captureOnCommitCallbacks(execute=True):
+            scan_sla_deadlines(now=self.now)
+        mock_notify.reset_mock()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = scan_sla_deadlines(now=self.now + timedelta(minutes=1))
+
+        self.assertEqual(result, {'breached': 0, 'warned': 0})
+        mock_notify.assert_not_called()
+        self.assertEqual(TaskItem.objects.filter(sla_breached_at__isnull=False).count(), 1)
+
+    def test_long_overdue_item_is_breached_on_a_later_scan(self, mock_notify):
+        """Test that items overdue long before the previous scan are still picked up"""
+        scan_sla_deadlines(now=self.now)
+        long_overdue = self._item(self.now - timedelta(days=30))
+
+        result = scan_sla_deadlines(now=self.now + timedelta(minutes=1))
+
+        self.assertEqual(result['breached'], 1)
+        long_overdue.refresh_from_db()
+        self.assertEqual(long_overdue.sla_breached_at, self.now + timedelta(minutes=1))
+
+    def test_stale_save_keeps_scanner_markers(self, mock_notify):
+        """Test that saving a stale TaskItem does not clear the idempotency markers"""
+        stale = TaskItem.objects.get(pk=self.due_soon.pk)
+        scan_sla_deadlines(now=self.now)
+
+        stale.notes = "edited"
+        stale.save()
+
+        stale.refresh_from_db()
+        self.assertIsNotNone(stale.sla_warning_sent_at)
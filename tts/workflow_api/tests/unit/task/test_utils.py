@@ -10,7 +10,13 @@ from unittest.mock import patch, MagicMock
 
 from tests.base import BaseTestCase
 from task.models import Task, TaskItem, TaskItemHistory
-from task.utils.assignment import fetch_users_for_role, apply_round_robin_assignment
+from task.utils.assignment import (
+    fetch_users_for_role,
+    apply_round_robin_assignment,
+    claim_round_robin_slots,
+    claim_round_robin_users,
+    get_active_role_users,
+)
 from task.utils.target_resolution import (
     get_sla_for_priority,
     calculate_step_weight_percentage,
@@ -132,6 +138,13 @@ class RoundRobinAssignmentTests(BaseTestCase):
         self.assertNotIn(2, user_ids)
         self.assertIn(3, user_ids)
 
+    def test_fetch_users_ordered_by_user_id(self):
+        """Test that round-robin slots map to users in a stable user_id order"""
+        RoleUsers.objects.create(role_id=self.role, user_id=9, user_full_name="Ivy", is_active=True)
+        RoleUsers.objects.create(role_id=self.role, user_id=5, user_full_name="Eve", is_active=True)
+        
+        self.assertEqual(fetch_users_for_role("Support Agent"), [1, 2, 3, 5, 9])
+
     def test_fetch_users_nonexistent_role(self):
         """Test that fetching users for a non-existent role returns empty list"""
         user_ids = fetch_users_for_role("NonExistentRole")
@@ -215,6 +228,32 @@ class RoundRobinAssignmentTests(BaseTestCase):
         rr.refresh_from_db()
         self.assertGreaterEqual(rr.current_index, 1)
 
+    def test_claimed_slot_ranges_are_disjoint(self):
+        """Test that consecutive claims hand out contiguous, non-overlapping slots"""
+        first = claim_round_robin_slots("Support Agent", 3)
+        second = claim_round_robin_slots("Support Agent", 2)
+        
+        self.assertEqual(list(first), [0, 1, 2])
+        self.assertEqual(list(second), [3, 4])
+        self.assertEqual(RoundRobin.objects.get(role_name="Support Agent").current_index, 5)
+
+    def test_batch_claim_cycles_through_users(self):
+        """Test that a batch claim distributes users in round-robin order"""
+        role_users = claim_round_robin_users("Support Agent", 5)
+        
+        self.assertEqual([ru.user_id for ru in role_users], [1, 2, 3, 1, 2])
+        self.assertEqual(claim_round_robin_users("Support Agent")[0].user_id, 3)
+        self.assertEqual(claim_round_robin_users("NonExistentRole", 2), [])
+
+    def test_role_users_cache_invalidated_on_sync(self):
+        """Test that saving a RoleUsers row refreshes the cached active users"""
+        self.assertEqual([ru.user_id for ru in get_active_role_users("Support Agent")], [1, 2, 3])
+        
+        self.user_2.is_active = False
+        self.user_2.save()
+        
+        self.assertEqual([ru.user_id for ru in get_active_role_users("Support Agent")], [1, 3])
+
     def test_no_available_users(self):
         """Test assignment behavior when no users are available for a role"""
         # Deactivate all users
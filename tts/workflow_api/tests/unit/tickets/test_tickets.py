@@ -470,4 +470,93 @@ class CreateTaskForTicketTests(BaseTicketTaskTest):
             response = create_task_for_ticket(self.ticket.id)
             
             self.assertEqual(response['status'], 'error')
-            self.assertEqual(response['message'], 'Workflow matching error')
\ No newline at end of file
+            self.assertEqual(response['message'], 'Workflow matching error')
+
+class ReceiveTicketBatchTests(BaseTicketTaskTest):
+    """Tests for the batched intake path (receive_ticket_batch / tickets.intake)."""
+
+    def setUp(self):
+        super().setUp()
+        self.workflow, self.steps, self.workflow_version = self._create_workflow_with_steps(
+            name='IT Support Workflow',
+            department='IT',
+            category='Hardware',
+        )
+
+    def _payload(self, ticket_number, **extra):
+        data = {'ticket_number': ticket_number, 'subject': f'Issue {ticket_number}',
+                'department': 'IT', 'category': 'Hardware', 'priority': 'High', 'status': 'Open'}
+        data.update(extra)
+        return data
+
+    @patch('task.tasks.send_bulk_assignment_notifications.delay')
+    def test_batch_creates_tasks_items_and_history(self, mock_bulk_notify):
+        """Test that a batch creates one task, item and 'new' history row per routed ticket."""
+        from tickets.tasks import receive_ticket_batch
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = receive_ticket_batch([self._payload(f'TX-{n}') for n in range(4)], batch_size=3)
+
+        self.assertEqual(response['status'], 'success')
+        self.assertEqual(response['created'], 4)
+        self.assertEqual(response['tasks_created'], 4)
+        self.assertEqual(Task.objects.filter(workflow_version=self.workflow_version).count(), 4)
+        self.assertEqual(WorkflowTicket.objects.filter(is_task_allocated=True).count(), 4)
+
+        items = TaskItem.objects.order_by('task__ticket_id__ticket_number')
+        self.assertEqual([item.status for item in items], ['new'] * 4)
+        self.assertEqual(TaskItemHistory.objects.filter(status='new').count(), 4)
+        self.assertTrue(all(item.target_resolution for item in items))
+        # First step belongs to the single Ticket Coordinator
+        self.assertEqual({item.role_user.user_id for item in items}, {101})
+        self.assertTrue(all(task.ticket_owner_id for task in Task.objects.all()))
+
+        # One bulk notification task per chunk (chunks of 3 + 1)
+        self.assertEqual(mock_bulk_notify.call_count, 2)
+        notifications = mock_bulk_notify.call_args_list[0].args[0]
+        self.assertEqual(notifications[0]['ticket_number'], 'TX-0')
+
+    @patch('task.tasks.send_bulk_assignment_notifications.delay')
+    def test_batch_updates_existing_and_skips_unrouted(self, mock_bulk_notify):
+        """Test that known tickets are updated, unmatched ones stored without a task."""
+        from tickets.intake import ingest_ticket_batch
+
+        WorkflowTicket.objects.create(ticket_number='TX-OLD', ticket_data={'status': 'Open'}, priority='Low')
+
+        response = ingest_ticket_batch([
+            self._payload('TX-OLD', priority='Medium'),
+            self._payload('TX-NEW', category='Unknown'),
+            {'subject': 'No identifier'},
+        ])
+
+        self.assertEqual(response['updated'], 1)
+        self.assertEqual(response['created'], 1)
+        self.assertEqual(response['unrouted'], 1)
+        self.assertEqual(response['skipped'], 1)
+        self.assertEqual(response['tasks_created'], 0)
+        self.assertEqual(WorkflowTicket.objects.get(ticket_number='TX-OLD').priority, 'Medium')
+        self.assertFalse(Task.objects.exists())
+
+
+class ReceiveTicketStatusBatchTests(BaseTestCase):
+    """Tests for status changes pushed from HDTS in batches (receive_ticket_status_batch)."""
+
+    def test_statuses_applied_per_ticket(self):
+        """Test that each listed ticket gets its status and others are untouched."""
+        from tickets.tasks import receive_ticket_status_batch
+
+        for number in ('TX-1', 'TX-2', 'TX-3'):
+            WorkflowTicket.objects.create(ticket_number=number, ticket_data={}, status='Resolved')
+
+        with self.assertNumQueries(2):
+            response = receive_ticket_status_batch([
+                {'ticket_number': 'TX-1', 'status': 'Closed'},
+                {'ticket_number': 'TX-2', 'status': 'Closed'},
+                {'ticket_number': 'TX-3', 'status': 'Open'},
+                {'ticket_number': 'TX-404', 'status': 'Closed'},
+                {'status': 'Closed'},
+            ])
+
+        self.assertEqual(response, {'status': 'success', 'updated': 3})
+        statuses = dict(WorkflowTicket.objects.values_list('ticket_number', 'status'))
+        self.assertEqual(statuses, {'TX-1': 'Closed', 'TX-2': 'Closed', 'TX-3': 'Open'})
@@ -0,0 +1,101 @@
+"""
+Unit tests for compiled WorkflowVersion definitions (workflow.compiled).
+
+Run with: python manage.py test tests.unit.workflow.test_compiled_workflow
+"""
+from datetime import timedelta
+
+from django.test import override_settings
+
+from tests.base import BaseTestCase
+from workflow.models import Workflows, WorkflowVersion
+from workflow.compiled import compiled_versions, get_compiled_version
+
+
+DEFINITION = {
+    'nodes': [
+        {'id': 10, 'label': 'Triage', 'role_name': 'Agent', 'order': 1, 'weight': 1.0, 'is_start': True, 'is_end': False},
+        {'id': 11, 'label': 'Fix', 'role_name': 'Engineer', 'order': 2, 'weight': 3.0, 'is_start': False, 'is_end': False},
+        {'id': 12, 'label': 'Close', 'role_name': 'Agent', 'order': 3, 'weight': 0.0, 'is_start': False, 'is_end': True},
+    ],
+    'edges': [
+        {'id': 100, 'from_step_id': 10, 'to_step_id': 11, 'name': 'Assign'},
+        {'id': 101, 'from_step_id': 11, 'to_step_id': 12, 'name': 'Done'},
+        {'id': 102, 'from_step_id': 11, 'to_step_id': 10, 'name': 'Back'},
+    ],
+    'metadata': {
+        'high_sla': str(timedelta(hours=8)),
+        'urgent_sla': str(timedelta(days=1, hours=2)),
+        'low_sla': None,
+    },
+}
+
+
+class CompiledWorkflowTests(BaseTestCase):
+    """Test compilation and caching of WorkflowVersion definitions"""
+
+    def setUp(self):
+        compiled_versions.clear()
+        self.workflow = Workflows.objects.create(
+            user_id=1,
+            name="Compiled Workflow",
+            description="Workflow for compiled definition tests",
+            category="Support",
+            sub_category="General",
+            department="IT",
+        )
+        self.version = WorkflowVersion.objects.create(
+            workflow=self.workflow,
+            version=1,
+            definition=DEFINITION,
+        )
+
+    def test_graph_structure(self):
+        """Test adjacency lists and start/end steps"""
+        compiled = get_compiled_version(self.version)
+
+        self.assertEqual(compiled.ordered_step_ids, (10, 11, 12))
+        self.assertEqual([t.transition_id for t in compiled.outgoing(11)], [101, 102])
+        self.assertTrue(compiled.has_outgoing(10))
+        self.assertFalse(compiled.has_outgoing(12))
+        self.assertEqual(compiled.start_step_ids, (10,))
+        self.assertEqual(compiled.end_step_ids, (12,))
+        self.assertEqual(compiled.first_step_id, 10)
+
+    def test_weights_and_sla(self):
+        """Test weight fractions and per-priority SLA deltas"""
+        compiled = get_compiled_version(self.version)
+
+        self.assertAlmostEqual(compiled.weight_fraction(11), 0.75)
+        self.assertEqual(compiled.sla_for_priority('High'), timedelta(hours=8))
+        self.assertEqual(compiled.sla_for_priority('Critical'), timedelta(days=1, hours=2))
+        self.assertIsNone(compiled.sla_for_priority('Low'))
+        self.assertEqual(compiled.step_sla('High', 10), timedelta(hours=2))
+
+    def test_cache_reuses_compiled_version(self):
+        """Test that lookups by instance or id share one compiled object without queries"""
+        compiled = get_compiled_version(self.version)
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_compiled_version(self.version.pk), compiled)
+            self.assertIs(get_compiled_version(self.version), compiled)
+
+    @override_settings(WORKFLOW_COMPILED_CACHE_SIZE=1)
+    def test_cache_is_bounded(self):
+        """Test that the LRU evicts the least recently used version"""
+        other = WorkflowVersion.objects.create(workflow=self.workflow, version=2, definition=DEFINITION)
+
+        get_compiled_version(self.version)
+        get_compiled_version(other)
+
+        self.assertEqual(len(compiled_versions), 1)
+        self.assertIsNone(compiled_versions.get(self.version.pk))
+
+    def test_deleted_version_is_discarded(self):
+        """Test that deleting a version drops its compiled entry"""
+        get_compiled_version(self.version)
+        version_id = self.version.pk
+        self.version.delete()
+
+        self.assertIsNone(compiled_versions.get(version_id))
+        self.assertIsNone(get_compiled_version(version_id))
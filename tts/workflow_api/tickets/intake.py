@@ -0,0 +1,292 @@
+"""
+Batched ticket intake.
+
+receive_ticket handles one HDTS ticket per message and runs the whole
+workflow lookup / SLA / round-robin pipeline for each one. During morning
+spikes and backfills that is several queries per ticket. ingest_ticket_batch()
+takes a list of ticket payloads and:
+
+1. upserts the WorkflowTicket rows (bulk_create for new tickets),
+2. resolves workflow, first step, active WorkflowVersion and SLA inputs
+   once per (department, category),
+3. claims round-robin slots once per role for the whole batch,
+4. bulk-creates Task, TaskItem and TaskItemHistory rows in one transaction,
+5. queues a single send_bulk_assignment_notifications task.
+
+Entry point for Celery is tickets.tasks.receive_ticket_batch.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from tickets.models import WorkflowTicket
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_ticket_data(ticket_data):
+    """
+    Fill ticket_number / priority the same way receive_ticket does.
+
+    Returns:
+        (ticket_number, priority, status)
+    """
+    ticket_number = (
+        ticket_data.get('ticket_number') or
+        ticket_data.get('ticket_id') or
+        ticket_data.get('id') or
+        ticket_data.get('original_ticket_id')
+    )
+    ticket_data['ticket_number'] = ticket_number
+    priority = ticket_data.get('priority', 'Medium')
+    ticket_data['priority'] = priority
+    return ticket_number, priority, ticket_data.get('status')
+
+
+class _WorkflowRoute:
+    """Everything needed to open a task for one (department, category)."""
+
+    def __init__(self, workflow, first_step, workflow_version, step_percentage):
+        self.workflow = workflow
+        self.first_step = first_step
+        self.workflow_version = workflow_version
+        self.step_percentage = step_percentage
+
+
+def _resolve_route(department, category):
+    """Workflow, first step, active version and step weight for a ticket group."""
+    from step.models import Steps
+    from workflow.models import WorkflowVersion
+    from task.utils.target_resolution import calculate_step_weight_percentage
+    from tickets.tasks import find_matching_workflow
+
+    workflow = find_matching_workflow(department, category, None)
+    if not workflow:
+        logger.warning(f"⚠️ No matching workflow found for {department} / {category}")
+        return None
+
+    first_step = Steps.objects.filter(
+        workflow_id=workflow
+    ).select_related('role_id').order_by('order').first()
+    if not first_step:
+        logger.warning(f"⚠️ No steps found for workflow {workflow.name}")
+        return None
+
+    workflow_version = WorkflowVersion.objects.filter(
+        workflow=workflow,
+        is_active=True
+    ).order_by('-version').first()
+    if not workflow_version:
+        logger.warning(f"⚠️ No active WorkflowVersion for workflow {workflow.name}, creating one on-demand")
+        try:
+            from workflow.signals import create_workflow_version
+            create_workflow_version(workflow)
+            workflow_version = WorkflowVersion.objects.filter(
+                workflow=workflow,
+                is_active=True
+            ).order_by('-version').first()
+        except Exception as e:
+            logger.error(f"❌ Failed to create WorkflowVersion: {e}")
+
+    step_percentage = calculate_step_weight_percentage(first_step, workflow, workflow_version)
+    return _WorkflowRoute(workflow, first_step, workflow_version, step_percentage)
+
+
+def _upsert_tickets(payloads):
+    """
+    Create or update WorkflowTicket rows for the batch.
+
+    Returns:
+        (new_tickets, updated_count)
+    """
+    existing = {}
+    for ticket in WorkflowTicket.objects.filter(ticket_number__in=list(payloads)).order_by('id'):
+        existing.setdefault(ticket.ticket_number, ticket)
+
+    updated = 0
+    for ticket_number, ticket in existing.items():
+        ticket_data, priority, status = payloads[ticket_number]
+        ticket.ticket_data = ticket_data
+        ticket.priority = priority
+        ticket.status = status
+        ticket.save()  # per-row save keeps the HDTS status push in WorkflowTicket.save
+        updated += 1
+
+    new_tickets = WorkflowTicket.objects.bulk_create([
+        WorkflowTicket(ticket_number=ticket_number, ticket_data=ticket_data, priority=priority, status=status)
+        for ticket_number, (ticket_data, priority, status) in payloads.items()
+        if ticket_number not in existing
+    ])
+    return new_tickets, updated
+
+
+def ingest_ticket_batch(tickets_data):
+    """
+    Ingest a batch of HDTS ticket payloads.
+
+    Args:
+        tickets_data: List of ticket dicts in the receive_ticket format
+
+    Returns:
+        dict with counts: received, created, updated, tasks_created,
+        items_assigned, unrouted (no workflow/steps) and skipped (no identifier)
+    """
+    from task.models import Task, TaskItem, TaskItemHistory
+    from task.utils.assignment import claim_round_robin_users, TICKET_COORDINATOR_ROLE
+    from task.utils.target_resolution import resolve_sla
+    from reporting.rollups import record_bulk_intake
+
+    # Last payload wins when a ticket appears twice in one batch
+    payloads = {}
+    skipped = 0
+    for ticket_data in tickets_data:
+        ticket_number, priority, status = normalize_ticket_data(ticket_data)
+        if not ticket_number:
+            skipped += 1
+            continue
+        payloads[ticket_number] = (ticket_data, priority, status)
+
+    new_tickets, updated = _upsert_tickets(payloads)
+
+    # Group new tickets by routing key and resolve each route once
+    groups = defaultdict(list)
+    for ticket in new_tickets:
+        groups[(ticket.ticket_data.get('department'), ticket.ticket_data.get('category'))].append(ticket)
+
+    routed = []  # (ticket, route)
+    unrouted = 0
+    for (department, category), tickets in groups.items():
+        route = _resolve_route(department, category)
+        if route is None:
+            unrouted += len(tickets)
+            continue
+        routed.extend((ticket, route) for ticket in tickets)
+
+    # One round-robin claim per role for the whole batch
+    owners = claim_round_robin_users(TICKET_COORDINATOR_ROLE, len(routed))
+    by_role = defaultdict(list)
+    for index, (ticket, route) in enumerate(routed):
+        by_role[route.first_step.role_id.name].append(index)
+    assignees = {}
+    for role_name, indexes in by_role.items():
+        role_users = claim_round_robin_users(role_name, len(indexes))
+        if not role_users:
+            logger.warning(f"⚠️ No users assigned for role {role_name}")
+        for index, role_user in zip(indexes, role_users):
+            assignees[index] = role_user
+
+    now = timezone.now()
+    sla_cache = {}
+
+    def sla_for(route, priority):
+        key = (route.workflow.pk, priority)
+        if key not in sla_cache:
+            sla_cache[key] = resolve_sla(route.workflow, priority or 'Medium', route.workflow_version)
+        return sla_cache[key]
+
+    tasks = []
+    for index, (ticket, route) in enumerate(routed):
+        sla = sla_for(route, ticket.priority)
+        tasks.append(Task(
+            ticket_id=ticket,
+            workflow_id=route.workflow,
+            workflow_version=route.workflow_version,
+            current_step=route.first_step,
+            ticket_owner=owners[index] if owners else None,
+            status='pending',
+            fetched_at=now,
+            target_resolution=now + sla if sla else None,
+        ))
+
+    with transaction.atomic():
+        Task.objects.bulk_create(tasks)
+
+        task_items = []
+        for index, task in enumerate(tasks):
+            role_user = assignees.get(index)
+            if role_user is None:
+                continue
+            route = routed[index][1]
+            sla = sla_for(route, task.ticket_id.priority)
+            task_items.append(TaskItem(
+                task=task,
+                role_user=role_user,
+                assigned_on_step=route.first_step,
+                origin='System',
+                target_resolution=now + sla * route.step_percentage if sla else None,
+                status='new',
+                status_updated_on=now,
+            ))
+        TaskItem.objects.bulk_create(task_items)
+        TaskItemHistory.objects.bulk_create([
+            TaskItemHistory(task_item=task_item, status='new') for task_item in task_items
+        ])
+
+        allocated_ids = {task_item.task.ticket_id_id for task_item in task_items}
+        WorkflowTicket.objects.filter(id__in=allocated_ids).update(is_task_allocated=True, updated_at=now)
+
+        record_bulk_intake(tasks, task_items)
+        transaction.on_commit(lambda: _queue_notifications(tasks, task_items))
+
+    logger.info(
+        f"🎫 Batch intake: {len(payloads)} tickets ({len(new_tickets)} new, {updated} updated), "
+        f"{len(tasks)} tasks, {len(task_items)} assignments, {unrouted} unrouted"
+    )
+    return {
+        "status": "success",
+        "received": len(tickets_data),
+        "created": len(new_tickets),
+        "updated": updated,
+        "tasks_created": len(tasks),
+        "items_assigned": len(task_items),
+        "unrouted": unrouted,
+        "skipped": skipped,
+    }
+
+
+def _queue_notifications(tasks, task_items):
+    """Send every assignment / ownership notice of the batch as one Celery task."""
+    from task.models import FailedNotification
+    from task.tasks import send_bulk_assignment_notifications
+    from task.utils.assignment import TICKET_COORDINATOR_ROLE
+
+    notifications = [
+        {
+            "user_id": task_item.role_user.user_id,
+            "ticket_number": str(task_item.task.ticket_id.ticket_number),
+            "task_item_id": str(task_item.task_item_id),
+            "task_title": str(task_item.task.ticket_id.subject),
+            "role_name": task_item.role_user.role_id.name,
+        }
+        for task_item in task_items
+    ] + [
+        {
+            "user_id": task.ticket_owner.user_id,
+            "ticket_number": str(task.ticket_id.ticket_number),
+            "task_item_id": f"task_{task.task_id}_owner",
+            "task_title": str(task.ticket_id.ticket_number),
+            "role_name": TICKET_COORDINATOR_ROLE,
+        }
+        for task in tasks if task.ticket_owner
+    ]
+    if not notifications:
+        return
+
+    try:
+        send_bulk_assignment_notifications.delay(notifications)
+    except Exception as e:
+        # Broker unavailable: keep them for the retry_failed_notifications job
+        logger.warning(f"⚠️ Failed to queue bulk assignment notifications: {e}")
+        FailedNotification.objects.bulk_create([
+            FailedNotification(
+                user_id=notification['user_id'],
+                task_item_id=notification['task_item_id'],
+                task_title=notification['task_title'],
+                role_name=notification['role_name'],
+                error_message=str(e),
+                status='pending'
+            )
+            for notification in notifications
+        ])
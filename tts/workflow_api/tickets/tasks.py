@@ -70,6 +70,69 @@ def receive_ticket(ticket_data):
         }
 
 
+@shared_task(name='tickets.tasks.receive_ticket_batch')
+def receive_ticket_batch(tickets_data, batch_size=None):
+    """
+    Batch counterpart of receive_ticket for intake spikes and backfills.
+    
+    Drains the list in chunks of `batch_size` (default
+    settings.TICKET_INTAKE_BATCH_SIZE); each chunk resolves workflows once
+    per (department, category) and bulk-creates its tasks. See tickets.intake.
+    
+    Args:
+        tickets_data (list): Ticket dicts in the receive_ticket format
+        batch_size (int): Tickets per chunk
+    
+    Returns:
+        dict: Summed counts over all chunks
+    """
+    from tickets.intake import ingest_ticket_batch
+    import traceback
+
+    batch_size = max(1, batch_size or getattr(settings, 'TICKET_INTAKE_BATCH_SIZE', 100))
+    totals = {}
+    try:
+        for start in range(0, len(tickets_data), batch_size):
+            result = ingest_ticket_batch(tickets_data[start:start + batch_size])
+            for key, value in result.items():
+                if isinstance(value, int):
+                    totals[key] = totals.get(key, 0) + value
+        print(f"✅ Batch intake finished: {totals}")
+        return {"status": "success", **totals}
+    except Exception as e:
+        return {
+            "status": "error",
+            "type": "exception",
+            "error": str(e),
+            "processed": totals,
+            "trace": traceback.format_exc()
+        }
+
+
+@shared_task(name='tickets.tasks.receive_ticket_status_batch')
+def receive_ticket_status_batch(updates):
+    """
+    Apply status changes made on the HDTS side (e.g. its hourly auto-close)
+    with one UPDATE per distinct status instead of one message per ticket.
+    
+    Args:
+        updates (list): [{'ticket_number': ..., 'status': ...}, ...]
+    
+    Returns:
+        dict: Number of WorkflowTicket rows updated
+    """
+    by_status = {}
+    for update in updates or []:
+        if update.get('ticket_number') and update.get('status'):
+            by_status.setdefault(update['status'], []).append(update['ticket_number'])
+
+    updated = 0
+    for status, ticket_numbers in by_status.items():
+        updated += WorkflowTicket.objects.filter(ticket_number__in=ticket_numbers).update(status=status)
+    print(f"✅ Ticket status batch applied: {updated} tickets")
+    return {"status": "success", "updated": updated}
+
+
 @shared_task(name='tickets.tasks.create_task_for_ticket')
 def create_task_for_ticket(ticket_id):
     """
@@ -268,18 +331,14 @@ def apply_round_robin_assignment(user_ids, role_name, max_assignments=1):
         (kept for backward compatibility, but TaskItem records are created via assign_users_for_step)
     """
     from django.utils import timezone
-    from tickets.models import RoundRobin
+    from task.utils.assignment import claim_round_robin_slots
 
     if not user_ids:
         return []
 
-    # Get or create the round-robin state for this role
-    round_robin_state, _ = RoundRobin.objects.get_or_create(role_name=role_name, defaults={"current_index": 0})
-
-    # Determine the user to assign
-    current_index = round_robin_state.current_index
-    user_index = current_index % len(user_ids)
-    user_id = user_ids[user_index]
+    # Atomically claim the next slot for this role
+    slot = claim_round_robin_slots(role_name)[0]
+    user_id = user_ids[slot % len(user_ids)]
 
     # This returns data in old format for backward compatibility
     assigned_user = {
@@ -289,10 +348,6 @@ def apply_round_robin_assignment(user_ids, role_name, max_assignments=1):
         "role": role_name
     }
 
-    # Update round-robin state for next assignment
-    round_robin_state.current_index = (current_index + 1) % len(user_ids)
-    round_robin_state.save()
-
     return [assigned_user]
 
 
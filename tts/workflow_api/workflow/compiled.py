@@ -0,0 +1,235 @@
+"""
+Compiled, in-memory workflow definitions.
+
+A WorkflowVersion is an immutable snapshot, so its JSON definition can be
+turned once into lookup structures (adjacency lists, start/end steps, step
+weight fractions, per-priority SLA deltas) and reused by every transition,
+assignment and SLA calculation that runs against that version.
+
+Compiled versions live in a bounded per-process LRU keyed by version id:
+
+    compiled = get_compiled_version(task.workflow_version)
+    compiled.has_outgoing(step_id)
+    compiled.weight_fraction(step_id)
+    compiled.step_sla('High', step_id)
+"""
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from types import MappingProxyType
+
+from django.conf import settings
+from django.utils.dateparse import parse_duration
+
+logger = logging.getLogger(__name__)
+
+CompiledStep = namedtuple('CompiledStep', [
+    'step_id', 'name', 'description', 'instruction', 'role_id', 'role_name',
+    'order', 'weight', 'weight_fraction', 'is_start', 'is_end',
+])
+
+CompiledTransition = namedtuple('CompiledTransition', [
+    'transition_id', 'from_step_id', 'to_step_id', 'name',
+])
+
+# Same mapping as task.utils.target_resolution.get_sla_for_priority
+PRIORITY_SLA_FIELDS = {
+    'low': 'low_sla',
+    'medium': 'medium_sla',
+    'high': 'high_sla',
+    'critical': 'urgent_sla',
+    'urgent': 'urgent_sla',
+}
+
+
+class CompiledWorkflow:
+    """Read-only view of one WorkflowVersion definition."""
+
+    def __init__(self, version_id, workflow_id, version, steps, transitions, sla):
+        self.version_id = version_id
+        self.workflow_id = workflow_id
+        self.version = version
+        self.steps = MappingProxyType({step.step_id: step for step in steps})
+        self.ordered_step_ids = tuple(step.step_id for step in sorted(steps, key=lambda s: (s.order, s.step_id)))
+        self.transitions = MappingProxyType({t.transition_id: t for t in transitions})
+
+        outgoing, incoming = {}, {}
+        for transition in transitions:
+            outgoing.setdefault(transition.from_step_id, []).append(transition)
+            incoming.setdefault(transition.to_step_id, []).append(transition)
+        self.outgoing_map = MappingProxyType({k: tuple(v) for k, v in outgoing.items()})
+        self.incoming_map = MappingProxyType({k: tuple(v) for k, v in incoming.items()})
+
+        self.start_step_ids = tuple(
+            step_id for step_id in self.ordered_step_ids
+            if self.steps[step_id].is_start or step_id not in self.incoming_map
+        )
+        self.end_step_ids = tuple(
+            step_id for step_id in self.ordered_step_ids
+            if self.steps[step_id].is_end or step_id not in self.outgoing_map
+        )
+        self.sla = MappingProxyType(dict(sla))
+
+    def __contains__(self, step_id):
+        return step_id in self.steps
+
+    @property
+    def first_step_id(self):
+        """Lowest-order step (what ticket intake assigns first)."""
+        return self.ordered_step_ids[0] if self.ordered_step_ids else None
+
+    def outgoing(self, step_id):
+        return self.outgoing_map.get(step_id, ())
+
+    def has_outgoing(self, step_id):
+        return step_id in self.outgoing_map
+
+    def weight_fraction(self, step_id):
+        step = self.steps.get(step_id)
+        return step.weight_fraction if step else None
+
+    def sla_for_priority(self, priority):
+        """Full SLA timedelta for a ticket priority, or None if not configured."""
+        return self.sla.get(PRIORITY_SLA_FIELDS.get((priority or 'Medium').lower()))
+
+    def step_sla(self, priority, step_id):
+        """SLA share of one step (full SLA * step weight fraction)."""
+        sla = self.sla_for_priority(priority)
+        fraction = self.weight_fraction(step_id)
+        if sla is None or fraction is None:
+            return None
+        return sla * fraction
+
+    def __repr__(self):
+        return f'<CompiledWorkflow version_id={self.version_id} v{self.version} steps={len(self.steps)}>'
+
+
+def compile_definition(version_id, workflow_id, version, definition):
+    """Build a CompiledWorkflow from a WorkflowVersion.definition dict."""
+    definition = definition or {}
+    nodes = definition.get('nodes', [])
+
+    weights = [float(node.get('weight') or 0) for node in nodes]
+    total_weight = sum(weights)
+    steps = []
+    for node, weight in zip(nodes, weights):
+        # Mirrors calculate_step_weight_percentage: equal shares if no weights
+        fraction = weight / total_weight if total_weight else 1.0 / len(nodes)
+        steps.append(CompiledStep(
+            step_id=node['id'],
+            name=node.get('label', ''),
+            description=node.get('description', ''),
+            instruction=node.get('instruction', ''),
+            role_id=node.get('role_id'),
+            role_name=node.get('role_name'),
+            order=node.get('order', 0),
+            weight=weight,
+            weight_fraction=fraction,
+            is_start=bool(node.get('is_start')),
+            is_end=bool(node.get('is_end')),
+        ))
+
+    transitions = [
+        CompiledTransition(
+            transition_id=edge.get('id'),
+            from_step_id=edge.get('from_step_id'),
+            to_step_id=edge.get('to_step_id'),
+            name=edge.get('name', ''),
+        )
+        for edge in definition.get('edges', [])
+    ]
+
+    metadata = definition.get('metadata', {})
+    sla = {}
+    for field in set(PRIORITY_SLA_FIELDS.values()):
+        value = metadata.get(field)
+        duration = parse_duration(value) if isinstance(value, str) else None
+        if duration:
+            sla[field] = duration
+
+    return CompiledWorkflow(version_id, workflow_id, version, steps, transitions, sla)
+
+
+class _CompiledVersionCache:
+    """Thread-safe bounded LRU of CompiledWorkflow keyed by WorkflowVersion id."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self):
+        return getattr(settings, 'WORKFLOW_COMPILED_CACHE_SIZE', 256)
+
+    def get(self, version_id):
+        with self._lock:
+            compiled = self._entries.get(version_id)
+            if compiled is not None:
+                self._entries.move_to_end(version_id)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return compiled
+
+    def put(self, compiled):
+        with self._lock:
+            self._entries[compiled.version_id] = compiled
+            self._entries.move_to_end(compiled.version_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, version_id):
+        with self._lock:
+            self._entries.pop(version_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+compiled_versions = _CompiledVersionCache()
+
+
+def get_compiled_version(workflow_version):
+    """
+    Compiled definition for a WorkflowVersion instance or id.
+
+    Passing the instance (e.g. task.workflow_version) avoids any query on a
+    cache miss; passing an id loads the row once.
+
+    Returns:
+        CompiledWorkflow, or None if workflow_version is None / missing
+    """
+    if workflow_version is None:
+        return None
+    version_id = getattr(workflow_version, 'pk', workflow_version)
+
+    compiled = compiled_versions.get(version_id)
+    if compiled is not None:
+        return compiled
+
+    if not hasattr(workflow_version, 'definition'):
+        from workflow.models import WorkflowVersion
+        workflow_version = WorkflowVersion.objects.filter(pk=version_id).first()
+        if workflow_version is None:
+            return None
+
+    try:
+        compiled = compile_definition(
+            workflow_version.pk,
+            workflow_version.workflow_id,
+            workflow_version.version,
+            workflow_version.definition,
+        )
+    except Exception as e:
+        logger.error(f"❌ Failed to compile WorkflowVersion {version_id}: {e}", exc_info=True)
+        return None
+
+    compiled_versions.put(compiled)
+    return compiled
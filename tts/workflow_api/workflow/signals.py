@@ -114,6 +114,12 @@ def update_workflow_status(sender, instance, **kwargs):
     if workflow_id:
         compute_workflow_status(workflow_id)
 
+@receiver([post_save, post_delete], sender=WorkflowVersion)
+def discard_compiled_workflow_version(sender, instance, **kwargs):
+    # Versions are immutable snapshots; this only matters for deletes/admin edits
+    from workflow.compiled import compiled_versions
+    compiled_versions.discard(instance.pk)
+
 # No more push to localhost — this signal now only reacts to status changes.
 @receiver(post_save, sender=Workflows)
 def push_initialized_workflow(sender, instance: Workflows, created, **kwargs):
@@ -1,8 +1,17 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'workflow_api.settings')
 
 app = Celery('workflow_api')
 app.config_from_object('django.conf:settings', namespace='CELERY')
-app.autodiscover_tasks()
\ No newline at end of file
+app.autodiscover_tasks()
+
+# Celery Beat Schedule for periodic tasks
+app.conf.beat_schedule = {
+    'scan-sla-deadlines-every-minute': {
+        'task': 'task.scan_sla_deadlines',
+        'schedule': crontab(minute='*'),  # Run every minute
+    },
+}